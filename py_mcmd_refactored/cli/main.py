@@ -1,25 +1,48 @@
 import argparse
-import json
 import logging
 import os
 import sys
 from pathlib import Path
-from pprint import pprint  # pretty-print the object
 
 HERE = Path(__file__).resolve()
 PROJECT_ROOT = HERE.parents[1]  # .../py_mcmd_refactored
 REPO_ROOT = HERE.parents[2]  # repo root
 
+# `python cli/main.py` puts cli/ (not the project) on sys.path; the two
+# inserts are the whole cost here, the startup time was in the imports
 for p in (str(REPO_ROOT), str(PROJECT_ROOT)):
     if p not in sys.path:
         sys.path.insert(0, p)
 
 
-from config.models import load_simulation_config
-from orchestrator.manager import SimulationOrchestrator
-
 from py_mcmd_refactored.version import get_version
 
+# Heavy dependencies are resolved on first use: `--version` and argument
+# errors never import pydantic, and `--validate` never imports the
+# orchestrator/engine stack. Names stay module attributes (and remain
+# monkeypatchable) through the module-level __getattr__ below.
+_LAZY_ATTRS = {
+    "load_simulation_config": "config.models",
+    "SimulationOrchestrator": "orchestrator.manager",
+}
+
+
+def _lazy(name: str):
+    try:
+        return globals()[name]
+    except KeyError:
+        pass
+    module = __import__(_LAZY_ATTRS[name], fromlist=[name])
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # *************************************************
 # The python arguments that need to be selected to run the simulations (start)
@@ -68,6 +91,12 @@ def parse_args(argv=None):
         action="store_true",
         help="Do not execute NAMD/GOMC binaries. Still generates inputs and runs orchestration logic.",
     )
+    arg_parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Only load and validate the JSON config, then exit "
+        "(does not import the orchestrator or engines).",
+    )
     # return arg_parser.parse_args()
     args = arg_parser.parse_args(argv)
 
@@ -108,6 +137,12 @@ def parse_args(argv=None):
 
 
 def main():
+    if sys.argv[1:2] == ["timing"]:
+        # `py-mcmd timing ...`: timing report of a (running) simulation
+        from cli.timing import main as timing_main
+
+        sys.exit(timing_main(sys.argv[2:]))
+
     args = parse_args()
     # logging setup
     level = logging.DEBUG if args.verbose else logging.INFO
@@ -118,12 +153,16 @@ def main():
     )
     # load + validate config
     try:
-        cfg = load_simulation_config(args.file)
+        cfg = _lazy("load_simulation_config")(args.file)
         logging.info("Loaded simulation config from %s", args.file)
     except Exception as e:
         logging.error("Failed to load config: %s", e)
         sys.exit(1)
 
+    if args.validate:
+        logging.info("Config %s is valid.", args.file)
+        return
+
     # CLI overrides (do not require JSON config changes)
     # NOTE: parse_args() normalizes invalid/missing values to "series".
     cfg = cfg.model_copy(
@@ -131,7 +170,7 @@ def main():
     )
 
     # hand off to the orchestrator
-    sim = SimulationOrchestrator(cfg, dry_run=args.dry_run)
+    sim = _lazy("SimulationOrchestrator")(cfg, dry_run=args.dry_run)
     logging.info(
         "Configuration loaded and orchestrator constructed successfully."
     )
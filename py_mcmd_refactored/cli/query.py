@@ -0,0 +1,115 @@
+import argparse
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve()
+PROJECT_ROOT = HERE.parents[1]  # .../py_mcmd_refactored
+REPO_ROOT = HERE.parents[2]  # repo root
+
+for p in (str(REPO_ROOT), str(PROJECT_ROOT)):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from utils.output_index import CycleOffsetIndex
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog="py-mcmd-query",
+        description="Print rows of a combined output for a cycle or step "
+        "range using its .idx sidecar index.",
+        epilog="example: py-mcmd-query "
+        "combined_data/GOMC_Energies_Stat_box_0.txt --cycles 4000 4500",
+    )
+    arg_parser.add_argument(
+        "output",
+        type=Path,
+        help="Combined output file, e.g. "
+        "combined_data/GOMC_Energies_Stat_box_0.txt",
+    )
+    selector = arg_parser.add_mutually_exclusive_group()
+    selector.add_argument(
+        "--cycles",
+        nargs=2,
+        type=int,
+        metavar=("FIRST", "LAST"),
+        help="Inclusive cycle range.",
+    )
+    selector.add_argument(
+        "--steps",
+        nargs=2,
+        type=int,
+        metavar=("FIRST", "LAST"),
+        help="Inclusive step range.",
+    )
+    arg_parser.add_argument(
+        "--build",
+        action="store_true",
+        help="(Re)build the index from the output first; needed for files "
+        "written by the legacy replay. Requires --steps-per-cycle.",
+    )
+    arg_parser.add_argument(
+        "--steps-per-cycle",
+        type=int,
+        help="namd_run_steps + gomc_run_steps of the run (for --build).",
+    )
+    arg_parser.add_argument(
+        "--step-offset",
+        type=int,
+        default=0,
+        help="Step at which cycle 0 starts (for --build, default 0).",
+    )
+    arg_parser.add_argument(
+        "--no-header",
+        action="store_true",
+        help="Do not print the column titles line.",
+    )
+    args = arg_parser.parse_args(argv)
+
+    if args.build and not args.steps_per_cycle:
+        arg_parser.error("--build requires --steps-per-cycle")
+    if not args.build and args.cycles is None and args.steps is None:
+        arg_parser.error("one of --cycles, --steps or --build is required")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if not args.output.exists():
+        print(f"Output file <{args.output}> does not exist!", file=sys.stderr)
+        return 1
+
+    if args.build:
+        index = CycleOffsetIndex.build(
+            args.output,
+            steps_per_cycle=args.steps_per_cycle,
+            step_offset=args.step_offset,
+        )
+    else:
+        index = CycleOffsetIndex(args.output)
+        if not index.path.exists():
+            print(
+                f"No index <{index.path}>; rerun with --build "
+                "--steps-per-cycle N",
+                file=sys.stderr,
+            )
+            return 1
+
+    if args.cycles is not None:
+        rows = index.read_cycles(*args.cycles)
+    elif args.steps is not None:
+        rows = index.read_steps(*args.steps)
+    else:
+        return 0
+
+    header = None if args.no_header else index.header()
+    if header is not None:
+        print(header)
+    for row in rows:
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve()
+PROJECT_ROOT = HERE.parents[1]  # .../py_mcmd_refactored
+REPO_ROOT = HERE.parents[2]  # repo root
+
+for p in (str(REPO_ROOT), str(PROJECT_ROOT)):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from orchestrator.status import tree_bytes
+from utils.time_stats import TIME_STATS_COLUMNS
+from utils.timing_analysis import (
+    OUTLIER_Z,
+    PHASES,
+    analyze,
+    forecast_disk,
+    gomc_molecule_counts,
+    read_time_stats,
+)
+
+_PHASE_TITLES = dict(zip(PHASES, TIME_STATS_COLUMNS))
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog="py-mcmd timing",
+        description="Report per-phase timing statistics, trends, outlier "
+        "cycles and a remaining-time / disk forecast of a run (also while "
+        "it is still running).",
+    )
+    arg_parser.add_argument(
+        "-f",
+        "--file",
+        type=Path,
+        help="JSON config of the run; supplies the log, combined-data and "
+        "run dirs and total_cycles_namd_gomc_sims.",
+    )
+    arg_parser.add_argument(
+        "--log-dir",
+        type=Path,
+        help="Directory with the TIME_STATS files (overrides the config).",
+    )
+    arg_parser.add_argument(
+        "--combined-dir",
+        type=Path,
+        help="On-the-fly combined data dir (overrides the config).",
+    )
+    arg_parser.add_argument(
+        "--total-cycles",
+        type=int,
+        help="Cycles to forecast for (overrides the config).",
+    )
+    arg_parser.add_argument(
+        "--window",
+        type=int,
+        default=50,
+        help="Recent cycles used for the forecast (default 50).",
+    )
+    arg_parser.add_argument(
+        "--outlier-z",
+        type=float,
+        default=OUTLIER_Z,
+        help=f"Modified z-score of an outlier cycle (default {OUTLIER_Z}).",
+    )
+    arg_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON.",
+    )
+    args = arg_parser.parse_args(argv)
+
+    if args.file is None and args.log_dir is None:
+        arg_parser.error("one of -f/--file or --log-dir is required")
+    return args
+
+
+def _duration(seconds) -> str:
+    if seconds is None:
+        return "n/a"
+    seconds = int(round(seconds))
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if days:
+        return f"{days}d {hours}h {minutes:02d}m"
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {seconds:02d}s"
+
+
+def _size(n_bytes) -> str:
+    if n_bytes is None:
+        return "n/a"
+    value = float(n_bytes)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+def format_report(report: dict) -> str:
+    if not report["cycles"]:
+        return "No TIME_STATS data found."
+
+    lines = [
+        f"Cycles {report['first_cycle']}..{report['last_cycle']} "
+        f"({report['cycles']} recorded, "
+        f"{len(report['missing_cycles'])} missing)",
+        "",
+        f"{'phase':<14}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}"
+        f"{'trend s/cycle':>16}{'r':>7}",
+    ]
+    for phase in PHASES:
+        dist = report["distributions"][phase]
+        trend = report["trends"][phase]
+        slope = f"{trend['slope']:+.4g}" if trend else "n/a"
+        r = f"{trend['r']:.2f}" if trend else "n/a"
+        lines.append(
+            f"{_PHASE_TITLES[phase]:<14}"
+            + "".join(
+                f"{dist[key]:>10.3f}" for key in ("mean", "p50", "p95", "max")
+            )
+            + f"{slope:>16}{r:>7}"
+        )
+
+    lines.append("")
+    overhead = report["python_overhead_fraction"]
+    lines.append(
+        "Python overhead: "
+        + (
+            "n/a"
+            if overhead is None
+            else f"{100 * overhead:.3f} % of wall time"
+        )
+    )
+    molecules = report.get("gomc_vs_molecules")
+    if molecules:
+        lines.append(
+            f"GOMC time vs box-0 molecules: {molecules['slope']:+.4g} "
+            f"s/molecule (r={molecules['r']:.2f})"
+        )
+    if report["outliers"]:
+        lines.append(
+            "Outlier cycles: "
+            + "; ".join(
+                f"{_PHASE_TITLES[p]}: {', '.join(map(str, cycles))}"
+                for p, cycles in report["outliers"].items()
+            )
+        )
+    else:
+        lines.append("Outlier cycles: none")
+
+    forecast = report.get("forecast")
+    if forecast:
+        lines.append(
+            f"Forecast: {forecast['remaining_cycles']} of "
+            f"{forecast['total_cycles']} cycles left at "
+            f"{forecast['per_cycle_s'] or 0:.2f} s/cycle -> "
+            f"{_duration(forecast['remaining_s'])} "
+            f"(with trend: {_duration(forecast['remaining_s_trend'])})"
+        )
+    disk = report.get("disk")
+    if disk:
+        per_cycle = disk.get("bytes_per_cycle")
+        lines.append(
+            f"Disk: {_size(disk['current_bytes'])} now"
+            + (
+                f", {_size(per_cycle)}/cycle -> {_size(disk['final_bytes'])} "
+                f"at {forecast['total_cycles']} cycles"
+                if per_cycle is not None and forecast
+                else ""
+            )
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    cfg = None
+    if args.file is not None:
+        if not args.file.exists():
+            print(f"Config file <{args.file}> does not exist!", file=sys.stderr)
+            return 1
+        from config.models import load_simulation_config
+
+        cfg = load_simulation_config(str(args.file))
+
+    log_dir = args.log_dir or Path(cfg.log_dir)
+    combined_dir = args.combined_dir or (
+        Path(cfg.combined_data_dir) if cfg is not None else None
+    )
+    total_cycles = args.total_cycles or (
+        int(cfg.total_cycles_namd_gomc_sims) if cfg is not None else None
+    )
+
+    timings = read_time_stats(log_dir)
+    report = analyze(
+        timings,
+        total_cycles=total_cycles,
+        molecule_counts=(
+            gomc_molecule_counts(combined_dir) if combined_dir else None
+        ),
+        window=args.window,
+        outlier_z=args.outlier_z,
+    )
+
+    if total_cycles is not None and timings:
+        dirs = {log_dir}
+        if combined_dir is not None:
+            dirs.add(combined_dir)
+        if cfg is not None:
+            dirs.update({Path(cfg.path_namd_runs), Path(cfg.path_gomc_runs)})
+        report["disk"] = forecast_disk(
+            sum(tree_bytes(d) for d in dirs),
+            report["forecast"]["cycles_done"],
+            total_cycles,
+        )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+    return 0 if timings else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# python cli/timing.py -f user_input_NAMD_GOMC.json
@@ -2,18 +2,328 @@
 import json
 import re
 from pathlib import Path
-from typing import Dict, List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Tuple
 
 from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    NonNegativeInt,
     StrictBool,
     field_validator,
     model_validator,
 )
 
 
+class DcdAtomSelection(BaseModel):
+    """
+    Atoms kept in an on-the-fly combined DCD, resolved once from the PSF.
+    Index ranges, segids and resnames are OR-ed (all atoms if none is
+    given); the exclude lists are removed afterwards.
+    """
+
+    index_ranges: List[Tuple[int, int]] = Field(
+        default_factory=list,
+        description="Inclusive, zero-based [first, last] atom index ranges.",
+    )
+    segids: List[str] = Field(default_factory=list)
+    resnames: List[str] = Field(default_factory=list)
+    exclude_segids: List[str] = Field(default_factory=list)
+    exclude_resnames: List[str] = Field(default_factory=list)
+
+    model_config = ConfigDict(extra="forbid")
+
+    @field_validator("index_ranges")
+    @classmethod
+    def _validate_index_ranges(cls, v):
+        for first, last in v:
+            if first < 0 or last < first:
+                raise ValueError(
+                    "index_ranges entries must be [first, last] with "
+                    f"0 <= first <= last; received {[first, last]}."
+                )
+        return v
+
+
+class ConvergenceCriterionConfig(BaseModel):
+    """
+    One stopping criterion: the block-averaged standard error of a parsed
+    column (e.g. GOMC box 0 TOT_DENSITY) at or below `tolerance`.
+    """
+
+    engine: Literal["NAMD", "GOMC"] = "GOMC"
+    box: int = Field(default=0, ge=0, le=1)
+    column: str
+    tolerance: float = Field(..., gt=0)
+    relative: StrictBool = Field(
+        default=False,
+        description="Compare sem / |mean| instead of the absolute sem.",
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ConvergenceStopConfig(BaseModel):
+    """
+    Stop the coupled run early once all criteria hold for
+    `consecutive_checks` checks in a row.
+    """
+
+    criteria: List[ConvergenceCriterionConfig] = Field(..., min_length=1)
+    consecutive_checks: int = Field(default=3, ge=1)
+    min_cycles: int = Field(
+        default=0,
+        ge=0,
+        description="Committed cycles of this run before the first check.",
+    )
+    check_every: int = Field(default=1, ge=1)
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class SegmentTunerConfig(BaseModel):
+    """
+    Opt-in tuning of namd_run_steps/gomc_run_steps from the measured
+    per-segment overhead. "propose" only logs suggested lengths; "apply"
+    switches to them between cycles, within the min/max bounds.
+    """
+
+    mode: Literal["propose", "apply"] = "propose"
+    target_overhead_percent: float = Field(
+        default=10.0,
+        gt=0,
+        lt=100,
+        description="Largest acceptable non-simulation share of a cycle.",
+    )
+    min_namd_run_steps: Optional[int] = Field(default=None, ge=1)
+    max_namd_run_steps: Optional[int] = Field(default=None, ge=1)
+    min_gomc_run_steps: Optional[int] = Field(default=None, ge=1)
+    max_gomc_run_steps: Optional[int] = Field(default=None, ge=1)
+    window: int = Field(
+        default=8, ge=2, description="Recent cycles used for the fit."
+    )
+    warmup_cycles: int = Field(
+        default=2,
+        ge=0,
+        description="Cycles of each run ignored (minimization, cold caches).",
+    )
+    retune_every: int = Field(default=4, ge=1)
+    probe_factor: float = Field(
+        default=2.0,
+        gt=1,
+        description=(
+            "Length scale of the one-cycle probe run in apply mode when "
+            "all observed cycles had the same length."
+        ),
+    )
+    step_multiple: int = Field(
+        default=10,
+        ge=1,
+        description="Proposed lengths are rounded up to this multiple.",
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def _check_bounds(self):
+        for engine in ("namd", "gomc"):
+            lo = getattr(self, f"min_{engine}_run_steps")
+            hi = getattr(self, f"max_{engine}_run_steps")
+            if lo is not None and hi is not None and lo > hi:
+                raise ValueError(
+                    f"min_{engine}_run_steps must be <= max_{engine}_run_steps"
+                )
+        if self.mode == "apply" and (
+            self.max_namd_run_steps is None or self.max_gomc_run_steps is None
+        ):
+            raise ValueError(
+                "segment_tuner mode 'apply' requires max_namd_run_steps and "
+                "max_gomc_run_steps"
+            )
+        return self
+
+
+class EngineWatchdogConfig(BaseModel):
+    """
+    Hang detection for the engine subprocesses. A segment is flagged (or,
+    with mode "kill", terminated) once its stdout and CPU progress fall
+    well below the baseline learned from earlier healthy segments.
+    """
+
+    mode: Literal["off", "flag", "kill"] = "flag"
+    check_interval_s: float = Field(default=5.0, gt=0)
+    grace_s: float = Field(
+        default=60.0,
+        ge=0,
+        description="Runtime of a segment before it can be flagged.",
+    )
+    stall_factor: float = Field(
+        default=4.0,
+        gt=1,
+        description=(
+            "Multiple of the baseline silence (and segment duration) "
+            "beyond which a silent segment is suspect."
+        ),
+    )
+    cpu_stall_fraction: float = Field(
+        default=0.1,
+        gt=0,
+        lt=1,
+        description="CPU rate, as a fraction of the baseline, of a hang.",
+    )
+    idle_timeout_s: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Silence limit used before any baseline was learned.",
+    )
+    tail_lines: int = Field(
+        default=50, ge=1, description="Stdout lines kept for the report."
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class SegmentRetryConfig(BaseModel):
+    """
+    Retry a failed NAMD/GOMC segment from the last committed restart files
+    instead of aborting the run.
+    """
+
+    max_retries: int = Field(default=2, ge=0)
+    core_fraction_per_retry: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=1,
+        description=(
+            "Scale the core counts by this factor on every retry "
+            "(e.g. 0.5 halves them on the first retry)."
+        ),
+    )
+    reseed_gomc: StrictBool = Field(
+        default=True,
+        description="Run GOMC retries with a new fixed random seed.",
+    )
+    backoff_s: float = Field(
+        default=0.0, ge=0, description="Pause before each retry."
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class LiveStatusConfig(BaseModel):
+    """
+    Publish the live status of the run as an atomically replaced JSON file
+    and, optionally, as Prometheus metrics on a local HTTP port.
+    """
+
+    path: Optional[str] = Field(
+        default=None,
+        description="Status JSON path (default: <log_dir>/status.json).",
+    )
+    prometheus_port: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=65535,
+        description="Serve /metrics on this port (0 picks a free one).",
+    )
+    prometheus_host: str = Field(
+        default="127.0.0.1",
+        description="Address of the metrics endpoint (localhost only by default).",
+    )
+    run_label: Optional[str] = Field(
+        default=None,
+        description="Value of the 'run' label (default: working-dir name).",
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class LauncherConfig(BaseModel):
+    """
+    How an engine is launched: local multicore, charmrun, mpirun or srun,
+    with per-box host allocation (see engines/launcher.py).
+    """
+
+    kind: Literal["local", "charmrun", "mpirun", "srun"] = "local"
+    executable: Optional[str] = Field(
+        default=None,
+        description="Launcher binary (default: the kind, found on PATH).",
+    )
+    hosts: List[str] = Field(
+        default_factory=list,
+        description=(
+            "Host pool; split evenly between NAMD boxes run in parallel."
+        ),
+    )
+    box_hosts: Optional[Dict[int, List[str]]] = Field(
+        default=None,
+        description='Hosts per NAMD box, e.g. {"0": ["n1"], "1": ["n2"]}.',
+    )
+    ranks_per_host: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Ranks per host (default: the engine's core count).",
+    )
+    keep_cores_flag: StrictBool = Field(
+        default=False,
+        description=(
+            "Keep the engine's +p<cores> flag under mpirun/srun (e.g. GOMC "
+            "OpenMP threads per rank)."
+        ),
+    )
+    extra_args: List[str] = Field(
+        default_factory=list,
+        description="Extra launcher arguments placed before the engine.",
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+    @field_validator("box_hosts")
+    @classmethod
+    def _validate_box_hosts(cls, v):
+        if v is not None and not set(v) <= {0, 1}:
+            raise ValueError("box_hosts keys must be NAMD boxes 0 and/or 1")
+        return v
+
+
+class BackgroundConfig(BaseModel):
+    """
+    Scheduling of the non-engine background work (the OTF worker, which
+    then runs in its own process, the tools it runs, e.g. catdcd, and
+    retry-log archival), so it does not slow down NAMD/GOMC.
+    """
+
+    cpus: Optional[List[NonNegativeInt]] = Field(
+        default=None,
+        description=(
+            "CPU cores for background work, outside NAMD's and GOMC's "
+            "cores (default: the legacy catdcd_core / enable_cpu_affinity "
+            "choice, else unpinned)."
+        ),
+    )
+    nice: int = Field(
+        default=10,
+        ge=0,
+        le=19,
+        description="Nice increment of background threads (0 = unchanged).",
+    )
+    io_class: Literal["idle", "best-effort", "none"] = Field(
+        default="best-effort",
+        description=(
+            "I/O scheduling class; 'idle' only gets disk time the engines "
+            "leave unused, 'none' keeps the inherited class."
+        ),
+    )
+    io_level: int = Field(
+        default=7,
+        ge=0,
+        le=7,
+        description="Best-effort I/O priority level (7 = lowest).",
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
 class SimulationConfig(BaseModel):
     """
     Pydantic model for hybrid NAMD↔GOMC simulation configuration.
@@ -88,11 +398,12 @@ class SimulationConfig(BaseModel):
     catdcd_core: Optional[int] = Field(
         default=None,
         description=(
-            "CPU core ID to pin catdcd to (via taskset), so the per-cycle "
-            "DCD combine does not steal CPU from NAMD's compute threads. "
-            "Set this to a core OUTSIDE NAMD's range. For example, if NAMD "
-            "uses 8 cores (0-7), set catdcd_core to 8 to give catdcd its own "
-            "core. If null, catdcd runs without CPU pinning (default)."
+            "CPU core ID to pin the background (OTF) work, including "
+            "catdcd, to, so the per-cycle DCD combine does not steal CPU "
+            "from NAMD's compute threads. Set this to a core OUTSIDE NAMD's "
+            "range. For example, if NAMD uses 8 cores (0-7), set catdcd_core "
+            "to 8. Superseded by background.cpus; if both are null, the "
+            "background work runs without CPU pinning (default)."
         ),
     )
 
@@ -101,15 +412,16 @@ class SimulationConfig(BaseModel):
         description=(
             "Number of CPU cores to reserve for on-the-fly processing "
             "(catdcd + parsing), kept separate from NAMD's cores. If set, "
-            "catdcd is pinned to the reserved core(s) just past NAMD's range."
+            "the background work is pinned to the reserved core(s) just "
+            "past NAMD's range when enable_cpu_affinity is true."
         ),
     )
 
     enable_cpu_affinity: StrictBool = Field(
         default=False,
         description=(
-            "Whether to pin the on-the-fly processing (catdcd) to a "
-            "dedicated CPU core so it does not compete with NAMD."
+            "Whether to pin the on-the-fly processing (worker and catdcd) "
+            "to dedicated CPU cores so it does not compete with NAMD."
         ),
     )
 
@@ -129,6 +441,187 @@ class SimulationConfig(BaseModel):
         description="Number of recent raw cycle directories to keep for crash recovery.",
     )
 
+    otf_namd_dcd_selection: Optional[DcdAtomSelection] = Field(
+        default=None,
+        description=(
+            "Atoms written to the combined NAMD DCD (e.g. "
+            '{"exclude_resnames": ["TIP3"]}). A matching reduced PSF is '
+            "written next to it. All atoms when null (default)."
+        ),
+    )
+
+    otf_gomc_dcd_selection: Optional[DcdAtomSelection] = Field(
+        default=None,
+        description="Atoms written to the combined GOMC DCDs (see above).",
+    )
+
+    otf_namd_dcd_frame_stride: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Keep every Nth frame of each NAMD DCD segment in the combined "
+            "trajectory (the last frame of every N)."
+        ),
+    )
+
+    otf_gomc_dcd_frame_stride: int = Field(
+        default=1,
+        ge=1,
+        description="Keep every Nth frame of each GOMC DCD segment.",
+    )
+
+    otf_trajectory_format: str = Field(
+        default="dcd",
+        description=(
+            "Format of the on-the-fly combined trajectories. Options: 'dcd' "
+            "(default, via catdcd), 'compressed' (fixed-precision .pmct "
+            "files) or 'both'."
+        ),
+    )
+
+    otf_trajectory_precision: float = Field(
+        default=0.001,
+        gt=0,
+        description=(
+            "Coordinate precision (Angstrom) of compressed trajectories; "
+            "decoded coordinates are within half of it of the originals."
+        ),
+    )
+
+    otf_online_stats: Optional[StrictBool] = Field(
+        default=None,
+        description=(
+            "Keep online mean/variance, block-average and autocorrelation "
+            "estimates of every parsed NAMD/GOMC column and write them to "
+            "online_stats.json in the combined data dir every cycle. "
+            "Defaults to on only when convergence_stop is set."
+        ),
+    )
+
+    otf_stats_max_lag: int = Field(
+        default=64,
+        ge=1,
+        description="Largest lag (in rows) of the running autocorrelation.",
+    )
+
+    convergence_stop: Optional[ConvergenceStopConfig] = Field(
+        default=None,
+        description=(
+            "Optional stopping rule evaluated on the on-the-fly online "
+            "statistics; requires process_on_the_fly and otf_online_stats."
+        ),
+    )
+
+    segment_tuner: Optional[SegmentTunerConfig] = Field(
+        default=None,
+        description=(
+            "Optional overhead-aware tuning of the NAMD/GOMC segment "
+            "lengths; changes are recorded in the segment ledger."
+        ),
+    )
+
+    engine_watchdog: Optional[EngineWatchdogConfig] = Field(
+        default=None,
+        description=(
+            "Optional hang watchdog for NAMD/GOMC segments; events are "
+            "written to watchdog_event.json in the segment directory."
+        ),
+    )
+
+    segment_retry: Optional[SegmentRetryConfig] = Field(
+        default=None,
+        description=(
+            "Optional retry policy for failed segments; the logs of each "
+            "failed attempt are kept under <log_dir>/segment_attempts."
+        ),
+    )
+
+    live_status: Optional[LiveStatusConfig] = Field(
+        default=None,
+        description=(
+            "Optional live status JSON / Prometheus metrics for monitoring "
+            "long runs without parsing the logs."
+        ),
+    )
+    namd_launcher: Optional[LauncherConfig] = Field(
+        default=None,
+        description=(
+            "Launch NAMD through charmrun/mpirun/srun, e.g. a node per "
+            "GEMC box (local '+p<cores>' when unset)."
+        ),
+    )
+    gomc_launcher: Optional[LauncherConfig] = Field(
+        default=None,
+        description=(
+            "Launch GOMC through charmrun/mpirun/srun (local '+p<cores>' "
+            "when unset)."
+        ),
+    )
+    background: Optional[BackgroundConfig] = Field(
+        default=None,
+        description=(
+            "Optional CPU affinity, nice level and I/O priority of the "
+            "background (OTF) work."
+        ),
+    )
+    stage_static_inputs: StrictBool = Field(
+        default=False,
+        description=(
+            "Copy force fields, starting PSF/PDBs and templates once into a "
+            "node-wide content-addressed tmpfs area shared by concurrent "
+            "runs, and point the engine configs at the copies."
+        ),
+    )
+    staged_inputs_dir: Optional[str] = Field(
+        default=None,
+        description=(
+            "Root of the staged inputs (default: $PY_MCMD_STAGED_INPUT_ROOT, "
+            "else /dev/shm/py_mcmd_inputs-<uid>). A root other users own or "
+            "can write to is not used; inputs then go under the managed root."
+        ),
+    )
+    trace_events_path: Optional[str] = Field(
+        default=None,
+        description=(
+            "Write a Chrome/Perfetto trace-event JSON of the run timeline "
+            "(orchestrator, engine processes, OTF worker) to this path."
+        ),
+    )
+    engine_profile_interval_s: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Sample /proc for the NAMD/GOMC process trees at this interval "
+            "and log a resource profile per segment (off when unset)."
+        ),
+    )
+
+    namd_fft_cache_dir: Optional[str] = Field(
+        default=None,
+        description=(
+            "Persistent directory for NAMD FFTW plan files shared across "
+            "simulations and restarts (falls back to PY_MCMD_FFT_CACHE_DIR; "
+            "disabled when unset)."
+        ),
+    )
+
+    namd_fft_cache_max_mb: int = Field(
+        default=64,
+        ge=1,
+        description="Size bound for the persistent FFTW plan cache (MiB).",
+    )
+
+    namd_persistent_process: StrictBool = Field(
+        default=False,
+        description=(
+            "Keep one NAMD process per box alive across cycles and drive it "
+            "through its Tcl interface (+stdin) instead of relaunching NAMD "
+            "every cycle. NAMD is relaunched when the atom count, the "
+            "command line or the allocated cores change. Each segment is "
+            "still watched, profiled and traced like a launched process."
+        ),
+    )
+
     # Core counts
     no_core_box_0: int = Field(..., ge=1)  # must be a positive integer
     no_core_box_1: int = Field(
@@ -209,6 +702,20 @@ class SimulationConfig(BaseModel):
             )
         return mode
 
+    @field_validator("otf_trajectory_format", mode="before")
+    @classmethod
+    def _validate_otf_trajectory_format(cls, v):
+        if not isinstance(v, str):
+            raise TypeError("otf_trajectory_format must be a string.")
+
+        fmt = v.strip().lower()
+        valid_formats = {"dcd", "compressed", "both"}
+        if fmt not in valid_formats:
+            raise ValueError(
+                "otf_trajectory_format must be one of: dcd, compressed, both."
+            )
+        return fmt
+
     # @model_validator(mode="after")
     # def _require_box1_when_two_box_ensemble(self):
     #     # For ensembles that use a second box, require non-zero cores for box 1
@@ -217,6 +724,19 @@ class SimulationConfig(BaseModel):
     #             raise ValueError("no_core_box_1 must be > 0")
     #     return self
 
+    @model_validator(mode="after")
+    def _convergence_stop_needs_online_stats(self):
+        if self.otf_online_stats is None:
+            self.otf_online_stats = self.convergence_stop is not None
+        if self.convergence_stop is not None and not (
+            self.process_on_the_fly and self.otf_online_stats
+        ):
+            raise ValueError(
+                "convergence_stop requires process_on_the_fly and "
+                "otf_online_stats to be true"
+            )
+        return self
+
     @model_validator(mode="after")
     def _require_box1_when_two_box_ensemble(self):
         # Only two-box GEMC runs require NAMD cores for box 1.
@@ -402,17 +922,7 @@ class SimulationConfig(BaseModel):
         super().__init__(**data)
 
         # Derive the per-engine step parameters from run steps
-        gsteps = int(self.gomc_run_steps)
-        nsteps = int(self.namd_run_steps)
-
-        # Tolerances
-        object.__setattr__(self, "gomc_console_blkavg_hist_steps", gsteps)
-        object.__setattr__(self, "gomc_rst_coor_ckpoint_steps", gsteps)
-        object.__setattr__(
-            self, "gomc_hist_sample_steps", min(500, int(gsteps / 10))
-        )
-        object.__setattr__(self, "namd_rst_dcd_xst_steps", nsteps)
-        object.__setattr__(self, "namd_console_blkavg_e_and_p_steps", nsteps)
+        self._derive_step_params()
         object.__setattr__(
             self,
             "namd_minimize_steps",
@@ -445,6 +955,27 @@ class SimulationConfig(BaseModel):
             spc * int(self.starting_at_cycle_namd_gomc_sims),
         )
 
+    def _derive_step_params(self) -> None:
+        gsteps = int(self.gomc_run_steps)
+        nsteps = int(self.namd_run_steps)
+
+        object.__setattr__(self, "gomc_console_blkavg_hist_steps", gsteps)
+        object.__setattr__(self, "gomc_rst_coor_ckpoint_steps", gsteps)
+        object.__setattr__(
+            self, "gomc_hist_sample_steps", min(500, int(gsteps / 10))
+        )
+        object.__setattr__(self, "namd_rst_dcd_xst_steps", nsteps)
+        object.__setattr__(self, "namd_console_blkavg_e_and_p_steps", nsteps)
+
+    def set_run_steps(self, namd_run_steps: int, gomc_run_steps: int) -> None:
+        """Change the segment lengths mid-run and re-derive the output
+        frequencies tied to them (the minimization length is kept)."""
+        if int(namd_run_steps) < 0 or int(gomc_run_steps) < 0:
+            raise ValueError("run steps must be >= 0")
+        object.__setattr__(self, "namd_run_steps", int(namd_run_steps))
+        object.__setattr__(self, "gomc_run_steps", int(gomc_run_steps))
+        self._derive_step_params()
+
     # ---- tolerances (with defaults) ----
     allowable_error_fraction_vdw_plus_elec: float = Field(5e-3, ge=0)
     allowable_error_fraction_potential: float = Field(5e-3, ge=0)
@@ -3,6 +3,8 @@ import os
 from pathlib import Path
 
 from config.models import SimulationConfig
+from engines.launcher import Launcher
+from utils.input_stage import StagedInputs
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +51,12 @@ class Engine:
         if self.engine_type not in ("NAMD", "GOMC"):
             raise ValueError(f"Unknown engine_type {self.engine_type}")
 
+        # Wraps `<exec> +p<cores> in.conf` (local, charmrun, mpirun, srun)
+        self.launcher: Launcher = Launcher.from_config(cfg, self.engine_type)
+
+        # Static inputs staged by the artifact store (`stage_static_inputs`)
+        self.staged_inputs: StagedInputs | None = None
+
         logger.info(
             f"\n\t[{self.engine_type}] initialized with\n"
             "\t\trun_dir={self.run_dir},\n"
@@ -56,5 +64,11 @@ class Engine:
             "\t\tpath_template={self.path_template}"
         )
 
+    def input_path(self, path: str | Path) -> str | Path:
+        """Staged copy of a static input, else the configured path."""
+        if self.staged_inputs is None:
+            return path
+        return self.staged_inputs.path(path)
+
     def run(self):
         raise NotImplementedError("Subclasses must implement run()")
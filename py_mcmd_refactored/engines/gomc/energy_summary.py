@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import numpy as np
+from utils.units import K_TO_KCAL_PER_MOL
+
+log = logging.getLogger(__name__)
+
+# Column order of the summary matrix built from the first/last ENER_<box> rows
+_SUMMARY_COLS = ("TOTAL_ELECT", "TOTAL", "INTRA(NB)", "INTER(LJ)", "LRC")
+
+
+@dataclass(frozen=True)
+class GomcEnergySummary:
+    """First/last per-box GOMC energies in kcal/mol.
+
+    VDW+ELECT follows the legacy definition
+    ``INTRA(NB) + INTER(LJ) + TOTAL_ELECT + LRC``.
+    """
+
+    total_first: float
+    total_last: float
+    vdw_plus_elec_first: float
+    vdw_plus_elec_last: float
+    lrc_first: float
+    lrc_last: float
+    elect_first: float
+    elect_last: float
+    n_rows: int
+
+
+def _column_indices(titles: List[str]) -> List[int]:
+    missing = [c for c in _SUMMARY_COLS if c not in titles]
+    if missing:
+        raise KeyError(
+            f"Missing required GOMC energy columns: {missing}. "
+            f"Present: {titles}"
+        )
+    return [titles.index(c) for c in _SUMMARY_COLS]
+
+
+def summarize_gomc_energy(
+    cfg,
+    lines: Iterable[str],
+    box_number: int,
+) -> GomcEnergySummary:
+    """
+    Return the first/last TOTAL, VDW+ELECT, LRC and ELECT for one box.
+
+    Pandas-free counterpart of ``get_gomc_energy_data`` +
+    ``get_gomc_energy_data_kcal_per_mol`` for the per-cycle continuity
+    check: `lines` is scanned once and only the first and last
+    ``ENER_<box_number>:`` rows are converted. Scaling follows the same
+    rule (``cfg.K_to_kcal_mol`` or ``K_TO_KCAL_PER_MOL``).
+    """
+    if box_number not in (0, 1):
+        raise ValueError(f"box_number must be 0 or 1, got {box_number}")
+
+    energy_prefix = f"ENER_{box_number}:"
+    titles: Optional[List[str]] = None
+    first: Optional[str] = None
+    last: Optional[str] = None
+    n_rows = 0
+
+    for line in lines:
+        if line.startswith(energy_prefix):
+            if first is None:
+                first = line
+            last = line
+            n_rows += 1
+        elif titles is None and line.startswith("ETITLE:"):
+            titles = line.split()
+
+    if not titles:
+        raise ValueError("Missing ETITLE header before ENERGY lines.")
+    if first is None:
+        raise ValueError("Empty GOMC energy DataFrame.")
+
+    # Some GOMC builds print 'ETITLE:' twice; ENERGY rows carry a matching
+    # extra token in that slot.
+    had_dup = len(titles) >= 2 and titles[1] == "ETITLE:"
+    if had_dup:
+        titles = [titles[0]] + titles[2:]
+    idx = _column_indices(titles)
+
+    rows = []
+    for raw in (first, last):
+        tokens = raw.split()
+        if had_dup and len(tokens) >= 2:
+            tokens = [tokens[0]] + tokens[2:]
+        try:
+            rows.append([float(tokens[i]) for i in idx])
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"Malformed GOMC energy row: {raw!r}") from e
+
+    scale = float(getattr(cfg, "K_to_kcal_mol", K_TO_KCAL_PER_MOL))
+    values = np.asarray(rows, dtype=float) * scale
+    elect, total, intra_nb, inter_lj, lrc = values.T
+    vdw_plus_elec = intra_nb + inter_lj + elect + lrc
+
+    return GomcEnergySummary(
+        total_first=float(total[0]),
+        total_last=float(total[1]),
+        vdw_plus_elec_first=float(vdw_plus_elec[0]),
+        vdw_plus_elec_last=float(vdw_plus_elec[1]),
+        lrc_first=float(lrc[0]),
+        lrc_last=float(lrc[1]),
+        elect_first=float(elect[0]),
+        elect_last=float(elect[1]),
+        n_rows=n_rows,
+    )
@@ -321,6 +321,7 @@ def write_gomc_conf_file(
     sim: GOMCSimParams,
     starts: GOMCStartFiles,
     dry_run: bool = False,
+    params_files: Optional[Iterable[Path]] = None,
 ) -> Path:
     python_dir = Path(io.python_file_directory)
     run_id = format_cycle_id(run_no, width=10)
@@ -330,7 +331,9 @@ def write_gomc_conf_file(
     tpl_path = python_dir / io.path_gomc_template
     template = _load_text(tpl_path)
 
-    params_files = getattr(cfg, "starting_ff_file_list_gomc", []) or []
+    # defaults to the config's list (staged copies are passed explicitly)
+    if params_files is None:
+        params_files = getattr(cfg, "starting_ff_file_list_gomc", []) or []
     # params_block = _build_parameters_block(params_files, relative_to=gomc_newdir)
     params_block = _build_parameters_block(
         params_files,
@@ -660,3 +663,29 @@ def write_gomc_conf_file(
     _save_text(out_path, out)
     log.info(f"[GOMC] Wrote config: {out_path}")
     return gomc_newdir
+
+
+def set_prng_seed(conf_path: Path, seed: int) -> None:
+    """Switch an in.conf to a fixed random seed (``PRNG INTSEED``).
+
+    A conf without a ``PRNG`` line gets one appended, so the seed is never
+    silently dropped.
+    """
+    seed_lines = ["PRNG\t\tINTSEED\n", f"Random_Seed\t{int(seed)}\n"]
+    lines = []
+    found = False
+    for line in _load_text(conf_path).splitlines(keepends=True):
+        toks = line.split()
+        if toks and toks[0] == "Random_Seed":
+            continue
+        if toks and toks[0] == "PRNG":
+            lines.extend(seed_lines)
+            found = True
+            continue
+        lines.append(line)
+    if not found:
+        if lines and not lines[-1].endswith("\n"):
+            lines[-1] += "\n"
+        lines.extend(seed_lines)
+    _save_text(conf_path, "".join(lines))
+    log.info(f"[GOMC] Set Random_Seed {int(seed)} in {conf_path}")
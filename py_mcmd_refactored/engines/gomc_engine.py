@@ -5,18 +5,20 @@ from pathlib import Path
 from typing import Optional
 
 from engines.base import Engine as BaseEngine
-from engines.gomc.energy_metrics import get_gomc_energy_data_kcal_per_mol
-from engines.gomc.energy_parse import get_gomc_energy_data
+from engines.gomc.energy_summary import summarize_gomc_energy
 from engines.gomc.gomc_writer import (
     GOMCIOPaths,
     GOMCSimParams,
     GOMCStartFiles,
+    set_prng_seed,
     write_gomc_conf_file,
 )
 from engines.namd.energy_compare import compare_namd_gomc_energies
 from orchestrator.state import RunState
 from utils.persisted_file_lists import persisted_output_path
 from utils.subprocess_runner import Command, SubprocessRunner
+from utils.tracing import record_span, trace_clock_us
+from utils.watchdog import EngineWatchdog
 
 from py_mcmd_refactored.utils.path import format_cycle_id
 
@@ -72,7 +74,13 @@ class GomcEngine(BaseEngine):
                 )
 
         self.steps_per_run = int(getattr(cfg, "gomc_run_steps", 0))
-        self.runner = SubprocessRunner(dry_run=self.dry_run)
+        self.runner = SubprocessRunner(
+            dry_run=self.dry_run,
+            watchdog=EngineWatchdog.from_config(cfg),
+            profile_interval_s=getattr(cfg, "engine_profile_interval_s", None),
+        )
+        # set by the orchestrator for a reseeded retry of a failed segment
+        self.prng_seed: Optional[int] = None
 
     def run(self):
         raise NotImplementedError("Use GomcEngine.run_segment(...) instead.")
@@ -95,8 +103,9 @@ class GomcEngine(BaseEngine):
         self, *, run_dir: Path, cores: int, fifo_resources=None
     ) -> int:
         cmd = Command(
-            argv=[str(self.exec_path), f"+p{int(cores)}", "in.conf"],
+            argv=self.launcher.argv(self.exec_path, cores, cwd=Path(run_dir)),
             cwd=Path(run_dir),
+            allocated_cores=self.launcher.allocated_cores(cores),
             **self._stdout_command_kwargs(
                 run_dir=Path(run_dir),
                 fifo_resources=fifo_resources,
@@ -112,6 +121,7 @@ class GomcEngine(BaseEngine):
         self, *, run_no: int, state: RunState, fifo_resources=None
     ) -> dict:
         """Run the full GOMC segment for an odd run_no and update RunState."""
+        prepare_start_us = trace_clock_us()
 
         runtime_gomc_root = self._runtime_gomc_root(fifo_resources)
 
@@ -133,7 +143,9 @@ class GomcEngine(BaseEngine):
         io = GOMCIOPaths(
             python_file_directory=python_file_directory,
             path_gomc_runs=runtime_gomc_root,
-            path_gomc_template=Path(self.cfg.path_gomc_template),
+            path_gomc_template=Path(
+                self.input_path(self.cfg.path_gomc_template)
+            ),
             namd_box_0_dir=Path(state.namd_box0_dir),
             namd_box_1_dir=(
                 Path(state.namd_box1_dir)
@@ -161,11 +173,23 @@ class GomcEngine(BaseEngine):
         )
 
         starts = GOMCStartFiles(
-            starting_pdb_box_0_file=Path(self.cfg.starting_pdb_box_0_file),
-            starting_pdb_box_1_file=Path(self.cfg.starting_pdb_box_1_file),
-            starting_psf_box_0_file=Path(self.cfg.starting_psf_box_0_file),
-            starting_psf_box_1_file=Path(self.cfg.starting_psf_box_1_file),
+            starting_pdb_box_0_file=Path(
+                self.input_path(self.cfg.starting_pdb_box_0_file)
+            ),
+            starting_pdb_box_1_file=Path(
+                self.input_path(self.cfg.starting_pdb_box_1_file)
+            ),
+            starting_psf_box_0_file=Path(
+                self.input_path(self.cfg.starting_psf_box_0_file)
+            ),
+            starting_psf_box_1_file=Path(
+                self.input_path(self.cfg.starting_psf_box_1_file)
+            ),
         )
+        params_files = [
+            Path(self.input_path(f))
+            for f in getattr(self.cfg, "starting_ff_file_list_gomc", []) or []
+        ]
 
         # 1) Write GOMC config
         gomc_newdir = write_gomc_conf_file(
@@ -175,8 +199,12 @@ class GomcEngine(BaseEngine):
             sim=sim,
             starts=starts,
             dry_run=self.dry_run,
+            params_files=params_files,
         )
 
+        if self.prng_seed is not None:
+            set_prng_seed(Path(gomc_newdir) / "in.conf", self.prng_seed)
+
         state.gomc_dir = Path(gomc_newdir)
 
         # 2) Execute GOMC (stdout -> out.dat)
@@ -185,18 +213,25 @@ class GomcEngine(BaseEngine):
         disk_gomc_dir.mkdir(parents=True, exist_ok=True)
 
         cmd = Command(
-            argv=[
-                str(self.exec_path),
-                f"+p{int(self.cfg.total_no_cores)}",
-                "in.conf",
-            ],
+            argv=self.launcher.argv(
+                self.exec_path,
+                int(self.cfg.total_no_cores),
+                cwd=Path(gomc_newdir),
+            ),
             cwd=Path(gomc_newdir),
+            allocated_cores=self.launcher.allocated_cores(
+                int(self.cfg.total_no_cores)
+            ),
             **self._stdout_command_kwargs(
                 runtime_dir=Path(gomc_newdir),
                 disk_dir=disk_gomc_dir,
             ),
         )
 
+        record_span(
+            "GOMC prepare", "engine", prepare_start_us, trace_clock_us()
+        )
+
         t0 = time.perf_counter()
         h = self.runner.start(cmd)
         rc = self.runner.wait(h)
@@ -222,6 +257,7 @@ class GomcEngine(BaseEngine):
             )
 
         # 3) Parse energies -> cache in state
+        parse_start_us = trace_clock_us()
         try:
             lines = (
                 (Path(gomc_newdir) / "out.dat")
@@ -229,48 +265,24 @@ class GomcEngine(BaseEngine):
                 .splitlines(True)
             )
 
-            df0 = get_gomc_energy_data(self.cfg, lines, box0)
-            (
-                _e_elect0,
-                _e_elect0_i,
-                _e_elect0_f,
-                _e_pot0,
-                pot0_i,
-                pot0_f,
-                _e_lrc0,
-                _e_lrc0_i,
-                _e_lrc0_f,
-                _e_vpe0,
-                vpe0_i,
-                vpe0_f,
-            ) = get_gomc_energy_data_kcal_per_mol(df0)
-
-            state.energy_box0.gomc_potential_initial = pot0_i
-            state.energy_box0.gomc_potential_final = pot0_f
-            state.energy_box0.gomc_vdw_plus_elec_initial = vpe0_i
-            state.energy_box0.gomc_vdw_plus_elec_final = vpe0_f
+            s0 = summarize_gomc_energy(self.cfg, lines, box0)
+            state.energy_box0.gomc_potential_initial = s0.total_first
+            state.energy_box0.gomc_potential_final = s0.total_last
+            state.energy_box0.gomc_vdw_plus_elec_initial = (
+                s0.vdw_plus_elec_first
+            )
+            state.energy_box0.gomc_vdw_plus_elec_final = s0.vdw_plus_elec_last
 
             if two_box:
-                df1 = get_gomc_energy_data(self.cfg, lines, box1)
-                (
-                    _e_elect1,
-                    _e_elect1_i,
-                    _e_elect1_f,
-                    _e_pot1,
-                    pot1_i,
-                    pot1_f,
-                    _e_lrc1,
-                    _e_lrc1_i,
-                    _e_lrc1_f,
-                    _e_vpe1,
-                    vpe1_i,
-                    vpe1_f,
-                ) = get_gomc_energy_data_kcal_per_mol(df1)
-
-                state.energy_box1.gomc_potential_initial = pot1_i
-                state.energy_box1.gomc_potential_final = pot1_f
-                state.energy_box1.gomc_vdw_plus_elec_initial = vpe1_i
-                state.energy_box1.gomc_vdw_plus_elec_final = vpe1_f
+                s1 = summarize_gomc_energy(self.cfg, lines, box1)
+                state.energy_box1.gomc_potential_initial = s1.total_first
+                state.energy_box1.gomc_potential_final = s1.total_last
+                state.energy_box1.gomc_vdw_plus_elec_initial = (
+                    s1.vdw_plus_elec_first
+                )
+                state.energy_box1.gomc_vdw_plus_elec_final = (
+                    s1.vdw_plus_elec_last
+                )
 
         except Exception as e:
             if self.dry_run:
@@ -278,7 +290,12 @@ class GomcEngine(BaseEngine):
             else:
                 raise
 
+        record_span(
+            "GOMC parse energies", "engine", parse_start_us, trace_clock_us()
+        )
+
         # 4) Continuity check (NAMD -> GOMC) when values exist
+        energy_warnings = 0
         e0 = state.energy_box0
         if (
             (e0.namd_potential_final is not None)
@@ -286,14 +303,17 @@ class GomcEngine(BaseEngine):
             and (e0.namd_vdw_plus_elec_final is not None)
             and (e0.gomc_vdw_plus_elec_initial is not None)
         ):
-            compare_namd_gomc_energies(
-                self.cfg,
-                e0.namd_potential_final,
-                e0.gomc_potential_initial,
-                e0.namd_vdw_plus_elec_final,
-                e0.gomc_vdw_plus_elec_initial,
-                run_no,
-                0,
+            energy_warnings += (
+                compare_namd_gomc_energies(
+                    self.cfg,
+                    e0.namd_potential_final,
+                    e0.gomc_potential_initial,
+                    e0.namd_vdw_plus_elec_final,
+                    e0.gomc_vdw_plus_elec_initial,
+                    run_no,
+                    0,
+                )
+                or 0
             )
 
         if two_box:
@@ -304,14 +324,17 @@ class GomcEngine(BaseEngine):
                 and (e1.namd_vdw_plus_elec_final is not None)
                 and (e1.gomc_vdw_plus_elec_initial is not None)
             ):
-                compare_namd_gomc_energies(
-                    self.cfg,
-                    e1.namd_potential_final,
-                    e1.gomc_potential_initial,
-                    e1.namd_vdw_plus_elec_final,
-                    e1.gomc_vdw_plus_elec_initial,
-                    run_no,
-                    1,
+                energy_warnings += (
+                    compare_namd_gomc_energies(
+                        self.cfg,
+                        e1.namd_potential_final,
+                        e1.gomc_potential_initial,
+                        e1.namd_vdw_plus_elec_final,
+                        e1.gomc_vdw_plus_elec_initial,
+                        run_no,
+                        1,
+                    )
+                    or 0
                 )
 
         # 5) Update step counter
@@ -322,6 +345,7 @@ class GomcEngine(BaseEngine):
             "rc": int(rc),
             "gomc_dir": str(gomc_newdir),
             "previous_gomc_dir": previous_gomc_dir,
+            "energy_warnings": energy_warnings,
         }
 
     def _ensure_dry_run_gomc_restart_files(
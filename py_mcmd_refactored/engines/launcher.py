@@ -0,0 +1,173 @@
+"""Launcher backends that turn an engine invocation into a command line.
+
+NAMD and GOMC run as ``<exec> +p<cores> in.conf`` on the local node unless a
+``namd_launcher`` / ``gomc_launcher`` block selects another backend:
+
+* ``local``:    ``namd2 +p8 in.conf``
+* ``charmrun``: ``charmrun +p16 ++nodelist <cwd>/charmrun.nodelist namd2
+  in.conf`` (``++local`` without hosts), for Charm++ network builds
+* ``mpirun``:   ``mpirun -np 16 --host n1:8,n2:8 namd2 in.conf``
+* ``srun``:     ``srun --ntasks=16 --nodes=2 --nodelist=n1,n2 namd2 in.conf``
+
+Each NAMD box gets the hosts listed for it in ``box_hosts``; otherwise the
+``hosts`` pool is split evenly between the boxes that run in parallel, so a
+two-box GEMC system can use a node (or more) per box. The rank count is
+``ranks_per_host`` x hosts when set, else the core count the engine would
+use locally. The MPI launchers drop the Charm++ ``+p`` flag unless
+``keep_cores_flag`` is set (e.g. for GOMC, whose ``+p`` is the OpenMP thread
+count of a rank); charmrun passes ``+p`` itself.
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+NODELIST_NAME = "charmrun.nodelist"
+
+
+class Launcher:
+    """Local multicore launch; base class of the other backends."""
+
+    kind = "local"
+
+    def __init__(
+        self,
+        *,
+        executable: Optional[str] = None,
+        hosts: Iterable[str] = (),
+        box_hosts: Optional[dict[int, Sequence[str]]] = None,
+        ranks_per_host: Optional[int] = None,
+        keep_cores_flag: bool = False,
+        extra_args: Iterable[str] = (),
+    ) -> None:
+        self.executable = str(executable or self.kind)
+        self.hosts = [str(h) for h in hosts]
+        self.box_hosts = {
+            int(box): [str(h) for h in names]
+            for box, names in (box_hosts or {}).items()
+        }
+        self.ranks_per_host = (
+            int(ranks_per_host) if ranks_per_host is not None else None
+        )
+        self.keep_cores_flag = bool(keep_cores_flag)
+        self.extra_args = [str(a) for a in extra_args]
+
+    @classmethod
+    def from_config(cls, cfg, engine_type: str) -> "Launcher":
+        spec = getattr(cfg, f"{engine_type.lower()}_launcher", None)
+        if spec is None:
+            return Launcher()
+
+        def _get(name, default=None):
+            if isinstance(spec, dict):
+                value = spec.get(name, default)
+            else:
+                value = getattr(spec, name, default)
+            return default if value is None else value
+
+        kind = str(_get("kind", "local"))
+        if kind not in LAUNCHERS:
+            raise ValueError(
+                f"Unknown launcher kind {kind!r}; "
+                f"expected one of {sorted(LAUNCHERS)}"
+            )
+        return LAUNCHERS[kind](
+            executable=_get("executable"),
+            hosts=_get("hosts", ()),
+            box_hosts=_get("box_hosts"),
+            ranks_per_host=_get("ranks_per_host"),
+            keep_cores_flag=bool(_get("keep_cores_flag", False)),
+            extra_args=_get("extra_args", ()),
+        )
+
+    def hosts_for(self, box: Optional[int] = None, n_boxes: int = 1) -> list:
+        """Hosts of `box` when `n_boxes` boxes run at the same time."""
+        if box is not None and box in self.box_hosts:
+            return list(self.box_hosts[box])
+        if box is None or n_boxes <= 1 or len(self.hosts) < n_boxes:
+            return list(self.hosts)
+        per_box = math.ceil(len(self.hosts) / n_boxes)
+        return self.hosts[box * per_box : (box + 1) * per_box]
+
+    def ranks(self, cores: int, hosts: Sequence[str]) -> int:
+        if self.ranks_per_host is not None and hosts:
+            return self.ranks_per_host * len(hosts)
+        return max(1, int(cores))
+
+    def allocated_cores(
+        self, cores: int, *, box: Optional[int] = None, n_boxes: int = 1
+    ) -> int:
+        """Cores a launch from `argv` with the same arguments occupies."""
+        ranks = self.ranks(cores, self.hosts_for(box, n_boxes))
+        if self.kind != "local" and self.keep_cores_flag:
+            return ranks * max(1, int(cores))  # +p threads per rank
+        return ranks
+
+    def argv(
+        self,
+        exec_path,
+        cores: int,
+        *,
+        cwd: Path,
+        box: Optional[int] = None,
+        n_boxes: int = 1,
+        conf: str = "in.conf",
+    ) -> list[str]:
+        """Command line running `exec_path` on `conf` from `cwd`."""
+        hosts = self.hosts_for(box, n_boxes)
+        program = [str(exec_path)]
+        if self.kind == "local" or self.keep_cores_flag:
+            program.append(f"+p{int(cores)}")
+        return self._wrap(program + [conf], cores, hosts, Path(cwd))
+
+    def _wrap(
+        self, program: list[str], cores: int, hosts: list, cwd: Path
+    ) -> list[str]:
+        return program
+
+
+class CharmrunLauncher(Launcher):
+    kind = "charmrun"
+
+    def _wrap(self, program, cores, hosts, cwd):
+        argv = [self.executable, f"+p{self.ranks(cores, hosts)}"]
+        if hosts:
+            nodelist = Path(cwd) / NODELIST_NAME
+            nodelist.parent.mkdir(parents=True, exist_ok=True)
+            nodelist.write_text(
+                "group main\n" + "".join(f" host {h}\n" for h in hosts)
+            )
+            argv += ["++nodelist", str(nodelist)]
+        else:
+            argv.append("++local")
+        return argv + self.extra_args + program
+
+
+class MpirunLauncher(Launcher):
+    kind = "mpirun"
+
+    def _wrap(self, program, cores, hosts, cwd):
+        ranks = self.ranks(cores, hosts)
+        argv = [self.executable, "-np", str(ranks)]
+        if hosts:
+            slots = math.ceil(ranks / len(hosts))
+            argv += ["--host", ",".join(f"{h}:{slots}" for h in hosts)]
+        return argv + self.extra_args + program
+
+
+class SrunLauncher(Launcher):
+    kind = "srun"
+
+    def _wrap(self, program, cores, hosts, cwd):
+        argv = [self.executable, f"--ntasks={self.ranks(cores, hosts)}"]
+        if hosts:
+            argv += [f"--nodes={len(hosts)}", f"--nodelist={','.join(hosts)}"]
+        return argv + self.extra_args + program
+
+
+LAUNCHERS = {
+    launcher.kind: launcher
+    for launcher in (Launcher, CharmrunLauncher, MpirunLauncher, SrunLauncher)
+}
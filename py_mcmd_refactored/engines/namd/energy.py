@@ -8,6 +8,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Iterable, List, Tuple
 
+import numpy as np
+
 
 @dataclass(frozen=True)
 class NamdEnergyData:
@@ -179,3 +181,69 @@ def get_namd_energy_data(
         data.vdw_plus_elec_first,
         data.vdw_plus_elec_last,
     )
+
+
+@dataclass(frozen=True)
+class NamdEnergySummary:
+    """First/last NAMD energies needed for the GOMC↔NAMD continuity check."""
+
+    potential_first: float
+    potential_last: float
+    vdw_plus_elec_first: float
+    vdw_plus_elec_last: float
+    elect_first: float
+    elect_last: float
+    n_rows: int
+
+
+def summarize_namd_energy_lines(
+    lines: Iterable[str],
+    default_titles: Iterable[str],
+) -> NamdEnergySummary:
+    """
+    Lightweight alternative to `parse_namd_energy_lines` for the hot path.
+
+    Scans `lines` once and converts only the first and last ENERGY rows;
+    same title rules (first ETITLE wins, `default_titles` as fallback) and
+    the same required columns (ELECT, POTENTIAL, VDW).
+    """
+    titles: List[str] = []
+    first = last = None
+    n_rows = 0
+
+    for line in lines:
+        if line.startswith("ENERGY:"):
+            if first is None:
+                first = line
+            last = line
+            n_rows += 1
+        elif not titles and line.startswith("ETITLE:"):
+            titles = line.split()
+
+    titles = _normalize_titles(titles, default_titles)
+    if first is None:
+        raise ValueError("No ENERGY lines found in NAMD energy output")
+
+    idx = _column_indices(titles, required=("ELECT", "POTENTIAL", "VDW"))
+    cols = [idx["ELECT"], idx["POTENTIAL"], idx["VDW"]]
+
+    rows = []
+    for raw in (first, last):
+        tokens = raw.split()
+        rows.append(
+            [float(tokens[i]) if i < len(tokens) else math.nan for i in cols]
+        )
+
+    values = np.asarray(rows, dtype=float)
+    elect, potential, vdw = values.T
+    vdw_plus_elec = vdw + elect
+
+    return NamdEnergySummary(
+        potential_first=float(potential[0]),
+        potential_last=float(potential[1]),
+        vdw_plus_elec_first=float(vdw_plus_elec[0]),
+        vdw_plus_elec_last=float(vdw_plus_elec[1]),
+        elect_first=float(elect[0]),
+        elect_last=float(elect[1]),
+        n_rows=n_rows,
+    )
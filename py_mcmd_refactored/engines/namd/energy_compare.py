@@ -102,11 +102,12 @@ def compare_namd_gomc_energies(  # config-aware entrypoint
     e_vdw_plus_elec_box_x_initial_value,
     run_no: int,
     box_number: int,
-) -> None:
+) -> int:
     """
     Compare NAMD↔GOMC energies using thresholds from SimulationConfig and centralized logging.
-    Returns None (side-effect: logs PASS/FAIL messages).
+    Logs PASS/FAIL messages and returns the number of FAILED checks (0-2).
     """
+    failed = 0
     tol_potential_frac, tol_vdw_frac, tol_vdw_abs_kcal = (
         _resolve_thresholds_from_cfg(cfg)
     )
@@ -119,6 +120,7 @@ def compare_namd_gomc_energies(  # config-aware entrypoint
         log.info(_msg_potential_pass(box_number, run_no, pot_frac).strip())
     else:
         log.warning(_msg_potential_fail(box_number, run_no, pot_frac).strip())
+        failed += 1
 
     # --- VDW+ELECT (fractional OR absolute fallback)
     vpe_frac = _fraction_error(
@@ -136,5 +138,6 @@ def compare_namd_gomc_energies(  # config-aware entrypoint
         log.warning(
             _msg_vdw_fail(box_number, run_no, vpe_frac, vpe_absd).strip()
         )
+        failed += 1
 
-    return None
+    return failed
@@ -0,0 +1,235 @@
+"""Persistent, cross-run cache for NAMD FFTW plan (wisdom) files.
+
+NAMD writes an ``FFTW_NAMD*`` wisdom file into the run directory the first
+time it plans the PME FFTs for a given grid. The per-run copy kept under the
+managed root is deleted by ``cleanup_all``, so without this cache every new
+simulation and every restart pays the planning cost again.
+
+Entries are keyed by ``(PME grid dims, +p core count, NAMD binary hash)`` and
+live under a user-chosen directory outside the run::
+
+    <cache_root>/
+        entries/<key>/FFTW_NAMD_<...>.txt
+        entries/<key>/meta.json
+        systems/<system_key>.json   # last known PME dims for a set of inputs
+        .lock
+
+Population is concurrent-safe: files are staged under a unique temporary
+name and published with ``os.replace`` while holding an ``fcntl`` lock on the
+cache root, so several simulations on one node can share a cache directory.
+The total size is bounded by evicting least-recently-used entries.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FFT_CACHE_DIR_ENV = "PY_MCMD_FFT_CACHE_DIR"
+
+_META_NAME = "meta.json"
+_FFT_PREFIX = "FFTW_NAMD"
+
+
+def hash_namd_binary(exec_path: str | Path) -> str:
+    """Return a short content hash identifying the NAMD binary.
+
+    Falls back to hashing the path string when the binary does not exist
+    (e.g. dry runs), so keys stay deterministic.
+    """
+    path = Path(exec_path)
+    digest = hashlib.sha256()
+    if path.is_file():
+        with path.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        digest.update(str(exec_path).encode())
+    return digest.hexdigest()[:16]
+
+
+def fft_plan_key(
+    pme_dims: Sequence[Optional[int]], cores: int, binary_hash: str
+) -> Optional[str]:
+    """Return the cache key for a grid/core/binary triple, or None if the
+    PME dims are not fully known."""
+    if len(pme_dims) != 3 or any(d is None for d in pme_dims):
+        return None
+    nx, ny, nz = (int(d) for d in pme_dims)
+    return f"pme{nx}x{ny}x{nz}_p{int(cores)}_{binary_hash}"
+
+
+class FftPlanCache:
+    """Size-bounded on-disk cache of NAMD FFTW wisdom files."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.entries_dir = self.root / "entries"
+        self.systems_dir = self.root / "systems"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.systems_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["FftPlanCache"]:
+        """Build the cache from ``namd_fft_cache_dir`` (or the
+        ``PY_MCMD_FFT_CACHE_DIR`` environment variable); None disables it."""
+        root = getattr(cfg, "namd_fft_cache_dir", None) or os.getenv(
+            FFT_CACHE_DIR_ENV
+        )
+        if not root:
+            return None
+        max_mb = int(getattr(cfg, "namd_fft_cache_max_mb", 64))
+        return cls(Path(root).expanduser(), max_bytes=max_mb * 1024 * 1024)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        with (self.root / ".lock").open("a+") as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_json_atomic(path: Path, data: dict) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[dict]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    # ------------------------------------------------------------------
+    # FFT plan entries
+    # ------------------------------------------------------------------
+    def lookup(self, key: Optional[str]) -> Optional[Path]:
+        """Return the cached wisdom file for `key` and mark it as used."""
+        if key is None:
+            return None
+        meta = self._read_json(self.entries_dir / key / _META_NAME)
+        if not meta:
+            return None
+        path = self.entries_dir / key / str(meta.get("filename", ""))
+        if not path.is_file():
+            return None
+        try:
+            os.utime(self.entries_dir / key / _META_NAME)
+        except OSError:
+            pass
+        return path
+
+    def store(
+        self,
+        key: Optional[str],
+        src: str | Path,
+        *,
+        pme_dims: Sequence[Optional[int]] = (None, None, None),
+        cores: Optional[int] = None,
+    ) -> Optional[Path]:
+        """Publish `src` under `key`, replacing an older copy, then evict."""
+        src = Path(src)
+        if key is None or not src.is_file():
+            return None
+        if not src.name.startswith(_FFT_PREFIX):
+            raise ValueError(f"Not a NAMD FFTW plan file: {src}")
+
+        entry_dir = self.entries_dir / key
+        with self._locked():
+            entry_dir.mkdir(parents=True, exist_ok=True)
+            tmp = entry_dir / f".{src.name}.{os.getpid()}.tmp"
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, entry_dir / src.name)
+            self._write_json_atomic(
+                entry_dir / _META_NAME,
+                {
+                    "filename": src.name,
+                    "pme_dims": [
+                        int(d) if d is not None else None for d in pme_dims
+                    ],
+                    "cores": cores,
+                    "stored_at": time.time(),
+                },
+            )
+            self._evict_locked(keep=key)
+
+        logger.info("[NAMD] Stored FFTW plan in persistent cache: %s", key)
+        return entry_dir / src.name
+
+    def size_bytes(self) -> int:
+        total = 0
+        for path in self.entries_dir.rglob("*"):
+            if path.is_file():
+                total += path.stat().st_size
+        return total
+
+    def _evict_locked(self, *, keep: Optional[str] = None) -> None:
+        entries = []
+        for entry_dir in self.entries_dir.iterdir():
+            if not entry_dir.is_dir():
+                continue
+            size = sum(
+                p.stat().st_size for p in entry_dir.iterdir() if p.is_file()
+            )
+            meta_path = entry_dir / _META_NAME
+            last_used = (
+                meta_path.stat().st_mtime
+                if meta_path.exists()
+                else entry_dir.stat().st_mtime
+            )
+            entries.append((last_used, entry_dir, size))
+
+        total = sum(size for _, _, size in entries)
+        for _, entry_dir, size in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry_dir.name == keep:
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            logger.info(
+                "[NAMD] Evicted FFTW plan cache entry %s", entry_dir.name
+            )
+
+    # ------------------------------------------------------------------
+    # System records (PME dims remembered per set of run inputs)
+    # ------------------------------------------------------------------
+    def record_system(
+        self, system_key: str, pme_dims: Sequence[Optional[int]]
+    ) -> None:
+        """Remember the PME dims NAMD chose for a given set of inputs."""
+        if any(d is None for d in pme_dims):
+            return
+        with self._locked():
+            self._write_json_atomic(
+                self.systems_dir / f"{system_key}.json",
+                {"pme_dims": [int(d) for d in pme_dims]},
+            )
+
+    def lookup_system(
+        self, system_key: str
+    ) -> tuple[Optional[int], Optional[int], Optional[int]]:
+        data = self._read_json(self.systems_dir / f"{system_key}.json")
+        if not data or len(data.get("pme_dims") or []) != 3:
+            return None, None, None
+        nx, ny, nz = data["pme_dims"]
+        return int(nx), int(ny), int(nz)
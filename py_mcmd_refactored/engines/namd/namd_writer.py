@@ -6,14 +6,55 @@ from __future__ import annotations
 
 import logging
 import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Tuple
+from typing import Callable, Dict, Iterable, Optional, TextIO, Tuple
+
+from utils.input_stage import StagedInputs
 
 log = logging.getLogger(__name__)
-starting_ff_file_list_namd = []
-check_for_pdb_dims_and_override = None
-simulation_type = "NVT"
-log_template_file = None
+
+
+@dataclass(frozen=True)
+class NamdWriterContext:
+    """
+    Per-simulation inputs of `write_namd_conf_file` that are not per box.
+
+    Replaces the former module globals of the same names, so configs of
+    both boxes and of several simulations can be rendered concurrently:
+      - starting_ff_file_list_namd : parameter files of the simulation
+      - simulation_type : "NVT", "NPT", "GEMC" or "GCMC" (PME grid scaling)
+      - check_for_pdb_dims_and_override : optional dimension callable
+      - log_template_file : optional file-like .write(str) for the legacy log
+    """
+
+    starting_ff_file_list_namd: Tuple[Path, ...] = ()
+    simulation_type: str = "NVT"
+    check_for_pdb_dims_and_override: Optional[Callable[..., float]] = None
+    log_template_file: Optional[TextIO] = None
+
+    @classmethod
+    def from_config(
+        cls,
+        cfg,
+        root: Optional[Path] = None,
+        staged_inputs: Optional[StagedInputs] = None,
+    ) -> "NamdWriterContext":
+        """Context of `cfg`; relative parameter files resolve under `root`,
+        or to their staged copies when `staged_inputs` is given."""
+        root = Path.cwd() if root is None else Path(root)
+        ff_files = getattr(cfg, "starting_ff_file_list_namd", None) or []
+        return cls(
+            starting_ff_file_list_namd=tuple(
+                (
+                    staged_inputs.path(f)
+                    if staged_inputs is not None
+                    else (root / f).resolve()
+                )
+                for f in ff_files
+            ),
+            simulation_type=str(getattr(cfg, "simulation_type", "NVT")),
+        )
 
 
 # --- Step 1. validate_box_number ------------------------------------------------
@@ -479,14 +520,16 @@ def write_namd_conf_file(
     set_angle_beta=90,
     set_angle_gamma=90,
     fft_add_namd_ang_to_box_dim=0,
+    *,
+    context: Optional[NamdWriterContext] = None,
 ):
     """
-    Final, wired version using all helpers. Keeps legacy globals compatibility:
-      - starting_ff_file_list_namd : list of parameter files
-      - check_for_pdb_dims_and_override : callable
-      - simulation_type : str in {"NVT","NPT","GEMC"}
-      - log_template_file : file-like .write(str)
+    Final, wired version using all helpers. The simulation-wide inputs
+    (parameter files, simulation type, dimension checker, legacy log) come
+    from `context`; the function keeps no state between calls and is safe
+    to call from several threads at once.
     """
+    ctx = context if context is not None else NamdWriterContext()
     # Normalize
     python_file_directory = Path(python_file_directory)
     path_namd_runs = Path(path_namd_runs)
@@ -503,9 +546,10 @@ def write_namd_conf_file(
         python_file_directory, path_namd_template
     )
 
-    # 3) Parameter files block (from global if available)
-    ff_files = globals().get("starting_ff_file_list_namd", [])
-    param_block = _build_parameter_files_block(ff_files, target_dir)
+    # 3) Parameter files block
+    param_block = _build_parameter_files_block(
+        list(ctx.starting_ff_file_list_namd), target_dir
+    )
 
     # 4) Paths + PDB lines
     repl_paths, pdb_lines = _compute_run_paths_and_read_pdb_lines(
@@ -527,13 +571,13 @@ def write_namd_conf_file(
     )
 
     # 7) Resolve used dims via checker or fallbacks
-    checker = globals().get("check_for_pdb_dims_and_override", None)
+    checker = ctx.check_for_pdb_dims_and_override
     used_x = _override_dim(checker, "x", run_no, rx, set_x_dim)
     used_y = _override_dim(checker, "y", run_no, ry, set_y_dim)
     used_z = _override_dim(checker, "z", run_no, rz, set_z_dim)
 
     # 8) PME grid dims
-    sim_type = globals().get("simulation_type", "NVT")
+    sim_type = ctx.simulation_type
     gx, gy, gz = _compute_pme_grid_dims(
         run_no,
         used_x,
@@ -582,7 +626,7 @@ def write_namd_conf_file(
     (target_dir / "in.conf").write_text(rendered)
 
     msg = f"NAMD simulation data for simulation number {run_no} in box {box_number} is completed\n"
-    legacy_log = globals().get("log_template_file", None)
+    legacy_log = ctx.log_template_file
     if hasattr(legacy_log, "write"):
         legacy_log.write(msg)
     logging.getLogger(__name__).info(msg.strip())
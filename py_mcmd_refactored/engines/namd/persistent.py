@@ -0,0 +1,308 @@
+# py-MCMD
+# Author: Haydar Mehryar
+# Copyright (c) 2025
+# SPDX-License-Identifier: MIT
+
+"""Long-lived NAMD process driven through its Tcl command interface.
+
+NAMD is launched once with the regular ``in.conf`` plus ``+stdin`` so that,
+after the configuration file has been processed, it keeps reading Tcl
+commands from standard input. Each later NAMD segment is then issued as a
+short command batch (new output names, ``reinitatoms`` from the GOMC restart
+files, optionally ``reinitvels``, ``firsttimestep 0``, ``run N``) instead of
+a fresh ``namd2 +pN in.conf`` launch. Resetting the step counter makes every
+segment start at TS 0 like a relaunch does, so the OTF step offsets and the
+restart/DCD cadence are the same in both modes.
+
+Segment boundaries are detected with a ``puts`` marker echoed back on stdout.
+Everything NAMD prints for a segment is written to that segment's ``out.dat``
+so the existing energy and PME parsers work unchanged.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+import subprocess
+import threading
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+STDIN_FLAG = "+stdin"
+SEGMENT_DONE_MARKER = "PY_MCMD_SEGMENT_DONE"
+
+
+def read_psf_atom_count(psf_path: Path) -> Optional[int]:
+    """Return the ``!NATOM`` count of a PSF file, or None if unavailable."""
+    try:
+        with Path(psf_path).open("r") as fh:
+            for line in fh:
+                if "!NATOM" in line:
+                    return int(line.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def read_binary_atom_count(path: Path) -> Optional[int]:
+    """Return the atom count stored in a NAMD binary .coor/.vel header."""
+    try:
+        with Path(path).open("rb") as fh:
+            header = fh.read(4)
+    except OSError:
+        return None
+    if len(header) != 4:
+        return None
+    return int(struct.unpack("<i", header)[0])
+
+
+def build_reinit_commands(
+    *,
+    restart_base: Path,
+    output_prefix: Path,
+    run_steps: int,
+    natoms: Optional[int],
+    temperature_k: float,
+) -> Optional[list[str]]:
+    """Return the Tcl commands that continue from GOMC's restart files.
+
+    Returns None when the live process cannot be reused and NAMD must be
+    relaunched: the binary coordinates or cell (.xsc) are missing, or the
+    atom count differs from the one the process was started with (GEMC/GCMC
+    molecule transfers change the PSF).
+    """
+    restart_base = Path(restart_base)
+    coor = restart_base.with_name(restart_base.name + ".coor")
+    vel = restart_base.with_name(restart_base.name + ".vel")
+    xsc = restart_base.with_name(restart_base.name + ".xsc")
+    psf = restart_base.with_name(restart_base.name + ".psf")
+
+    if not coor.exists() or not xsc.exists():
+        logger.info(
+            "[NAMD] Restart coor/xsc missing at %s; relaunching NAMD",
+            restart_base,
+        )
+        return None
+
+    coor_natoms = read_binary_atom_count(coor)
+    psf_natoms = read_psf_atom_count(psf) if psf.exists() else coor_natoms
+    if natoms is None or coor_natoms != natoms or psf_natoms != natoms:
+        logger.info(
+            "[NAMD] Atom count changed (%s -> %s); relaunching NAMD",
+            natoms,
+            psf_natoms,
+        )
+        return None
+
+    reinit_vels = False
+    if vel.exists() and read_binary_atom_count(vel) != natoms:
+        # reinitatoms would read the stale .vel; start a fresh process.
+        logger.info(
+            "[NAMD] Restart velocities at %s do not match the atom count; "
+            "relaunching NAMD",
+            vel,
+        )
+        return None
+    if not vel.exists():
+        reinit_vels = True
+
+    commands = [
+        f"outputName {output_prefix}",
+        f"restartName {output_prefix}.restart",
+        f"DCDfile {output_prefix}.dcd",
+        f"XSTfile {output_prefix}.xst",
+        f"reinitatoms {restart_base}",
+    ]
+    if reinit_vels:
+        commands.append(f"reinitvels {temperature_k}")
+    # a live process keeps counting from the last segment's final step
+    commands.append("firsttimestep 0")
+    commands.append(f"run {int(run_steps)}")
+    return commands
+
+
+class NamdPersistentSession:
+    """One NAMD process that runs consecutive segments on demand.
+
+    Use `launch` to start NAMD on a segment's ``in.conf``; the first segment
+    is the configuration file itself. `begin_segment` sends the next command
+    batch and `wait_segment` blocks until NAMD echoes the segment marker (or
+    exits). Output is routed to each segment's ``stdout_path``. The engine
+    hands `poll_segment` to `SubprocessRunner.attach`, so each segment is
+    supervised, profiled and traced like a launched process.
+    """
+
+    def __init__(
+        self,
+        popen: subprocess.Popen,
+        *,
+        natoms: Optional[int] = None,
+        launch_key: Optional[tuple] = None,
+    ) -> None:
+        self.popen = popen
+        self.natoms = natoms
+        # what the process was launched with; a segment that needs another
+        # command line or core count gets a new process
+        self.launch_key = launch_key
+        self.segments_run = 0
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._token = 0
+        self._completed = False
+        self._sink: Optional[BinaryIO] = None
+        self._sink_has_etitle = False
+        self._last_etitle: Optional[bytes] = None
+        self._eof = False
+
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+
+    @classmethod
+    def launch(
+        cls,
+        argv: Sequence[str],
+        cwd: Path,
+        stdout_path: Path,
+        *,
+        natoms: Optional[int] = None,
+        launch_key: Optional[tuple] = None,
+    ) -> "NamdPersistentSession":
+        cwd = Path(cwd)
+        cwd.mkdir(parents=True, exist_ok=True)
+        popen = subprocess.Popen(
+            [*argv, STDIN_FLAG],
+            cwd=str(cwd),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        session = cls(popen, natoms=natoms, launch_key=launch_key)
+        session.begin_segment(stdout_path, [])
+        return session
+
+    @property
+    def pid(self) -> int:
+        return int(self.popen.pid)
+
+    @property
+    def alive(self) -> bool:
+        return self.popen.poll() is None
+
+    def begin_segment(self, stdout_path: Path, commands: Iterable[str]) -> None:
+        """Route output to `stdout_path` and send one segment's commands."""
+        stdout_path = Path(stdout_path)
+        stdout_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            if self._sink is not None:
+                raise RuntimeError("previous NAMD segment has not finished")
+            self._sink = stdout_path.open("wb")
+            self._sink_has_etitle = False
+            self._token += 1
+            self._completed = False
+            self._done.clear()
+            token = self._token
+            if self._eof:
+                self._finish_segment_locked(False)
+                return
+
+        payload = "".join(f"{c}\n" for c in commands)
+        payload += f'puts "{SEGMENT_DONE_MARKER} {token}"\n'
+        try:
+            self.popen.stdin.write(payload.encode())
+            self.popen.stdin.flush()
+        except (BrokenPipeError, OSError):
+            # The process already exited; wait_segment reports its rc.
+            pass
+
+    def wait_segment(self, timeout: Optional[float] = None) -> int:
+        """Return 0 once the segment finished, else NAMD's exit code."""
+        self._done.wait(timeout)
+        if self._completed:
+            self.segments_run += 1
+            return 0
+        if not self._done.is_set():
+            raise TimeoutError("NAMD segment did not finish in time")
+
+        rc = self.popen.wait()
+        self._reader.join()
+        logger.error(
+            "[NAMD] Persistent NAMD process exited with rc=%s mid-segment", rc
+        )
+        return int(rc) if rc else 1
+
+    def poll_segment(self, timeout: Optional[float] = None) -> Optional[int]:
+        """`wait_segment`, returning None when the segment is still running."""
+        try:
+            return self.wait_segment(timeout)
+        except TimeoutError:
+            return None
+
+    def close(self, timeout: float = 30.0) -> Optional[int]:
+        """Ask NAMD to exit and reap the process."""
+        if self.alive:
+            try:
+                self.popen.stdin.write(b"exit\n")
+                self.popen.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+        try:
+            self.popen.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        try:
+            rc = self.popen.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.popen.kill()
+            rc = self.popen.wait()
+        self._reader.join(timeout=timeout)
+        return rc
+
+    # ------------------------------------------------------------------
+    def _finish_segment_locked(self, completed: bool) -> None:
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+        self._completed = completed
+        self._done.set()
+
+    def _read_stdout(self) -> None:
+        marker = SEGMENT_DONE_MARKER.encode()
+        pipe = self.popen.stdout
+        try:
+            for raw in iter(pipe.readline, b""):
+                with self._lock:
+                    if marker in raw:
+                        fields = raw.split(marker, 1)[1].split()
+                        if fields and fields[0] == str(self._token).encode():
+                            self._finish_segment_locked(True)
+                            continue
+
+                    if raw.startswith(b"ETITLE:"):
+                        self._last_etitle = raw
+                        self._sink_has_etitle = True
+                    elif (
+                        raw.startswith(b"ENERGY:")
+                        and not self._sink_has_etitle
+                        and self._last_etitle is not None
+                    ):
+                        # NAMD does not repeat ETITLE for every `run`.
+                        if self._sink is not None:
+                            self._sink.write(self._last_etitle)
+                        self._sink_has_etitle = True
+
+                    if self._sink is not None:
+                        self._sink.write(raw)
+        finally:
+            with self._lock:
+                self._eof = True
+                if not self._done.is_set():
+                    self._finish_segment_locked(False)
+            try:
+                pipe.close()
+            except Exception:
+                pass
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import List, Literal, Optional
 
 from config.models import SimulationConfig
+from engines.launcher import Launcher
 from utils.subprocess_runner import Command
 
 # from utils.persisted_file_lists import persisted_output_path
@@ -36,6 +37,7 @@ def build_namd_execution_plan(
     exec_path: str,
     box0_dir: Path,
     box1_dir: Optional[Path],
+    launcher: Optional[Launcher] = None,
 ) -> NamdExecutionPlan:
     """Build the NAMD execution plan for the current run segment.
 
@@ -44,7 +46,10 @@ def build_namd_execution_plan(
     - Two-box GEMC:
         - series: run box0 then box1, both with +p{total_no_cores}
         - parallel: start both, box0 uses +p{no_core_box_0}, box1 uses +p{no_core_box_1}
+
+    `launcher` wraps each box's command (local ``+p`` launch by default).
     """
+    launcher = launcher if launcher is not None else Launcher()
     two_box = (cfg.simulation_type == "GEMC") and (
         cfg.only_use_box_0_for_namd_for_gemc is False
     )
@@ -58,8 +63,9 @@ def build_namd_execution_plan(
         #     stdout_path=persisted_output_path("NAMD", box0_dir, "out.dat"),
         # )
         cmd0 = Command(
-            argv=[exec_path, f"+p{cores0}", "in.conf"],
+            argv=launcher.argv(exec_path, cores0, cwd=Path(box0_dir), box=0),
             cwd=Path(box0_dir),
+            allocated_cores=launcher.allocated_cores(cores0, box=0),
             stdout_path=Path(box0_dir) / "out.dat",
         )
         return NamdExecutionPlan(mode="series", box0=cmd0, box1=None)
@@ -84,9 +90,15 @@ def build_namd_execution_plan(
     #     cwd=Path(box0_dir),
     #     stdout_path=persisted_output_path("NAMD", box0_dir, "out.dat"),
     # )
+    n_boxes = 2 if mode == "parallel" else 1
     cmd0 = Command(
-        argv=[exec_path, f"+p{cores0}", "in.conf"],
+        argv=launcher.argv(
+            exec_path, cores0, cwd=Path(box0_dir), box=0, n_boxes=n_boxes
+        ),
         cwd=Path(box0_dir),
+        allocated_cores=launcher.allocated_cores(
+            cores0, box=0, n_boxes=n_boxes
+        ),
         stdout_path=Path(box0_dir) / "out.dat",
     )
 
@@ -96,8 +108,13 @@ def build_namd_execution_plan(
     #     stdout_path=persisted_output_path("NAMD", box1_dir, "out.dat"),
     # )
     cmd1 = Command(
-        argv=[exec_path, f"+p{cores1}", "in.conf"],
+        argv=launcher.argv(
+            exec_path, cores1, cwd=Path(box1_dir), box=1, n_boxes=n_boxes
+        ),
         cwd=Path(box1_dir),
+        allocated_cores=launcher.allocated_cores(
+            cores1, box=1, n_boxes=n_boxes
+        ),
         stdout_path=Path(box1_dir) / "out.dat",
     )
     return NamdExecutionPlan(mode=mode, box0=cmd0, box1=cmd1)
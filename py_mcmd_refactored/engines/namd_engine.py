@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import os
 import shutil
@@ -8,18 +9,26 @@ from typing import Optional
 
 from engines.base import Engine as BaseEngine
 from engines.namd.constants import DEFAULT_NAMD_E_TITLES_LIST
-from engines.namd.energy import get_namd_energy_data
+from engines.namd.energy import summarize_namd_energy_lines
 from engines.namd.energy_compare import compare_namd_gomc_energies
-from engines.namd.namd_writer import write_namd_conf_file
+from engines.namd.fft_cache import FftPlanCache, fft_plan_key, hash_namd_binary
+from engines.namd.namd_writer import NamdWriterContext, write_namd_conf_file
 from engines.namd.parser import (
     extract_pme_grid_from_out,
     find_run0_fft_filename,
     get_run0_dir,
 )
+from engines.namd.persistent import (
+    NamdPersistentSession,
+    build_reinit_commands,
+    read_psf_atom_count,
+)
 from orchestrator.state import RunState
 from utils.path import format_cycle_id
 from utils.persisted_file_lists import persisted_output_path
-from utils.subprocess_runner import Command, SubprocessRunner
+from utils.subprocess_runner import Command, ProcessHandle, SubprocessRunner
+from utils.tracing import record_span, trace_clock_us, trace_tags
+from utils.watchdog import EngineWatchdog
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +67,23 @@ class NamdEngine(BaseEngine):
         self.steps_per_run = int(getattr(cfg, "namd_run_steps", 0))
 
         # subprocess adapter
-        self.runner = SubprocessRunner(dry_run=self.dry_run)
+        self.runner = SubprocessRunner(
+            dry_run=self.dry_run,
+            watchdog=EngineWatchdog.from_config(cfg),
+            profile_interval_s=getattr(cfg, "engine_profile_interval_s", None),
+        )
+
+        # Optional persistent FFTW plan cache shared across runs/restarts
+        self.fft_plan_cache: Optional[FftPlanCache] = FftPlanCache.from_config(
+            cfg
+        )
+        self._namd_binary_hash: Optional[str] = None
+
+        # Optional long-lived NAMD processes (one per box) reused across cycles
+        self.persistent_process = bool(
+            getattr(cfg, "namd_persistent_process", False)
+        ) and (not self.dry_run)
+        self._namd_sessions: dict[int, NamdPersistentSession] = {}
 
     def run(self):
         raise NotImplementedError("Use NamdEngine.run_segment(...) instead.")
@@ -92,6 +117,20 @@ class NamdEngine(BaseEngine):
         out_path = run0_dir / "out.dat"
         nx, ny, nz = extract_pme_grid_from_out(out_path)
 
+        if nx is None and self.fft_plan_cache is not None:
+            nx, ny, nz = self.fft_plan_cache.lookup_system(
+                self._fft_system_key(box_number)
+            )
+            if nx is not None:
+                logger.info(
+                    "[NAMD] Run-0 out.dat unavailable; using PME dims %s %s %s "
+                    "from the persistent FFT cache (box=%s)",
+                    nx,
+                    ny,
+                    nz,
+                    box_number,
+                )
+
         if nx is None:
             logger.warning(
                 "[NAMD] PME grid not found in %s (box=%s)", out_path, box_number
@@ -218,8 +257,9 @@ class NamdEngine(BaseEngine):
         fifo_basename: str = "box0.out.dat",
     ) -> int:
         cmd = Command(
-            argv=[str(self.exec_path), f"+p{int(cores)}", "in.conf"],
+            argv=self.launcher.argv(self.exec_path, cores, cwd=Path(run_dir)),
             cwd=Path(run_dir),
+            allocated_cores=self.launcher.allocated_cores(cores),
             **self._stdout_command_kwargs(
                 run_dir=Path(run_dir),
                 fifo_resources=fifo_resources,
@@ -303,6 +343,9 @@ class NamdEngine(BaseEngine):
         dest_dir: Path,
         run_root: Optional[Path] = None,
         managed_root: Optional[Path] = None,
+        *,
+        pme_dims: Optional[tuple] = None,
+        cores: Optional[int] = None,
     ) -> None:
         if not isinstance(box_number, int) or box_number not in (0, 1):
             raise ValueError("box_number must be integer 0 or 1")
@@ -325,6 +368,12 @@ class NamdEngine(BaseEngine):
                     fft_filename = cached_fft_filename
                     run0_dir = cached_dir
 
+            if fft_filename is None and pme_dims is not None:
+                persistent = self._lookup_persistent_fft_plan(pme_dims, cores)
+                if persistent is not None:
+                    fft_filename = persistent.name
+                    run0_dir = str(persistent.parent)
+
             if fft_filename is None:
                 fft_filename, run0_dir = self._get_run0_fft_filename_compat(
                     box_number,
@@ -381,6 +430,108 @@ class NamdEngine(BaseEngine):
             src,
         )
 
+    # -------------------------------------------------------------------------
+    # Persistent (cross-run) FFT plan cache
+    # -------------------------------------------------------------------------
+    def _fft_system_key(self, box_number: int) -> str:
+        """Identify the run inputs that determine NAMD's run-0 PME grid."""
+        if box_number == 0:
+            pdb = self.cfg.starting_pdb_box_0_file
+            dims = self.cfg.set_dims_box_0_list
+        else:
+            pdb = self.cfg.starting_pdb_box_1_file
+            dims = self.cfg.set_dims_box_1_list
+
+        parts = [
+            str(self.cfg.simulation_type),
+            str(box_number),
+            str(dims),
+            str(self.cfg.path_namd_template),
+        ]
+        pdb_path = Path(pdb) if pdb else None
+        if pdb_path is not None:
+            parts.append(str(pdb_path.resolve()))
+            try:
+                st = pdb_path.stat()
+                parts.extend([str(st.st_size), str(st.st_mtime_ns)])
+            except OSError:
+                pass
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()[:24]
+
+    def _fft_plan_key(self, pme_dims, cores: Optional[int]) -> Optional[str]:
+        if cores is None:
+            return None
+        if self._namd_binary_hash is None:
+            self._namd_binary_hash = hash_namd_binary(self.exec_path)
+        return fft_plan_key(tuple(pme_dims), int(cores), self._namd_binary_hash)
+
+    def _lookup_persistent_fft_plan(
+        self, pme_dims, cores: Optional[int]
+    ) -> Optional[Path]:
+        if self.fft_plan_cache is None:
+            return None
+        return self.fft_plan_cache.lookup(self._fft_plan_key(pme_dims, cores))
+
+    def seed_run0_fft_plan_from_cache(
+        self, box_number: int, dest_dir: Path, cores: int
+    ) -> Optional[Path]:
+        """Copy a cached FFTW plan into a fresh run-0 directory.
+
+        The PME dims are taken from the last run with the same inputs. The
+        plan is copied (not linked) because NAMD may extend the wisdom file
+        in place if it ends up choosing a different grid.
+        """
+        if self.fft_plan_cache is None:
+            return None
+        dims = self.fft_plan_cache.lookup_system(
+            self._fft_system_key(box_number)
+        )
+        src = self._lookup_persistent_fft_plan(dims, cores)
+        if src is None:
+            return None
+
+        dst = Path(dest_dir) / src.name
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(src, dst)
+        logger.info(
+            "[NAMD] Seeded run0 FFT plan for box=%s from persistent cache: %s",
+            box_number,
+            src,
+        )
+        return dst
+
+    def store_run0_fft_plan_in_cache(
+        self,
+        box_number: int,
+        *,
+        pme_dims,
+        cores: int,
+        run_root: Optional[Path] = None,
+    ) -> Optional[Path]:
+        """Publish the run-0 FFTW plan and PME dims to the persistent cache."""
+        if self.fft_plan_cache is None:
+            return None
+
+        self.fft_plan_cache.record_system(
+            self._fft_system_key(box_number), tuple(pme_dims)
+        )
+
+        try:
+            fft_filename, run0_dir = self._get_run0_fft_filename_compat(
+                box_number, run_root=run_root
+            )
+        except FileNotFoundError:
+            return None
+        if not fft_filename:
+            return None
+
+        return self.fft_plan_cache.store(
+            self._fft_plan_key(pme_dims, cores),
+            Path(run0_dir) / fft_filename,
+            pme_dims=tuple(pme_dims),
+            cores=cores,
+        )
+
     def build_execution_plan(
         self, *, box0_dir: Path, box1_dir: Optional[Path]
     ) -> NamdExecutionPlan:
@@ -392,6 +543,7 @@ class NamdEngine(BaseEngine):
             exec_path=exec_path,
             box0_dir=Path(box0_dir),
             box1_dir=Path(box1_dir) if box1_dir is not None else None,
+            launcher=self.launcher,
         )
 
     def execute_plan(self, plan: NamdExecutionPlan) -> dict:
@@ -428,6 +580,7 @@ class NamdEngine(BaseEngine):
         self, *, run_no: int, state: RunState, fifo_resources=None
     ) -> dict:
         """Run the full NAMD segment for an even run_no and update RunState."""
+        prepare_start_us = trace_clock_us()
 
         # runtime_namd_root = self._runtime_namd_root(fifo_resources)
         runtime_namd_root = self._runtime_namd_root(fifo_resources)
@@ -452,9 +605,6 @@ class NamdEngine(BaseEngine):
 
         self._ensure_pme_dims_for_dry_run(state)
 
-        # --- Ensure namd_writer globals are wired from config (required for real runs) ---
-        from engines.namd import namd_writer as nw
-
         # Resolve FF/parameter files from config (must not be empty for real NAMD runs)
         ff_files = getattr(self.cfg, "starting_ff_file_list_namd", None) or []
         if not ff_files:
@@ -463,24 +613,19 @@ class NamdEngine(BaseEngine):
                 "in user_input_NAMD_GOMC.json to one or more CHARMM parameter files."
             )
 
-        root = Path.cwd()  # repo root where you run the CLI
-        nw.starting_ff_file_list_namd = [
-            (
-                (root / f).resolve()
-                if not Path(f).is_absolute()
-                else Path(f).resolve()
-            )
-            for f in ff_files
-        ]
+        # Per-simulation writer inputs (parameter files relative to the
+        # directory the CLI runs from, or their staged copies; simulation
+        # type for PME sizing)
+        writer_context = NamdWriterContext.from_config(
+            self.cfg, Path.cwd(), self.staged_inputs
+        )
 
-        # namd_writer also uses this global when computing PME behavior
-        nw.simulation_type = self.cfg.simulation_type
         # 1) Write NAMD config(s)
         python_file_directory = Path.cwd()
 
         namd_box0_dir = write_namd_conf_file(
             python_file_directory,
-            self.cfg.path_namd_template,
+            self.input_path(self.cfg.path_namd_template),
             # self.cfg.path_namd_runs,
             runtime_namd_root,
             gomc_newdir,
@@ -492,14 +637,15 @@ class NamdEngine(BaseEngine):
             self.cfg.namd_console_blkavg_e_and_p_steps,
             self.cfg.simulation_temp_k,
             self.cfg.simulation_pressure_bar,
-            self.cfg.starting_pdb_box_0_file,
-            self.cfg.starting_psf_box_0_file,
+            self.input_path(self.cfg.starting_pdb_box_0_file),
+            self.input_path(self.cfg.starting_psf_box_0_file),
             state.pme_box0.x,
             state.pme_box0.y,
             state.pme_box0.z,
             set_x_dim=self.cfg.set_dims_box_0_list[0],
             set_y_dim=self.cfg.set_dims_box_0_list[1],
             set_z_dim=self.cfg.set_dims_box_0_list[2],
+            context=writer_context,
         )
         state.namd_box0_dir = Path(namd_box0_dir)
 
@@ -507,7 +653,7 @@ class NamdEngine(BaseEngine):
         if two_box:
             namd_box1_dir = write_namd_conf_file(
                 python_file_directory,
-                self.cfg.path_namd_template,
+                self.input_path(self.cfg.path_namd_template),
                 # self.cfg.path_namd_runs,
                 runtime_namd_root,
                 gomc_newdir,
@@ -519,8 +665,8 @@ class NamdEngine(BaseEngine):
                 self.cfg.namd_console_blkavg_e_and_p_steps,
                 self.cfg.simulation_temp_k,
                 self.cfg.simulation_pressure_bar,
-                self.cfg.starting_pdb_box_1_file,
-                self.cfg.starting_psf_box_1_file,
+                self.input_path(self.cfg.starting_pdb_box_1_file),
+                self.input_path(self.cfg.starting_psf_box_1_file),
                 state.pme_box1.x,
                 state.pme_box1.y,
                 state.pme_box1.z,
@@ -528,6 +674,7 @@ class NamdEngine(BaseEngine):
                 set_y_dim=self.cfg.set_dims_box_1_list[1],
                 set_z_dim=self.cfg.set_dims_box_1_list[2],
                 fft_add_namd_ang_to_box_dim=0,
+                context=writer_context,
             )
             state.namd_box1_dir = Path(namd_box1_dir)
 
@@ -544,15 +691,35 @@ class NamdEngine(BaseEngine):
                     Path(state.namd_box1_dir),
                     self.cfg.set_dims_box_1_list,
                 )
+        mode = self.cfg.namd_simulation_order if two_box else "series"
+
+        cores0 = (
+            int(self.cfg.total_no_cores)
+            if (not two_box or mode == "series")
+            else int(self.cfg.no_core_box_0)
+        )
+        cores1 = (
+            int(self.cfg.total_no_cores)
+            if mode == "series"
+            else int(self.cfg.no_core_box_1)
+        )
+
         # 2) FFT housekeeping
         if run_no == 0:
             # self.delete_namd_run_0_fft_file(box0)
             self.delete_namd_run_0_fft_file(box0, run_root=runtime_namd_root)
+            self.seed_run0_fft_plan_from_cache(
+                box0, Path(namd_box0_dir), cores0
+            )
             if two_box:
                 # self.delete_namd_run_0_fft_file(box1)
                 self.delete_namd_run_0_fft_file(
                     box1, run_root=runtime_namd_root
                 )
+                if namd_box1_dir is not None:
+                    self.seed_run0_fft_plan_from_cache(
+                        box1, Path(namd_box1_dir), cores1
+                    )
         else:
 
             self.link_run0_fft_file_into_dir(
@@ -560,6 +727,8 @@ class NamdEngine(BaseEngine):
                 Path(namd_box0_dir),
                 run_root=runtime_namd_root,
                 managed_root=managed_root,
+                pme_dims=state.pme_box0.as_tuple(),
+                cores=cores0,
             )
             if two_box and namd_box1_dir is not None:
 
@@ -568,23 +737,33 @@ class NamdEngine(BaseEngine):
                     Path(namd_box1_dir),
                     run_root=runtime_namd_root,
                     managed_root=managed_root,
+                    pme_dims=state.pme_box1.as_tuple(),
+                    cores=cores1,
                 )
 
-        # 3) Execute NAMD with legacy series/parallel semantics
-        mode = self.cfg.namd_simulation_order if two_box else "series"
-
-        cores0 = (
-            int(self.cfg.total_no_cores)
-            if (not two_box or mode == "series")
-            else int(self.cfg.no_core_box_0)
+        record_span(
+            "NAMD prepare", "engine", prepare_start_us, trace_clock_us()
         )
 
+        # 3) Execute NAMD with legacy series/parallel semantics
         disk_box0_dir = self._disk_namd_dir(fifo_resources, 0, run_no)
         disk_box0_dir.mkdir(parents=True, exist_ok=True)
 
+        # boxes started together share the launcher's host pool
+        n_boxes = 2 if two_box and mode == "parallel" else 1
+
         cmd0 = Command(
-            argv=[str(self.exec_path), f"+p{cores0}", "in.conf"],
+            argv=self.launcher.argv(
+                self.exec_path,
+                cores0,
+                cwd=Path(namd_box0_dir),
+                box=0,
+                n_boxes=n_boxes,
+            ),
             cwd=Path(namd_box0_dir),
+            allocated_cores=self.launcher.allocated_cores(
+                cores0, box=0, n_boxes=n_boxes
+            ),
             **self._stdout_command_kwargs(
                 runtime_dir=Path(namd_box0_dir),
                 disk_dir=disk_box0_dir,
@@ -593,18 +772,21 @@ class NamdEngine(BaseEngine):
 
         cmd1: Optional[Command] = None
         if two_box and namd_box1_dir is not None:
-            cores1 = (
-                int(self.cfg.total_no_cores)
-                if mode == "series"
-                else int(self.cfg.no_core_box_1)
-            )
-
             disk_box1_dir = self._disk_namd_dir(fifo_resources, 1, run_no)
             disk_box1_dir.mkdir(parents=True, exist_ok=True)
 
             cmd1 = Command(
-                argv=[str(self.exec_path), f"+p{cores1}", "in.conf"],
+                argv=self.launcher.argv(
+                    self.exec_path,
+                    cores1,
+                    cwd=Path(namd_box1_dir),
+                    box=1,
+                    n_boxes=n_boxes,
+                ),
                 cwd=Path(namd_box1_dir),
+                allocated_cores=self.launcher.allocated_cores(
+                    cores1, box=1, n_boxes=n_boxes
+                ),
                 **self._stdout_command_kwargs(
                     runtime_dir=Path(namd_box1_dir),
                     disk_dir=disk_box1_dir,
@@ -615,24 +797,35 @@ class NamdEngine(BaseEngine):
         box0_time = 0.0
         box1_time = 0.0
 
+        def _start(box_number: int, cmd: Command):
+            with trace_tags(box=box_number):
+                if self.persistent_process:
+                    return self._start_persistent_segment(
+                        box_number,
+                        cmd,
+                        run_no=run_no,
+                        gomc_dir=state.gomc_dir,
+                    )
+                return self.runner.start(cmd)
+
         if cmd1 is None or mode == "series":
             t0 = time.perf_counter()
-            h0 = self.runner.start(cmd0)
+            h0 = _start(box0, cmd0)
             rc0 = self.runner.wait(h0)
             box0_time = time.perf_counter() - t0
 
             if cmd1 is not None:
                 t1 = time.perf_counter()
-                h1 = self.runner.start(cmd1)
+                h1 = _start(box1, cmd1)
                 rc1 = self.runner.wait(h1)
                 box1_time = time.perf_counter() - t1
 
             max_namd_cycle_time_s = box0_time + box1_time
         else:
             t0 = time.perf_counter()
-            h0 = self.runner.start(cmd0)
+            h0 = _start(box0, cmd0)
             t1 = time.perf_counter()
-            h1 = self.runner.start(cmd1)
+            h1 = _start(box1, cmd1)
 
             rc0 = self.runner.wait(h0)
             end0 = time.perf_counter()
@@ -658,22 +851,15 @@ class NamdEngine(BaseEngine):
                 .read_text(errors="ignore")
                 .splitlines(True)
             )
-            (
-                _elect_series,
-                _elect_initial,
-                _elect_final,
-                _pot_series,
-                pot_initial,
-                pot_final,
-                _vpe_series,
-                vpe_initial,
-                vpe_final,
-            ) = get_namd_energy_data(lines, DEFAULT_NAMD_E_TITLES_LIST)
-            energy_obj.namd_potential_initial = pot_initial
-            energy_obj.namd_potential_final = pot_final
-            energy_obj.namd_vdw_plus_elec_initial = vpe_initial
-            energy_obj.namd_vdw_plus_elec_final = vpe_final
+            summary = summarize_namd_energy_lines(
+                lines, DEFAULT_NAMD_E_TITLES_LIST
+            )
+            energy_obj.namd_potential_initial = summary.potential_first
+            energy_obj.namd_potential_final = summary.potential_last
+            energy_obj.namd_vdw_plus_elec_initial = summary.vdw_plus_elec_first
+            energy_obj.namd_vdw_plus_elec_final = summary.vdw_plus_elec_last
 
+        parse_start_us = trace_clock_us()
         try:
             _parse_to_energy(Path(namd_box0_dir), state.energy_box0)
         except Exception as e:
@@ -695,7 +881,12 @@ class NamdEngine(BaseEngine):
                 else:
                     raise
 
+        record_span(
+            "NAMD parse energies", "engine", parse_start_us, trace_clock_us()
+        )
+
         # 5) Continuity check (GOMC -> NAMD) when applicable
+        energy_warnings = 0
         if (run_no != 0) and (run_no != int(self.cfg.starting_sims_namd_gomc)):
             e0 = state.energy_box0
             if (
@@ -704,14 +895,17 @@ class NamdEngine(BaseEngine):
                 and (e0.gomc_vdw_plus_elec_final is not None)
                 and (e0.namd_vdw_plus_elec_initial is not None)
             ):
-                compare_namd_gomc_energies(
-                    self.cfg,
-                    e0.gomc_potential_final,
-                    e0.namd_potential_initial,
-                    e0.gomc_vdw_plus_elec_final,
-                    e0.namd_vdw_plus_elec_initial,
-                    run_no,
-                    0,
+                energy_warnings += (
+                    compare_namd_gomc_energies(
+                        self.cfg,
+                        e0.gomc_potential_final,
+                        e0.namd_potential_initial,
+                        e0.gomc_vdw_plus_elec_final,
+                        e0.namd_vdw_plus_elec_initial,
+                        run_no,
+                        0,
+                    )
+                    or 0
                 )
 
             if two_box:
@@ -722,14 +916,17 @@ class NamdEngine(BaseEngine):
                     and (e1.gomc_vdw_plus_elec_final is not None)
                     and (e1.namd_vdw_plus_elec_initial is not None)
                 ):
-                    compare_namd_gomc_energies(
-                        self.cfg,
-                        e1.gomc_potential_final,
-                        e1.namd_potential_initial,
-                        e1.gomc_vdw_plus_elec_final,
-                        e1.namd_vdw_plus_elec_initial,
-                        run_no,
-                        1,
+                    energy_warnings += (
+                        compare_namd_gomc_energies(
+                            self.cfg,
+                            e1.gomc_potential_final,
+                            e1.namd_potential_initial,
+                            e1.gomc_vdw_plus_elec_final,
+                            e1.namd_vdw_plus_elec_initial,
+                            run_no,
+                            1,
+                        )
+                        or 0
                     )
 
         # 6) Update PME dims after Run-0 (out.dat exists now)
@@ -749,6 +946,12 @@ class NamdEngine(BaseEngine):
                 run_root=runtime_namd_root,
                 managed_root=managed_root,
             )
+            self.store_run0_fft_plan_in_cache(
+                0,
+                pme_dims=(nx0, ny0, nz0),
+                cores=cores0,
+                run_root=runtime_namd_root,
+            )
 
             if two_box:
                 nx1, ny1, nz1, _ = self.get_run0_pme_dims(
@@ -771,6 +974,12 @@ class NamdEngine(BaseEngine):
                     run_root=runtime_namd_root,
                     managed_root=managed_root,
                 )
+                self.store_run0_fft_plan_in_cache(
+                    1,
+                    pme_dims=(nx1, ny1, nz1),
+                    cores=cores1,
+                    run_root=runtime_namd_root,
+                )
 
         # 7) Update step counter (legacy rule)
         if run_no == 0:
@@ -783,6 +992,7 @@ class NamdEngine(BaseEngine):
         return {
             "run_no": int(run_no),
             "mode": mode,
+            "energy_warnings": energy_warnings,
             "rc_box0": rc0,
             "rc_box1": rc1,
             "namd_box0_dir": str(namd_box0_dir),
@@ -791,6 +1001,115 @@ class NamdEngine(BaseEngine):
             ),
         }
 
+    # -------------------------------------------------------------------------
+    # Persistent NAMD process mode
+    # -------------------------------------------------------------------------
+    def _start_persistent_segment(
+        self,
+        box_number: int,
+        cmd: Command,
+        *,
+        run_no: int,
+        gomc_dir: Optional[Path],
+    ) -> ProcessHandle:
+        """Run this segment on the box's live NAMD process if possible.
+
+        The process is (re)launched on the segment's own ``in.conf`` for
+        run 0, when no live process exists, when the segment's command line
+        or allocated cores differ from the launch (retry core overrides), or
+        when the GOMC restart files cannot be loaded with ``reinitatoms``
+        (e.g. the atom count changed). The returned handle is waited for
+        with `self.runner` like a launched segment.
+        """
+        session = self._namd_sessions.get(box_number)
+        launch_key = self._session_launch_key(cmd)
+        commands = None
+        if (
+            session is not None
+            and session.alive
+            and session.launch_key == launch_key
+            and int(run_no) != 0
+            and gomc_dir is not None
+        ):
+            commands = build_reinit_commands(
+                restart_base=Path(gomc_dir)
+                / f"Output_data_BOX_{box_number}_restart",
+                output_prefix=Path(cmd.cwd).resolve() / "namdOut",
+                run_steps=int(self.cfg.namd_run_steps),
+                natoms=session.natoms,
+                temperature_k=float(self.cfg.simulation_temp_k),
+            )
+
+        if commands is not None:
+            session.begin_segment(cmd.stdout_path, commands)
+            logger.info(
+                "[NAMD] Reusing NAMD process pid=%s for run_no=%s box=%s",
+                session.pid,
+                run_no,
+                box_number,
+            )
+            return self.runner.attach(session.popen, cmd, session.poll_segment)
+
+        if session is not None:
+            if session.alive and session.launch_key != launch_key:
+                logger.info(
+                    "[NAMD] Command line or cores changed for box=%s; "
+                    "relaunching NAMD",
+                    box_number,
+                )
+            session.close()
+
+        session = NamdPersistentSession.launch(
+            cmd.argv,
+            cmd.cwd,
+            cmd.stdout_path,
+            natoms=self._segment_atom_count(box_number, run_no, gomc_dir),
+            launch_key=launch_key,
+        )
+        self._namd_sessions[box_number] = session
+        logger.info(
+            "[NAMD] Launched persistent NAMD process pid=%s for run_no=%s "
+            "box=%s",
+            session.pid,
+            run_no,
+            box_number,
+        )
+        return self.runner.attach(session.popen, cmd, session.poll_segment)
+
+    @staticmethod
+    def _session_launch_key(cmd: Command) -> tuple:
+        # launcher files such as the charmrun nodelist live in the run dir
+        cwd = str(Path(cmd.cwd))
+        argv = tuple(str(a).replace(cwd, "{cwd}") for a in cmd.argv)
+        return argv, cmd.allocated_cores
+
+    def _segment_atom_count(
+        self, box_number: int, run_no: int, gomc_dir: Optional[Path]
+    ) -> Optional[int]:
+        if int(run_no) != 0 and gomc_dir is not None:
+            psf = Path(gomc_dir) / f"Output_data_BOX_{box_number}_restart.psf"
+        elif box_number == 0:
+            psf = Path.cwd() / self.input_path(self.cfg.starting_psf_box_0_file)
+        else:
+            psf = Path.cwd() / self.input_path(
+                str(self.cfg.starting_psf_box_1_file)
+            )
+        return read_psf_atom_count(psf)
+
+    def close(self) -> None:
+        """Shut down any persistent NAMD processes."""
+        for box_number, session in sorted(self._namd_sessions.items()):
+            rc = session.close()
+            logger.info(
+                "[NAMD] Closed persistent NAMD process pid=%s box=%s rc=%s "
+                "after %s segments",
+                session.pid,
+                box_number,
+                rc,
+                session.segments_run,
+            )
+        self._namd_sessions.clear()
+
     def _ensure_dry_run_restart_files(self, run_dir: Path, dims_xyz) -> None:
         run_dir.mkdir(parents=True, exist_ok=True)
         (run_dir / "namdOut.restart.coor").touch(exist_ok=True)
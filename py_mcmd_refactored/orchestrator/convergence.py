@@ -0,0 +1,145 @@
+"""Convergence-driven early termination of the coupled run.
+
+The on-the-fly processor keeps block-averaged error bars of every parsed
+column (`utils.online_stats`). `ConvergenceMonitor` looks at the configured
+columns after each committed cycle; once every criterion has been met for
+``consecutive_checks`` checks in a row, it returns a `ConvergenceDecision`
+and the orchestrator stops after the cycle that is running.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+from utils.online_stats import OnlineStatsBook
+
+
+@dataclass(frozen=True)
+class ConvergenceCriterion:
+    """Block-averaged SEM of one column at or below `tolerance`."""
+
+    engine: str
+    box: int
+    column: str
+    tolerance: float
+    relative: bool = False  # compare sem / |mean| instead of sem
+
+    @property
+    def label(self) -> str:
+        return f"{self.engine} box {self.box} {self.column}"
+
+    def evaluate(self, stats: OnlineStatsBook) -> dict[str, Any]:
+        column = stats.get(self.engine, self.box, self.column)
+        summary = column.summary() if column is not None else {}
+        sem = summary.get("sem")
+        mean = summary.get("mean")
+
+        value = sem
+        if self.relative and sem is not None:
+            value = sem / abs(mean) if mean else None
+
+        return {
+            "criterion": self.label,
+            "n": summary.get("n", 0),
+            "mean": mean,
+            "sem": sem,
+            "value": value,
+            "tolerance": self.tolerance,
+            "relative": self.relative,
+            "met": value is not None and value <= self.tolerance,
+        }
+
+
+@dataclass(frozen=True)
+class ConvergenceDecision:
+    cycle: int
+    checks: int
+    results: list[dict[str, Any]]
+
+    @property
+    def reason(self) -> str:
+        parts = [
+            f"{r['criterion']} {'rel. ' if r['relative'] else ''}"
+            f"sem={r['value']:.6g} <= {r['tolerance']:g}"
+            for r in self.results
+        ]
+        return (
+            f"converged at cycle {self.cycle} after {self.checks} "
+            f"consecutive checks: " + "; ".join(parts)
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "cycle": self.cycle,
+            "consecutive_checks": self.checks,
+            "reason": self.reason,
+            "criteria": self.results,
+        }
+
+
+@dataclass
+class ConvergenceMonitor:
+    criteria: Sequence[ConvergenceCriterion]
+    consecutive_checks: int = 3
+    min_cycles: int = 0
+    check_every: int = 1
+
+    observed: int = 0
+    streak: int = 0
+    last_results: list[dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["ConvergenceMonitor"]:
+        """Build the monitor from ``cfg.convergence_stop`` (None if unset)."""
+        spec = getattr(cfg, "convergence_stop", None)
+        if spec is None:
+            return None
+
+        def _get(obj, name, default=None):
+            if isinstance(obj, dict):
+                return obj.get(name, default)
+            return getattr(obj, name, default)
+
+        criteria = [
+            ConvergenceCriterion(
+                engine=str(_get(c, "engine", "GOMC")).upper(),
+                box=int(_get(c, "box", 0)),
+                column=str(_get(c, "column")),
+                tolerance=float(_get(c, "tolerance")),
+                relative=bool(_get(c, "relative", False)),
+            )
+            for c in _get(spec, "criteria", [])
+        ]
+        if not criteria:
+            return None
+        return cls(
+            criteria=criteria,
+            consecutive_checks=max(1, int(_get(spec, "consecutive_checks", 3))),
+            min_cycles=max(0, int(_get(spec, "min_cycles", 0))),
+            check_every=max(1, int(_get(spec, "check_every", 1))),
+        )
+
+    def observe(
+        self, stats: OnlineStatsBook, cycle: int
+    ) -> Optional[ConvergenceDecision]:
+        """Account for one committed cycle; returns a decision once it fires."""
+        self.observed += 1
+        if self.observed < self.min_cycles:
+            return None
+        if (self.observed - self.min_cycles) % self.check_every:
+            return None
+
+        self.last_results = [c.evaluate(stats) for c in self.criteria]
+        if all(result["met"] for result in self.last_results):
+            self.streak += 1
+        else:
+            self.streak = 0
+
+        if self.streak >= self.consecutive_checks:
+            return ConvergenceDecision(
+                cycle=int(cycle),
+                checks=self.streak,
+                results=list(self.last_results),
+            )
+        return None
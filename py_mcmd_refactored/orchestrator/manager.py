@@ -8,12 +8,37 @@ from config.models import SimulationConfig
 from engines.base import Engine
 from engines.gomc_engine import GomcEngine
 from engines.namd_engine import NamdEngine
+from utils.background import BackgroundIsolation
 from utils.fifo_store import FifoStepResources, FifoStore
+from utils.input_stage import static_input_paths
 from utils.onthefly_processor import OnTheFlyProcessor
+from utils.otf_worker import OtfWorkerProcess
 from utils.path import format_cycle_id
+from utils.proc_profiler import ResourceProfileLog
+from utils.time_stats import TimeStatsRecorder
+from utils.tracing import (
+    active_tracer,
+    install_tracer,
+    record_span,
+    trace_clock_us,
+    trace_instant,
+    trace_span,
+    trace_tags,
+    uninstall_tracer,
+)
+from utils.watchdog import SegmentHangError
 from version import get_version
 
+from .convergence import ConvergenceMonitor
+from .retry import SegmentRetryPolicy, archive_attempt_logs, attempt_log_dir
+from .segment_tuner import (
+    SEGMENT_LEDGER_NAME,
+    SegmentLedger,
+    SegmentObservation,
+    SegmentTuner,
+)
 from .state import PmeDims, RunState
+from .status import StatusPublisher, tree_bytes
 
 _FIFO_OUTPUT_BASENAMES_BY_ENGINE = {
     # These are the outputs currently routed through the centralized runner.
@@ -23,9 +48,24 @@ _FIFO_OUTPUT_BASENAMES_BY_ENGINE = {
     "GOMC": ["out.dat"],
 }
 
+import copy
+import dataclasses
 import inspect
 import threading
 import time
+from collections import deque
+
+_RUN_NO_START_BANNER = (
+    "*************************************************\n"
+    "*************************************************\n"
+    "run_no = %s (START)\n"
+    "*************************************************"
+)
+_RUN_NO_END_BANNER = (
+    "*************************************************\n"
+    "run_no = %s (End)\n"
+    "*************************************************"
+)
 
 try:
     from orchestrator.restart import apply_start_context, compute_start_context
@@ -54,7 +94,12 @@ class SimulationOrchestrator:
         self.cfg = cfg
         # Central mutable state for the legacy run_no loop
         self.state = RunState.from_config(cfg)
-        self._time_stats_lines = []
+        self._time_stats: TimeStatsRecorder | None = None
+        self._resource_log: ResourceProfileLog | None = None
+        self._status: StatusPublisher | None = None
+        self._energy_warnings = 0
+        # run_segment signature lookups, keyed by the underlying function
+        self._accepts_fifo_resources: dict = {}
 
         # Propagated execution strategy for NAMD (used later when planning two-box GEMC runs)
         self.namd_simulation_order = getattr(
@@ -71,6 +116,7 @@ class SimulationOrchestrator:
                 "GOMC": Path(self.cfg.path_gomc_runs),
             },
             developer_mode=self.developer_mode,
+            input_root=getattr(cfg, "staged_inputs_dir", None),
             logger=self.logger,
         )
         # self._last_successful_fifo_step_by_engine = {
@@ -90,13 +136,14 @@ class SimulationOrchestrator:
 
         self.otf_keep_raw_cycles = int(getattr(cfg, "otf_keep_raw_cycles", 2))
 
-        self._retained_cycle_pairs: list[tuple[str, str]] = []
+        self._retained_cycle_pairs: deque[tuple[str, str]] = deque()
 
         self._bg_thread: threading.Thread | None = None
         self._bg_error: Exception | None = None
         self._bg_cycle_pair: tuple[int, int] | None = None
 
         self._otf_processor = None
+        self._background = BackgroundIsolation.from_config(cfg)
 
         if bool(
             getattr(
@@ -105,19 +152,33 @@ class SimulationOrchestrator:
                 False,
             )
         ):
-            self._otf_processor = OnTheFlyProcessor(
+            otf_args = (
                 cfg,
                 getattr(
                     cfg,
                     "combined_data_dir",
                     "combined_data",
                 ),
-                managed_root=getattr(
-                    self.fifo_store,
-                    "managed_root",
-                    None,
-                ),
             )
+            otf_managed_root = getattr(
+                self.fifo_store,
+                "managed_root",
+                None,
+            )
+            if self._background is not None:
+                # a thread would share the interpreter lock with the
+                # engine stdout pumps; see utils/otf_worker.py
+                self._otf_processor = OtfWorkerProcess(
+                    *otf_args,
+                    managed_root=otf_managed_root,
+                    isolation=self._background,
+                    factory=OnTheFlyProcessor,
+                )
+            else:
+                self._otf_processor = OnTheFlyProcessor(
+                    *otf_args,
+                    managed_root=otf_managed_root,
+                )
 
             self.logger.info(
                 "[OTF] On-the-fly processing enabled. " "Combined output: %s",
@@ -128,9 +189,51 @@ class SimulationOrchestrator:
                 ),
             )
 
+            self.logger.info(
+                "[OTF] Background isolation: %s",
+                (
+                    f"{self._background.describe()} (worker process)"
+                    if self._background is not None
+                    else "none"
+                ),
+            )
+
+        # Optional early stop once the configured columns have converged;
+        # fed from the online statistics of each committed OTF cycle.
+        self._convergence = None
+        self._stop_decision = None
+        if getattr(cfg, "convergence_stop", None) is not None:
+            if self._otf_processor is None:
+                self.logger.warning(
+                    "[Convergence] convergence_stop needs "
+                    "process_on_the_fly; running all cycles"
+                )
+            else:
+                self._convergence = ConvergenceMonitor.from_config(cfg)
+
+        # Optional overhead-aware segment lengths; applied changes go to the
+        # ledger, which restarts replay even when the tuner is off.
+        self._segment_tuner = SegmentTuner.from_config(cfg)
+        self._segment_ledger = SegmentLedger(
+            Path(cfg.log_dir) / SEGMENT_LEDGER_NAME
+        )
+
+        # Optional retries of failed segments from the committed restarts
+        self._retry_policy = SegmentRetryPolicy.from_config(cfg)
+        self._segment_retries: list[dict] = []
+
         self.namd = NamdEngine(cfg, "NAMD", dry_run=dry_run)
         self.gomc = GomcEngine(cfg, "GOMC", dry_run=dry_run)
 
+        # Force fields, starting structures and templates read by every
+        # segment: one shared tmpfs copy per node instead of project reads
+        if bool(getattr(cfg, "stage_static_inputs", False)):
+            staged = self.fifo_store.stage_inputs(
+                static_input_paths(cfg), Path.cwd()
+            )
+            self.namd.staged_inputs = staged
+            self.gomc.staged_inputs = staged
+
         self.total_cycles = int(getattr(cfg, "total_cycles_namd_gomc_sims", 0))
         self.start_cycle = int(
             getattr(cfg, "starting_at_cycle_namd_gomc_sims", 0)
@@ -436,6 +539,8 @@ class SimulationOrchestrator:
         run_succeeded = False
 
         try:
+            self._restore_segment_lengths()
+
             if int(self.cfg.starting_at_cycle_namd_gomc_sims) > 0:
                 if (
                     compute_start_context is not None
@@ -459,6 +564,12 @@ class SimulationOrchestrator:
                     )
 
                 if self._otf_processor is not None:
+                    rewind = getattr(
+                        self._otf_processor, "rewind_to_cycle", None
+                    )
+                    if callable(rewind):
+                        rewind(self.start_cycle)
+
                     self._otf_processor.set_current_step(
                         self.state.current_step
                     )
@@ -481,46 +592,75 @@ class SimulationOrchestrator:
 
             cycles_completed = 0
             cycle_start_perf = None
-            self._time_stats_lines = []
+            cycle_start_us = None
+            self._time_stats = TimeStatsRecorder(
+                Path(self.cfg.log_dir)
+                / f"TIME_STATS_started_at_cycle_No_{self.start_cycle}.txt"
+            )
+            trace_path = getattr(self.cfg, "trace_events_path", None)
+            if trace_path:
+                install_tracer(trace_path)
+                self.logger.info(
+                    "[Trace] Writing trace events to %s", trace_path
+                )
+            self._status = StatusPublisher.from_config(self.cfg)
+            self._publish_status(state="starting", cycles_completed=0)
+            if getattr(self.cfg, "engine_profile_interval_s", None):
+                self._resource_log = ResourceProfileLog(
+                    Path(self.cfg.log_dir)
+                    / "RESOURCE_PROFILE_started_at_cycle_No_"
+                    f"{self.start_cycle}.jsonl"
+                )
 
             for run_no in range(
                 starting_sims,
                 total_sims,
             ):
-                self.logger.info(
-                    "*************************************************\n"
-                    "*************************************************\n"
-                    "run_no = %s (START)\n"
-                    "*************************************************",
-                    run_no,
-                )
+                self.logger.info(_RUN_NO_START_BANNER, run_no)
 
                 if run_no % 2 == 0:
                     cycle_start_perf = time.perf_counter()
+                    cycle_start_us = trace_clock_us()
                     engine_name = "NAMD"
 
                 else:
                     engine_name = "GOMC"
 
-                fifo_resources = self._prepare_fifo_step(
-                    engine_name,
-                    run_no,
+                self._publish_status(
+                    state="running",
+                    current_cycle=run_no // 2,
+                    run_no=run_no,
+                    engine=engine_name,
                 )
 
+                with trace_span("prepare step", "orchestrator", run_no=run_no):
+                    fifo_resources = self._prepare_fifo_step(
+                        engine_name,
+                        run_no,
+                    )
+
                 try:
                     if run_no % 2 == 0:
-                        self._call_run_segment(
+                        result = self._run_segment_with_retry(
                             self.namd,
+                            engine_name,
                             run_no=run_no,
                             fifo_resources=fifo_resources,
                         )
+                        self._record_resource_profiles(
+                            self.namd, engine_name, run_no
+                        )
 
                     else:
-                        self._call_run_segment(
+                        result = self._run_segment_with_retry(
                             self.gomc,
+                            engine_name,
                             run_no=run_no,
                             fifo_resources=fifo_resources,
                         )
+                        self._record_resource_profiles(
+                            self.gomc, engine_name, run_no
+                        )
 
                         cycles_completed += 1
 
@@ -528,8 +668,19 @@ class SimulationOrchestrator:
                         engine_name,
                         run_no,
                     )
+                    if isinstance(result, dict):
+                        self._energy_warnings += int(
+                            result.get("energy_warnings") or 0
+                        )
 
-                except Exception:
+                except Exception as exc:
+                    if isinstance(exc, SegmentHangError):
+                        self.logger.error(
+                            "[Watchdog] %s segment run_no=%s killed: %s",
+                            engine_name,
+                            run_no,
+                            exc.event.reason,
+                        )
                     self._mark_fifo_step_failure(
                         engine_name,
                         run_no,
@@ -575,45 +726,69 @@ class SimulationOrchestrator:
                     )
 
                     if run_no == starting_sims + 1:
-                        header = (
-                            "*************************************************\n"
-                            "TIME_STATS_TITLE:\t"
-                            "#Cycle_No\t\t"
-                            "NAMD_time_s\t\t"
-                            "GOMC_time_s\t\t"
-                            "Python_time_s\t\t"
-                            "Total_time_s\n"
-                        )
-
-                        self._time_stats_lines.append(header)
+                        header = self._time_stats.write_header()
 
                         self.logger.info(header.rstrip("\n"))
 
-                    cycle_no = int(run_no / 2)
+                    data = self._time_stats.record(
+                        run_no // 2,
+                        max_namd,
+                        gomc_t,
+                        python_only_time_s,
+                        cycle_run_time_s,
+                    )
+
+                    self.logger.info(data.rstrip("\n"))
 
-                    data = (
-                        f"TIME_STATS_DATA:\t"
-                        f"{cycle_no}\t\t"
-                        f"{max_namd}\t\t"
-                        f"{gomc_t}\t\t"
-                        f"{python_only_time_s}\t\t"
-                        f"{cycle_run_time_s}\n"
+                    self._tune_segments(
+                        run_no // 2,
+                        max_namd,
+                        gomc_t,
+                        python_only_time_s,
                     )
 
-                    self._time_stats_lines.append(data)
+                    self._trace_cycle(
+                        run_no // 2,
+                        cycle_start_us,
+                        python_only_time_s=python_only_time_s,
+                    )
 
-                    self.logger.info(data.rstrip("\n"))
+                    self._publish_status(
+                        cycles_completed=cycles_completed,
+                        last_namd_segment_s=max_namd,
+                        last_gomc_segment_s=gomc_t,
+                        last_cycle_s=cycle_run_time_s,
+                        python_overhead_percent=(
+                            round(
+                                100 * python_only_time_s / cycle_run_time_s, 2
+                            )
+                            if cycle_run_time_s > 0
+                            else None
+                        ),
+                    )
 
-                self.logger.info(
-                    "*************************************************\n"
-                    "run_no = %s (End)\n"
-                    "*************************************************",
-                    run_no,
-                )
+                self.logger.info(_RUN_NO_END_BANNER, run_no)
+
+                if run_no % 2 == 1 and self._stop_decision is not None:
+                    self.logger.info(
+                        "[Convergence] Stopping after cycle %d of %d: %s",
+                        run_no // 2,
+                        self.total_cycles,
+                        self._stop_decision.reason,
+                    )
+                    break
 
             self._wait_for_otf_worker()
 
-            self.logger.info("All cycles completed.")
+            if self._stop_decision is None:
+                self.logger.info("All cycles completed.")
+            else:
+                self.logger.info(
+                    "Stopped early after %d of %d cycles (converged).",
+                    cycles_completed,
+                    self.total_cycles - self.start_cycle,
+                )
+            self.logger.info(self._time_stats.summary_line())
 
             summary = {
                 "total_cycles": self.total_cycles,
@@ -624,22 +799,79 @@ class SimulationOrchestrator:
                 "total_sims_namd_gomc": (self.total_sims_namd_gomc),
                 "starting_sims_namd_gomc": (self.starting_sims_namd_gomc),
                 "state": self.state.snapshot(),
-                "time_stats_lines": (self._time_stats_lines),
+                "time_stats_lines": self._time_stats.lines,
+                "time_stats_path": str(self._time_stats.path),
+                "time_stats_summary": self._time_stats.summary(),
+                "stopped_early": self._stop_decision is not None,
+                "stop_reason": (
+                    self._stop_decision.reason
+                    if self._stop_decision is not None
+                    else None
+                ),
+                "convergence": (
+                    self._stop_decision.as_dict()
+                    if self._stop_decision is not None
+                    else None
+                ),
+                "watchdog_events": [
+                    event.as_dict() for event in self._hang_events()
+                ],
+                "segment_retries": list(self._segment_retries),
+                "status_path": (
+                    str(self._status.path) if self._status is not None else None
+                ),
+                "energy_continuity_warnings": self._energy_warnings,
+                "trace_events_path": (
+                    str(active_tracer().path)
+                    if active_tracer() is not None
+                    else None
+                ),
+                "resource_profiles_path": (
+                    str(self._resource_log.path)
+                    if self._resource_log is not None
+                    else None
+                ),
+                "segment_tuning": (
+                    self._segment_tuner.history
+                    if self._segment_tuner is not None
+                    else None
+                ),
             }
 
             self._emit_end_header()
 
             run_succeeded = True
+            self._publish_status(
+                state=(
+                    "completed" if self._stop_decision is None else "converged"
+                ),
+                cycles_completed=cycles_completed,
+            )
 
             return summary
 
         finally:
+            if self._time_stats is not None:
+                self._time_stats.close()
+
+            if getattr(self.cfg, "trace_events_path", None):
+                uninstall_tracer()
+
+            if self._status is not None:
+                if not run_succeeded:
+                    self._publish_status(state="failed")
+                self._status.close()
+
             if self._bg_thread is not None:
                 self._join_otf_worker_for_teardown()
 
             if self._otf_processor is not None:
                 self._otf_processor.close()
 
+            close_namd = getattr(self.namd, "close", None)
+            if callable(close_namd):
+                close_namd()
+
             if run_succeeded:
                 self._finalize_successful_artifact_cleanup()
 
@@ -721,10 +953,18 @@ class SimulationOrchestrator:
     ) -> None:
         step_id = self._fifo_step_id(run_no)
 
-        self.fifo_store.finalize_step_success(
-            engine,
-            step_id,
-        )
+        if self.developer_mode:
+            # mirrors the runtime step to disk
+            self._run_isolated(
+                self.fifo_store.finalize_step_success,
+                engine,
+                step_id,
+            )
+        else:
+            self.fifo_store.finalize_step_success(
+                engine,
+                step_id,
+            )
 
         self._last_successful_fifo_step_by_engine[engine] = step_id
 
@@ -756,6 +996,8 @@ class SimulationOrchestrator:
             except Exception as exc:
                 self._bg_error = exc
 
+        # with an isolation configured the processor is an OtfWorkerProcess
+        # and this thread only waits for it
         self._bg_thread = threading.Thread(
             target=_worker,
             name=(f"otf_cycle_" f"{gomc_run_no // 2}"),
@@ -776,7 +1018,8 @@ class SimulationOrchestrator:
         if thread is None:
             return
 
-        thread.join()
+        with trace_span("wait for OTF", "orchestrator"):
+            thread.join()
 
         self._bg_thread = None
 
@@ -800,6 +1043,124 @@ class SimulationOrchestrator:
 
             self._apply_retention_policy()
 
+            self._observe_convergence(cycle_pair[1] // 2)
+
+    def _observe_convergence(self, cycle: int) -> None:
+        """Check the stopping rule against the cycle the OTF just committed."""
+        if self._convergence is None or self._stop_decision is not None:
+            return
+
+        stats = getattr(self._otf_processor, "stats", None)
+        if stats is None:
+            return
+
+        self._stop_decision = self._convergence.observe(stats, cycle)
+
+        if self._stop_decision is not None:
+            self.logger.info(
+                "[Convergence] %s; finishing the current cycle",
+                self._stop_decision.reason,
+            )
+        elif self._convergence.last_results:
+            self.logger.debug(
+                "[Convergence] cycle %d: %d/%d consecutive checks passed",
+                cycle,
+                self._convergence.streak,
+                self._convergence.consecutive_checks,
+            )
+
+    def _hang_events(self) -> list:
+        """Hang events the engines' watchdogs reported during this run."""
+        events = []
+        for engine in (self.namd, self.gomc):
+            runner = getattr(engine, "runner", None)
+            events.extend(getattr(runner, "hang_events", ()))
+        return events
+
+    def _restore_segment_lengths(self) -> None:
+        """Resume with the segment lengths in effect at the start cycle."""
+        # changes recorded for cycles that are about to be re-run are stale
+        self._segment_ledger.discard_after(self.start_cycle)
+        if self.start_cycle <= 0:
+            return
+
+        namd, gomc = self._segment_ledger.lengths_at(
+            self.start_cycle, (self.namd_steps, self.gomc_steps)
+        )
+        if (namd, gomc) != (self.namd_steps, self.gomc_steps):
+            self.logger.info(
+                "[Tuner] Resuming cycle %d with the ledger's segment "
+                "lengths: NAMD %d, GOMC %d steps",
+                self.start_cycle,
+                namd,
+                gomc,
+            )
+            self._set_segment_lengths(namd, gomc)
+
+    def _tune_segments(
+        self,
+        cycle: int,
+        namd_s: float,
+        gomc_s: float,
+        python_s: float,
+    ) -> None:
+        """Feed a finished cycle to the tuner; apply or log its proposal."""
+        if self._segment_tuner is None:
+            return
+
+        proposal = self._segment_tuner.observe(
+            SegmentObservation(
+                cycle=cycle,
+                namd_steps=self.namd_steps,
+                gomc_steps=self.gomc_steps,
+                namd_s=namd_s,
+                gomc_s=gomc_s,
+                python_s=python_s,
+            )
+        )
+        if proposal is None:
+            return
+
+        if self._segment_tuner.mode != "apply":
+            self.logger.info(
+                "[Tuner] Proposed segment lengths: NAMD %d, GOMC %d steps "
+                "(currently %d, %d): %s",
+                proposal.namd_run_steps,
+                proposal.gomc_run_steps,
+                self.namd_steps,
+                self.gomc_steps,
+                proposal.reason,
+            )
+            return
+
+        self.logger.info(
+            "[Tuner] Segment lengths from cycle %d: NAMD %d -> %d, "
+            "GOMC %d -> %d steps: %s",
+            proposal.cycle,
+            self.namd_steps,
+            proposal.namd_run_steps,
+            self.gomc_steps,
+            proposal.gomc_run_steps,
+            proposal.reason,
+        )
+        self._segment_ledger.append(
+            cycle=proposal.cycle,
+            namd_run_steps=proposal.namd_run_steps,
+            gomc_run_steps=proposal.gomc_run_steps,
+            previous=(self.namd_steps, self.gomc_steps),
+            reason=proposal.reason,
+        )
+        self._set_segment_lengths(
+            proposal.namd_run_steps, proposal.gomc_run_steps
+        )
+
+    def _set_segment_lengths(self, namd_steps: int, gomc_steps: int) -> None:
+        self.cfg.set_run_steps(namd_steps, gomc_steps)
+        self.namd_steps = int(namd_steps)
+        self.gomc_steps = int(gomc_steps)
+        self.namd.steps_per_run = self.namd_steps
+        self.gomc.steps_per_run = self.gomc_steps
+
     def _join_otf_worker_for_teardown(
         self,
     ) -> None:
@@ -832,7 +1193,11 @@ class SimulationOrchestrator:
             self._fifo_step_id(gomc_run_no),
         )
 
-        if pair not in self._retained_cycle_pairs:
+        # Pairs arrive in run order, so a repeat can only be the newest one.
+        if (
+            not self._retained_cycle_pairs
+            or self._retained_cycle_pairs[-1] != pair
+        ):
             self._retained_cycle_pairs.append(pair)
 
     def _apply_retention_policy(self) -> None:
@@ -843,7 +1208,7 @@ class SimulationOrchestrator:
             (
                 namd_step_id,
                 gomc_step_id,
-            ) = self._retained_cycle_pairs.pop(0)
+            ) = self._retained_cycle_pairs.popleft()
 
             self.fifo_store.release_step(
                 "NAMD",
@@ -891,12 +1256,254 @@ class SimulationOrchestrator:
             engine, self._fifo_step_id(run_no)
         )
 
+    def _run_segment_with_retry(
+        self, engine, engine_name: str, *, run_no: int, fifo_resources
+    ):
+        """Run one segment; on failure retry it per `segment_retry`."""
+        with trace_tags(
+            cycle=run_no // 2, run_no=run_no, engine=engine_name
+        ), trace_span(f"{engine_name} segment", "orchestrator"):
+            return self._run_segment_attempts(
+                engine,
+                engine_name,
+                run_no=run_no,
+                fifo_resources=fifo_resources,
+            )
+
+    def _run_segment_attempts(
+        self, engine, engine_name: str, *, run_no: int, fifo_resources
+    ):
+        policy = self._retry_policy
+        if policy is None:
+            return self._call_run_segment(
+                engine, run_no=run_no, fifo_resources=fifo_resources
+            )
+
+        attempt = 0
+        while True:
+            saved_state = copy.deepcopy(self.state)
+            seed = policy.gomc_seed(run_no, attempt)
+            if engine_name == "GOMC" and hasattr(engine, "prng_seed"):
+                engine.prng_seed = seed
+            try:
+                with policy.core_overrides(self.cfg, attempt) as cores:
+                    if attempt and (cores or seed is not None):
+                        self.logger.info(
+                            "[Retry] %s run_no=%s attempt %d overrides: "
+                            "cores=%s seed=%s",
+                            engine_name,
+                            run_no,
+                            attempt + 1,
+                            cores or None,
+                            seed if engine_name == "GOMC" else None,
+                        )
+                    return self._call_run_segment(
+                        engine, run_no=run_no, fifo_resources=fifo_resources
+                    )
+            except Exception as exc:
+                logs = self._archive_failed_attempt(
+                    engine_name, run_no, attempt, fifo_resources, saved_state
+                )
+                self._segment_retries.append(
+                    {
+                        "engine": engine_name,
+                        "run_no": run_no,
+                        "attempt": attempt + 1,
+                        "error": f"{type(exc).__name__}: {exc}",
+                        "logs": str(logs),
+                    }
+                )
+                if attempt >= policy.max_retries:
+                    self.logger.error(
+                        "[Retry] %s run_no=%s failed after %d attempts; "
+                        "attempt logs in %s",
+                        engine_name,
+                        run_no,
+                        attempt + 1,
+                        logs.parent,
+                    )
+                    raise
+
+                attempt += 1
+                trace_instant(
+                    "segment retry", "orchestrator", attempt=attempt + 1
+                )
+                self.logger.warning(
+                    "[Retry] %s run_no=%s failed (%s); retry %d/%d from the "
+                    "last committed restart files",
+                    engine_name,
+                    run_no,
+                    exc,
+                    attempt,
+                    policy.max_retries,
+                )
+                self._restore_state(saved_state)
+                fifo_resources = self._reprepare_fifo_step(engine_name, run_no)
+                if policy.backoff_s > 0:
+                    time.sleep(policy.backoff_s)
+            finally:
+                if engine_name == "GOMC" and hasattr(engine, "prng_seed"):
+                    engine.prng_seed = None
+
+    def _publish_status(self, **changes) -> None:
+        """Update the live status with `changes` and the current gauges."""
+        if self._status is None:
+            return
+        managed_root = getattr(self.fifo_store, "managed_root", None)
+        self._status.update(
+            total_cycles=self.total_cycles,
+            start_cycle=self.start_cycle,
+            tmpfs_bytes=(
+                tree_bytes(managed_root) if managed_root is not None else None
+            ),
+            otf_queue_depth=int(self._bg_thread is not None),
+            energy_continuity_warnings=self._energy_warnings,
+            segment_retries=len(self._segment_retries),
+            **changes,
+        )
+
+    def _trace_cycle(
+        self,
+        cycle: int,
+        start_us: int | None,
+        *,
+        python_only_time_s: float,
+    ) -> None:
+        """Close the cycle span and flush the trace so far."""
+        writer = active_tracer()
+        if writer is None or start_us is None:
+            return
+        record_span(
+            "cycle",
+            "orchestrator",
+            start_us,
+            trace_clock_us(),
+            args={"cycle": cycle, "python_only_time_s": python_only_time_s},
+        )
+        writer.flush()
+
+    def _record_resource_profiles(
+        self, engine, engine_name: str, run_no: int
+    ) -> None:
+        """Log the /proc profiles of the segment that just finished."""
+        runner = getattr(engine, "runner", None)
+        pop_profiles = getattr(runner, "pop_profiles", None)
+        if self._resource_log is None or not callable(pop_profiles):
+            return
+
+        for profile in pop_profiles():
+            box = None
+            if engine_name == "NAMD":
+                box = 1 if Path(profile.cwd).name.endswith("_b") else 0
+            self._resource_log.append(
+                profile,
+                cycle=run_no // 2,
+                run_no=run_no,
+                engine=engine_name,
+                box=box,
+            )
+            self.logger.info(
+                "[Profile] %s%s run_no=%s: %.2f of %s cores busy, peak RSS "
+                "%.1f MiB, read %.1f MiB, written %.1f MiB, context "
+                "switches %d/%d (voluntary/involuntary)",
+                engine_name,
+                f" box {box}" if box is not None else "",
+                run_no,
+                profile.cpu_utilization,
+                profile.allocated_cores or "?",
+                profile.peak_rss_bytes / 2**20,
+                profile.read_bytes / 2**20,
+                profile.write_bytes / 2**20,
+                profile.voluntary_ctxt_switches,
+                profile.nonvoluntary_ctxt_switches,
+            )
+
+    def _archive_failed_attempt(
+        self,
+        engine_name: str,
+        run_no: int,
+        attempt: int,
+        fifo_resources,
+        saved_state: RunState,
+    ) -> Path:
+        dest = (
+            attempt_log_dir(
+                self.cfg.log_dir, engine_name, self._fifo_step_id(run_no)
+            )
+            / f"attempt_{attempt + 1}"
+        )
+        runtime_dir = getattr(fifo_resources, "runtime_dir", None)
+        if callable(runtime_dir):
+            sources = (
+                [runtime_dir(0), runtime_dir(1)]
+                if engine_name == "NAMD"
+                else [runtime_dir()]
+            )
+        else:
+            # unmanaged runs: the dirs the failed attempt switched to
+            sources = [
+                Path(getattr(self.state, name))
+                for name in ("namd_box0_dir", "namd_box1_dir", "gomc_dir")
+                if getattr(self.state, name) is not None
+                and getattr(self.state, name) != getattr(saved_state, name)
+            ]
+        try:
+            self._run_isolated(archive_attempt_logs, sources, dest)
+        except OSError as exc:
+            self.logger.warning(
+                "[Retry] Could not keep the logs of %s run_no=%s: %s",
+                engine_name,
+                run_no,
+                exc,
+            )
+        return dest
+
+    def _run_isolated(self, fn, *args):
+        """Run file work under the background isolation and wait for it."""
+        if self._background is None:
+            return fn(*args)
+
+        outcome: dict = {}
+
+        def _body() -> None:
+            try:
+                outcome["result"] = fn(*args)
+            except BaseException as exc:
+                outcome["error"] = exc
+
+        thread = threading.Thread(
+            target=self._background.wrap(_body), name="isolated_file_work"
+        )
+        thread.start()
+        thread.join()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def _restore_state(self, saved: RunState) -> None:
+        # keep the RunState object itself: engines and OTF hold references
+        for f in dataclasses.fields(saved):
+            setattr(self.state, f.name, getattr(saved, f.name))
+
+    def _reprepare_fifo_step(self, engine: str, run_no: int):
+        cleanup = getattr(self.fifo_store, "cleanup_step", None)
+        if callable(cleanup):
+            cleanup(engine, self._fifo_step_id(run_no))
+        return self._prepare_fifo_step(engine, run_no)
+
     def _call_run_segment(self, engine, *, run_no: int, fifo_resources):
-        sig = inspect.signature(engine.run_segment)
+        run_segment = engine.run_segment
+        func = getattr(run_segment, "__func__", run_segment)
+        accepts_fifo = self._accepts_fifo_resources.get(func)
+        if accepts_fifo is None:
+            sig = inspect.signature(run_segment)
+            accepts_fifo = "fifo_resources" in sig.parameters
+            self._accepts_fifo_resources[func] = accepts_fifo
+
         kwargs = {
             "run_no": run_no,
             "state": self.state,
         }
-        if "fifo_resources" in sig.parameters:
+        if accepts_fifo:
             kwargs["fifo_resources"] = fifo_resources
-        return engine.run_segment(**kwargs)
+        return run_segment(**kwargs)
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Optional
 
 from config.models import SimulationConfig
+from orchestrator.segment_tuner import SEGMENT_LEDGER_NAME, SegmentLedger
 from orchestrator.state import RunState
 from utils.run_dirs import gomc_run_dir, namd_run_dir
 
@@ -30,6 +31,7 @@ def compute_start_context(
           prev NAMD dirs from (starting_sims-2)
           prev GOMC dir  from (starting_sims-1)
           current_step = (namd_steps + gomc_steps)*start_cycle + namd_minimize_steps
+          (per cycle, from the segment ledger when the tuner changed lengths)
     """
     starting_sims = int(cfg.starting_sims_namd_gomc)
     start_cycle = int(cfg.starting_at_cycle_namd_gomc_sims)
@@ -60,9 +62,11 @@ def compute_start_context(
             cfg.path_namd_runs, prev_namd_run_no, 1, id_width=id_width
         )
 
-    current_step = (
-        int(cfg.namd_run_steps) + int(cfg.gomc_run_steps)
-    ) * start_cycle + int(cfg.namd_minimize_steps)
+    # segment lengths changed by the tuner are replayed from its ledger
+    ledger = SegmentLedger(Path(cfg.log_dir) / SEGMENT_LEDGER_NAME)
+    current_step = ledger.steps_before(
+        start_cycle, (int(cfg.namd_run_steps), int(cfg.gomc_run_steps))
+    ) + int(cfg.namd_minimize_steps)
 
     return StartContext(
         current_step=current_step,
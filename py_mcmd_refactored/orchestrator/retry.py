@@ -0,0 +1,108 @@
+"""Retry policy for failed NAMD/GOMC segments.
+
+A segment only reads the restart files of the last committed segments
+(referenced from `RunState`) and writes into its own managed step
+directory. A failed attempt can therefore be retried by restoring the
+state as it was before the attempt and re-preparing a fresh step
+directory; the orchestrator does both and consults `SegmentRetryPolicy`
+for whether to retry and with which overrides (fewer cores, a new GOMC
+random seed). The logs of every failed attempt are copied to
+``<log_dir>/segment_attempts/<ENGINE>/<step id>/attempt_<n>/`` first.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import shutil
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+ATTEMPTS_DIR_NAME = "segment_attempts"
+
+# small text outputs worth keeping from a failed attempt
+_LOG_SUFFIXES = {".dat", ".conf", ".log", ".json", ".txt", ".out", ".err"}
+
+
+@dataclass(frozen=True)
+class SegmentRetryPolicy:
+    max_retries: int = 2
+    core_fraction: Optional[float] = None  # per retry, cumulative
+    reseed_gomc: bool = True
+    backoff_s: float = 0.0
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["SegmentRetryPolicy"]:
+        spec = getattr(cfg, "segment_retry", None)
+        if spec is None:
+            return None
+
+        def _get(name, default=None):
+            if isinstance(spec, dict):
+                value = spec.get(name, default)
+            else:
+                value = getattr(spec, name, default)
+            return default if value is None else value
+
+        retries = int(_get("max_retries", 2))
+        if retries <= 0:
+            return None
+        fraction = _get("core_fraction_per_retry")
+        return cls(
+            max_retries=retries,
+            core_fraction=float(fraction) if fraction is not None else None,
+            reseed_gomc=bool(_get("reseed_gomc", True)),
+            backoff_s=float(_get("backoff_s", 0.0)),
+        )
+
+    def cores_for(self, cores: int, attempt: int) -> int:
+        """Core count of retry `attempt` (0 is the first, normal run)."""
+        if attempt <= 0 or self.core_fraction is None:
+            return int(cores)
+        return max(1, int(int(cores) * self.core_fraction**attempt))
+
+    def gomc_seed(self, run_no: int, attempt: int) -> Optional[int]:
+        """Deterministic PRNG seed of a GOMC retry (None: keep the conf)."""
+        if attempt <= 0 or not self.reseed_gomc:
+            return None
+        return zlib.crc32(f"{int(run_no)}:{int(attempt)}".encode()) % (2**31)
+
+    @contextlib.contextmanager
+    def core_overrides(self, cfg, attempt: int) -> Iterator[dict[str, int]]:
+        """Temporarily scale the configured core counts for one attempt."""
+        names = ("total_no_cores", "no_core_box_0", "no_core_box_1")
+        saved = {name: int(getattr(cfg, name)) for name in names}
+        changed = {
+            name: self.cores_for(value, attempt)
+            for name, value in saved.items()
+            if value > 0 and self.cores_for(value, attempt) != value
+        }
+        for name, value in changed.items():
+            object.__setattr__(cfg, name, value)
+        try:
+            yield changed
+        finally:
+            for name in changed:
+                object.__setattr__(cfg, name, saved[name])
+
+
+def attempt_log_dir(log_dir: str | Path, engine: str, step_id: str) -> Path:
+    return Path(log_dir) / ATTEMPTS_DIR_NAME / str(engine).upper() / step_id
+
+
+def archive_attempt_logs(sources: Iterable[Path], dest: Path) -> list[Path]:
+    """Copy the log-like files of `sources` (dirs) below `dest`."""
+    copied = []
+    for src in sources:
+        src = Path(src)
+        if not src.is_dir():
+            continue
+        for item in sorted(src.rglob("*")):
+            if not item.is_file() or item.suffix not in _LOG_SUFFIXES:
+                continue
+            target = dest / src.name / item.relative_to(src)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(item, target)
+            copied.append(target)
+    return copied
@@ -0,0 +1,383 @@
+"""Overhead-aware tuning of the NAMD/GOMC segment lengths.
+
+Each cycle costs roughly
+
+    T = (a_namd + b_namd * namd_steps) + (a_gomc + b_gomc * gomc_steps) + P
+
+where ``a_*`` is the fixed per-segment cost of an engine (process start,
+reading inputs, writing restarts), ``b_*`` its cost per step and ``P`` the
+orchestrator's own per-cycle time (the TIME_STATS python column). The
+tuner fits ``a`` and ``b`` per engine over a window of recent cycles and
+scales both segment lengths by the smallest factor that brings the
+non-simulation share ``(a_namd + a_gomc + P) / T`` under the target.
+Fitting needs cycles of different lengths; when all observed cycles are
+equally long, ``apply`` mode first runs one probe cycle at a scaled length
+and ``propose`` mode falls back to counting only ``P`` as overhead.
+
+Applied changes are appended to the segment ledger in the log dir, which a
+restart replays to recover the effective lengths and the global step.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_LEDGER_NAME = "segment_lengths_ledger.jsonl"
+
+# relative change below which a new proposal is not worth applying
+_MIN_RELATIVE_CHANGE = 0.1
+_UNBOUNDED = 2**62
+
+
+@dataclass(frozen=True)
+class SegmentObservation:
+    cycle: int
+    namd_steps: int
+    gomc_steps: int
+    namd_s: float
+    gomc_s: float
+    python_s: float
+
+
+@dataclass(frozen=True)
+class SegmentProposal:
+    cycle: int  # first cycle the lengths apply to
+    namd_run_steps: int
+    gomc_run_steps: int
+    overhead_fraction: Optional[float]  # estimated, at the current lengths
+    predicted_overhead_fraction: Optional[float]
+    reason: str
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def fit_linear(
+    xs: list[float], ys: list[float]
+) -> Optional[tuple[float, float]]:
+    """Least-squares ``y = a + b x``; None without spread in x or b <= 0."""
+    n = len(xs)
+    if n < 2:
+        return None
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx <= 0.0:
+        return None
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = sxy / sxx
+    if slope <= 0.0:
+        return None
+    return max(0.0, mean_y - slope * mean_x), slope
+
+
+def _round_steps(steps: float, multiple: int, lo: int, hi: int) -> int:
+    multiple = max(1, int(multiple))
+    rounded = int(math.ceil(steps / multiple)) * multiple
+    return max(int(lo), min(int(hi), rounded))
+
+
+class SegmentLedger:
+    """Append-only JSONL record of segment-length changes (by cycle)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def entries(self) -> list[dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        entries = []
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                logger.warning(
+                    "[Tuner] Ignoring unreadable ledger line in %s", self.path
+                )
+        return sorted(entries, key=lambda entry: int(entry["cycle"]))
+
+    def append(
+        self,
+        *,
+        cycle: int,
+        namd_run_steps: int,
+        gomc_run_steps: int,
+        previous: tuple[int, int],
+        reason: str,
+    ) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "cycle": int(cycle),
+            "namd_run_steps": int(namd_run_steps),
+            "gomc_run_steps": int(gomc_run_steps),
+            "previous_namd_run_steps": int(previous[0]),
+            "previous_gomc_run_steps": int(previous[1]),
+            "reason": reason,
+        }
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+    def discard_after(self, cycle: int) -> None:
+        """Drop changes that take effect after `cycle` (not yet run)."""
+        entries = self.entries()
+        kept = [e for e in entries if int(e["cycle"]) <= int(cycle)]
+        if len(kept) == len(entries):
+            return
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(
+            "".join(json.dumps(e) + "\n" for e in kept), encoding="utf-8"
+        )
+        tmp.replace(self.path)
+
+    def lengths_at(
+        self, cycle: int, default: tuple[int, int]
+    ) -> tuple[int, int]:
+        lengths = tuple(default)
+        for entry in self.entries():
+            if int(entry["cycle"]) > int(cycle):
+                break
+            lengths = (
+                int(entry["namd_run_steps"]),
+                int(entry["gomc_run_steps"]),
+            )
+        return lengths
+
+    def steps_before(self, cycle: int, default: tuple[int, int]) -> int:
+        """NAMD + GOMC steps run in cycles ``0 .. cycle - 1``.
+
+        Cycles before the first change ran at that entry's previous
+        lengths; `default` is only used without any entry.
+        """
+        entries = self.entries()
+        lengths = tuple(default)
+        if entries:
+            lengths = (
+                int(entries[0]["previous_namd_run_steps"]),
+                int(entries[0]["previous_gomc_run_steps"]),
+            )
+        total = 0
+        start = 0
+        for entry in entries:
+            change_at = min(int(entry["cycle"]), int(cycle))
+            total += (change_at - start) * sum(lengths)
+            start = change_at
+            lengths = (
+                int(entry["namd_run_steps"]),
+                int(entry["gomc_run_steps"]),
+            )
+        total += max(0, int(cycle) - start) * sum(lengths)
+        return total
+
+
+class SegmentTuner:
+    def __init__(
+        self,
+        *,
+        mode: str = "propose",
+        target_overhead_percent: float = 10.0,
+        namd_bounds: tuple[int, int],
+        gomc_bounds: tuple[int, int],
+        window: int = 8,
+        warmup_cycles: int = 2,
+        retune_every: int = 4,
+        probe_factor: float = 2.0,
+        step_multiple: int = 10,
+    ) -> None:
+        self.mode = mode
+        self.target = float(target_overhead_percent) / 100.0
+        self.namd_bounds = (int(namd_bounds[0]), int(namd_bounds[1]))
+        self.gomc_bounds = (int(gomc_bounds[0]), int(gomc_bounds[1]))
+        self.warmup_cycles = max(0, int(warmup_cycles))
+        self.retune_every = max(1, int(retune_every))
+        self.probe_factor = max(1.0, float(probe_factor))
+        self.step_multiple = max(1, int(step_multiple))
+
+        self.window: deque[SegmentObservation] = deque(maxlen=max(2, window))
+        self.seen = 0
+        self.since_change = 0
+        self.history: list[dict[str, Any]] = []
+        self._probe_pending: Optional[tuple[int, int]] = None
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["SegmentTuner"]:
+        spec = getattr(cfg, "segment_tuner", None)
+        if spec is None:
+            return None
+
+        def _get(name, default=None):
+            if isinstance(spec, dict):
+                value = spec.get(name, default)
+            else:
+                value = getattr(spec, name, default)
+            return default if value is None else value
+
+        # unset bounds leave proposals free; apply mode requires maxima
+        multiple = int(_get("step_multiple", 10))
+        return cls(
+            mode=str(_get("mode", "propose")),
+            target_overhead_percent=float(_get("target_overhead_percent", 10)),
+            namd_bounds=(
+                int(_get("min_namd_run_steps", multiple)),
+                int(_get("max_namd_run_steps", _UNBOUNDED)),
+            ),
+            gomc_bounds=(
+                int(_get("min_gomc_run_steps", multiple)),
+                int(_get("max_gomc_run_steps", _UNBOUNDED)),
+            ),
+            window=int(_get("window", 8)),
+            warmup_cycles=int(_get("warmup_cycles", 2)),
+            retune_every=int(_get("retune_every", 4)),
+            probe_factor=float(_get("probe_factor", 2.0)),
+            step_multiple=multiple,
+        )
+
+    # ------------------------------------------------------------------
+    def observe(
+        self, observation: SegmentObservation
+    ) -> Optional[SegmentProposal]:
+        """Record a finished cycle; returns a proposal when one is due."""
+        self.seen += 1
+        if self.seen <= self.warmup_cycles:
+            return None
+        self.window.append(observation)
+        self.since_change += 1
+
+        if self._probe_pending is not None:
+            # the probe ran: go back to the lengths it interrupted
+            namd, gomc = self._probe_pending
+            self._probe_pending = None
+            return self._proposal(
+                observation.cycle + 1,
+                namd,
+                gomc,
+                None,
+                None,
+                "probe finished; restoring the previous lengths",
+            )
+
+        if self.since_change < self.retune_every:
+            return None
+        self.since_change = 0
+        return self._propose(observation)
+
+    def _propose(
+        self, current: SegmentObservation
+    ) -> Optional[SegmentProposal]:
+        namd_fit = fit_linear(
+            [o.namd_steps for o in self.window],
+            [o.namd_s for o in self.window],
+        )
+        gomc_fit = fit_linear(
+            [o.gomc_steps for o in self.window],
+            [o.gomc_s for o in self.window],
+        )
+        python_s = sum(o.python_s for o in self.window) / len(self.window)
+
+        if namd_fit is None or gomc_fit is None:
+            if self.mode == "apply" and not any(
+                r["reason"].startswith("probe") for r in self.history
+            ):
+                return self._probe(current)
+            # engine start-up cost cannot be separated: count P only
+            namd_fit = namd_fit or (
+                0.0,
+                self._per_step(current.namd_s, current.namd_steps),
+            )
+            gomc_fit = gomc_fit or (
+                0.0,
+                self._per_step(current.gomc_s, current.gomc_steps),
+            )
+
+        overhead = namd_fit[0] + gomc_fit[0] + python_s
+        simulated = (
+            namd_fit[1] * current.namd_steps + gomc_fit[1] * current.gomc_steps
+        )
+        if simulated <= 0.0:
+            return None
+        fraction = overhead / (overhead + simulated)
+
+        scale = overhead * (1.0 - self.target) / (self.target * simulated)
+        namd = _round_steps(
+            current.namd_steps * scale, self.step_multiple, *self.namd_bounds
+        )
+        gomc = _round_steps(
+            current.gomc_steps * scale, self.step_multiple, *self.gomc_bounds
+        )
+        predicted_sim = namd_fit[1] * namd + gomc_fit[1] * gomc
+        predicted = overhead / (overhead + predicted_sim)
+
+        change = max(
+            abs(namd - current.namd_steps) / max(1, current.namd_steps),
+            abs(gomc - current.gomc_steps) / max(1, current.gomc_steps),
+        )
+        if change < _MIN_RELATIVE_CHANGE:
+            return None
+
+        reason = (
+            f"overhead {fraction:.1%} of the cycle (fixed "
+            f"{overhead:.3g} s vs {simulated:.3g} s simulating); "
+            f"target {self.target:.1%}"
+        )
+        if predicted > self.target + 1e-9:
+            reason += "; limited by the configured bounds"
+        return self._proposal(
+            current.cycle + 1, namd, gomc, fraction, predicted, reason
+        )
+
+    def _probe(self, current: SegmentObservation) -> Optional[SegmentProposal]:
+        def scaled(steps: int, bounds: tuple[int, int]) -> int:
+            up = _round_steps(
+                steps * self.probe_factor, self.step_multiple, *bounds
+            )
+            if up != steps:
+                return up
+            return _round_steps(
+                steps / self.probe_factor, self.step_multiple, *bounds
+            )
+
+        namd = scaled(current.namd_steps, self.namd_bounds)
+        gomc = scaled(current.gomc_steps, self.gomc_bounds)
+        if (namd, gomc) == (current.namd_steps, current.gomc_steps):
+            return None
+        self._probe_pending = (current.namd_steps, current.gomc_steps)
+        return self._proposal(
+            current.cycle + 1,
+            namd,
+            gomc,
+            None,
+            None,
+            "probe: one cycle at a different length to separate the "
+            "per-segment overhead from the per-step cost",
+        )
+
+    @staticmethod
+    def _per_step(seconds: float, steps: int) -> float:
+        return float(seconds) / steps if steps else 0.0
+
+    def _proposal(
+        self,
+        cycle: int,
+        namd: int,
+        gomc: int,
+        fraction: Optional[float],
+        predicted: Optional[float],
+        reason: str,
+    ) -> SegmentProposal:
+        proposal = SegmentProposal(
+            cycle=int(cycle),
+            namd_run_steps=int(namd),
+            gomc_run_steps=int(gomc),
+            overhead_fraction=fraction,
+            predicted_overhead_fraction=predicted,
+            reason=reason,
+        )
+        self.history.append(proposal.as_dict())
+        return proposal
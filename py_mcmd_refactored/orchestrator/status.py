@@ -0,0 +1,274 @@
+"""Live status of a running simulation for dashboards.
+
+With ``live_status`` set, the orchestrator keeps a `StatusPublisher` up to
+date (run state, current cycle, cycles/hour, last segment times, Python
+overhead, managed tmpfs usage, OTF queue depth, energy-continuity
+warnings) and publishes it
+
+* as ``status.json`` (in the log dir unless ``path`` is given), replaced
+  atomically on every update so a poller never reads a partial file, and
+* optionally in Prometheus text format on
+  ``http://<prometheus_host>:<prometheus_port>/metrics`` (localhost by
+  default), served from a daemon thread.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_FILE_NAME = "status.json"
+METRIC_PREFIX = "py_mcmd_"
+
+# status key -> (Prometheus metric, type, help)
+_METRICS = {
+    "current_cycle": ("current_cycle", "gauge", "Cycle currently running."),
+    "total_cycles": ("total_cycles", "gauge", "Cycles configured."),
+    "cycles_completed": (
+        "cycles_completed_total",
+        "counter",
+        "Cycles completed since the run (re)started.",
+    ),
+    "cycles_per_hour": (
+        "cycles_per_hour",
+        "gauge",
+        "Completed cycles per wall-clock hour since the run (re)started.",
+    ),
+    "last_namd_segment_s": (
+        "last_namd_segment_seconds",
+        "gauge",
+        "Wall time of the last NAMD segment (slowest box).",
+    ),
+    "last_gomc_segment_s": (
+        "last_gomc_segment_seconds",
+        "gauge",
+        "Wall time of the last GOMC segment.",
+    ),
+    "last_cycle_s": (
+        "last_cycle_seconds",
+        "gauge",
+        "Wall time of the last cycle.",
+    ),
+    "python_overhead_percent": (
+        "python_overhead_percent",
+        "gauge",
+        "Share of the last cycle spent outside the engines.",
+    ),
+    "tmpfs_bytes": (
+        "tmpfs_bytes",
+        "gauge",
+        "Bytes used below the managed runtime root.",
+    ),
+    "otf_queue_depth": (
+        "otf_queue_depth",
+        "gauge",
+        "Cycles handed to the OTF worker and not yet committed.",
+    ),
+    "energy_continuity_warnings": (
+        "energy_continuity_warnings_total",
+        "counter",
+        "FAILED NAMD/GOMC energy-continuity checks.",
+    ),
+    "segment_retries": (
+        "segment_retries_total",
+        "counter",
+        "Failed segment attempts that were retried or aborted the run.",
+    ),
+    "updated_at": (
+        "last_update_timestamp_seconds",
+        "gauge",
+        "Unix time of the last status update.",
+    ),
+}
+
+# run states exported as a one-hot state gauge
+RUN_STATES = ("starting", "running", "completed", "converged", "failed")
+
+
+def tree_bytes(root: str | Path) -> int:
+    """Total size of the regular files below `root` (0 if missing)."""
+    total = 0
+    todo = [str(root)]
+    while todo:
+        try:
+            entries = list(os.scandir(todo.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    todo.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _label_value(value: Any) -> str:
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+    )
+
+
+class StatusPublisher:
+    """Current status of one run; see the module docstring."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        run_label: str,
+        prometheus_port: Optional[int] = None,
+        prometheus_host: str = "127.0.0.1",
+    ) -> None:
+        self.path = Path(path)
+        self.run_label = str(run_label)
+        self._lock = threading.Lock()
+        self._status: dict[str, Any] = {"run": self.run_label}
+        self._started = time.monotonic()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        if prometheus_port is not None:
+            self._serve(prometheus_host, int(prometheus_port))
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["StatusPublisher"]:
+        spec = getattr(cfg, "live_status", None)
+        if spec is None:
+            return None
+
+        def _get(name, default=None):
+            if isinstance(spec, dict):
+                value = spec.get(name, default)
+            else:
+                value = getattr(spec, name, default)
+            return default if value is None else value
+
+        path = _get("path") or Path(cfg.log_dir) / STATUS_FILE_NAME
+        return cls(
+            path,
+            run_label=_get("run_label", Path.cwd().name),
+            prometheus_port=_get("prometheus_port"),
+            prometheus_host=str(_get("prometheus_host", "127.0.0.1")),
+        )
+
+    @property
+    def port(self) -> Optional[int]:
+        """Bound port of the metrics endpoint (None when not serving)."""
+        if self._server is None:
+            return None
+        return int(self._server.server_address[1])
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return dict(self._status)
+
+    def update(self, **changes: Any) -> dict[str, Any]:
+        """Merge `changes` into the status and rewrite the status file."""
+        with self._lock:
+            self._status.update(changes)
+            hours = (time.monotonic() - self._started) / 3600
+            if "cycles_completed" in changes and hours > 0:
+                self._status["cycles_per_hour"] = round(
+                    int(changes["cycles_completed"]) / hours, 3
+                )
+            self._status["updated_at"] = round(time.time(), 3)
+            status = dict(self._status)
+        try:
+            self._write(status)
+        except OSError as exc:
+            logger.warning("[Status] Could not write %s: %s", self.path, exc)
+        return status
+
+    def _write(self, status: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(status, indent=2, default=str) + "\n")
+        os.replace(tmp, self.path)
+
+    def prometheus_text(self) -> str:
+        status = self.snapshot()
+        run = f'run="{_label_value(self.run_label)}"'
+        lines = []
+        for key, (name, kind, text) in _METRICS.items():
+            value = status.get(key)
+            if value is None or isinstance(value, bool):
+                continue
+            lines += [
+                f"# HELP {METRIC_PREFIX}{name} {text}",
+                f"# TYPE {METRIC_PREFIX}{name} {kind}",
+                f"{METRIC_PREFIX}{name}{{{run}}} {float(value)!r}",
+            ]
+        state = status.get("state")
+        if state is not None:
+            lines += [
+                f"# HELP {METRIC_PREFIX}run_state Run state (1 = current).",
+                f"# TYPE {METRIC_PREFIX}run_state gauge",
+            ]
+            lines += [
+                f'{METRIC_PREFIX}run_state{{{run},state="{s}"}} '
+                f"{int(s == state)}"
+                for s in RUN_STATES
+            ]
+        return "\n".join(lines) + "\n"
+
+    def _serve(self, host: str, port: int) -> None:
+        publisher = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 (http.server API)
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = publisher.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:
+                logger.debug("[Status] %s", format % args)
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), _Handler)
+        except OSError as exc:
+            logger.warning(
+                "[Status] Metrics endpoint on %s:%s unavailable: %s",
+                host,
+                port,
+                exc,
+            )
+            return
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="status_metrics",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            "[Status] Serving Prometheus metrics on http://%s:%d/metrics",
+            host,
+            self.port,
+        )
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -4,8 +4,11 @@ import sys
 
 sys.path.insert(0, "/home/arsalan/wsu-gomc/py-MCMD-hm/py_mcmd_refactored")
 
+import json
 import logging
 import os
+import subprocess
+from pathlib import Path
 
 import pytest
 from cli.main import parse_args
@@ -13,8 +16,6 @@ from cli.main import parse_args
 
 def test_main_overrides_config_namd_simulation_order(tmp_path, monkeypatch):
     """Ensure cli.main.main() applies CLI override to SimulationConfig."""
-    import json
-
     import cli.main as cli_main
 
     # Valid config JSON WITHOUT namd_simulation_order (so default would be "series")
@@ -123,3 +124,92 @@ def test_parse_args_exit_on_missing_file(tmp_path):
     with pytest.raises(SystemExit) as exc_info:
         parse_args(["--file", str(nonexist)])
     assert exc_info.value.code == 1
+
+
+CLI_MAIN = Path(__file__).resolve().parents[2] / "cli" / "main.py"
+
+# Modules the CLI must not pull in before it knows it needs them
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "pydantic",
+    "orchestrator.manager",
+    "engines.namd_engine",
+    "engines.gomc_engine",
+)
+
+# Cumulative `python -X importtime` budget for `import cli.main` (µs)
+CLI_IMPORT_BUDGET_US = 250_000
+
+
+def _importtime(args, cwd):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=str(cwd),
+        capture_output=True,
+        text=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cum, name = line[len("import time:") :].split("|")
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    return proc, cumulative
+
+
+def test_cli_import_stays_within_budget():
+    proc, cumulative = _importtime(
+        ["-c", "import cli.main"], CLI_MAIN.parents[1]
+    )
+    assert proc.returncode == 0, proc.stderr
+
+    for heavy in HEAVY_MODULES:
+        assert heavy not in cumulative
+    assert cumulative["cli.main"] < CLI_IMPORT_BUDGET_US
+
+
+def test_validate_fast_path_skips_engine_stack(tmp_path):
+    cfg = {
+        "total_cycles_namd_gomc_sims": 1,
+        "starting_at_cycle_namd_gomc_sims": 0,
+        "gomc_use_CPU_or_GPU": "CPU",
+        "simulation_type": "NVT",
+        "only_use_box_0_for_namd_for_gemc": True,
+        "no_core_box_0": 1,
+        "no_core_box_1": 0,
+        "simulation_temp_k": 300.0,
+        "namd_minimize_mult_scalar": 1,
+        "namd_run_steps": 10,
+        "gomc_run_steps": 5,
+        "set_dims_box_0_list": [10.0, 10.0, 10.0],
+        "set_dims_box_1_list": [10.0, 10.0, 10.0],
+        "set_angle_box_0_list": [90, 90, 90],
+        "set_angle_box_1_list": [90, 90, 90],
+        "starting_ff_file_list_gomc": ["ff_gomc.inp"],
+        "starting_ff_file_list_namd": ["ff_namd.inp"],
+        "starting_pdb_box_0_file": "box0.pdb",
+        "starting_psf_box_0_file": "box0.psf",
+        "starting_pdb_box_1_file": None,
+        "starting_psf_box_1_file": None,
+        "namd2_bin_directory": "bin/namd",
+        "gomc_bin_directory": "bin/gomc",
+    }
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps(cfg))
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps({**cfg, "no_core_box_0": 0}))
+
+    proc, cumulative = _importtime(
+        [str(CLI_MAIN), "--validate", "-f", str(good)], tmp_path
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "config.models" in cumulative
+    assert "orchestrator.manager" not in cumulative
+    assert "engines.namd_engine" not in cumulative
+
+    proc, _ = _importtime(
+        [str(CLI_MAIN), "--validate", "-f", str(bad)], tmp_path
+    )
+    assert proc.returncode == 1
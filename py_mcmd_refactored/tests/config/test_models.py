@@ -222,6 +222,43 @@ def test_otf_keep_raw_cycles_must_be_at_least_one():
     assert "otf_keep_raw_cycles" in str(exc.value)
 
 
+def test_otf_dcd_selection_and_stride_are_validated():
+    data = minimal_config()
+    data["otf_namd_dcd_selection"] = {
+        "index_ranges": [[0, 99]],
+        "exclude_resnames": ["TIP3"],
+    }
+    data["otf_gomc_dcd_frame_stride"] = 5
+    cfg = SimulationConfig(**data)
+    assert cfg.otf_namd_dcd_selection.index_ranges == [(0, 99)]
+    assert cfg.otf_gomc_dcd_selection is None
+    assert cfg.otf_namd_dcd_frame_stride == 1
+
+    for field_name, value in (
+        ("otf_namd_dcd_selection", {"index_ranges": [[5, 2]]}),
+        ("otf_gomc_dcd_selection", {"resname": ["TIP3"]}),
+        ("otf_namd_dcd_frame_stride", 0),
+    ):
+        bad = minimal_config()
+        bad[field_name] = value
+        with pytest.raises(ValidationError) as exc:
+            SimulationConfig(**bad)
+        assert field_name in str(exc.value)
+
+
+def test_otf_trajectory_format_is_normalized_and_validated():
+    data = minimal_config()
+    data["otf_trajectory_format"] = " Compressed "
+    cfg = SimulationConfig(**data)
+    assert cfg.otf_trajectory_format == "compressed"
+    assert cfg.otf_trajectory_precision == 0.001
+
+    data["otf_trajectory_format"] = "xtc"
+    with pytest.raises(ValidationError) as exc:
+        SimulationConfig(**data)
+    assert "dcd, compressed, both" in str(exc.value)
+
+
 @pytest.mark.parametrize(
     "field_name",
     [
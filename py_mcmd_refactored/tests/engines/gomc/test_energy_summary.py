@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from py_mcmd_refactored.engines.gomc.energy_metrics import (
+    get_gomc_energy_data_kcal_per_mol,
+)
+from py_mcmd_refactored.engines.gomc.energy_parse import get_gomc_energy_data
+from py_mcmd_refactored.engines.gomc.energy_summary import (
+    summarize_gomc_energy,
+)
+
+LINES = [
+    "ETITLE: ETITLE: STEP TOTAL INTRA(B) INTRA(NB) INTER(LJ) LRC TOTAL_ELECT\n",
+    "ENER_0: ENER_0: 0 -100.0 1.0 -2.0 -30.0 -4.0 -50.0\n",
+    "ENER_1: ENER_1: 0 -10.0 0.1 -0.2 -3.0 -0.4 -5.0\n",
+    "ENER_0: ENER_0: 5 -110.0 1.5 -2.5 -31.0 -4.5 -52.0\n",
+    "ENER_0: ENER_0: 10 -120.0 2.0 -3.0 -32.0 -5.0 -54.0\n",
+    "ENER_1: ENER_1: 10 -11.0 0.2 -0.3 -3.1 -0.5 -5.2\n",
+]
+
+
+def _cfg(scale=0.5):
+    return SimpleNamespace(current_step=0, K_to_kcal_mol=scale)
+
+
+@pytest.mark.parametrize("box_number", [0, 1])
+def test_summary_matches_dataframe_path(box_number):
+    cfg = _cfg()
+    summary = summarize_gomc_energy(cfg, LINES, box_number)
+
+    (
+        _elect,
+        elect_first,
+        elect_last,
+        _total,
+        total_first,
+        total_last,
+        _lrc,
+        lrc_first,
+        lrc_last,
+        _vpe,
+        vpe_first,
+        vpe_last,
+    ) = get_gomc_energy_data_kcal_per_mol(
+        get_gomc_energy_data(cfg, LINES, box_number)
+    )
+
+    assert summary.total_first == total_first
+    assert summary.total_last == total_last
+    assert summary.elect_first == elect_first
+    assert summary.elect_last == elect_last
+    assert summary.lrc_first == lrc_first
+    assert summary.lrc_last == lrc_last
+    assert summary.vdw_plus_elec_first == vpe_first
+    assert summary.vdw_plus_elec_last == vpe_last
+
+
+def test_summary_counts_rows_and_uses_first_and_last():
+    summary = summarize_gomc_energy(_cfg(scale=1.0), LINES, 0)
+    assert summary.n_rows == 3
+    assert summary.total_first == -100.0
+    assert summary.total_last == -120.0
+
+
+def test_summary_errors():
+    with pytest.raises(ValueError):
+        summarize_gomc_energy(_cfg(), LINES[1:], 0)
+    with pytest.raises(ValueError):
+        summarize_gomc_energy(_cfg(), LINES[:1], 0)
+    with pytest.raises(ValueError):
+        summarize_gomc_energy(_cfg(), LINES, 2)
+    with pytest.raises(KeyError):
+        summarize_gomc_energy(
+            _cfg(), ["ETITLE: STEP TOTAL\n", "ENER_0: 0 1.0\n"], 0
+        )
+
+
+def test_engine_modules_do_not_import_pandas():
+    project_root = Path(__file__).resolve().parents[3]
+    code = (
+        "import sys\n"
+        "import engines.gomc_engine, engines.namd_engine\n"
+        "sys.exit(1 if 'pandas' in sys.modules else 0)\n"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(project_root), str(project_root.parent)]
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(project_root),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
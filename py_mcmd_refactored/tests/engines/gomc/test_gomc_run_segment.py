@@ -5,6 +5,7 @@ from types import SimpleNamespace
 
 import pytest
 from config.models import SimulationConfig
+from engines.gomc.energy_summary import GomcEnergySummary
 from engines.gomc_engine import GomcEngine
 from orchestrator.state import PmeDims, RunState
 
@@ -56,6 +57,20 @@ def _cfg(tmp_path: Path, **kw) -> SimulationConfig:
     return SimulationConfig(**base)
 
 
+def _summary(pot_i, pot_f, vpe_i, vpe_f) -> GomcEnergySummary:
+    return GomcEnergySummary(
+        total_first=pot_i,
+        total_last=pot_f,
+        vdw_plus_elec_first=vpe_i,
+        vdw_plus_elec_last=vpe_f,
+        lrc_first=0.0,
+        lrc_last=0.0,
+        elect_first=0.0,
+        elect_last=0.0,
+        n_rows=2,
+    )
+
+
 def _state(tmp_path: Path, *, two_box: bool = False) -> RunState:
     st = RunState(current_step=0)
     st.pme_box0 = PmeDims()
@@ -132,26 +147,8 @@ def test_gomc_run_segment_calls_compare_when_values_exist(
     # patch parse so GOMC initials exist
     monkeypatch.setattr(
         ge,
-        "get_gomc_energy_data",
-        lambda cfg, lines, box_number: object(),
-    )
-    monkeypatch.setattr(
-        ge,
-        "get_gomc_energy_data_kcal_per_mol",
-        lambda df: (
-            None,
-            None,
-            None,
-            None,
-            100.0,
-            101.0,
-            None,
-            None,
-            None,
-            None,
-            200.0,
-            201.0,
-        ),
+        "summarize_gomc_energy",
+        lambda cfg, lines, box_number: _summary(100.0, 101.0, 200.0, 201.0),
     )
 
     eng.run_segment(run_no=1, state=st)
@@ -169,45 +166,12 @@ def test_gomc_run_segment_two_box_gemc_parses_box1(
 
     import engines.gomc_engine as ge
 
-    # return "df" as the box number
-    monkeypatch.setattr(
-        ge,
-        "get_gomc_energy_data",
-        lambda cfg, lines, box_number: box_number,
-    )
+    def fake_summary(cfg, lines, box_number):
+        if box_number == 0:
+            return _summary(10.0, 11.0, 20.0, 21.0)
+        return _summary(30.0, 31.0, 40.0, 41.0)
 
-    def fake_metrics(df):
-        if df == 0:
-            return (
-                None,
-                None,
-                None,
-                None,
-                10.0,
-                11.0,
-                None,
-                None,
-                None,
-                None,
-                20.0,
-                21.0,
-            )
-        return (
-            None,
-            None,
-            None,
-            None,
-            30.0,
-            31.0,
-            None,
-            None,
-            None,
-            None,
-            40.0,
-            41.0,
-        )
-
-    monkeypatch.setattr(ge, "get_gomc_energy_data_kcal_per_mol", fake_metrics)
+    monkeypatch.setattr(ge, "summarize_gomc_energy", fake_summary)
 
     eng.run_segment(run_no=1, state=st)
 
@@ -242,12 +206,10 @@ def test_gomc_run_segment_calls_energy_parser_with_cfg(monkeypatch, tmp_path):
     def fake_parse(cfg, lines, box_number):
         called["cfg"] = cfg
         called["box_number"] = box_number
-        import pandas as pd
-
-        return pd.DataFrame(columns=["STEP", "TOTAL", "INTRA(B)"])
+        return _summary(0.0, 0.0, 0.0, 0.0)
 
     monkeypatch.setattr(
-        "py_mcmd_refactored.engines.gomc_engine.get_gomc_energy_data",
+        "py_mcmd_refactored.engines.gomc_engine.summarize_gomc_energy",
         fake_parse,
     )
 
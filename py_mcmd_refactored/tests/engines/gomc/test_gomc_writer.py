@@ -76,6 +76,7 @@ from py_mcmd_refactored.engines.gomc.gomc_writer import (
     GOMCIOPaths,
     GOMCSimParams,
     GOMCStartFiles,
+    set_prng_seed,
     write_gomc_conf_file,
 )
 
@@ -914,3 +915,32 @@ def test_subsequent_two_box_gemc_uses_previous_gomc_box1_pdb_psf(
     assert "inputs/b1.psf" not in conf
 
     assert "Restart true" in conf
+
+
+def test_set_prng_seed_switches_to_a_fixed_seed(tmp_path: Path):
+    conf = tmp_path / "in.conf"
+    conf.write_text("Restart true\nPRNG\t\tRANDOM\nRandom_Seed 7\nPressure 1\n")
+
+    set_prng_seed(conf, 12345)
+
+    lines = conf.read_text().splitlines()
+    assert lines == [
+        "Restart true",
+        "PRNG\t\tINTSEED",
+        "Random_Seed\t12345",
+        "Pressure 1",
+    ]
+
+
+def test_set_prng_seed_appends_when_conf_has_no_prng(tmp_path: Path):
+    conf = tmp_path / "in.conf"
+    conf.write_text("Restart true\nRandom_Seed 7\nPressure 1")
+
+    set_prng_seed(conf, 42)
+
+    assert conf.read_text().splitlines() == [
+        "Restart true",
+        "Pressure 1",
+        "PRNG\t\tINTSEED",
+        "Random_Seed\t42",
+    ]
@@ -156,3 +156,30 @@ def test_legacy_facade_propagates_errors():
         get_namd_energy_data(
             [et], ["TS", "BOND", "ANGLE", "DIHED", "VDW", "ELECT", "POTENTIAL"]
         )
+
+
+from engines.namd.energy import summarize_namd_energy_lines
+
+
+def test_summary_matches_full_parse():
+    lines = [ETITLE, E1, E2]
+    full = parse_namd_energy_lines(lines, DEFAULTS)
+    summary = summarize_namd_energy_lines(lines, DEFAULTS)
+
+    assert summary.n_rows == 2
+    assert summary.potential_first == full.potential_first
+    assert summary.potential_last == full.potential_last
+    assert summary.elect_first == full.elect_first
+    assert summary.elect_last == full.elect_last
+    assert summary.vdw_plus_elec_first == full.vdw_plus_elec_first
+    assert summary.vdw_plus_elec_last == full.vdw_plus_elec_last
+
+
+def test_summary_errors_match_full_parse():
+    et = "ETITLE: TS BOND ANGLE DIHED VDW ELECT POTENTIAL\n"
+    with pytest.raises(ValueError):
+        summarize_namd_energy_lines([et], DEFAULTS)
+    with pytest.raises(KeyError):
+        summarize_namd_energy_lines(
+            ["ETITLE: TS BOND VDW POTENTIAL\n", "ENERGY: 0 1 2 3\n"], DEFAULTS
+        )
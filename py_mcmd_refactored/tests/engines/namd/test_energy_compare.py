@@ -30,9 +30,10 @@ def test_potential_pass_fraction(caplog):
     caplog.set_level(logging.INFO)
     c = cfg(pfrac=0.05)
     # |(100 - 99)/100| = 0.01 <= 0.05  -> PASS
-    compare_namd_gomc_energies(
+    failed = compare_namd_gomc_energies(
         c, 100.0, 99.0, -10.0, -10.0, run_no=2, box_number=0
     )
+    assert failed == 0
     msgs = [rec.message for rec in caplog.records]
     assert any(
         "PASSED: Box 0: Potential energies error fraction" in m for m in msgs
@@ -46,9 +47,10 @@ def test_potential_fail_fraction(caplog):
     caplog.set_level(logging.INFO)
     c = cfg(pfrac=0.01)
     # |(100 - 90)/100| = 0.10 > 0.01 -> FAIL
-    compare_namd_gomc_energies(
+    failed = compare_namd_gomc_energies(
         c, 100.0, 90.0, -10.0, -10.0, run_no=2, box_number=1
     )
+    assert failed == 1
     msgs = [rec.message for rec in caplog.records]
     assert any(
         "FAILED: Box 1: Potential energies error fraction" in m for m in msgs
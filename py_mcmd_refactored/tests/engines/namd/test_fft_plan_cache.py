@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pytest
+from config.models import SimulationConfig
+from engines.namd.fft_cache import FftPlanCache, fft_plan_key
+from engines.namd_engine import NamdEngine
+
+
+def make_cfg(tmp: Path, **kw) -> SimulationConfig:
+    base = dict(
+        total_cycles_namd_gomc_sims=1,
+        starting_at_cycle_namd_gomc_sims=0,
+        simulation_type="NPT",
+        gomc_use_CPU_or_GPU="CPU",
+        only_use_box_0_for_namd_for_gemc=True,
+        no_core_box_0=1,
+        no_core_box_1=0,
+        simulation_temp_k=298.15,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=10,
+        set_dims_box_0_list=[25, 25, 25],
+        set_angle_box_0_list=[90, 90, 90],
+        set_dims_box_1_list=[25, 25, 25],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["a.inp"],
+        starting_ff_file_list_namd=["b.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp / "bin_namd"),
+        gomc_bin_directory=str(tmp / "bin_gomc"),
+        path_namd_runs=str(tmp / "NAMD"),
+        path_gomc_runs=str(tmp / "GOMC"),
+        log_dir=str(tmp / "logs"),
+        namd_fft_cache_dir=str(tmp / "fft_cache"),
+    )
+    base.update(kw)
+    return SimulationConfig(**base)
+
+
+def _plan(dir_: Path, name: str = "FFTW_NAMD_plan.txt", size: int = 10):
+    dir_.mkdir(parents=True, exist_ok=True)
+    path = dir_ / name
+    path.write_text("x" * size)
+    return path
+
+
+def test_fft_plan_key_requires_full_dims():
+    assert fft_plan_key((None, 2, 3), 4, "abc") is None
+    assert fft_plan_key((30, 30, 32), 4, "abc") == "pme30x30x32_p4_abc"
+
+
+def test_store_and_lookup_roundtrip(tmp_path: Path):
+    cache = FftPlanCache(tmp_path / "cache")
+    src = _plan(tmp_path / "run0")
+
+    stored = cache.store("k1", src, pme_dims=(30, 30, 32), cores=4)
+
+    assert stored is not None and stored.read_text() == src.read_text()
+    assert cache.lookup("k1") == stored
+    assert cache.lookup("missing") is None
+    assert cache.lookup(None) is None
+
+
+def test_store_rejects_non_fft_file(tmp_path: Path):
+    cache = FftPlanCache(tmp_path / "cache")
+    src = _plan(tmp_path / "run0", name="out.dat")
+    with pytest.raises(ValueError):
+        cache.store("k1", src)
+
+
+def test_eviction_keeps_cache_within_bound(tmp_path: Path):
+    cache = FftPlanCache(tmp_path / "cache", max_bytes=400)
+    for i in range(6):
+        src = _plan(tmp_path / f"run{i}", size=150)
+        cache.store(f"k{i}", src)
+
+    assert cache.size_bytes() <= 400
+    # the most recently stored entry always survives
+    assert cache.lookup("k5") is not None
+    assert cache.lookup("k0") is None
+
+
+def test_concurrent_store_same_key(tmp_path: Path):
+    cache = FftPlanCache(tmp_path / "cache")
+    src = _plan(tmp_path / "run0", size=4096)
+    errors = []
+
+    def _store():
+        try:
+            FftPlanCache(cache.root).store("shared", src)
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_store) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    hit = cache.lookup("shared")
+    assert hit is not None and hit.read_text() == src.read_text()
+    assert not list(hit.parent.glob(".*.tmp"))
+
+
+def test_system_record_roundtrip(tmp_path: Path):
+    cache = FftPlanCache(tmp_path / "cache")
+    assert cache.lookup_system("sys") == (None, None, None)
+    cache.record_system("sys", (None, 1, 2))
+    assert cache.lookup_system("sys") == (None, None, None)
+    cache.record_system("sys", (30, 30, 32))
+    assert cache.lookup_system("sys") == (30, 30, 32)
+
+
+def test_cache_disabled_without_config(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv("PY_MCMD_FFT_CACHE_DIR", raising=False)
+    eng = NamdEngine(make_cfg(tmp_path, namd_fft_cache_dir=None), dry_run=True)
+    assert eng.fft_plan_cache is None
+
+
+def test_engine_store_then_reuse_across_simulations(tmp_path: Path):
+    run_root = tmp_path / "NAMD"
+    src = _plan(run_root / "0000000000_a")
+    (run_root / "0000000000_a" / "out.dat").write_text(
+        "Info: PME GRID DIMENSIONS 30 30 32\n"
+    )
+
+    eng = NamdEngine(make_cfg(tmp_path), dry_run=True)
+    stored = eng.store_run0_fft_plan_in_cache(
+        0, pme_dims=(30, 30, 32), cores=1, run_root=run_root
+    )
+    assert stored is not None
+
+    # A new simulation on the same inputs: run-0 outputs are gone.
+    eng2 = NamdEngine(make_cfg(tmp_path), dry_run=True)
+    fresh_root = tmp_path / "NAMD_new"
+    nx, ny, nz, _ = eng2.get_run0_pme_dims(0, run_root=fresh_root)
+    assert (nx, ny, nz) == (30, 30, 32)
+
+    run0_dir = fresh_root / "0000000000_a"
+    seeded = eng2.seed_run0_fft_plan_from_cache(0, run0_dir, 1)
+    assert seeded is not None
+    assert not seeded.is_symlink()
+    assert seeded.read_text() == src.read_text()
+
+    # Later segments fall back to the persistent cache via a symlink.
+    dest_dir = fresh_root / "0000000002_a"
+    dest_dir.mkdir(parents=True)
+    eng2.link_run0_fft_file_into_dir(
+        0,
+        dest_dir,
+        run_root=tmp_path / "missing_runtime",
+        pme_dims=(30, 30, 32),
+        cores=1,
+    )
+    dst = dest_dir / src.name
+    assert dst.is_symlink()
+    assert dst.resolve() == stored.resolve()
+
+
+def test_engine_cache_miss_for_different_core_count(tmp_path: Path):
+    run_root = tmp_path / "NAMD"
+    _plan(run_root / "0000000000_a")
+
+    eng = NamdEngine(make_cfg(tmp_path), dry_run=True)
+    eng.store_run0_fft_plan_in_cache(
+        0, pme_dims=(30, 30, 32), cores=1, run_root=run_root
+    )
+
+    run0_dir = tmp_path / "NAMD_new" / "0000000000_a"
+    assert eng.seed_run0_fft_plan_from_cache(0, run0_dir, 8) is None
@@ -438,25 +438,24 @@ import pytest
 from engines.namd.namd_writer import write_namd_conf_file
 
 
-def test_write_namd_conf_file_fresh(tmp_path, monkeypatch):
-    # Globals expected by legacy code
-    from engines.namd import namd_writer as mod
+def test_write_namd_conf_file_fresh(tmp_path):
+    from engines.namd.namd_writer import NamdWriterContext
 
     # parameter files
     prm = tmp_path / "params" / "par.prm"
     prm.parent.mkdir()
     prm.write_text("* test prm")
-    monkeypatch.setattr(mod, "starting_ff_file_list_namd", [prm])
 
     # checker
     class Checker:
         def __call__(self, axis, run_no, read_dim, *, set_dim, only_on_run_no):
             return float(set_dim if set_dim is not None else read_dim)
 
-    monkeypatch.setattr(mod, "check_for_pdb_dims_and_override", Checker())
-
-    # sim type
-    monkeypatch.setattr(mod, "simulation_type", "NVT")
+    context = NamdWriterContext(
+        starting_ff_file_list_namd=(prm,),
+        simulation_type="NVT",
+        check_for_pdb_dims_and_override=Checker(),
+    )
 
     # template (include all placeholders we fill)
     tpl = tmp_path / "tpl.conf"
@@ -509,6 +508,7 @@ def test_write_namd_conf_file_fresh(tmp_path, monkeypatch):
         set_angle_beta=90,
         set_angle_gamma=90,
         fft_add_namd_ang_to_box_dim=2,
+        context=context,
     )
     out_path = Path(out_dir) / "in.conf"
     txt = out_path.read_text()
@@ -551,13 +551,8 @@ def test_write_namd_conf_file_fresh(tmp_path, monkeypatch):
 # def test_write_namd_conf_file_restart(tmp_path, monkeypatch):
 def test_write_namd_conf_file_restart_with_vel_uses_binary_restart(
     tmp_path,
-    monkeypatch,
 ):
-    from py_mcmd_refactored.engines.namd import namd_writer as mod
-
-    monkeypatch.setattr(mod, "starting_ff_file_list_namd", [])
-    monkeypatch.setattr(mod, "check_for_pdb_dims_and_override", None)
-    monkeypatch.setattr(mod, "simulation_type", "NPT")
+    from engines.namd.namd_writer import NamdWriterContext
 
     tpl = tmp_path / "tpl.conf"
     tpl.write_text("set r Bool_restart\nPMEGridSizeX X_PME_GRID_DIM\n")
@@ -605,9 +600,86 @@ def test_write_namd_conf_file_restart_with_vel_uses_binary_restart(
         set_angle_beta=90,
         set_angle_gamma=90,
         fft_add_namd_ang_to_box_dim=0,
+        context=NamdWriterContext(simulation_type="NPT"),
     )
     out_path = Path(out_dir) / "in.conf"
     txt = out_path.read_text()
     # restart: Bool_restart true and PME sizes match the given ones
     assert "set r true" in txt
     assert "PMEGridSizeX 40" in txt
+
+
+def test_write_namd_conf_file_contexts_render_concurrently(tmp_path):
+    import threading
+
+    from engines.namd.namd_writer import NamdWriterContext
+
+    tpl = tmp_path / "tpl.conf"
+    tpl.write_text(
+        "parameters all_parameter_files\n"
+        "structure psf_box_file\ncoordinates pdb_box_file\n"
+        "set coor coor_file\nset xsc xsc_file\nset vel vel_file\n"
+        "cell x_dim_box y_dim_box z_dim_box\n"
+        "origin x_origin_box y_origin_box z_origin_box\n"
+        "pme X_PME_GRID_DIM Y_PME_GRID_DIM Z_PME_GRID_DIM\n"
+        "set t System_temp_set\nset p System_press_set\n"
+        "DCDfreq NAMD_RST_DCD_XST_Steps\n"
+        "outputEnergies NAMD_console_BLKavg_E_and_P_Steps\n"
+        "minimize NAMD_Minimize\nrun NAMD_Run_Steps\nset r Bool_restart\n"
+        "cur current_step\n"
+    )
+    for box in (0, 1):
+        (tmp_path / f"box{box}.pdb").write_text(
+            "CRYST1   10.000   10.000   10.000   90.00   90.00   90.00\n"
+        )
+        (tmp_path / f"box{box}.psf").write_text("PSF\n")
+
+    # two simulations (NPT scales the PME grid by 1.3) x two boxes
+    jobs = []
+    for sim_type in ("NVT", "NPT"):
+        prm = tmp_path / f"{sim_type}.prm"
+        prm.write_text("* prm")
+        context = NamdWriterContext(
+            starting_ff_file_list_namd=(prm,), simulation_type=sim_type
+        )
+        for box in (0, 1):
+            jobs.append((sim_type, box, context))
+
+    barrier = threading.Barrier(len(jobs))
+    results = {}
+
+    def _render(sim_type, box, context):
+        barrier.wait()
+        results[(sim_type, box)] = write_namd_conf_file(
+            tmp_path,
+            tpl.name,
+            f"NAMD_{sim_type}",
+            tmp_path / "GOMC",
+            0,
+            box,
+            1000,
+            100,
+            50,
+            10,
+            300.0,
+            1.0,
+            f"box{box}.pdb",
+            f"box{box}.psf",
+            None,
+            None,
+            None,
+            context=context,
+        )
+
+    threads = [threading.Thread(target=_render, args=job) for job in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for (sim_type, box), out_dir in results.items():
+        txt = (Path(out_dir) / "in.conf").read_text()
+        grid = 14 if sim_type == "NPT" else 11
+        assert f"pme {grid} {grid} {grid}" in txt
+        assert f"{sim_type}.prm" in txt
+        assert Path(out_dir).name.endswith("ab"[box])
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+import struct
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from config.models import SimulationConfig
+from engines.namd.parser import extract_pme_grid_from_out
+from engines.namd.persistent import NamdPersistentSession, build_reinit_commands
+from engines.namd_engine import NamdEngine
+from utils.subprocess_runner import Command
+from utils.tracing import install_tracer, uninstall_tracer
+from utils.watchdog import SegmentHangError
+
+# Stand-in for `namd2 +pN in.conf +stdin`: prints a run-0 style header, then
+# executes the Tcl commands the session sends on stdin and logs them.
+FAKE_NAMD = textwrap.dedent(
+    """\
+    #!{python}
+    import os, sys, time
+
+    log = open("commands.log", "a")
+    log.write("launch pid=%d argv=%s\\n" % (os.getpid(), " ".join(sys.argv[1:])))
+    log.flush()
+    print("Info: PME GRID DIMENSIONS 30 30 32", flush=True)
+    print("ETITLE: TS BOND ANGLE DIHED IMPRP ELECT VDW TOTAL POTENTIAL", flush=True)
+    print("ENERGY: 0 0 0 0 0 -10.0 1.0 0 -9.0", flush=True)
+    print("ENERGY: 10 0 0 0 0 -10.0 1.0 0 -9.0", flush=True)
+    step = 10  # where the `run` of in.conf ended
+    for line in sys.stdin:
+        line = line.strip()
+        log.write(line + "\\n")
+        log.flush()
+        if line.startswith("puts "):
+            print(line[5:].strip('"'), flush=True)
+        elif line.startswith("firsttimestep "):
+            step = int(line.split()[1])
+        elif line.startswith("run "):
+            if os.path.exists("hang"):  # in the launch dir
+                time.sleep(60)
+            print("ENERGY: %d 0 0 0 0 -11.0 2.0 0 -9.0" % step, flush=True)
+            step += int(line.split()[1])
+            print("ENERGY: %d 0 0 0 0 -11.0 2.0 0 -9.0" % step, flush=True)
+        elif line == "exit":
+            break
+    """
+)
+
+
+def _write_fake_namd(bin_dir: Path) -> Path:
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    exe = bin_dir / "namd2"
+    exe.write_text(FAKE_NAMD.format(python=sys.executable))
+    exe.chmod(0o755)
+    return exe
+
+
+def _write_restart(gomc_dir: Path, box: int, natoms: int, *, vel=True):
+    gomc_dir.mkdir(parents=True, exist_ok=True)
+    base = gomc_dir / f"Output_data_BOX_{box}_restart"
+    header = struct.pack("<i", natoms)
+    Path(f"{base}.coor").write_bytes(header)
+    if vel:
+        Path(f"{base}.vel").write_bytes(header)
+    Path(f"{base}.xsc").write_text("0 25 0 0 0 25 0 0 0 25 0 0 0\n")
+    Path(f"{base}.psf").write_text(f"PSF\n\n{natoms} !NATOM\n")
+    return base
+
+
+def _cfg(tmp: Path, **kw) -> SimulationConfig:
+    base = dict(
+        total_cycles_namd_gomc_sims=2,
+        starting_at_cycle_namd_gomc_sims=0,
+        simulation_type="NPT",
+        gomc_use_CPU_or_GPU="CPU",
+        only_use_box_0_for_namd_for_gemc=True,
+        no_core_box_0=1,
+        no_core_box_1=0,
+        simulation_temp_k=298.15,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=10,
+        set_dims_box_0_list=[25, 25, 25],
+        set_angle_box_0_list=[90, 90, 90],
+        set_dims_box_1_list=[25, 25, 25],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["a.inp"],
+        starting_ff_file_list_namd=["b.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file=str(tmp / "box0.psf"),
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp / "bin_namd"),
+        gomc_bin_directory=str(tmp / "bin_gomc"),
+        path_namd_runs=str(tmp / "NAMD"),
+        path_gomc_runs=str(tmp / "GOMC"),
+        log_dir=str(tmp / "logs"),
+        namd_persistent_process=True,
+    )
+    base.update(kw)
+    return SimulationConfig(**base)
+
+
+def _cmd(exe: Path, run_dir: Path, cores: int = 1) -> Command:
+    return Command(
+        argv=[str(exe), f"+p{cores}", "in.conf"],
+        cwd=run_dir,
+        stdout_path=run_dir / "out.dat",
+        allocated_cores=cores,
+    )
+
+
+def test_session_routes_each_segment_to_its_own_out_dat(tmp_path: Path):
+    exe = _write_fake_namd(tmp_path / "bin")
+    run0 = tmp_path / "0000000000_a"
+    run2 = tmp_path / "0000000002_a"
+
+    session = NamdPersistentSession.launch(
+        [str(exe), "+p1", "in.conf"], run0, run0 / "out.dat", natoms=3
+    )
+    try:
+        assert session.wait_segment(timeout=30) == 0
+        assert extract_pme_grid_from_out(run0 / "out.dat") == (30, 30, 32)
+
+        session.begin_segment(run2 / "out.dat", ["firsttimestep 0", "run 10"])
+        assert session.wait_segment(timeout=30) == 0
+        assert session.alive
+    finally:
+        assert session.close() == 0
+
+    seg = (run2 / "out.dat").read_text().splitlines()
+    # the ETITLE header is carried over so the energy parser still works
+    assert seg[0].startswith("ETITLE:")
+    assert seg[1].startswith("ENERGY: 0 ")
+    assert seg[2].startswith("ENERGY: 10 ")
+    assert "Info: PME GRID" not in "\n".join(seg)
+    assert session.segments_run == 2
+
+
+def test_session_reports_process_exit_mid_segment(tmp_path: Path):
+    exe = _write_fake_namd(tmp_path / "bin")
+    run0 = tmp_path / "0000000000_a"
+
+    session = NamdPersistentSession.launch(
+        [str(exe), "+p1", "in.conf"], run0, run0 / "out.dat"
+    )
+    assert session.wait_segment(timeout=30) == 0
+
+    session.begin_segment(tmp_path / "next" / "out.dat", ["exit"])
+    assert session.wait_segment(timeout=30) != 0
+    assert not session.alive
+    session.close()
+
+
+def test_reinit_commands_require_matching_atom_count(tmp_path: Path):
+    base = _write_restart(tmp_path / "GOMC", 0, natoms=3, vel=False)
+
+    cmds = build_reinit_commands(
+        restart_base=base,
+        output_prefix=tmp_path / "run" / "namdOut",
+        run_steps=10,
+        natoms=3,
+        temperature_k=300.0,
+    )
+    assert cmds is not None
+    assert f"reinitatoms {base}" in cmds
+    assert "reinitvels 300.0" in cmds
+    assert cmds[-2:] == ["firsttimestep 0", "run 10"]
+
+    assert (
+        build_reinit_commands(
+            restart_base=base,
+            output_prefix=tmp_path / "run" / "namdOut",
+            run_steps=10,
+            natoms=4,
+            temperature_k=300.0,
+        )
+        is None
+    )
+
+
+def test_engine_reuses_process_and_relaunches_on_atom_count_change(
+    tmp_path: Path,
+):
+    exe = _write_fake_namd(tmp_path / "bin_namd")
+    (tmp_path / "box0.psf").write_text("PSF\n\n3 !NATOM\n")
+    eng = NamdEngine(_cfg(tmp_path), dry_run=False)
+    assert eng.persistent_process
+
+    namd = tmp_path / "NAMD"
+    try:
+        h0 = eng._start_persistent_segment(
+            0, _cmd(exe, namd / "0000000000_a"), run_no=0, gomc_dir=None
+        )
+        assert eng.runner.wait(h0) == 0
+        s0 = eng._namd_sessions[0]
+
+        gomc1 = tmp_path / "GOMC" / "0000000001"
+        _write_restart(gomc1, 0, natoms=3)
+        h2 = eng._start_persistent_segment(
+            0, _cmd(exe, namd / "0000000002_a"), run_no=2, gomc_dir=gomc1
+        )
+        assert eng._namd_sessions[0] is s0
+        assert h2.pid == h0.pid
+        assert eng.runner.wait(h2) == 0
+
+        gomc3 = tmp_path / "GOMC" / "0000000003"
+        _write_restart(gomc3, 0, natoms=6)
+        h4 = eng._start_persistent_segment(
+            0, _cmd(exe, namd / "0000000004_a"), run_no=4, gomc_dir=gomc3
+        )
+        s4 = eng._namd_sessions[0]
+        assert s4 is not s0
+        assert s4.natoms == 6
+        assert eng.runner.wait(h4) == 0
+        assert not s0.alive
+    finally:
+        eng.close()
+
+    log0 = (namd / "0000000000_a" / "commands.log").read_text()
+    assert log0.count("launch pid=") == 1
+    assert "+stdin" in log0
+    assert f"reinitatoms {gomc1 / 'Output_data_BOX_0_restart'}" in log0
+    assert f"outputName {(namd / '0000000002_a').resolve() / 'namdOut'}" in log0
+    # every reused segment starts at TS 0, the same as a relaunch
+    for run in ("0000000000_a", "0000000002_a", "0000000004_a"):
+        energies = [
+            line.split()[1]
+            for line in (namd / run / "out.dat").read_text().splitlines()
+            if line.startswith("ENERGY:")
+        ]
+        assert energies[0] == "0", run
+    assert (namd / "0000000002_a" / "out.dat").read_text().count("ENERGY:") == 2
+    assert (namd / "0000000004_a" / "commands.log").exists()
+
+
+def test_engine_persistent_mode_disabled_in_dry_run(tmp_path: Path):
+    eng = NamdEngine(_cfg(tmp_path), dry_run=True)
+    assert not eng.persistent_process
+
+
+def test_engine_relaunches_when_the_cores_change(tmp_path: Path):
+    exe = _write_fake_namd(tmp_path / "bin_namd")
+    (tmp_path / "box0.psf").write_text("PSF\n\n3 !NATOM\n")
+    eng = NamdEngine(_cfg(tmp_path), dry_run=False)
+    gomc1 = tmp_path / "GOMC" / "0000000001"
+    _write_restart(gomc1, 0, natoms=3)
+
+    namd = tmp_path / "NAMD"
+    try:
+        h0 = eng._start_persistent_segment(
+            0, _cmd(exe, namd / "0000000000_a"), run_no=0, gomc_dir=None
+        )
+        assert eng.runner.wait(h0) == 0
+        # a retry with fewer cores must not reuse the +p1 process
+        h2 = eng._start_persistent_segment(
+            0,
+            _cmd(exe, namd / "0000000002_a", cores=2),
+            run_no=2,
+            gomc_dir=gomc1,
+        )
+        assert h2.pid != h0.pid
+        assert eng.runner.wait(h2) == 0
+    finally:
+        eng.close()
+
+    log2 = (namd / "0000000002_a" / "commands.log").read_text()
+    assert "launch pid=" in log2 and "+p2 in.conf +stdin" in log2
+
+
+def test_segments_are_watched_profiled_and_traced(tmp_path: Path):
+    exe = _write_fake_namd(tmp_path / "bin_namd")
+    (tmp_path / "box0.psf").write_text("PSF\n\n3 !NATOM\n")
+    cfg = _cfg(
+        tmp_path,
+        engine_watchdog={
+            "mode": "kill",
+            "check_interval_s": 0.05,
+            "grace_s": 0,
+            "idle_timeout_s": 1.0,
+        },
+        engine_profile_interval_s=0.05,
+    )
+    eng = NamdEngine(cfg, dry_run=False)
+    gomc1 = tmp_path / "GOMC" / "0000000001"
+    _write_restart(gomc1, 0, natoms=3)
+    trace = tmp_path / "trace.json"
+    namd = tmp_path / "NAMD"
+
+    install_tracer(trace)
+    try:
+        h0 = eng._start_persistent_segment(
+            0, _cmd(exe, namd / "0000000000_a"), run_no=0, gomc_dir=None
+        )
+        assert eng.runner.wait(h0) == 0
+        h2 = eng._start_persistent_segment(
+            0, _cmd(exe, namd / "0000000002_a"), run_no=2, gomc_dir=gomc1
+        )
+        assert eng.runner.wait(h2) == 0
+        session = eng._namd_sessions[0]
+
+        # a segment that stops printing is killed like a launched one
+        (namd / "0000000000_a" / "hang").touch()
+        h4 = eng._start_persistent_segment(
+            0, _cmd(exe, namd / "0000000004_a"), run_no=4, gomc_dir=gomc1
+        )
+        assert h4.pid == session.pid
+        with pytest.raises(SegmentHangError):
+            eng.runner.wait(h4)
+        assert not session.alive
+    finally:
+        eng.close()
+        uninstall_tracer()
+
+    profiles = eng.runner.pop_profiles()
+    assert [p.pid for p in profiles] == [session.pid] * 3
+    assert all(p.allocated_cores == 1 and p.samples > 0 for p in profiles)
+
+    spans = [
+        e
+        for e in json.loads(trace.read_text())
+        if e["ph"] == "X" and e["cat"] == "subprocess"
+    ]
+    assert [s["pid"] for s in spans] == [session.pid] * 3
+    assert [Path(s["args"]["cwd"]).name for s in spans] == [
+        "0000000000_a",
+        "0000000002_a",
+        "0000000004_a",
+    ]
+    assert [s["args"]["hang"] is None for s in spans] == [True, True, False]
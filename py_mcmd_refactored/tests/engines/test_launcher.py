@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import pytest
+from config.models import LauncherConfig
+from engines.launcher import NODELIST_NAME, Launcher
+
+
+def _launcher(**spec):
+    class Cfg:
+        namd_launcher = LauncherConfig(**spec)
+
+    return Launcher.from_config(Cfg, "NAMD")
+
+
+def test_default_is_the_local_multicore_launch(tmp_path: Path):
+    class Cfg:
+        pass
+
+    launcher = Launcher.from_config(Cfg, "GOMC")
+    assert launcher.argv("GOMC_CPU_NPT", 6, cwd=tmp_path) == [
+        "GOMC_CPU_NPT",
+        "+p6",
+        "in.conf",
+    ]
+
+
+def test_mpirun_splits_hosts_between_parallel_boxes(tmp_path: Path):
+    launcher = _launcher(
+        kind="mpirun", hosts=["n1", "n2", "n3", "n4"], ranks_per_host=8
+    )
+    box1 = launcher.argv("namd2", 4, cwd=tmp_path, box=1, n_boxes=2)
+    assert box1 == [
+        "mpirun",
+        "-np",
+        "16",
+        "--host",
+        "n3:8,n4:8",
+        "namd2",
+        "in.conf",
+    ]
+
+    # series: each box in turn gets the whole pool
+    series = launcher.argv("namd2", 4, cwd=tmp_path, box=1, n_boxes=1)
+    assert series[:5] == [
+        "mpirun",
+        "-np",
+        "32",
+        "--host",
+        "n1:8,n2:8,n3:8,n4:8",
+    ]
+
+
+def test_box_hosts_and_srun_without_ranks_per_host(tmp_path: Path):
+    launcher = _launcher(
+        kind="srun",
+        box_hosts={"0": ["a1", "a2"], "1": ["b1"]},
+        extra_args=["--exclusive"],
+    )
+    assert launcher.argv("namd2", 12, cwd=tmp_path, box=0, n_boxes=2) == [
+        "srun",
+        "--ntasks=12",
+        "--nodes=2",
+        "--nodelist=a1,a2",
+        "--exclusive",
+        "namd2",
+        "in.conf",
+    ]
+
+
+def test_charmrun_writes_a_nodelist(tmp_path: Path):
+    launcher = _launcher(
+        kind="charmrun", executable="/opt/charm/charmrun", hosts=["n1", "n2"]
+    )
+    argv = launcher.argv("namd2", 16, cwd=tmp_path / "run")
+    nodelist = tmp_path / "run" / NODELIST_NAME
+    assert argv == [
+        "/opt/charm/charmrun",
+        "+p16",
+        "++nodelist",
+        str(nodelist),
+        "namd2",
+        "in.conf",
+    ]
+    assert nodelist.read_text() == "group main\n host n1\n host n2\n"
+
+    local = _launcher(kind="charmrun").argv("namd2", 4, cwd=tmp_path)
+    assert local == ["charmrun", "+p4", "++local", "namd2", "in.conf"]
+
+
+def test_keep_cores_flag_for_openmp_ranks(tmp_path: Path):
+    class Cfg:
+        gomc_launcher = {
+            "kind": "mpirun",
+            "hosts": ["g1"],
+            "ranks_per_host": 1,
+            "keep_cores_flag": True,
+        }
+
+    argv = Launcher.from_config(Cfg, "GOMC").argv("GOMC", 8, cwd=tmp_path)
+    assert argv == [
+        "mpirun",
+        "-np",
+        "1",
+        "--host",
+        "g1:1",
+        "GOMC",
+        "+p8",
+        "in.conf",
+    ]
+
+
+def test_allocated_cores_follow_the_launch(tmp_path: Path):
+    assert _launcher().allocated_cores(8) == 8
+    mpirun = _launcher(
+        kind="mpirun", hosts=["n1", "n2", "n3", "n4"], ranks_per_host=8
+    )
+    assert mpirun.allocated_cores(4, box=1, n_boxes=2) == 16
+    openmp = _launcher(
+        kind="mpirun", hosts=["g1"], ranks_per_host=1, keep_cores_flag=True
+    )
+    assert openmp.allocated_cores(8) == 8
+
+
+def test_box_hosts_must_name_namd_boxes():
+    with pytest.raises(ValueError):
+        LauncherConfig(kind="srun", box_hosts={"2": ["n1"]})
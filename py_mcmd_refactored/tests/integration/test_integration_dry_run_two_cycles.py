@@ -7,6 +7,34 @@ from pathlib import Path
 import orchestrator.manager as mgr
 import pytest
 from config.models import SimulationConfig
+from engines.gomc.energy_summary import GomcEnergySummary
+from engines.namd.energy import NamdEnergySummary
+
+
+def _namd_summary() -> NamdEnergySummary:
+    return NamdEnergySummary(
+        potential_first=10.0,
+        potential_last=11.0,
+        vdw_plus_elec_first=20.0,
+        vdw_plus_elec_last=21.0,
+        elect_first=0.0,
+        elect_last=0.0,
+        n_rows=2,
+    )
+
+
+def _gomc_summary() -> GomcEnergySummary:
+    return GomcEnergySummary(
+        total_first=100.0,
+        total_last=101.0,
+        vdw_plus_elec_first=200.0,
+        vdw_plus_elec_last=201.0,
+        lrc_first=0.0,
+        lrc_last=0.0,
+        elect_first=0.0,
+        elect_last=0.0,
+        n_rows=2,
+    )
 
 
 def _cfg(tmp_path: Path, **overrides) -> SimulationConfig:
@@ -126,37 +154,15 @@ def test_integration_dry_run_two_cycles(tmp_path: Path, monkeypatch):
     # - NAMD: set initial/final potential and vdw+elec
     # - GOMC: set initial/final potential and vdw+elec
     # ---------------------------
-    def fake_get_namd_energy_data(lines, titles):
-        # returns tuple expected by NamdEngine.run_segment parsing:
-        # (elect_series, elect_init, elect_final,
-        #  pot_series, pot_init, pot_final,
-        #  vpe_series, vpe_init, vpe_final)
-        return (None, None, None, None, 10.0, 11.0, None, 20.0, 21.0)
-
-    monkeypatch.setattr(ne, "get_namd_energy_data", fake_get_namd_energy_data)
-
     monkeypatch.setattr(
-        ge,
-        "get_gomc_energy_data",
-        lambda cfg, lines, box_number: object(),
+        ne,
+        "summarize_namd_energy_lines",
+        lambda lines, titles: _namd_summary(),
     )
     monkeypatch.setattr(
         ge,
-        "get_gomc_energy_data_kcal_per_mol",
-        lambda df: (
-            None,
-            None,
-            None,
-            None,
-            100.0,
-            101.0,
-            None,
-            None,
-            None,
-            None,
-            200.0,
-            201.0,
-        ),
+        "summarize_gomc_energy",
+        lambda cfg, lines, box_number: _gomc_summary(),
     )
 
     # ---------------------------
@@ -293,39 +299,13 @@ def _patch_managed_store_dry_run_dependencies(tmp_path: Path, monkeypatch):
 
     monkeypatch.setattr(
         ne,
-        "get_namd_energy_data",
-        lambda lines, titles: (
-            None,
-            None,
-            None,
-            None,
-            10.0,
-            11.0,
-            None,
-            20.0,
-            21.0,
-        ),
-    )
-    monkeypatch.setattr(
-        ge, "get_gomc_energy_data", lambda cfg, lines, box_number: object()
+        "summarize_namd_energy_lines",
+        lambda lines, titles: _namd_summary(),
     )
     monkeypatch.setattr(
         ge,
-        "get_gomc_energy_data_kcal_per_mol",
-        lambda df: (
-            None,
-            None,
-            None,
-            None,
-            100.0,
-            101.0,
-            None,
-            None,
-            None,
-            None,
-            200.0,
-            201.0,
-        ),
+        "summarize_gomc_energy",
+        lambda cfg, lines, box_number: _gomc_summary(),
     )
 
     monkeypatch.setattr(
@@ -0,0 +1,110 @@
+"""Two-box GEMC NAMD launched across "nodes" through a stand-in mpirun.
+
+The stand-in records its command line and execs the engine found in it, so
+the real SubprocessRunner path (Popen, stdout capture, wait) is exercised
+without an MPI installation.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+from config.models import SimulationConfig
+from engines.namd_engine import NamdEngine
+from utils.subprocess_runner import SubprocessRunner
+
+STANDIN_LAUNCHER = """\
+#!{python}
+import json, os, sys
+args = sys.argv[1:]
+with open("launch.json", "w") as fh:
+    json.dump(args, fh)
+# the engine is the first executable file on the command line
+i = next(
+    i for i, a in enumerate(args) if os.path.isfile(a) and os.access(a, os.X_OK)
+)
+os.execv(args[i], args[i:])
+"""
+
+FAKE_NAMD = """\
+#!{python}
+import os, sys
+print("namd ran in", os.path.basename(os.getcwd()), "with", *sys.argv[1:])
+"""
+
+
+def _script(path: Path, body: str) -> Path:
+    path.write_text(body.format(python=sys.executable))
+    path.chmod(0o755)
+    return path
+
+
+def _cfg(tmp_path: Path, **overrides) -> SimulationConfig:
+    base = dict(
+        total_cycles_namd_gomc_sims=1,
+        starting_at_cycle_namd_gomc_sims=0,
+        simulation_type="GEMC",
+        gomc_use_CPU_or_GPU="CPU",
+        only_use_box_0_for_namd_for_gemc=False,
+        no_core_box_0=2,
+        no_core_box_1=3,
+        simulation_temp_k=298.15,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=10,
+        set_dims_box_0_list=[25, 25, 25],
+        set_angle_box_0_list=[90, 90, 90],
+        set_dims_box_1_list=[25, 25, 25],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["a.inp"],
+        starting_ff_file_list_namd=["b.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp_path / "bin_namd"),
+        gomc_bin_directory=str(tmp_path / "bin_gomc"),
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        log_dir=str(tmp_path / "logs"),
+        namd_simulation_order="parallel",
+    )
+    base.update(overrides)
+    return SimulationConfig(**base)
+
+
+def test_parallel_boxes_run_on_their_own_hosts(tmp_path: Path):
+    launcher = _script(tmp_path / "mpirun_standin", STANDIN_LAUNCHER)
+    namd = _script(tmp_path / "namd2", FAKE_NAMD)
+    cfg = _cfg(
+        tmp_path,
+        namd_launcher={
+            "kind": "mpirun",
+            "executable": str(launcher),
+            "hosts": ["node1", "node2", "node3", "node4"],
+            "ranks_per_host": 4,
+        },
+    )
+    eng = NamdEngine(cfg, dry_run=True)
+    eng.exec_path = str(namd)
+    eng.runner = SubprocessRunner()
+
+    box_dirs = [tmp_path / "NAMD" / f"0000000000_{s}" for s in "ab"]
+    for d in box_dirs:
+        d.mkdir(parents=True)
+    plan = eng.build_execution_plan(box0_dir=box_dirs[0], box1_dir=box_dirs[1])
+
+    assert eng.execute_plan(plan) == {
+        "rc_box0": 0,
+        "rc_box1": 0,
+        "mode": "parallel",
+    }
+    for box_dir, hosts in zip(box_dirs, ("node1:4,node2:4", "node3:4,node4:4")):
+        launched = json.loads((box_dir / "launch.json").read_text())
+        assert launched == ["-np", "8", "--host", hosts, str(namd), "in.conf"]
+        assert (box_dir / "out.dat").read_text() == (
+            f"namd ran in {box_dir.name} with in.conf\n"
+        )
@@ -424,7 +424,7 @@ def test_minimal_mode_releases_old_pairs_and_preserves_recent_window(
         "0000000005",
     ) not in orch.fifo_store.calls
 
-    assert orch._retained_cycle_pairs == [
+    assert list(orch._retained_cycle_pairs) == [
         (
             "0000000002",
             "0000000003",
@@ -481,7 +481,7 @@ def test_off_mode_preserves_all_successful_runtime_steps(
 
     assert ("cleanup_all",) not in orch.fifo_store.calls
 
-    assert orch._retained_cycle_pairs == [
+    assert list(orch._retained_cycle_pairs) == [
         (
             "0000000000",
             "0000000001",
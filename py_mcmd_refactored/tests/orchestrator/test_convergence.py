@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import orchestrator.manager as mgr
+import pytest
+from config.models import SimulationConfig
+from orchestrator.convergence import ConvergenceCriterion, ConvergenceMonitor
+from pydantic import ValidationError
+from utils.online_stats import OnlineStatsBook
+
+
+def _cfg(tmp_path: Path, **overrides) -> SimulationConfig:
+    base = dict(
+        total_cycles_namd_gomc_sims=40,
+        starting_at_cycle_namd_gomc_sims=0,
+        gomc_use_CPU_or_GPU="CPU",
+        simulation_type="GEMC",
+        only_use_box_0_for_namd_for_gemc=True,
+        no_core_box_0=1,
+        no_core_box_1=0,
+        simulation_temp_k=250,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=5,
+        set_dims_box_0_list=[25.0, 25.0, 25.0],
+        set_dims_box_1_list=[25.0, 25.0, 25.0],
+        set_angle_box_0_list=[90, 90, 90],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["ff_gomc.inp"],
+        starting_ff_file_list_namd=["ff_namd.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp_path / "bin_namd"),
+        gomc_bin_directory=str(tmp_path / "bin_gomc"),
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        log_dir=str(tmp_path / "logs"),
+        process_on_the_fly=True,
+        combined_data_dir=str(tmp_path / "combined_data"),
+    )
+    base.update(overrides)
+    return SimulationConfig(**base)
+
+
+def _density_rows(rng, n: int) -> list[list[str]]:
+    return [["0", str(1000.0 + rng.normal())] for _ in range(n)]
+
+
+def test_monitor_fires_after_consecutive_passing_checks():
+    stats = OnlineStatsBook()
+    monitor = ConvergenceMonitor(
+        criteria=[
+            ConvergenceCriterion("GOMC", 1, "TOT_DENSITY", tolerance=0.5)
+        ],
+        consecutive_checks=2,
+        min_cycles=1,
+    )
+    rng = np.random.default_rng(0)
+
+    # no data yet: the criterion cannot pass
+    assert monitor.observe(stats, 0) is None
+    assert monitor.observe(stats, 1) is None
+    assert monitor.last_results[0]["met"] is False
+
+    titles = ["#STEP", "TOT_DENSITY"]
+    stats.update("GOMC", 1, titles, _density_rows(rng, 64), skip=("STEP",))
+    assert monitor.observe(stats, 2) is None
+    assert monitor.streak == 1
+
+    stats.update("GOMC", 1, titles, _density_rows(rng, 64), skip=("STEP",))
+    decision = monitor.observe(stats, 3)
+    assert decision is not None
+    assert decision.cycle == 3
+    assert "GOMC box 1 TOT_DENSITY" in decision.reason
+    assert decision.as_dict()["criteria"][0]["sem"] < 0.5
+
+
+def test_relative_criterion_uses_sem_over_mean():
+    stats = OnlineStatsBook()
+    rows = _density_rows(np.random.default_rng(1), 128)
+    stats.update("GOMC", 0, ["#STEP", "TOT_DENSITY"], rows, skip=("STEP",))
+
+    strict = ConvergenceCriterion(
+        "GOMC", 0, "TOT_DENSITY", tolerance=1e-6, relative=True
+    )
+    loose = ConvergenceCriterion(
+        "GOMC", 0, "TOT_DENSITY", tolerance=1e-3, relative=True
+    )
+    assert strict.evaluate(stats)["met"] is False
+    assert loose.evaluate(stats)["met"] is True
+
+
+def test_convergence_stop_requires_online_stats(tmp_path: Path):
+    rule = {"criteria": [{"column": "TOT_DENSITY", "tolerance": 0.1}]}
+    with pytest.raises(ValidationError) as exc:
+        _cfg(tmp_path, process_on_the_fly=False, convergence_stop=rule)
+    assert "convergence_stop" in str(exc.value)
+
+    with pytest.raises(ValidationError):
+        _cfg(tmp_path, convergence_stop={"criteria": []})
+
+
+def test_online_stats_default_follows_convergence_stop(tmp_path: Path):
+    assert _cfg(tmp_path).otf_online_stats is False
+    rule = {"criteria": [{"column": "TOT_DENSITY", "tolerance": 0.1}]}
+    assert _cfg(tmp_path, convergence_stop=rule).otf_online_stats is True
+    with pytest.raises(ValidationError):
+        _cfg(tmp_path, convergence_stop=rule, otf_online_stats=False)
+
+
+def test_run_stops_after_the_current_cycle_once_converged(
+    tmp_path: Path, monkeypatch
+):
+    class DummyEngine:
+        def __init__(self, cfg, engine_type="NAMD", dry_run=False):
+            self.cfg = cfg
+            self.exec_path = engine_type.lower()
+
+        def run_segment(self, *, run_no: int, state):
+            return {"run_no": run_no}
+
+    processors = []
+
+    class StatsProcessor:
+        def __init__(self, cfg, combined_data_dir, *, managed_root=None):
+            self.stats = OnlineStatsBook()
+            self.processed = []
+            self.closed = False
+            self._rng = np.random.default_rng(2)
+            processors.append(self)
+
+        def set_current_step(self, current_step):
+            pass
+
+        def process_cycle(self, namd_run_no, gomc_run_no):
+            self.processed.append((namd_run_no, gomc_run_no))
+            self.stats.update(
+                "GOMC",
+                0,
+                ["#STEP", "TOT_DENSITY"],
+                _density_rows(self._rng, 16),
+                skip=("STEP",),
+            )
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(mgr, "NamdEngine", DummyEngine)
+    monkeypatch.setattr(mgr, "GomcEngine", DummyEngine)
+    monkeypatch.setattr(mgr, "OnTheFlyProcessor", StatsProcessor)
+
+    cfg = _cfg(
+        tmp_path,
+        convergence_stop={
+            "criteria": [{"column": "TOT_DENSITY", "tolerance": 0.2}],
+            "consecutive_checks": 3,
+        },
+    )
+    summary = mgr.SimulationOrchestrator(cfg, dry_run=True).run()
+
+    processor = processors[0]
+    assert summary["stopped_early"] is True
+    fired_at = summary["convergence"]["cycle"]
+    # the decision for cycle N is taken while cycle N + 1 runs, which is
+    # then finished, processed and committed before the run returns
+    assert summary["cycles_completed"] == fired_at + 2 < 40
+    assert processor.processed[-1] == (2 * fired_at + 2, 2 * fired_at + 3)
+    assert processor.closed
+    assert "TOT_DENSITY" in summary["stop_reason"]
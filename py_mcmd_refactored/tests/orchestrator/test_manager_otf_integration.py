@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import threading
 from pathlib import Path
 from types import SimpleNamespace
@@ -356,6 +357,101 @@ def test_otf_processor_processes_each_cycle_pair_and_closes(
     assert processor.managed_root == orch.fifo_store.managed_root
 
 
+def test_background_isolation_moves_otf_into_a_worker_process(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        mgr,
+        "FifoStore",
+        FakeFifoStore,
+    )
+
+    created = []
+
+    class RecordingWorker:
+        def __init__(
+            self,
+            cfg,
+            combined_data_dir,
+            *,
+            managed_root=None,
+            isolation=None,
+            factory=None,
+        ):
+            self.isolation = isolation
+            self.factory = factory
+            self.processed = []
+            self.closed = False
+
+            created.append(self)
+
+        def process_cycle(
+            self,
+            namd_run_no,
+            gomc_run_no,
+        ):
+            self.processed.append(
+                (
+                    namd_run_no,
+                    gomc_run_no,
+                )
+            )
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(
+        mgr,
+        "OtfWorkerProcess",
+        RecordingWorker,
+    )
+
+    cfg = _cfg(
+        tmp_path,
+        process_on_the_fly=True,
+        disk_cleanup_mode="off",
+        background={"nice": 5, "io_class": "none"},
+    )
+
+    orch = mgr.SimulationOrchestrator(
+        cfg,
+        dry_run=True,
+    )
+
+    _patch_successful_engines(
+        orch,
+        monkeypatch,
+    )
+
+    orch.run()
+
+    (worker,) = created
+
+    assert worker.factory is mgr.OnTheFlyProcessor
+
+    assert worker.isolation.describe() == "nice=+5"
+
+    assert worker.processed == [
+        (
+            0,
+            1,
+        ),
+        (
+            2,
+            3,
+        ),
+    ]
+
+    assert worker.closed is True
+
+    # retry-log archival and developer-mode mirroring get the isolation too
+    def _nice():
+        return os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+
+    assert orch._run_isolated(_nice) == min(19, _nice() + 5)
+
+
 def test_otf_worker_overlaps_next_cycle_and_release_waits_for_consumption(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import orchestrator.manager as mgr
+from config.models import SimulationConfig
+
+# The full 10^6-cycle run is opt-in (PY_MCMD_SCALING_CYCLES=1000000, about
+# a minute); the default suite runs a short one for the memory/state bounds.
+SCALING_CYCLES = int(os.environ.get("PY_MCMD_SCALING_CYCLES", 10_000))
+# The per-cycle cost ratio is wall-clock based and only checked when the
+# long run is requested explicitly (it flakes on a loaded machine).
+CHECK_CYCLE_COST = "PY_MCMD_SCALING_CYCLES" in os.environ
+# Allowed growth in live interpreter memory blocks between checkpoints,
+# independent of the cycle count.
+MEMORY_GROWTH_BUDGET_BLOCKS = 5_000
+
+
+def _cfg(tmp_path: Path, cycles: int) -> SimulationConfig:
+    return SimulationConfig(
+        total_cycles_namd_gomc_sims=cycles,
+        starting_at_cycle_namd_gomc_sims=0,
+        gomc_use_CPU_or_GPU="CPU",
+        simulation_type="NPT",
+        only_use_box_0_for_namd_for_gemc=True,
+        no_core_box_0=1,
+        no_core_box_1=0,
+        simulation_temp_k=250,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=5,
+        set_dims_box_0_list=[25.0, 25.0, 25.0],
+        set_dims_box_1_list=[25.0, 25.0, 25.0],
+        set_angle_box_0_list=[90, 90, 90],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["ff_gomc.inp"],
+        starting_ff_file_list_namd=["ff_namd.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp_path / "bin_namd"),
+        gomc_bin_directory=str(tmp_path / "bin_gomc"),
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        log_dir=str(tmp_path / "logs"),
+        disk_cleanup_mode="compact",
+        otf_keep_raw_cycles=2,
+    )
+
+
+class BoundedFakeStore:
+    """In-memory step store that forgets released steps."""
+
+    def __init__(self, *args, **kwargs):
+        self.live = {}
+        self.managed_root = Path("/nonexistent")
+
+    def prepare_step(self, engine, step_id):
+        res = SimpleNamespace(engine=engine, step_id=step_id, endpoints={})
+        self.live[(engine, step_id)] = res
+        return res
+
+    def finalize_step_success(self, engine, step_id):
+        pass
+
+    def finalize_step_failure(self, engine, step_id):
+        pass
+
+    def release_step(self, engine, step_id):
+        self.live.pop((engine, step_id), None)
+
+    def cleanup_all(self):
+        self.live.clear()
+
+
+class DummyNamd:
+    def __init__(self, cfg, engine_type="NAMD", dry_run=False):
+        self.exec_path = "namd2"
+
+    def run_segment(self, *, run_no: int, state, fifo_resources=None):
+        state.timings.max_namd_cycle_time_s = 0.0
+
+
+def _dummy_gomc(checkpoints: dict):
+    class DummyGomc:
+        def __init__(self, cfg, engine_type="GOMC", dry_run=False):
+            self.exec_path = "gomc"
+
+        def run_segment(self, *, run_no: int, state):
+            state.timings.gomc_cycle_time_s = 0.0
+            cycle = run_no // 2
+            if cycle in checkpoints:
+                checkpoints[cycle] = (
+                    time.perf_counter(),
+                    sys.getallocatedblocks(),
+                )
+
+    return DummyGomc
+
+
+def test_million_dry_cycles_hold_flat_memory_and_per_cycle_cost(
+    tmp_path: Path, monkeypatch
+):
+    n = SCALING_CYCLES
+    marks = [n // 10, n // 2, n - 1]
+    checkpoints = dict.fromkeys(marks)
+
+    monkeypatch.setattr(mgr, "NamdEngine", DummyNamd)
+    monkeypatch.setattr(mgr, "GomcEngine", _dummy_gomc(checkpoints))
+    monkeypatch.setattr(mgr, "FifoStore", BoundedFakeStore)
+
+    orch = mgr.SimulationOrchestrator(_cfg(tmp_path, n), dry_run=True)
+    # Per-cycle log lines are O(1) too, but writing millions of them would
+    # dominate the measurement.
+    monkeypatch.setattr(orch.logger, "disabled", True)
+
+    summary = orch.run()
+
+    assert summary["cycles_completed"] == n
+
+    (t0, m0), (t1, m1), (t2, m2) = (checkpoints[m] for m in marks)
+    # flat memory: growth between 10% and 100% of the run is bounded
+    assert m2 - m0 < MEMORY_GROWTH_BUDGET_BLOCKS
+    assert m2 - m1 < MEMORY_GROWTH_BUDGET_BLOCKS
+    # flat per-cycle cost: the second half is not slower than the first
+    if CHECK_CYCLE_COST:
+        first = (t1 - t0) / (marks[1] - marks[0])
+        second = (t2 - t1) / (marks[2] - marks[1])
+        assert second < 2.0 * first
+
+    # in-memory state stays bounded
+    assert len(orch._retained_cycle_pairs) <= orch.otf_keep_raw_cycles
+    assert len(orch.fifo_store.live) == 0
+    assert len(summary["time_stats_lines"]) <= 101
+
+    # every cycle was streamed to disk
+    stats_path = Path(summary["time_stats_path"])
+    with stats_path.open() as fh:
+        data_lines = sum(1 for line in fh if line.startswith("TIME_STATS_DATA"))
+    assert data_lines == n
+    assert summary["time_stats_summary"]["Total_time_s"]["count"] == n
@@ -84,3 +84,10 @@ def test_time_stats_header_once_and_data_per_cycle(tmp_path: Path, monkeypatch):
     assert "\t0\t\t10.0\t\t5.0\t\t5.0\t\t20.0" in lines[1]
     # Cycle 1: total=30, namd=10, gomc=5 => python_only=15
     assert "\t1\t\t10.0\t\t5.0\t\t15.0\t\t30.0" in lines[2]
+
+    # every line is also streamed to a file next to the run log
+    streamed = Path(summary["time_stats_path"]).read_text()
+    assert streamed == "".join(lines)
+    total = summary["time_stats_summary"]["Total_time_s"]
+    assert total["count"] == 2
+    assert total["max"] == 30.0
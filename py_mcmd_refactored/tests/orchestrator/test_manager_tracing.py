@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import orchestrator.manager as mgr
+from config.models import SimulationConfig
+from utils.tracing import active_tracer, trace_span
+
+
+def _cfg(tmp_path: Path, **overrides) -> SimulationConfig:
+    base = dict(
+        total_cycles_namd_gomc_sims=2,
+        starting_at_cycle_namd_gomc_sims=0,
+        gomc_use_CPU_or_GPU="CPU",
+        simulation_type="NPT",
+        only_use_box_0_for_namd_for_gemc=True,
+        no_core_box_0=4,
+        no_core_box_1=0,
+        simulation_temp_k=250,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=5,
+        set_dims_box_0_list=[25.0, 25.0, 25.0],
+        set_dims_box_1_list=[25.0, 25.0, 25.0],
+        set_angle_box_0_list=[90, 90, 90],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["ff_gomc.inp"],
+        starting_ff_file_list_namd=["ff_namd.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp_path / "bin_namd"),
+        gomc_bin_directory=str(tmp_path / "bin_gomc"),
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        log_dir=str(tmp_path / "logs"),
+    )
+    base.update(overrides)
+    return SimulationConfig(**base)
+
+
+class _TracedEngine:
+    def __init__(self, cfg, engine_type="NAMD", dry_run=False):
+        self.cfg = cfg
+        self.engine_type = engine_type
+        self.exec_path = engine_type.lower()
+
+    def run_segment(self, *, run_no: int, state, fifo_resources=None):
+        with trace_span(f"{self.engine_type} work", "engine"):
+            state.current_step += 1
+        return {"run_no": run_no}
+
+
+def test_run_writes_a_tagged_trace(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(mgr, "NamdEngine", _TracedEngine)
+    monkeypatch.setattr(mgr, "GomcEngine", _TracedEngine)
+    trace_path = tmp_path / "logs" / "trace.json"
+    cfg = _cfg(tmp_path, trace_events_path=str(trace_path))
+
+    summary = mgr.SimulationOrchestrator(cfg, dry_run=True).run()
+
+    assert summary["trace_events_path"] == str(trace_path)
+    assert active_tracer() is None
+    events = json.loads(trace_path.read_text())
+    spans = [e for e in events if e["ph"] == "X"]
+
+    segments = [e for e in spans if e["name"].endswith(" segment")]
+    assert [(e["name"], e["args"]["run_no"]) for e in segments] == [
+        ("NAMD segment", 0),
+        ("GOMC segment", 1),
+        ("NAMD segment", 2),
+        ("GOMC segment", 3),
+    ]
+    work = [e for e in spans if e["name"] == "GOMC work"]
+    assert [e["args"] for e in work] == [
+        {"cycle": 0, "run_no": 1, "engine": "GOMC"},
+        {"cycle": 1, "run_no": 3, "engine": "GOMC"},
+    ]
+
+    cycles = [e for e in spans if e["name"] == "cycle"]
+    assert [e["args"]["cycle"] for e in cycles] == [0, 1]
+    for cycle in cycles:
+        inside = [
+            e for e in segments if e["args"]["cycle"] == cycle["args"]["cycle"]
+        ]
+        assert all(
+            cycle["ts"] <= e["ts"]
+            and e["ts"] + e["dur"] <= cycle["ts"] + cycle["dur"]
+            for e in inside
+        )
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import orchestrator.manager as mgr
+import pytest
+from config.models import SimulationConfig
+from orchestrator.retry import ATTEMPTS_DIR_NAME, SegmentRetryPolicy
+
+
+def _cfg(tmp_path: Path, **overrides) -> SimulationConfig:
+    base = dict(
+        total_cycles_namd_gomc_sims=3,
+        starting_at_cycle_namd_gomc_sims=0,
+        gomc_use_CPU_or_GPU="CPU",
+        simulation_type="NPT",
+        only_use_box_0_for_namd_for_gemc=True,
+        no_core_box_0=4,
+        no_core_box_1=0,
+        simulation_temp_k=250,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=5,
+        set_dims_box_0_list=[25.0, 25.0, 25.0],
+        set_dims_box_1_list=[25.0, 25.0, 25.0],
+        set_angle_box_0_list=[90, 90, 90],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["ff_gomc.inp"],
+        starting_ff_file_list_namd=["ff_namd.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp_path / "bin_namd"),
+        gomc_bin_directory=str(tmp_path / "bin_gomc"),
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        log_dir=str(tmp_path / "logs"),
+    )
+    base.update(overrides)
+    return SimulationConfig(**base)
+
+
+def _flaky_engines(monkeypatch, failures: dict[int, int]):
+    """Engines failing run_no `n` on its first `failures[n]` attempts."""
+    calls = []
+
+    class FlakyEngine:
+        def __init__(self, cfg, engine_type="NAMD", dry_run=False):
+            self.cfg = cfg
+            self.engine_type = engine_type
+            self.exec_path = engine_type.lower()
+            self.prng_seed = None
+
+        def run_segment(self, *, run_no: int, state, fifo_resources=None):
+            attempt = sum(1 for call in calls if call["run_no"] == run_no)
+            calls.append(
+                {
+                    "run_no": run_no,
+                    "cores": int(self.cfg.total_no_cores),
+                    "seed": self.prng_seed,
+                }
+            )
+            run_dir = (
+                fifo_resources.runtime_dir(0)
+                if self.engine_type == "NAMD"
+                else fifo_resources.runtime_dir()
+            )
+            (run_dir / "out.dat").write_text(f"attempt {attempt + 1}\n")
+            (run_dir / "big.dcd").write_bytes(b"\0" * 64)
+            # like the engines: state moves forward before the run finishes
+            state.current_step += 10
+            if attempt < failures.get(run_no, 0):
+                raise RuntimeError(f"rc=1 for run_no={run_no}")
+            return {"run_no": run_no}
+
+    monkeypatch.setattr(mgr, "NamdEngine", FlakyEngine)
+    monkeypatch.setattr(mgr, "GomcEngine", FlakyEngine)
+    return calls
+
+
+def test_failed_segment_is_retried_from_the_previous_state(
+    tmp_path: Path, monkeypatch
+):
+    calls = _flaky_engines(monkeypatch, {3: 1})
+    cfg = _cfg(
+        tmp_path,
+        segment_retry={"max_retries": 2, "core_fraction_per_retry": 0.5},
+    )
+
+    summary = mgr.SimulationOrchestrator(cfg, dry_run=True).run()
+
+    assert summary["cycles_completed"] == 3
+    # 6 segments + 1 retry, but the failed attempt's step is rolled back
+    assert len(calls) == 7
+    assert summary["state"]["current_step"] == 6 * 10
+
+    first, retry = [call for call in calls if call["run_no"] == 3]
+    assert (first["cores"], first["seed"]) == (4, None)
+    assert retry["cores"] == 2
+    assert retry["seed"] == SegmentRetryPolicy().gomc_seed(3, 1)
+    assert cfg.total_no_cores == 4
+
+    (record,) = summary["segment_retries"]
+    assert record["engine"] == "GOMC"
+    assert record["attempt"] == 1
+    logs = Path(record["logs"])
+    assert (
+        logs
+        == (tmp_path / "logs" / ATTEMPTS_DIR_NAME / "GOMC" / "0000000003")
+        / "attempt_1"
+    )
+    # text logs of the step directory are kept, trajectories are not
+    assert sorted(p.relative_to(logs).as_posix() for p in logs.rglob("*")) == [
+        "0000000003",
+        "0000000003/out.dat",
+    ]
+    assert (logs / "0000000003" / "out.dat").read_text() == "attempt 1\n"
+
+
+def test_run_fails_once_retries_are_exhausted(tmp_path: Path, monkeypatch):
+    calls = _flaky_engines(monkeypatch, {2: 5})
+    cfg = _cfg(tmp_path, segment_retry={"max_retries": 1})
+
+    with pytest.raises(RuntimeError, match="run_no=2"):
+        mgr.SimulationOrchestrator(cfg, dry_run=True).run()
+
+    assert [call["run_no"] for call in calls] == [0, 1, 2, 2]
+    attempts = tmp_path / "logs" / ATTEMPTS_DIR_NAME / "NAMD" / "0000000002"
+    assert sorted(p.name for p in attempts.iterdir()) == [
+        "attempt_1",
+        "attempt_2",
+    ]
+
+
+def test_without_a_policy_the_first_failure_aborts(tmp_path: Path, monkeypatch):
+    calls = _flaky_engines(monkeypatch, {1: 1})
+
+    with pytest.raises(RuntimeError):
+        mgr.SimulationOrchestrator(_cfg(tmp_path), dry_run=True).run()
+
+    assert len(calls) == 2
+    assert not (tmp_path / "logs" / ATTEMPTS_DIR_NAME).exists()
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import orchestrator.manager as mgr
+import pytest
+from config.models import SimulationConfig
+from orchestrator.segment_tuner import (
+    SEGMENT_LEDGER_NAME,
+    SegmentLedger,
+    SegmentObservation,
+    SegmentTuner,
+    fit_linear,
+)
+from pydantic import ValidationError
+
+# synthetic cost model: seconds = fixed + per_step * steps
+NAMD_COST = (2.0, 0.01)
+GOMC_COST = (1.0, 0.02)
+PYTHON_S = 0.5
+
+
+def _cfg(tmp_path: Path, **overrides) -> SimulationConfig:
+    base = dict(
+        total_cycles_namd_gomc_sims=8,
+        starting_at_cycle_namd_gomc_sims=0,
+        gomc_use_CPU_or_GPU="CPU",
+        simulation_type="GEMC",
+        only_use_box_0_for_namd_for_gemc=True,
+        no_core_box_0=1,
+        no_core_box_1=0,
+        simulation_temp_k=250,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=5,
+        set_dims_box_0_list=[25.0, 25.0, 25.0],
+        set_dims_box_1_list=[25.0, 25.0, 25.0],
+        set_angle_box_0_list=[90, 90, 90],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["ff_gomc.inp"],
+        starting_ff_file_list_namd=["ff_namd.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp_path / "bin_namd"),
+        gomc_bin_directory=str(tmp_path / "bin_gomc"),
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        log_dir=str(tmp_path / "logs"),
+    )
+    base.update(overrides)
+    return SimulationConfig(**base)
+
+
+def _observation(cycle: int, namd: int, gomc: int) -> SegmentObservation:
+    return SegmentObservation(
+        cycle=cycle,
+        namd_steps=namd,
+        gomc_steps=gomc,
+        namd_s=NAMD_COST[0] + NAMD_COST[1] * namd,
+        gomc_s=GOMC_COST[0] + GOMC_COST[1] * gomc,
+        python_s=PYTHON_S,
+    )
+
+
+def test_fit_linear_separates_fixed_and_per_step_cost():
+    a, b = fit_linear([10, 20, 40], [2.1, 2.2, 2.4])
+    assert a == pytest.approx(2.0)
+    assert b == pytest.approx(0.01)
+    assert fit_linear([10, 10, 10], [2.1, 2.2, 2.4]) is None
+
+
+def test_proposal_brings_overhead_under_target():
+    tuner = SegmentTuner(
+        target_overhead_percent=10,
+        namd_bounds=(10, 100_000),
+        gomc_bounds=(10, 100_000),
+        warmup_cycles=0,
+        retune_every=4,
+    )
+    lengths = [(10, 5), (20, 10), (10, 5), (40, 20)]
+    proposals = [
+        tuner.observe(_observation(cycle, *steps))
+        for cycle, steps in enumerate(lengths)
+    ]
+    assert proposals[:3] == [None, None, None]
+
+    proposal = proposals[3]
+    assert proposal.cycle == 4
+    assert proposal.namd_run_steps % 10 == 0
+    assert proposal.overhead_fraction > 0.5
+    assert proposal.predicted_overhead_fraction <= 0.1
+    # the minimal lengths meeting the target: 3.5 s / (0.9 * total) <= 0.1
+    simulated = NAMD_COST[1] * proposal.namd_run_steps + (
+        GOMC_COST[1] * proposal.gomc_run_steps
+    )
+    assert simulated == pytest.approx(3.5 * 0.9 / 0.1, rel=0.02)
+
+
+def test_apply_mode_probes_once_when_lengths_never_varied():
+    tuner = SegmentTuner(
+        mode="apply",
+        namd_bounds=(10, 1000),
+        gomc_bounds=(5, 500),
+        warmup_cycles=0,
+        retune_every=2,
+    )
+    assert tuner.observe(_observation(0, 10, 5)) is None
+    probe = tuner.observe(_observation(1, 10, 5))
+    assert probe.reason.startswith("probe")
+    assert (probe.cycle, probe.namd_run_steps, probe.gomc_run_steps) == (
+        2,
+        20,
+        10,
+    )
+
+    restore = tuner.observe(_observation(2, 20, 10))
+    assert (restore.namd_run_steps, restore.gomc_run_steps) == (10, 5)
+
+    proposal = tuner.observe(_observation(3, 10, 5))
+    assert (proposal.namd_run_steps, proposal.gomc_run_steps) == (1000, 500)
+    assert "limited by the configured bounds" in proposal.reason
+
+
+def test_ledger_replays_lengths_and_steps(tmp_path: Path):
+    ledger = SegmentLedger(tmp_path / SEGMENT_LEDGER_NAME)
+    assert ledger.steps_before(4, (10, 5)) == 60
+
+    ledger.append(
+        cycle=2,
+        namd_run_steps=100,
+        gomc_run_steps=50,
+        previous=(10, 5),
+        reason="test",
+    )
+    ledger.append(
+        cycle=5,
+        namd_run_steps=200,
+        gomc_run_steps=100,
+        previous=(100, 50),
+        reason="test",
+    )
+
+    assert ledger.lengths_at(1, (10, 5)) == (10, 5)
+    assert ledger.lengths_at(4, (10, 5)) == (100, 50)
+    assert ledger.lengths_at(6, (10, 5)) == (200, 100)
+    # 2 * 15 + 3 * 150 + 1 * 300; the default is ignored once entries exist
+    assert ledger.steps_before(6, (1, 1)) == 30 + 450 + 300
+
+    ledger.discard_after(4)
+    assert [e["cycle"] for e in ledger.entries()] == [2]
+
+
+def test_apply_mode_requires_upper_bounds(tmp_path: Path):
+    with pytest.raises(ValidationError) as exc:
+        _cfg(tmp_path, segment_tuner={"mode": "apply"})
+    assert "max_namd_run_steps" in str(exc.value)
+
+    with pytest.raises(ValidationError):
+        _cfg(
+            tmp_path,
+            segment_tuner={"min_gomc_run_steps": 50, "max_gomc_run_steps": 5},
+        )
+
+
+def test_set_run_steps_rederives_output_frequencies(tmp_path: Path):
+    cfg = _cfg(tmp_path)
+    cfg.set_run_steps(200, 1000)
+    assert cfg.namd_rst_dcd_xst_steps == 200
+    assert cfg.gomc_rst_coor_ckpoint_steps == 1000
+    assert cfg.gomc_hist_sample_steps == 100
+    assert cfg.namd_minimize_steps == 10
+
+
+def test_run_applies_tuned_lengths_and_restart_replays_them(
+    tmp_path: Path, monkeypatch
+):
+    clock = SimpleNamespace(now=0.0)
+
+    class TimedEngine:
+        def __init__(self, cfg, engine_type="NAMD", dry_run=False):
+            self.cfg = cfg
+            self.engine_type = engine_type
+            self.exec_path = engine_type.lower()
+
+        def run_segment(self, *, run_no: int, state):
+            if self.engine_type == "NAMD":
+                steps = int(self.cfg.namd_run_steps)
+                seconds = NAMD_COST[0] + NAMD_COST[1] * steps
+                state.timings.max_namd_cycle_time_s = seconds
+            else:
+                steps = int(self.cfg.gomc_run_steps)
+                seconds = GOMC_COST[0] + GOMC_COST[1] * steps
+                state.timings.gomc_cycle_time_s = seconds
+                clock.now += PYTHON_S
+            clock.now += seconds
+            state.current_step += steps
+            return {"run_no": run_no}
+
+    monkeypatch.setattr(mgr, "NamdEngine", TimedEngine)
+    monkeypatch.setattr(mgr, "GomcEngine", TimedEngine)
+    monkeypatch.setattr(
+        mgr, "time", SimpleNamespace(perf_counter=lambda: clock.now)
+    )
+
+    tuner = {
+        "mode": "apply",
+        "max_namd_run_steps": 1000,
+        "max_gomc_run_steps": 500,
+        "warmup_cycles": 1,
+        "retune_every": 2,
+    }
+    orch = mgr.SimulationOrchestrator(
+        _cfg(tmp_path, segment_tuner=tuner), dry_run=True
+    )
+    summary = orch.run()
+
+    reasons = [entry["reason"] for entry in summary["segment_tuning"]]
+    assert reasons[0].startswith("probe")
+    assert summary["namd_steps"] == 1000
+    assert summary["gomc_steps"] == 500
+
+    ledger = SegmentLedger(tmp_path / "logs" / SEGMENT_LEDGER_NAME)
+    assert [e["cycle"] for e in ledger.entries()] == [3, 4, 5]
+    # cycles 0-2 and 4 at 10 + 5 steps, the probe at 20 + 10, then 1500
+    expected = 4 * 15 + 30 + 3 * 1500
+    assert orch.state.current_step == expected
+
+    # restart at cycle 6 without the tuner: lengths and step are replayed
+    restart = mgr.SimulationOrchestrator(
+        _cfg(tmp_path, starting_at_cycle_namd_gomc_sims=6), dry_run=True
+    )
+    restart.run()
+    assert (restart.namd_steps, restart.gomc_steps) == (1000, 500)
+    assert restart.cfg.gomc_rst_coor_ckpoint_steps == 500
+    # namd_minimize_steps (10) is part of every restart step
+    assert restart.state.current_step == (4 * 15 + 30 + 1500) + 10 + 2 * 1500
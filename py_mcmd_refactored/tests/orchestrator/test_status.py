@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import orchestrator.manager as mgr
+import pytest
+from config.models import SimulationConfig
+from orchestrator.status import StatusPublisher, tree_bytes
+
+
+def _cfg(tmp_path: Path, **overrides) -> SimulationConfig:
+    base = dict(
+        total_cycles_namd_gomc_sims=2,
+        starting_at_cycle_namd_gomc_sims=0,
+        gomc_use_CPU_or_GPU="CPU",
+        simulation_type="NPT",
+        only_use_box_0_for_namd_for_gemc=True,
+        no_core_box_0=4,
+        no_core_box_1=0,
+        simulation_temp_k=250,
+        simulation_pressure_bar=1.0,
+        namd_minimize_mult_scalar=1,
+        namd_run_steps=10,
+        gomc_run_steps=5,
+        set_dims_box_0_list=[25.0, 25.0, 25.0],
+        set_dims_box_1_list=[25.0, 25.0, 25.0],
+        set_angle_box_0_list=[90, 90, 90],
+        set_angle_box_1_list=[90, 90, 90],
+        starting_ff_file_list_gomc=["ff_gomc.inp"],
+        starting_ff_file_list_namd=["ff_namd.inp"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",
+        starting_pdb_box_1_file="box1.pdb",
+        starting_psf_box_1_file="box1.psf",
+        namd2_bin_directory=str(tmp_path / "bin_namd"),
+        gomc_bin_directory=str(tmp_path / "bin_gomc"),
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        log_dir=str(tmp_path / "logs"),
+    )
+    base.update(overrides)
+    return SimulationConfig(**base)
+
+
+def test_update_replaces_the_status_file(tmp_path: Path):
+    status = StatusPublisher(tmp_path / "status.json", run_label="case_1")
+    status.update(state="running", current_cycle=3, cycles_completed=3)
+    status.update(current_cycle=4)
+
+    data = json.loads((tmp_path / "status.json").read_text())
+    assert data["run"] == "case_1"
+    assert (data["state"], data["current_cycle"]) == ("running", 4)
+    assert data["cycles_per_hour"] > 0
+    # only the final file is left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["status.json"]
+
+
+def test_prometheus_text_exports_numbers_and_state(tmp_path: Path):
+    status = StatusPublisher(tmp_path / "status.json", run_label='a"b')
+    status.update(
+        state="running",
+        current_cycle=2,
+        python_overhead_percent=1.5,
+        energy_continuity_warnings=0,
+        last_gomc_segment_s=None,
+    )
+
+    text = status.prometheus_text()
+    assert 'py_mcmd_current_cycle{run="a\\"b"} 2.0' in text
+    assert "# TYPE py_mcmd_energy_continuity_warnings_total counter" in text
+    assert 'py_mcmd_run_state{run="a\\"b",state="running"} 1' in text
+    assert 'py_mcmd_run_state{run="a\\"b",state="failed"} 0' in text
+    assert "last_gomc_segment_seconds" not in text
+
+
+def test_metrics_endpoint_serves_localhost(tmp_path: Path):
+    status = StatusPublisher(
+        tmp_path / "status.json", run_label="case", prometheus_port=0
+    )
+    try:
+        status.update(state="running", current_cycle=7)
+        url = f"http://127.0.0.1:{status.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain")
+        assert 'py_mcmd_current_cycle{run="case"} 7.0' in body
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(url.replace("/metrics", "/x"), timeout=5)
+    finally:
+        status.close()
+    assert status.port is None
+
+
+def test_tree_bytes_sums_files(tmp_path: Path):
+    (tmp_path / "NAMD" / "0000000000_a").mkdir(parents=True)
+    (tmp_path / "NAMD" / "0000000000_a" / "out.dat").write_bytes(b"x" * 10)
+    (tmp_path / "restart.coor").write_bytes(b"x" * 5)
+    assert tree_bytes(tmp_path) == 15
+    assert tree_bytes(tmp_path / "missing") == 0
+
+
+class _WarningEngine:
+    def __init__(self, cfg, engine_type="NAMD", dry_run=False):
+        self.cfg = cfg
+        self.engine_type = engine_type
+        self.exec_path = engine_type.lower()
+
+    def run_segment(self, *, run_no: int, state, fifo_resources=None):
+        state.current_step += 1
+        # GOMC -> NAMD continuity fails once per NAMD segment after run 0
+        warnings = int(self.engine_type == "NAMD" and run_no > 0)
+        return {"run_no": run_no, "energy_warnings": warnings}
+
+
+def test_run_publishes_status(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(mgr, "NamdEngine", _WarningEngine)
+    monkeypatch.setattr(mgr, "GomcEngine", _WarningEngine)
+    cfg = _cfg(tmp_path, live_status={"run_label": "case_7"})
+
+    summary = mgr.SimulationOrchestrator(cfg, dry_run=True).run()
+
+    path = tmp_path / "logs" / "status.json"
+    assert summary["status_path"] == str(path)
+    assert summary["energy_continuity_warnings"] == 1
+    data = json.loads(path.read_text())
+    assert data["run"] == "case_7"
+    assert data["state"] == "completed"
+    assert (data["current_cycle"], data["run_no"]) == (1, 3)
+    assert (data["cycles_completed"], data["total_cycles"]) == (2, 2)
+    assert data["energy_continuity_warnings"] == 1
+    assert data["otf_queue_depth"] == 0
+    assert data["tmpfs_bytes"] >= 0
+    assert "python_overhead_percent" in data
+
+
+def test_failed_run_is_marked_failed(tmp_path: Path, monkeypatch):
+    class _Broken(_WarningEngine):
+        def run_segment(self, *, run_no: int, state, fifo_resources=None):
+            if run_no == 1:
+                raise RuntimeError("GOMC failed")
+            return super().run_segment(run_no=run_no, state=state)
+
+    monkeypatch.setattr(mgr, "NamdEngine", _Broken)
+    monkeypatch.setattr(mgr, "GomcEngine", _Broken)
+    cfg = _cfg(tmp_path, live_status={})
+
+    with pytest.raises(RuntimeError):
+        mgr.SimulationOrchestrator(cfg, dry_run=True).run()
+
+    data = json.loads((tmp_path / "logs" / "status.json").read_text())
+    assert (data["state"], data["run_no"], data["engine"]) == (
+        "failed",
+        1,
+        "GOMC",
+    )
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from config.models import BackgroundConfig
+from utils.background import BackgroundIsolation
+
+linux_only = pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="Linux scheduling API"
+)
+
+
+def _in_thread(fn):
+    out = {}
+
+    def _body():
+        out["value"] = fn()
+
+    thread = threading.Thread(target=_body)
+    thread.start()
+    thread.join()
+    return out["value"]
+
+
+def test_from_config_prefers_background_over_legacy_fields():
+    class Cfg:
+        catdcd_core = 8
+        enable_cpu_affinity = False
+        background = BackgroundConfig(cpus=[10, 11], io_class="idle")
+
+    iso = BackgroundIsolation.from_config(Cfg)
+    assert iso.cpus == {10, 11}
+    assert (iso.nice, iso.io_class, iso.io_level) == (10, "idle", 7)
+    assert iso.describe() == "cpus=10,11 nice=+10 io=idle/7"
+
+    Cfg.background = {"nice": 0, "io_class": "none"}
+    iso = BackgroundIsolation.from_config(Cfg)
+    assert (iso.cpus, iso.nice, iso.io_class) == ({8}, None, None)
+
+
+def test_legacy_affinity_pins_past_namd_cores():
+    class Cfg:
+        enable_cpu_affinity = True
+        no_core_box_0 = 4
+        no_core_box_1 = 2
+        otf_reserved_cores = 2
+
+    iso = BackgroundIsolation.from_config(Cfg)
+    assert iso.cpus == {6, 7}
+    assert (iso.nice, iso.io_class) == (None, None)
+
+    Cfg.enable_cpu_affinity = False
+    assert BackgroundIsolation.from_config(Cfg) is None
+
+
+@linux_only
+def test_apply_only_changes_the_calling_thread_and_its_children():
+    cpu = min(os.sched_getaffinity(0))
+    before = os.sched_getaffinity(0)
+    iso = BackgroundIsolation(cpus=[cpu], nice=5)
+
+    def _worker():
+        applied = iso.apply()
+        child = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import os; print(sorted(os.sched_getaffinity(0)), "
+                "os.getpriority(os.PRIO_PROCESS, 0))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return applied, child.stdout.strip()
+
+    applied, child = _in_thread(_worker)
+    assert applied["cpus"] == [cpu]
+    assert child == f"[{cpu}] {applied['nice']}"
+    # the orchestrator thread keeps its scheduling
+    assert os.sched_getaffinity(0) == before
+    assert os.getpriority(os.PRIO_PROCESS, threading.get_native_id()) < (
+        applied["nice"]
+    )
+
+
+@linux_only
+def test_refused_settings_warn_once(caplog):
+    iso = BackgroundIsolation(cpus=[100000])
+    with caplog.at_level("WARNING"):
+        assert _in_thread(iso.apply) == {}
+        assert _in_thread(iso.apply) == {}
+    assert len(caplog.records) == 1
+    assert "cpus isolation" in caplog.records[0].getMessage()
+
+
+def test_unknown_io_class_rejected():
+    with pytest.raises(ValueError):
+        BackgroundIsolation(io_class="bulk")
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from utils.compressed_traj import (
+    BLOCK_FRAMES,
+    CompressedTrajectory,
+    decode_frames,
+    encode_frames,
+)
+
+
+def _random_walk(n_frames: int, n_atoms: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(-40.0, 40.0, size=(1, n_atoms, 3))
+    steps = rng.normal(scale=0.05, size=(n_frames, n_atoms, 3))
+    steps[0] = 0.0
+    return (start + np.cumsum(steps, axis=0)).astype(np.float32)
+
+
+@pytest.mark.parametrize("precision", [0.001, 0.01])
+def test_round_trip_error_is_bounded_by_half_the_precision(precision):
+    coords = _random_walk(12, 50)
+    cells = np.tile(np.arange(6, dtype=np.float64), (12, 1))
+
+    payload = encode_frames(coords, cells, precision)
+    decoded, decoded_cells = decode_frames(payload, 12, 50, precision, True)
+
+    assert decoded.shape == coords.shape
+    assert decoded.dtype == np.float32
+    # float32 rounding of the decoded value adds a few ulps on top
+    assert np.abs(decoded - coords).max() <= precision / 2 + 1e-4
+    np.testing.assert_array_equal(decoded_cells, cells)
+
+
+def test_compressed_trajectory_is_several_times_smaller_than_float32():
+    coords = _random_walk(100, 2000)
+    payload = encode_frames(coords, None, 0.001)
+    assert len(payload) * 3 < coords.nbytes
+
+
+def test_append_and_read_by_cycle(tmp_path: Path):
+    traj = CompressedTrajectory(tmp_path / "t.pmct")
+    first = _random_walk(BLOCK_FRAMES + 4, 5, seed=1)
+    second = _random_walk(3, 5, seed=2)
+
+    assert traj.append(first, precision=0.01, cycle=0, engine="NAMD", box=0)
+    assert traj.append(second, precision=0.01, cycle=1, engine="NAMD", box=0)
+
+    blocks = list(traj.blocks())
+    assert [b.cycle for b in blocks] == [0, 0, 1]
+    assert blocks[-1].frames == slice(BLOCK_FRAMES + 4, BLOCK_FRAMES + 7)
+    assert len(CompressedTrajectory(traj.path)) == BLOCK_FRAMES + 7
+
+    coords, cells = traj.read(1, 1)
+    assert cells is None
+    assert np.abs(coords - second).max() <= 0.005 + 1e-5
+    assert traj.read()[0].shape == (BLOCK_FRAMES + 7, 5, 3)
+
+
+def test_reader_skips_a_torn_tail_block(tmp_path: Path):
+    path = tmp_path / "t.pmct"
+    traj = CompressedTrajectory(path)
+    traj.append(
+        _random_walk(4, 3), precision=0.01, cycle=0, engine="GOMC", box=1
+    )
+    intact = path.stat().st_size
+    traj.append(
+        _random_walk(4, 3), precision=0.01, cycle=1, engine="GOMC", box=1
+    )
+
+    with path.open("r+b") as fh:
+        fh.truncate(intact + 20)
+
+    blocks = list(CompressedTrajectory(path).blocks())
+    assert [(b.cycle, b.engine, b.box) for b in blocks] == [(0, "GOMC", 1)]
+
+
+def test_out_of_range_coordinates_are_rejected():
+    with pytest.raises(ValueError):
+        encode_frames(np.full((1, 1, 3), 1e7, dtype=np.float32), None, 0.001)
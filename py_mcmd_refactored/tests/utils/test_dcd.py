@@ -0,0 +1,248 @@
+import struct
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import utils.onthefly_processor as otf_mod
+from utils.compressed_traj import CompressedTrajectory
+from utils.dcd import (
+    DcdFrameIndex,
+    DcdTrajectory,
+    count_dcd_frames,
+    read_dcd_header,
+    truncate_dcd_frames,
+    write_dcd_subset,
+)
+from utils.onthefly_processor import OnTheFlyProcessor
+from utils.psf import read_psf
+
+
+def _record(payload: bytes) -> bytes:
+    size = struct.pack("<i", len(payload))
+    return size + payload + size
+
+
+def write_dcd(path: Path, coords: np.ndarray, *, cell: bool = True) -> None:
+    """Write a NAMD-style little-endian DCD from (frames, atoms, 3)."""
+    n_frames, n_atoms, _ = coords.shape
+    icntrl = [0] * 20
+    icntrl[0] = n_frames
+    icntrl[2] = 1
+    icntrl[10] = int(cell)
+    icntrl[19] = 24
+    control = bytearray(b"CORD" + struct.pack("<20i", *icntrl))
+    control[4 + 9 * 4 : 4 + 10 * 4] = struct.pack("<f", 2.0)
+    title = b"REMARKS test".ljust(80)
+
+    with path.open("wb") as fh:
+        fh.write(_record(bytes(control)))
+        fh.write(_record(struct.pack("<i", 1) + title))
+        fh.write(_record(struct.pack("<i", n_atoms)))
+        for frame in coords.astype("<f4"):
+            if cell:
+                fh.write(_record(np.arange(6, dtype="<f8").tobytes()))
+            for axis in range(3):
+                fh.write(_record(frame[:, axis].tobytes()))
+
+
+def _coords(n_frames: int, n_atoms: int, start: float = 0.0) -> np.ndarray:
+    values = np.arange(n_frames * n_atoms * 3, dtype=np.float32) + start
+    return values.reshape(n_frames, n_atoms, 3)
+
+
+@pytest.mark.parametrize("cell", [True, False])
+def test_trajectory_maps_frames_as_zero_copy_views(tmp_path: Path, cell):
+    path = tmp_path / "traj.dcd"
+    coords = _coords(5, 4)
+    write_dcd(path, coords, cell=cell)
+
+    header = read_dcd_header(path)
+    assert header.n_atoms == 4
+    assert header.n_frames_declared == 5
+    assert header.has_unit_cell is cell
+    assert header.titles == ("REMARKS test",)
+
+    traj = DcdTrajectory(path)
+    assert len(traj) == 5
+
+    x, y, z = traj.xyz(slice(1, 4))
+    assert x.shape == (3, 4)
+    assert not x.flags.owndata
+    assert isinstance(x.base, np.memmap) or isinstance(x, np.memmap)
+    np.testing.assert_array_equal(x, coords[1:4, :, 0])
+    np.testing.assert_array_equal(z, coords[1:4, :, 2])
+    np.testing.assert_array_equal(traj.positions(2)[0], coords[2])
+
+    cells = traj.unit_cells()
+    assert (cells is not None) is cell
+
+
+def test_truncate_dcd_frames_rewrites_nset(tmp_path: Path):
+    path = tmp_path / "traj.dcd"
+    write_dcd(path, _coords(6, 3))
+
+    assert truncate_dcd_frames(path, 4) is True
+    assert count_dcd_frames(path) == 4
+    assert read_dcd_header(path).n_frames_declared == 4
+    assert truncate_dcd_frames(path, 4) is False
+    assert count_dcd_frames(tmp_path / "missing.dcd") is None
+
+
+def _fake_catdcd(catdcd_bin, src_dcd, dst_dcd):
+    """Concatenate real DCDs the way catdcd does."""
+    parts = []
+    for path in (Path(dst_dcd), Path(src_dcd)):
+        if path.exists():
+            parts.append(DcdTrajectory(path).positions())
+    write_dcd(Path(dst_dcd), np.concatenate(parts))
+    return True
+
+
+def test_otf_appends_record_frame_index_per_cycle(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(otf_mod, "_append_dcd", _fake_catdcd)
+    cfg = SimpleNamespace(
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        simulation_type="NPT",
+    )
+    managed = tmp_path / "managed"
+    for cycle, n_frames in enumerate((2, 3)):
+        seg = managed / "NAMD" / f"{2 * cycle:010d}_a" / "namdOut.dcd"
+        seg.parent.mkdir(parents=True)
+        write_dcd(seg, _coords(n_frames, 4, start=100.0 * cycle))
+
+    processor = OnTheFlyProcessor(cfg, tmp_path / "out", managed_root=managed)
+    try:
+        assert processor._append_namd_dcd(0)
+        processor._commit(0, 1, 0)
+        assert processor._append_namd_dcd(2)
+    finally:
+        processor.close()
+
+    combined = tmp_path / "out" / "combined_box_0_NAMD_dcd_files.dcd"
+    index = DcdFrameIndex(combined)
+    entry = index.entry_for_cycle(1)
+    assert (entry.engine, entry.box, entry.n_atoms) == ("NAMD", 0, 4)
+    assert (entry.first_frame, entry.n_frames) == (2, 3)
+
+    traj = DcdTrajectory(combined)
+    x, _, _ = traj.xyz(entry.frames)
+    np.testing.assert_array_equal(x[0], _coords(1, 4, start=100.0)[0, :, 0])
+    assert index.frames_for_cycles(0, 1) == slice(0, 5)
+
+    # cycle 1 was never committed: a restart drops its frames and entry
+    OnTheFlyProcessor(cfg, tmp_path / "out", managed_root=managed).close()
+    assert count_dcd_frames(combined) == 2
+    assert index.entries()["cycle"].tolist() == [0]
+
+
+def test_write_dcd_subset_selects_atoms_and_strides_frames(tmp_path: Path):
+    src = tmp_path / "seg.dcd"
+    coords = _coords(7, 5)
+    write_dcd(src, coords)
+
+    dst = tmp_path / "reduced.dcd"
+    assert write_dcd_subset(src, dst, atom_indices=[0, 3], stride=3) == 2
+
+    header = read_dcd_header(dst)
+    assert (header.n_atoms, header.n_frames_declared) == (2, 2)
+    assert header.save_interval == 3
+    traj = DcdTrajectory(dst)
+    np.testing.assert_array_equal(traj.positions(), coords[[2, 5]][:, [0, 3]])
+    np.testing.assert_array_equal(
+        traj.unit_cells(), DcdTrajectory(src).unit_cells()[[2, 5]]
+    )
+
+
+def test_write_dcd_subset_rejects_indices_past_the_frame(tmp_path: Path):
+    src = tmp_path / "seg.dcd"
+    write_dcd(src, _coords(2, 4))
+    # e.g. a selection resolved before a GEMC swap shrank the box
+    with pytest.raises(ValueError):
+        write_dcd_subset(src, tmp_path / "reduced.dcd", atom_indices=[1, 4])
+
+
+def test_otf_writes_reduced_trajectory_and_psf(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(otf_mod, "_append_dcd", _fake_catdcd)
+    psf = tmp_path / "start.psf"
+    atoms = [("PROT", "ALA")] * 3 + [("WAT", "TIP3")] * 3
+    psf.write_text(
+        "PSF\n\n       6 !NATOM\n"
+        + "".join(
+            f"{i:8d} {seg:<4s} 1    {res:<4s} X    X    0.0 1.0 0\n"
+            for i, (seg, res) in enumerate(atoms, 1)
+        )
+    )
+    cfg = SimpleNamespace(
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        simulation_type="NPT",
+        starting_psf_box_0_file=str(psf),
+        otf_namd_dcd_selection={"exclude_resnames": ["TIP3"]},
+        otf_namd_dcd_frame_stride=2,
+    )
+    managed = tmp_path / "managed"
+    segments = []
+    for cycle in range(2):
+        seg = managed / "NAMD" / f"{2 * cycle:010d}_a" / "namdOut.dcd"
+        seg.parent.mkdir(parents=True)
+        segments.append(_coords(4, 6, start=100.0 * cycle))
+        write_dcd(seg, segments[-1])
+
+    processor = OnTheFlyProcessor(cfg, tmp_path / "out", managed_root=managed)
+    try:
+        assert processor._append_namd_dcd(0)
+        assert processor._append_namd_dcd(2)
+    finally:
+        processor.close()
+
+    combined = tmp_path / "out" / "combined_box_0_NAMD_dcd_files.dcd"
+    traj = DcdTrajectory(combined)
+    assert (len(traj), traj.n_atoms) == (4, 3)
+    expected = np.concatenate([s[1::2, :3] for s in segments])
+    np.testing.assert_array_equal(traj.positions(), expected)
+    assert DcdFrameIndex(combined).entry_for_cycle(1).frames == slice(2, 4)
+
+    reduced_psf = combined.with_suffix(".psf")
+    assert read_psf(reduced_psf).n_atoms == 3
+    assert not list(combined.parent.glob(".*.segment"))
+
+
+def test_otf_compressed_format_skips_catdcd_and_rolls_back(
+    tmp_path: Path, monkeypatch
+):
+    def no_catdcd(*args):
+        raise AssertionError("catdcd must not run for compressed output")
+
+    monkeypatch.setattr(otf_mod, "_append_dcd", no_catdcd)
+    cfg = SimpleNamespace(
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        simulation_type="NPT",
+        otf_trajectory_format="compressed",
+        otf_trajectory_precision=0.01,
+    )
+    managed = tmp_path / "managed"
+    for cycle in range(2):
+        seg = managed / "NAMD" / f"{2 * cycle:010d}_a" / "namdOut.dcd"
+        seg.parent.mkdir(parents=True)
+        write_dcd(seg, _coords(3, 4, start=100.0 * cycle))
+
+    processor = OnTheFlyProcessor(cfg, tmp_path / "out", managed_root=managed)
+    try:
+        assert processor._append_namd_dcd(0)
+        processor._commit(0, 1, 0)
+        assert processor._append_namd_dcd(2)
+    finally:
+        processor.close()
+
+    path = tmp_path / "out" / "combined_box_0_NAMD_dcd_files.pmct"
+    assert not path.with_suffix(".dcd").exists()
+    coords, cells = CompressedTrajectory(path).read(1, 1)
+    np.testing.assert_allclose(coords, _coords(3, 4, start=100.0), atol=0.006)
+    assert cells.shape == (3, 6)
+
+    # cycle 1 was never committed: a restart cuts its block off again
+    OnTheFlyProcessor(cfg, tmp_path / "out", managed_root=managed).close()
+    assert [b.cycle for b in CompressedTrajectory(path).blocks()] == [0]
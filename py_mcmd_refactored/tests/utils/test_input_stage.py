@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+from types import SimpleNamespace
+
+import utils.input_stage as input_stage
+from engines.gomc.gomc_writer import _build_parameters_block
+from engines.namd.namd_writer import NamdWriterContext
+from utils.fifo_store import ManagedArtifactStore
+from utils.input_stage import InputStage, static_input_paths
+
+
+def _project(tmp_path: Path, name: str) -> Path:
+    project = tmp_path / name
+    (project / "ff").mkdir(parents=True)
+    (project / "ff" / "par_all36.prm").write_text("BONDS\nCT1 CT1 222.5 1.5\n")
+    (project / "box0.pdb").write_text("CRYST1   25.000   25.000   25.000\n")
+    return project
+
+
+def test_runs_on_a_node_share_one_copy(tmp_path: Path, monkeypatch):
+    digests = []
+    real_digest = input_stage._file_digest
+    monkeypatch.setattr(
+        input_stage,
+        "_file_digest",
+        lambda p: digests.append(p) or real_digest(p),
+    )
+    root = tmp_path / "shm"
+    a = _project(tmp_path, "run_a") / "ff" / "par_all36.prm"
+    b = _project(tmp_path, "run_b") / "ff" / "par_all36.prm"
+
+    staged_a = InputStage(root).stage(a)
+    staged_b = InputStage(root).stage(b)  # another run, same content
+    again = InputStage(root).stage(a)  # known source: stat only
+
+    assert staged_a == staged_b == again
+    assert staged_a.read_bytes() == a.read_bytes()
+    assert not staged_a.stat().st_mode & stat.S_IWUSR
+    assert digests == [a, b]
+    assert len([p for p in root.iterdir() if p.name != "by_source"]) == 1
+
+
+def test_changed_source_is_staged_again(tmp_path: Path):
+    stage = InputStage(tmp_path / "shm")
+    src = _project(tmp_path, "run") / "ff" / "par_all36.prm"
+    first = stage.stage(src)
+    src.write_text("BONDS\nCT1 CT1 230.0 1.5\n")
+    os.utime(src, ns=(1, 1))
+
+    second = stage.stage(src)
+    assert second != first
+    assert second.read_text() == src.read_text()
+    assert first.exists()
+
+
+def test_artifact_store_stages_the_writer_inputs(tmp_path: Path):
+    project = _project(tmp_path, "run")
+    cfg = SimpleNamespace(
+        starting_ff_file_list_namd=["ff/par_all36.prm"],
+        starting_ff_file_list_gomc=["ff/par_all36.prm"],
+        starting_pdb_box_0_file="box0.pdb",
+        starting_psf_box_0_file="box0.psf",  # missing: left as configured
+        starting_pdb_box_1_file="NA",
+        simulation_type="NPT",
+    )
+    store = ManagedArtifactStore(
+        disk_roots={"NAMD": tmp_path / "NAMD", "GOMC": tmp_path / "GOMC"},
+        managed_root=tmp_path / "managed",
+        input_root=tmp_path / "shm",
+    )
+    staged = store.stage_inputs(static_input_paths(cfg), project)
+
+    prm = staged.path("ff/par_all36.prm")
+    assert prm.parent.parent == tmp_path / "shm"
+    assert staged.path("box0.pdb").parent.parent == tmp_path / "shm"
+    assert staged.path("box0.psf") == project / "box0.psf"
+
+    ctx = NamdWriterContext.from_config(cfg, project, staged)
+    assert ctx.starting_ff_file_list_namd == (prm,)
+
+    run_dir = tmp_path / "managed" / "GOMC" / "0000000001"
+    run_dir.mkdir(parents=True)
+    block = _build_parameters_block([prm], run_dir, project)
+    rel = block.split()[-1]
+    assert (run_dir / rel).resolve() == prm
+
+    store.cleanup_all()
+    assert prm.exists()  # shared with other runs on the node
+
+
+def test_input_root_must_be_private_to_the_user(tmp_path: Path):
+    managed = tmp_path / "managed"
+    private = input_stage._discover_input_root(tmp_path / "mine", managed)
+    assert private == tmp_path / "mine"
+    assert stat.S_IMODE(private.stat().st_mode) == 0o700
+
+    # e.g. a shared scratch dir other users could plant inputs in
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    fallback = input_stage._discover_input_root(shared, managed)
+    assert fallback == managed / "_inputs"
+
+
+def test_forged_source_entry_is_not_followed(tmp_path: Path):
+    stage = InputStage(tmp_path / "shm")
+    src = _project(tmp_path, "run") / "ff" / "par_all36.prm"
+    outside = tmp_path / "elsewhere" / src.name
+    outside.parent.mkdir()
+    outside.write_text("BONDS\nplanted\n")
+    key = stage._source_key(src.resolve())
+    key.parent.mkdir(parents=True)
+    key.write_text("../elsewhere")
+
+    staged = stage.stage(src)
+    assert staged.parent.parent == tmp_path / "shm"
+    assert staged.read_text() == src.read_text()
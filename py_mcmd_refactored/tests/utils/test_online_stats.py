@@ -0,0 +1,136 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from utils.online_stats import (
+    STATS_SNAPSHOT_NAME,
+    ColumnStats,
+    OnlineStatsBook,
+    Welford,
+)
+from utils.onthefly_processor import OnTheFlyProcessor
+
+
+def _ar1(n: int, phi: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(size=n)
+    series = np.empty(n)
+    series[0] = noise[0]
+    for i in range(1, n):
+        series[i] = phi * series[i - 1] + noise[i]
+    return series
+
+
+def test_welford_matches_numpy():
+    values = np.random.default_rng(1).normal(1e5, 3.0, size=500)
+    acc = Welford()
+    for value in values:
+        acc.add(value)
+    assert acc.mean == pytest.approx(values.mean())
+    assert acc.variance == pytest.approx(values.var(ddof=1))
+
+
+def test_block_and_autocorrelation_estimates_of_an_ar1_series():
+    phi = 0.8
+    expected = (1 + phi) / (1 - phi)  # statistical inefficiency: 9
+    column = ColumnStats(max_lag=64)
+    for value in _ar1(2**15, phi) + 1e5:
+        column.add(value)
+
+    summary = column.summary()
+    assert summary["n"] == 2**15
+    assert 0.6 * expected < summary["statistical_inefficiency"] < 1.5 * expected
+    assert 0.6 * expected < summary["tau_int"] < 1.5 * expected
+    assert summary["sem"] > summary["sem_naive"]
+    assert summary["blocks"][0]["block_size"] == 1
+    assert summary["blocks"][3]["n_blocks"] == 2**12
+
+
+def _feed(book: OnlineStatsBook, values: np.ndarray) -> None:
+    book.update(
+        "GOMC",
+        0,
+        ["#STEP", "DENSITY"],
+        [[str(i), str(v)] for i, v in enumerate(values)],
+        skip=("STEP",),
+    )
+
+
+def test_state_round_trip_resumes_the_same_accumulators():
+    series = _ar1(3000, 0.5, seed=3)
+    whole = OnlineStatsBook(max_lag=16)
+    _feed(whole, series)
+
+    first = OnlineStatsBook(max_lag=16)
+    _feed(first, series[:1234])
+    resumed = OnlineStatsBook(max_lag=16)
+    resumed.load_state(json.loads(json.dumps(first.state())))
+    _feed(resumed, series[1234:])
+
+    assert resumed.get("GOMC", 0, "STEP") is None
+    a = whole.get("GOMC", 0, "DENSITY").summary()
+    b = resumed.get("GOMC", 0, "DENSITY").summary()
+    assert a["n"] == b["n"] == 3000
+    for key in ("mean", "variance", "sem", "tau_int"):
+        assert a[key] == pytest.approx(b[key])
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def _write_cycle_logs(managed_root: Path, cycle: int) -> None:
+    _write(
+        managed_root / "NAMD" / f"{2 * cycle:010d}_a" / "out.dat",
+        "ETITLE: TS POTENTIAL ELECT PRESSURE VOLUME\n"
+        f"ENERGY: 0 -10.0 -2.0 1.0 1000.0\n"
+        f"ENERGY: 5 {-10.0 - cycle} -2.0 1.0 1000.0\n",
+    )
+    _write(
+        managed_root / "GOMC" / f"{2 * cycle + 1:010d}" / "out.dat",
+        "ETITLE: STEP TOTAL TOTAL_ELECT\n"
+        "STITLE: STEP PRESSURE VOLUME TOT_DENSITY\n"
+        "ENER_0: 0 1000.0 500.0\n"
+        "STAT_0: 0 1.5 2000.0 900.0\n"
+        "ENER_0: 5 1000.0 500.0\n"
+        f"STAT_0: 5 {1.5 + cycle} 2000.0 900.0\n",
+    )
+
+
+def test_otf_processor_snapshots_online_stats_every_cycle(tmp_path: Path):
+    cfg = SimpleNamespace(
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        simulation_type="NVT",
+        otf_online_stats=True,
+    )
+    managed = tmp_path / "managed"
+    combined = tmp_path / "combined"
+    for cycle in range(4):
+        _write_cycle_logs(managed, cycle)
+
+    processor = OnTheFlyProcessor(cfg, combined, managed_root=managed)
+    try:
+        for cycle in range(3):
+            processor.process_cycle(2 * cycle, 2 * cycle + 1)
+    finally:
+        processor.close()
+
+    snapshot = json.loads((combined / STATS_SNAPSHOT_NAME).read_text())
+    assert snapshot["cycle"] == 2
+    pressure = snapshot["stats"]["GOMC"]["box_0"]["PRESSURE"]
+    assert pressure["n"] == 3
+    assert pressure["mean"] == pytest.approx(2.5)
+    assert "TS" not in snapshot["stats"]["NAMD"]["box_0"]
+    assert snapshot["stats"]["NAMD"]["box_0"]["POTENTIAL"]["n"] == 6
+
+    # a restart picks the accumulators up where the last commit left them
+    processor = OnTheFlyProcessor(cfg, combined, managed_root=managed)
+    try:
+        processor.process_cycle(6, 7)
+        assert processor.stats.get("GOMC", 0, "PRESSURE").moments.count == 4
+    finally:
+        processor.close()
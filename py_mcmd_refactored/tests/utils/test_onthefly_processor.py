@@ -926,3 +926,104 @@ def test_archive_cycle_logs_uses_unique_names_and_prefers_runtime_logs(
 
     finally:
         processor.close()
+
+
+def _write_cycle_logs(managed_root: Path, cycle: int) -> None:
+    _write_log(
+        managed_root / "NAMD" / f"{2 * cycle:010d}_a" / "out.dat",
+        _namd_log(steps=(0, 5)),
+    )
+    _write_log(
+        managed_root / "GOMC" / f"{2 * cycle + 1:010d}" / "out.dat",
+        _gomc_log(steps=(0,)),
+    )
+
+
+def _combined_snapshot(combined_dir: Path) -> dict[str, str]:
+    return {
+        path.name: path.read_text()
+        for path in sorted(combined_dir.glob("*.txt"))
+    }
+
+
+def test_restart_truncates_partial_cycle_and_resumes_without_duplicates(
+    tmp_path: Path,
+):
+    managed_root = tmp_path / "managed"
+    for cycle in range(2):
+        _write_cycle_logs(managed_root, cycle)
+
+    # Reference: both cycles processed by one uninterrupted processor.
+    reference_dir = tmp_path / "reference"
+    processor = OnTheFlyProcessor(
+        _cfg(tmp_path), reference_dir, managed_root=managed_root
+    )
+    try:
+        processor.process_cycle(0, 1)
+        processor.process_cycle(2, 3)
+    finally:
+        processor.close()
+
+    combined_dir = tmp_path / "combined"
+    processor = OnTheFlyProcessor(
+        _cfg(tmp_path), combined_dir, managed_root=managed_root
+    )
+    processor.process_cycle(0, 1)
+    assert processor.last_committed_cycle == 0
+
+    # Crash in the middle of cycle 1: rows are written, no commit.
+    processor._process_namd_step(2)
+    processor._namd_log_fh.write("ENERGY: partial")
+    processor.close()
+    assert "partial" in (combined_dir / "NAMD_data_box_0.txt").read_text()
+
+    processor = OnTheFlyProcessor(
+        _cfg(tmp_path), combined_dir, managed_root=managed_root
+    )
+    try:
+        assert "partial" not in (
+            (combined_dir / "NAMD_data_box_0.txt").read_text()
+        )
+        processor.process_cycle(2, 3)
+    finally:
+        processor.close()
+
+    assert _combined_snapshot(combined_dir) == _combined_snapshot(reference_dir)
+
+
+def test_rewind_to_cycle_drops_rows_of_rerun_cycles(tmp_path: Path):
+    managed_root = tmp_path / "managed"
+    for cycle in range(3):
+        _write_cycle_logs(managed_root, cycle)
+
+    combined_dir = tmp_path / "combined"
+    processor = OnTheFlyProcessor(
+        _cfg(tmp_path), combined_dir, managed_root=managed_root
+    )
+    try:
+        processor.process_cycle(0, 1)
+        after_cycle_0 = _combined_snapshot(combined_dir)
+        processor.process_cycle(2, 3)
+        processor.process_cycle(4, 5)
+    finally:
+        processor.close()
+
+    processor = OnTheFlyProcessor(
+        _cfg(tmp_path), combined_dir, managed_root=managed_root
+    )
+    try:
+        assert processor.last_committed_cycle == 2
+        assert processor.rewind_to_cycle(1) == 0
+        assert _combined_snapshot(combined_dir) == after_cycle_0
+        # the restored step offset continues from cycle 0
+        processor.process_cycle(2, 3)
+    finally:
+        processor.close()
+
+    gomc_steps = [
+        line.split()[0]
+        for line in (combined_dir / "GOMC_Energies_Stat_box_0.txt")
+        .read_text()
+        .splitlines()[1:]
+    ]
+    assert gomc_steps == ["5", "10"]
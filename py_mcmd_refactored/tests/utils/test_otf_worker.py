@@ -0,0 +1,186 @@
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from utils.background import BackgroundIsolation
+from utils.online_stats import STATS_SNAPSHOT_NAME
+from utils.otf_worker import OtfWorkerProcess
+from utils.subprocess_runner import Command, SubprocessRunner
+from utils.tracing import (
+    install_tracer,
+    trace_span,
+    trace_tags,
+    uninstall_tracer,
+)
+
+# the worker imports these by module name, like a real processor class
+
+
+class FailingProcessor:
+    def __init__(self, cfg, combined_data_dir, *, managed_root=None):
+        self.stats = None
+
+    def process_cycle(self, namd_run_no, gomc_run_no):
+        with trace_span("OTF cycle", "otf"):
+            raise ValueError(f"bad cycle pair {namd_run_no}/{gomc_run_no}")
+
+    def close(self):
+        pass
+
+
+class BusyProcessor:
+    """Parses "logs" in pure Python until the test is done measuring."""
+
+    def __init__(self, cfg, combined_data_dir, *, managed_root=None):
+        self.stop_flag = Path(combined_data_dir) / "stop"
+        self.stats = None
+
+    def process_cycle(self, namd_run_no, gomc_run_no):
+        end = time.monotonic() + 30
+        while not self.stop_flag.exists() and time.monotonic() < end:
+            sum(float(x) for x in "1.0 2.0 3.0 4.0".split())
+
+    def close(self):
+        pass
+
+
+def _write_gomc_log(managed_root: Path, cycle: int) -> None:
+    path = managed_root / "GOMC" / f"{2 * cycle + 1:010d}" / "out.dat"
+    path.parent.mkdir(parents=True)
+    path.write_text(
+        "ETITLE: STEP TOTAL TOTAL_ELECT\n"
+        "STITLE: STEP PRESSURE VOLUME TOT_DENSITY\n"
+        "ENER_0: 5 1000.0 500.0\n"
+        f"STAT_0: 5 {1.5 + cycle} 2000.0 900.0\n"
+    )
+
+
+def test_worker_process_runs_the_processor_and_returns_stats(tmp_path: Path):
+    cfg = SimpleNamespace(
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        simulation_type="NVT",
+        otf_online_stats=True,
+    )
+    managed = tmp_path / "managed"
+    combined = tmp_path / "combined"
+    for cycle in range(2):
+        _write_gomc_log(managed, cycle)
+
+    worker = OtfWorkerProcess(cfg, combined, managed_root=managed)
+    try:
+        worker.set_current_step(0)
+        for cycle in range(2):
+            worker.process_cycle(2 * cycle, 2 * cycle + 1)
+        assert worker.stats.get("GOMC", 0, "PRESSURE").moments.count == 2
+    finally:
+        worker.close()
+    worker.close()  # idempotent
+
+    snapshot = json.loads((combined / STATS_SNAPSHOT_NAME).read_text())
+    assert snapshot["cycle"] == 1
+    with pytest.raises(RuntimeError):
+        worker.process_cycle(4, 5)
+
+
+def test_worker_errors_are_raised_in_the_caller(tmp_path: Path):
+    worker = OtfWorkerProcess(None, tmp_path, factory=FailingProcessor)
+    try:
+        with pytest.raises(ValueError, match="bad cycle pair 0/1"):
+            worker.process_cycle(0, 1)
+    finally:
+        worker.close()
+
+
+def test_worker_spans_appear_in_the_parent_trace(tmp_path: Path):
+    cfg = SimpleNamespace(
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        simulation_type="NVT",
+    )
+    managed = tmp_path / "managed"
+    _write_gomc_log(managed, 0)
+    trace = tmp_path / "trace.json"
+
+    worker = OtfWorkerProcess(cfg, tmp_path / "combined", managed_root=managed)
+    failing = OtfWorkerProcess(None, tmp_path, factory=FailingProcessor)
+    install_tracer(trace)
+    try:
+        with trace_tags(attempt=1):
+            worker.set_current_step(0)
+            worker.process_cycle(0, 1)
+            with pytest.raises(ValueError):
+                failing.process_cycle(2, 3)
+    finally:
+        worker.close()
+        failing.close()
+        uninstall_tracer()
+
+    events = json.loads(trace.read_text())
+    cycles = [e for e in events if e["ph"] == "X" and e["name"] == "OTF cycle"]
+    assert len(cycles) == 2
+    lanes = {
+        e["pid"]: e["args"]["name"]
+        for e in events
+        if e["ph"] == "M" and e["name"] == "process_name"
+    }
+    for span in cycles:
+        assert span["pid"] != os.getpid()
+        assert lanes[span["pid"]] == "OTF worker"
+        assert span["args"]["attempt"] == 1
+    ok, failed = cycles
+    assert ok["args"]["cycle"] == 0
+    assert "bad cycle pair 2/3" in failed["args"]["error"]
+    rows = [e for e in events if e.get("name") == "OTF GOMC rows"]
+    assert rows and ok["ts"] <= rows[0]["ts"] <= ok["ts"] + ok["dur"]
+
+
+def _pump_seconds(tmp_path: Path) -> float:
+    # ~20 MB of engine output through the Python (non zero-copy) pump
+    script = (
+        "import sys\n"
+        "line = b'x' * 99 + b'\\n'\n"
+        "for _ in range(200000): sys.stdout.buffer.write(line)\n"
+    )
+    cmd = Command(
+        argv=[sys.executable, "-c", script],
+        cwd=tmp_path / "run",
+        stdout_path=tmp_path / "run" / "runtime.dat",
+        stdout_disk_path=tmp_path / "run" / "out.dat",
+    )
+    runner = SubprocessRunner(zero_copy=False)
+    start = time.perf_counter()
+    assert runner.wait(runner.start(cmd)) == 0
+    return time.perf_counter() - start
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux")
+def test_busy_otf_worker_does_not_delay_the_stdout_pump(tmp_path: Path):
+    idle = min(_pump_seconds(tmp_path) for _ in range(2))
+
+    worker = OtfWorkerProcess(
+        None,
+        tmp_path,
+        isolation=BackgroundIsolation(nice=19),
+        factory=BusyProcessor,
+    )
+    # the orchestrator waits for the worker on a thread, as in the manager
+    cycle = threading.Thread(target=worker.process_cycle, args=(0, 1))
+    try:
+        cycle.start()
+        time.sleep(0.2)
+        busy = _pump_seconds(tmp_path)
+        assert cycle.is_alive()  # the worker was busy throughout
+    finally:
+        (tmp_path / "stop").touch()
+        cycle.join()
+        worker.close()
+
+    # a busy worker thread holds the interpreter lock against the pump and
+    # roughly triples this time; the worker process leaves it alone
+    assert busy < 1.6 * idle + 0.15
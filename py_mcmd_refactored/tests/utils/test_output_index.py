@@ -0,0 +1,153 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import cli.query as query_cli
+from utils.onthefly_processor import OnTheFlyProcessor
+from utils.output_index import CycleOffsetIndex, RowFormat
+
+
+def _cfg(tmp_path: Path) -> SimpleNamespace:
+    return SimpleNamespace(
+        path_namd_runs=str(tmp_path / "NAMD"),
+        path_gomc_runs=str(tmp_path / "GOMC"),
+        simulation_type="NVT",
+    )
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def _write_cycle_logs(managed_root: Path, cycle: int) -> None:
+    _write(
+        managed_root / "NAMD" / f"{2 * cycle:010d}_a" / "out.dat",
+        "ETITLE: TS POTENTIAL ELECT PRESSURE VOLUME\n"
+        "ENERGY: 0 -10.0 -2.0 1.0 1000.0\n"
+        "ENERGY: 5 -10.0 -2.0 1.0 1000.0\n",
+    )
+    _write(
+        managed_root / "GOMC" / f"{2 * cycle + 1:010d}" / "out.dat",
+        "ETITLE: STEP TOTAL TOTAL_ELECT\n"
+        "STITLE: STEP PRESSURE VOLUME TOT_DENSITY\n"
+        "ENER_0: 0 1000.0 500.0\n"
+        "STAT_0: 0 1.5 2000.0 900.0\n"
+        "ENER_0: 5 1000.0 500.0\n"
+        "STAT_0: 5 1.5 2000.0 900.0\n",
+    )
+
+
+def _run_cycles(tmp_path: Path, n: int) -> Path:
+    managed_root = tmp_path / "managed"
+    combined_dir = tmp_path / "combined"
+    for cycle in range(n):
+        _write_cycle_logs(managed_root, cycle)
+
+    processor = OnTheFlyProcessor(
+        _cfg(tmp_path), combined_dir, managed_root=managed_root
+    )
+    try:
+        for cycle in range(n):
+            processor.process_cycle(2 * cycle, 2 * cycle + 1)
+    finally:
+        processor.close()
+    return combined_dir
+
+
+def test_otf_processor_indexes_each_committed_cycle(tmp_path: Path):
+    combined_dir = _run_cycles(tmp_path, 4)
+
+    index = CycleOffsetIndex(combined_dir / "GOMC_Energies_Stat_box_0.txt")
+    entries = index.entries()
+    assert entries["cycle"].tolist() == [0, 1, 2, 3]
+    assert entries["n_rows"].tolist() == [1, 1, 1, 1]
+    assert index.header().startswith("#STEP")
+
+    # every cycle advances the step by 10 (NAMD 5 + GOMC 5)
+    assert [r.split()[0] for r in index.read_cycles(1, 2)] == ["20", "30"]
+    assert [r.split()[0] for r in index.read_steps(15, 30)] == ["20", "30"]
+
+    namd = CycleOffsetIndex(combined_dir / "NAMD_data_box_0.txt")
+    rows = namd.read_cycles(3, 3)
+    assert [r.split()[1] for r in rows] == ["30", "35"]
+    assert namd.entry_for_cycle(3).first_step == 30
+    assert namd.entry_for_cycle(9) is None
+
+
+def test_index_rolls_back_with_the_outputs_on_restart(tmp_path: Path):
+    combined_dir = _run_cycles(tmp_path, 3)
+    processor = OnTheFlyProcessor(
+        _cfg(tmp_path),
+        combined_dir,
+        managed_root=tmp_path / "managed",
+    )
+    try:
+        processor.rewind_to_cycle(1)
+    finally:
+        processor.close()
+
+    for name in ("combined_NAMD_GOMC_data_box_0.txt", "NAMD_data_box_0.txt"):
+        index = CycleOffsetIndex(combined_dir / name)
+        assert index.entries()["cycle"].tolist() == [0]
+
+
+def test_build_indexes_replayed_output(tmp_path: Path):
+    data = tmp_path / "GOMC_Energies_Stat_box_0.txt"
+    lines = ["#STEP\tPRESSURE\n"]
+    lines += [f"{step}\t1.0\n" for step in range(0, 100, 5)]
+    data.write_text("".join(lines))
+
+    index = CycleOffsetIndex.build(data, steps_per_cycle=20)
+    entries = index.entries()
+    assert entries["cycle"].tolist() == [0, 1, 2, 3, 4]
+    assert entries["n_rows"].tolist() == [4] * 5
+
+    assert [r.split()[0] for r in index.read_cycles(2, 2)] == [
+        "40",
+        "45",
+        "50",
+        "55",
+    ]
+    assert [r.split()[0] for r in index.read_steps(52, 61)] == ["55", "60"]
+    assert index.read_cycles(7, 9) == []
+
+
+def test_row_format_skips_headers_and_prefix_mismatches():
+    fmt = RowFormat(step_field=1, prefixes=("ENER_0:",))
+    assert fmt.step_of("ENER_0: 15 1.0") == 15
+    assert fmt.step_of("ENER_1: 15 1.0") is None
+    assert fmt.step_of("ETITLE: STEP TOTAL") is None
+
+
+def test_query_cli_prints_header_and_selected_rows(tmp_path: Path, capsys):
+    combined_dir = _run_cycles(tmp_path, 3)
+    target = combined_dir / "combined_NAMD_GOMC_data_box_0.txt"
+
+    assert query_cli.main([str(target), "--cycles", "2", "2"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0].startswith("#ENGINE")
+    assert [line.split()[:2] for line in out[1:]] == [
+        ["NAMD", "20"],
+        ["NAMD", "25"],
+        ["GOMC", "30"],
+    ]
+
+    missing = tmp_path / "other.txt"
+    missing.write_text("0\t1\n")
+    assert query_cli.main([str(missing), "--steps", "0", "1"]) == 1
+    assert (
+        query_cli.main(
+            [
+                str(missing),
+                "--build",
+                "--steps-per-cycle",
+                "10",
+                "--steps",
+                "0",
+                "1",
+                "--no-header",
+            ]
+        )
+        == 0
+    )
+    assert capsys.readouterr().out.splitlines()[-1] == "0\t1"
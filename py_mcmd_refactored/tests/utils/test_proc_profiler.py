@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from utils.proc_profiler import (
+    ResourceProfileLog,
+    ResourceSampler,
+    allocated_cores,
+)
+from utils.procfs import read_status, thread_cpu_seconds
+from utils.subprocess_runner import Command, SubprocessRunner
+from utils.watchdog import EngineWatchdog
+
+needs_proc = pytest.mark.skipif(
+    not Path("/proc/self/stat").exists(), reason="needs /proc"
+)
+
+# keeps one core busy and holds ~20 MB
+_BUSY = (
+    "import time\n"
+    "data = bytearray(20 * 2**20)\n"
+    "end = time.time() + 0.4\n"
+    "while time.time() < end:\n"
+    "    pass\n"
+)
+
+
+def test_allocated_cores_reads_charm_argument():
+    assert allocated_cores(["namd2", "+p8", "in.conf"]) == 8
+    assert allocated_cores(["GOMC_CPU_NVT", "+p4", "in.conf"]) == 4
+    assert allocated_cores(["namd2", "in.conf"]) is None
+
+
+@needs_proc
+def test_procfs_readers_see_this_process():
+    status = read_status(os.getpid())
+    assert status["VmRSS"] > 0
+    assert status["Threads"] >= 1
+    assert os.getpid() in thread_cpu_seconds(os.getpid())
+    assert read_status(2**22 + 12345) == {}
+
+
+@needs_proc
+def test_since_start_leaves_out_earlier_cpu_time():
+    end = time.process_time() + 0.3
+    while time.process_time() < end:
+        pass
+
+    whole = ResourceSampler(os.getpid(), interval_s=60).start()
+    segment = ResourceSampler(os.getpid(), interval_s=60, since_start=True)
+    segment.start()
+    assert whole.stop().cpu_s >= 0.3
+    assert segment.stop().cpu_s < 0.1
+
+
+@needs_proc
+def test_runner_profiles_a_segment(tmp_path: Path):
+    runner = SubprocessRunner(profile_interval_s=0.05)
+    cmd = Command(
+        argv=[sys.executable, "-c", _BUSY, "+p2"],
+        cwd=tmp_path / "00000001_a",
+        stdout_path=tmp_path / "00000001_a" / "out.dat",
+    )
+    assert runner.run_and_wait(cmd) == 0
+
+    (profile,) = runner.pop_profiles()
+    assert runner.pop_profiles() == []
+    assert profile.allocated_cores == 2
+    assert profile.samples >= 2
+    assert profile.cpu_s > 0.2
+    assert 0 < profile.core_efficiency <= 1
+    assert profile.peak_rss_bytes > 20 * 2**20
+    assert profile.busy_threads == 1
+
+
+@needs_proc
+@pytest.mark.parametrize("watchdog", [False, True])
+def test_final_sample_is_taken_before_reaping(tmp_path: Path, watchdog):
+    # the interval outlasts the process: only the start and the pre-reap
+    # samples can see its CPU time
+    runner = SubprocessRunner(
+        profile_interval_s=60,
+        watchdog=(
+            EngineWatchdog(mode="flag", check_interval_s=0.05)
+            if watchdog
+            else None
+        ),
+    )
+    cmd = Command(
+        argv=[sys.executable, "-c", _BUSY],  # no +pN, as under mpirun
+        cwd=tmp_path / "00000001_a",
+        stdout_path=tmp_path / "00000001_a" / "out.dat",
+        allocated_cores=3,
+    )
+    assert runner.run_and_wait(cmd) == 0
+
+    (profile,) = runner.pop_profiles()
+    assert profile.samples == 2
+    assert profile.cpu_s > 0.2
+    # taken from the launcher, not from a +pN on the command line
+    assert profile.allocated_cores == 3
+
+
+def test_sampler_without_the_process_reports_no_usage():
+    sampler = ResourceSampler(2**22 + 12345, argv=["namd2", "+p4"])
+    sampler.sample()
+    profile = sampler.profile(1.0)
+    assert profile.samples == 0
+    assert profile.cpu_s == 0
+    assert profile.core_efficiency == 0
+
+
+def test_profile_log_roundtrip(tmp_path: Path):
+    log = ResourceProfileLog(tmp_path / "logs" / "RESOURCE_PROFILE.jsonl")
+    assert log.records() == []
+    profile = ResourceSampler(1, argv=["namd2", "+p4"]).profile(2.0)
+    log.append(profile, cycle=3, run_no=6, engine="NAMD", box=1)
+    log.append(profile, cycle=3, run_no=7, engine="GOMC")
+
+    namd, gomc = log.records()
+    assert (namd["cycle"], namd["engine"], namd["box"]) == (3, "NAMD", 1)
+    assert namd["allocated_cores"] == 4
+    assert (gomc["run_no"], gomc["box"]) == (7, None)
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from utils.psf import read_psf, select_atoms, write_reduced_psf
+
+_ATOMS = [
+    ("PROT", "1", "ALA", "N", "NH1", -0.47, 14.007),
+    ("PROT", "1", "ALA", "CA", "CT1", 0.07, 12.011),
+    ("PROT", "1", "ALA", "C", "C", 0.51, 12.011),
+    ("WAT", "2", "TIP3", "OH2", "OT", -0.834, 15.999),
+    ("WAT", "2", "TIP3", "H1", "HT", 0.417, 1.008),
+    ("WAT", "2", "TIP3", "H2", "HT", 0.417, 1.008),
+]
+
+
+def write_psf(path: Path) -> None:
+    lines = ["PSF", "", "       1 !NTITLE", " REMARKS test", ""]
+    lines.append(f"{len(_ATOMS):8d} !NATOM")
+    for i, (seg, resid, res, name, typ, q, m) in enumerate(_ATOMS, 1):
+        lines.append(
+            f"{i:8d} {seg:<4s} {resid:<4s} {res:<4s} {name:<4s} {typ:<4s} "
+            f"{q:10.6f} {m:13.4f}           0"
+        )
+    lines += ["", "       4 !NBOND: bonds"]
+    lines += [
+        "       1       2       2       3       4       5       4       6"
+    ]
+    lines += ["", "       2 !NTHETA: angles"]
+    lines += ["       1       2       3       5       4       6", ""]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_read_psf_parses_atoms_and_bonded_terms(tmp_path: Path):
+    path = tmp_path / "sys.psf"
+    write_psf(path)
+
+    topology = read_psf(path)
+    assert topology.n_atoms == 6
+    assert topology.segids.tolist() == ["PROT"] * 3 + ["WAT"] * 3
+    assert topology.bonded["!NBOND"].tolist() == [
+        [1, 2],
+        [2, 3],
+        [4, 5],
+        [4, 6],
+    ]
+
+    bad = tmp_path / "bad.psf"
+    bad.write_text("not a psf\n")
+    with pytest.raises(ValueError):
+        read_psf(bad)
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ({"exclude_resnames": ["TIP3"]}, [0, 1, 2]),
+        ({"segids": ["WAT"]}, [3, 4, 5]),
+        ({"index_ranges": [[0, 0]], "resnames": ["TIP3"]}, [0, 3, 4, 5]),
+        ({"index_ranges": [[1, 4]], "exclude_segids": ["WAT"]}, [1, 2]),
+        ({}, [0, 1, 2, 3, 4, 5]),
+    ],
+)
+def test_select_atoms(tmp_path: Path, spec, expected):
+    path = tmp_path / "sys.psf"
+    write_psf(path)
+    assert select_atoms(read_psf(path), spec).tolist() == expected
+
+
+def test_reduced_psf_renumbers_atoms_and_keeps_internal_terms(tmp_path: Path):
+    path = tmp_path / "sys.psf"
+    write_psf(path)
+    topology = read_psf(path)
+
+    reduced = read_psf(
+        write_reduced_psf(topology, np.array([1, 2, 3]), tmp_path / "r.psf")
+    )
+    assert reduced.n_atoms == 3
+    assert [line.split()[0] for line in reduced.atom_lines] == ["1", "2", "3"]
+    assert [line.split()[4] for line in reduced.atom_lines] == [
+        "CA",
+        "C",
+        "OH2",
+    ]
+    # only the CA-C bond lies inside the selection
+    assert reduced.bonded["!NBOND"].tolist() == [[1, 2]]
+    assert reduced.bonded["!NTHETA"].shape == (0, 3)
+    assert "REMARKS reduced by py-MCMD" in reduced.titles[-1]
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import multiprocessing
+import sys
+import threading
+from pathlib import Path
+
+from utils.shm_ring import ShmRingReader, ShmRingWriter
+from utils.subprocess_runner import Command, SubprocessRunner
+
+
+def _chunks(n: int) -> list[bytes]:
+    return [
+        f"step {i:06d} energy {i * 0.5:.3f}\n".encode() * 7 for i in range(n)
+    ]
+
+
+def _drain(reader: ShmRingReader) -> bytes:
+    try:
+        return b"".join(reader)
+    finally:
+        reader.close()
+
+
+def test_round_trip_in_order_with_a_concurrent_reader(tmp_path: Path):
+    writer = ShmRingWriter(tmp_path / "spill.bin", capacity=4096)
+    reader = writer.reader()
+    got = []
+    t = threading.Thread(target=lambda: got.append(_drain(reader)))
+    t.start()
+
+    chunks = _chunks(500)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    t.join(timeout=10)
+    writer.unlink()
+
+    assert got == [b"".join(chunks)]
+
+
+def test_overflow_spills_to_file_without_loss(tmp_path: Path):
+    # nobody reads while the writer runs: it must neither block nor drop
+    writer = ShmRingWriter(tmp_path / "spill.bin", capacity=1024, max_wait_s=0)
+    chunks = _chunks(200) + [b"x" * 5000]  # larger than the ring itself
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+
+    assert writer.spilled_bytes > 0
+    assert _drain(writer.reader()) == b"".join(chunks)
+    writer.unlink()
+
+
+def test_read_times_out_while_the_stream_is_open(tmp_path: Path):
+    writer = ShmRingWriter(tmp_path / "spill.bin", capacity=1024)
+    reader = writer.reader()
+    assert reader.read(timeout=0.01) is None
+    writer.write(b"abc")
+    assert reader.read(timeout=0.01) == b"abc"
+    writer.close()
+    assert reader.read() == b""
+    reader.close()
+    writer.unlink()
+
+
+def _child_reader(spec, out_path: str) -> None:
+    Path(out_path).write_bytes(_drain(ShmRingReader(spec)))
+
+
+def test_out_of_process_reader(tmp_path: Path):
+    ctx = multiprocessing.get_context("spawn")
+    writer = ShmRingWriter(tmp_path / "spill.bin", capacity=2048, ctx=ctx)
+    out = tmp_path / "child.out"
+    child = ctx.Process(target=_child_reader, args=(writer.spec, str(out)))
+    child.start()
+
+    chunks = _chunks(300)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    child.join(timeout=60)
+    writer.unlink()
+
+    assert child.exitcode == 0
+    assert out.read_bytes() == b"".join(chunks)
+
+
+def test_runner_hands_engine_stdout_to_the_ring(tmp_path: Path):
+    writer = ShmRingWriter(tmp_path / "spill.bin", capacity=8192)
+    reader = writer.reader()
+    got = []
+    t = threading.Thread(target=lambda: got.append(_drain(reader)))
+    t.start()
+
+    script = "for i in range(20000): print('ENERGY:', i)"
+    cmd = Command(
+        argv=[sys.executable, "-c", script],
+        cwd=tmp_path,
+        stdout_disk_path=tmp_path / "out.dat",
+        stdout_ring=writer,
+    )
+    runner = SubprocessRunner()
+    assert runner.wait(runner.start(cmd)) == 0
+    t.join(timeout=10)
+    writer.unlink()
+
+    expected = "".join(f"ENERGY: {i}\n" for i in range(20000)).encode()
+    assert got == [expected]
+    assert (tmp_path / "out.dat").read_bytes() == expected
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import errno
+import os
+import threading
+from pathlib import Path
+
+import pytest
+from utils.splice_pump import pump_to_fifo, pump_to_files, zero_copy_available
+
+from utils import splice_pump
+
+pytestmark = pytest.mark.skipif(
+    not zero_copy_available(), reason="needs Linux splice/tee"
+)
+
+PAYLOAD = b"".join(
+    b"GOMC step %08d energy %.6f\n" % (i, i * 0.1) for i in range(50000)
+)
+
+
+def _feed(data: bytes) -> int:
+    r, w = os.pipe()
+
+    def writer():
+        view = memoryview(data)
+        while view:
+            view = view[os.write(w, view[:100000]) :]
+        os.close(w)
+
+    threading.Thread(target=writer, daemon=True).start()
+    return r
+
+
+def _pump(tmp_path: Path, mirror: bool) -> tuple[bytes, bytes]:
+    src = _feed(PAYLOAD)
+    with (tmp_path / "a").open("wb") as a, (tmp_path / "b").open("wb") as b:
+        pump_to_files(src, a.fileno(), b.fileno() if mirror else None)
+    os.close(src)
+    return (tmp_path / "a").read_bytes(), (tmp_path / "b").read_bytes()
+
+
+def test_pump_duplicates_into_primary_and_mirror(tmp_path: Path):
+    assert _pump(tmp_path, mirror=True) == (PAYLOAD, PAYLOAD)
+    assert _pump(tmp_path, mirror=False) == (PAYLOAD, b"")
+
+
+def test_falls_back_to_copying_when_splice_is_refused(
+    monkeypatch, tmp_path: Path
+):
+    real_splice = os.splice
+    calls = []
+
+    def splice(src, dst, count, *args):
+        calls.append(count)
+        if len(calls) > 3:
+            raise OSError(errno.EINVAL, "no splice for this file")
+        return real_splice(src, dst, count, *args)
+
+    monkeypatch.setattr(splice_pump.os, "splice", splice)
+    assert _pump(tmp_path, mirror=True) == (PAYLOAD, PAYLOAD)
+
+
+def test_stalled_fifo_is_dropped_and_the_mirror_gets_everything(
+    tmp_path: Path,
+):
+    fifo_path = tmp_path / "stdout.pipe"
+    os.mkfifo(fifo_path)
+    fifo = os.open(fifo_path, os.O_RDWR | os.O_NONBLOCK)
+    src = _feed(PAYLOAD)
+    try:
+        with (tmp_path / "mirror").open("wb") as mirror:
+            assert not pump_to_fifo(src, fifo, mirror.fileno(), stall_s=0.05)
+        # what the FIFO did take is the start of the stream
+        head = os.read(fifo, len(PAYLOAD))
+    finally:
+        os.close(src)
+        os.close(fifo)
+    assert (tmp_path / "mirror").read_bytes() == PAYLOAD
+    assert head and PAYLOAD.startswith(head)
@@ -0,0 +1,62 @@
+"""splice/tee stdout pump against the read/write copy loop.
+
+Both pumps drain the same stream (a child writing GOMC-style console
+lines) into a runtime file and a disk mirror, in this thread, so
+``time.thread_time`` is the CPU the pump itself costs. Run with ``-s`` to
+see the numbers; PY_MCMD_PUMP_BENCH_MB sets the stream size.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from utils.splice_pump import zero_copy_available
+from utils.subprocess_runner import SubprocessRunner
+
+BENCH_MB = int(os.environ.get("PY_MCMD_PUMP_BENCH_MB", 64))
+
+PRODUCER = """\
+import os, sys
+line = b"STEP 123456 TOTAL_ENERGY -1234.567890 PRESSURE 1.0133 DENSITY 0.99\\n"
+block = line * (65536 // len(line))
+for _ in range(int(sys.argv[1]) * (1 << 20) // len(block)):
+    os.write(1, block)
+"""
+
+
+def _run_pump(tmp_path: Path, zero_copy: bool) -> tuple[float, float]:
+    runner = SubprocessRunner(zero_copy=zero_copy)
+    p = subprocess.Popen(
+        [sys.executable, "-c", PRODUCER, str(BENCH_MB)],
+        stdout=subprocess.PIPE,
+        bufsize=0,
+    )
+    wall, cpu = time.perf_counter(), time.thread_time()
+    runner._pump_stdout(p.stdout, tmp_path / "out.dat", tmp_path / "disk.dat")
+    wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+    assert p.wait() == 0
+    return wall, cpu
+
+
+@pytest.mark.skipif(not zero_copy_available(), reason="needs splice/tee")
+def test_zero_copy_pump_against_copy_loop(tmp_path: Path):
+    results = {}
+    for name, zero_copy in (("copy loop", False), ("splice/tee", True)):
+        run_dir = tmp_path / name.replace("/", "_").replace(" ", "_")
+        run_dir.mkdir()
+        results[name] = _run_pump(run_dir, zero_copy)
+        out = (run_dir / "out.dat").read_bytes()
+        assert len(out) > BENCH_MB * (1 << 20) * 0.99
+        assert (run_dir / "disk.dat").read_bytes() == out
+
+    print(f"\nstdout pump, {BENCH_MB} MiB into runtime file + disk mirror")
+    for name, (wall, cpu) in results.items():
+        print(
+            f"  {name:<11} wall {wall:6.3f} s  pump CPU {cpu:6.3f} s"
+            f"  ({BENCH_MB / max(cpu, 1e-9):8.0f} MiB per CPU-second)"
+        )
@@ -3,9 +3,14 @@ from __future__ import annotations
 import os
 import stat
 import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
 
+import pytest
 from utils.subprocess_runner import (
+    FIFO_TRUNCATED,
     Command,
     DryRunSubprocessRunner,
     SubprocessRunner,
@@ -87,3 +92,73 @@ def test_dry_run_fifo_mode_keeps_fifo_and_writes_disk_mirror(tmp_path: Path):
     assert disk_path.exists()
     assert "dry_run" in disk_path.read_text()
     assert stat.S_ISFIFO(fifo_path.stat().st_mode)
+
+
+def test_fifo_without_reader_does_not_stall_the_engine(
+    monkeypatch, tmp_path: Path
+):
+    monkeypatch.setattr("utils.subprocess_runner.FIFO_STALL_S", 0.05)
+    fifo_path = tmp_path / "stdout.pipe"
+    os.mkfifo(fifo_path)
+    disk_path = tmp_path / "out.dat"
+
+    # far more than a pipe buffer, and nobody reads the FIFO
+    script = "for _ in range(1000): print('x' * 1000)"
+    cmd = Command(
+        argv=[sys.executable, "-c", script],
+        cwd=tmp_path,
+        stdout_path=tmp_path / "runtime.dat",
+        stdout_fifo_path=fifo_path,
+        stdout_disk_path=disk_path,
+    )
+    runner = SubprocessRunner()
+    assert runner.wait(runner.start(cmd)) == 0
+    assert disk_path.read_text() == ("x" * 1000 + "\n") * 1000
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_stalled_fifo_reader_sees_whole_lines_then_a_marker(
+    monkeypatch, tmp_path: Path, zero_copy
+):
+    monkeypatch.setattr("utils.subprocess_runner.FIFO_STALL_S", 0.1)
+    fifo_path = tmp_path / "stdout.pipe"
+    os.mkfifo(fifo_path)
+    line = "x" * 999 + "\n"
+
+    # fills the FIFO, then keeps printing after the reader came back
+    script = (
+        "import sys, time\n"
+        "for _ in range(300): print('x' * 999)\n"
+        "sys.stdout.flush(); time.sleep(1.0)\n"
+        "for _ in range(300): print('x' * 999)\n"
+    )
+    received = []
+
+    def _read_late():
+        with open(fifo_path, "rb") as fh:
+            time.sleep(0.4)
+            received.append(fh.read())
+
+    reader = threading.Thread(target=_read_late)
+    reader.start()
+    cmd = Command(
+        argv=[sys.executable, "-c", script],
+        cwd=tmp_path,
+        stdout_path=tmp_path / "runtime.dat",
+        stdout_fifo_path=fifo_path,
+        stdout_disk_path=tmp_path / "out.dat",
+    )
+    runner = SubprocessRunner(zero_copy=zero_copy)
+    assert runner.wait(runner.start(cmd)) == 0
+    reader.join(timeout=10)
+
+    assert (tmp_path / "out.dat").read_text() == line * 600
+    (data,) = received
+    assert data.endswith(FIFO_TRUNCATED)
+    head = data[: -len(FIFO_TRUNCATED)]
+    assert 0 < len(head) < len(line) * 600
+    if runner.zero_copy:
+        # tee stops wherever the FIFO filled up
+        assert (line * 600).encode().startswith(head)
+    else:
+        assert head == (line * (len(head) // len(line))).encode()
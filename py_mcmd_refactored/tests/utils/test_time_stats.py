@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from utils.time_stats import P2Quantile, TimeStatsRecorder
+
+
+@pytest.mark.parametrize("p", [0.5, 0.95])
+def test_p2_quantile_tracks_numpy_quantile(p):
+    rng = np.random.default_rng(7)
+    sample = rng.exponential(scale=2.0, size=20_000)
+
+    est = P2Quantile(p)
+    for x in sample:
+        est.add(x)
+
+    assert est.count == sample.size
+    assert est.value() == pytest.approx(np.quantile(sample, p), rel=0.02)
+
+
+def test_p2_quantile_is_exact_for_small_samples():
+    est = P2Quantile(0.5)
+    assert est.value() is None
+    for x in (5.0, 1.0, 3.0):
+        est.add(x)
+    assert est.value() == 3.0
+
+    with pytest.raises(ValueError):
+        P2Quantile(1.0)
+
+
+def test_recorder_streams_lines_and_keeps_bounded_tail(tmp_path: Path):
+    path = tmp_path / "logs" / "TIME_STATS.txt"
+    rec = TimeStatsRecorder(path, keep_recent=3)
+    rec.write_header()
+    for cycle in range(10):
+        rec.record(cycle, 1.0, 2.0, 0.5, 3.5 + cycle)
+    rec.close()
+
+    lines = rec.lines
+    assert len(lines) == 4
+    assert "TIME_STATS_TITLE" in lines[0]
+    assert lines[1].startswith("TIME_STATS_DATA:\t7\t\t")
+
+    on_disk = path.read_text().splitlines()
+    assert sum(ln.startswith("TIME_STATS_DATA") for ln in on_disk) == 10
+
+    total = rec.summary()["Total_time_s"]
+    assert total["count"] == 10
+    assert total["mean"] == pytest.approx(8.0)
+    assert total["max"] == pytest.approx(12.5)
+    assert "cycles=10" in rec.summary_line()
@@ -0,0 +1,148 @@
+import json
+from pathlib import Path
+
+import cli.main as cli_main
+import cli.timing as timing_cli
+import pytest
+from utils.time_stats import TimeStatsRecorder
+from utils.timing_analysis import (
+    CycleTiming,
+    analyze,
+    forecast_disk,
+    forecast_remaining,
+    outlier_indices,
+    read_time_stats,
+)
+
+
+def _write_stats(path: Path, rows):
+    rec = TimeStatsRecorder(path)
+    rec.write_header()
+    for row in rows:
+        rec.record(*row)
+    return rec
+
+
+def _rows(cycles, gomc=lambda c: 2.0):
+    return [(c, 10.0, gomc(c), 0.1, 12.1 + gomc(c) - 2.0) for c in cycles]
+
+
+def test_recorder_lines_are_readable_mid_run(tmp_path: Path):
+    rec = _write_stats(
+        tmp_path / "TIME_STATS_started_at_cycle_No_0.txt", _rows(range(3))
+    )
+    try:
+        timings = read_time_stats(tmp_path)
+    finally:
+        rec.close()
+    assert [t.cycle for t in timings] == [0, 1, 2]
+    assert timings[1].total_s == pytest.approx(12.1)
+
+
+def test_restart_files_are_merged_later_start_wins(tmp_path: Path):
+    _write_stats(
+        tmp_path / "TIME_STATS_started_at_cycle_No_0.txt", _rows(range(5))
+    ).close()
+    _write_stats(
+        tmp_path / "TIME_STATS_started_at_cycle_No_3.txt",
+        _rows(range(3, 6), gomc=lambda c: 4.0),
+    ).close()
+
+    timings = read_time_stats(tmp_path)
+    assert [t.cycle for t in timings] == [0, 1, 2, 3, 4, 5]
+    assert [t.gomc_s for t in timings] == [2.0, 2.0, 2.0, 4.0, 4.0, 4.0]
+
+
+def test_legacy_log_fallback(tmp_path: Path):
+    (tmp_path / "NAMD_GOMC_started_at_cycle_No_0.log").write_text(
+        "INFO start\n"
+        "TIME_STATS_DATA:\t0\t\t1.0\t\t2.0\t\t0.5\t\t3.5\n"
+        "TIME_STATS_DATA:\tbroken\n"
+    )
+    timings = read_time_stats(tmp_path)
+    assert [(t.cycle, t.total_s) for t in timings] == [(0, 3.5)]
+
+
+def test_outliers_and_trends():
+    values = [1.0, 1.1, 0.9, 1.0, 1.05, 9.0, 0.95]
+    assert outlier_indices(values) == [5]
+    assert outlier_indices([1.0] * 10) == []
+
+    timings = [
+        CycleTiming(c, 10.0, 2.0 + 0.5 * c, 0.1, 12.1 + 0.5 * c)
+        for c in range(20)
+    ]
+    report = analyze(
+        timings,
+        total_cycles=30,
+        molecule_counts={c: 100.0 + 10 * c for c in range(20)},
+    )
+    assert report["trends"]["gomc_s"]["slope"] == pytest.approx(0.5)
+    assert report["trends"]["namd_s"]["slope"] == pytest.approx(0.0)
+    assert report["gomc_vs_molecules"]["slope"] == pytest.approx(0.05)
+    assert report["gomc_vs_molecules"]["r"] == pytest.approx(1.0)
+    assert report["python_overhead_fraction"] == pytest.approx(
+        2.0 / sum(t.total_s for t in timings)
+    )
+    assert report["missing_cycles"] == []
+
+
+def test_forecast_uses_recent_window_and_trend():
+    # cycle 0 (minimization) is slow and must not bias the forecast
+    timings = [CycleTiming(0, 100.0, 2.0, 0.1, 102.1)] + [
+        CycleTiming(c, 8.0, float(c), 0.0, 8.0 + c) for c in range(1, 11)
+    ]
+    fc = forecast_remaining(timings, 13, window=5)
+    assert (fc["cycles_done"], fc["remaining_cycles"], fc["window"]) == (
+        11,
+        2,
+        5,
+    )
+    assert fc["per_cycle_s"] == pytest.approx(16.0)
+    assert fc["remaining_s"] == pytest.approx(32.0)
+    # linear growth continues: cycles 11 and 12 take 19 s and 20 s
+    assert fc["remaining_s_trend"] == pytest.approx(39.0)
+
+    done = forecast_remaining(timings, 5)
+    assert done["remaining_cycles"] == 0 and done["remaining_s"] == 0
+
+    disk = forecast_disk(1000, 10, 40)
+    assert (disk["bytes_per_cycle"], disk["final_bytes"]) == (100, 4000)
+    assert forecast_disk(0, 0, 40)["final_bytes"] is None
+
+
+def test_timing_cli_text_and_json(tmp_path: Path, capsys):
+    logs = tmp_path / "logs"
+    _write_stats(
+        logs / "TIME_STATS_started_at_cycle_No_0.txt",
+        _rows(range(10), gomc=lambda c: 30.0 if c == 6 else 2.0),
+    ).close()
+
+    assert (
+        timing_cli.main(["--log-dir", str(logs), "--total-cycles", "20"]) == 0
+    )
+    out = capsys.readouterr().out
+    assert "Cycles 0..9 (10 recorded, 0 missing)" in out
+    assert "Outlier cycles: GOMC_time_s: 6; Total_time_s: 6" in out
+    assert "Forecast: 10 of 20 cycles left" in out
+    assert "Disk:" in out
+
+    assert (
+        timing_cli.main(
+            ["--log-dir", str(logs), "--total-cycles", "20", "--json"]
+        )
+        == 0
+    )
+    report = json.loads(capsys.readouterr().out)
+    assert report["forecast"]["remaining_s"] == pytest.approx(121.0)
+    assert report["disk"]["current_bytes"] > 0
+
+
+def test_timing_subcommand_dispatch(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setattr(
+        "sys.argv", ["py-mcmd", "timing", "--log-dir", str(tmp_path)]
+    )
+    with pytest.raises(SystemExit) as exc:
+        cli_main.main()
+    assert exc.value.code == 1
+    assert "No TIME_STATS data found." in capsys.readouterr().out
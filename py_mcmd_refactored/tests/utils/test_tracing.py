@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from utils.subprocess_runner import Command, SubprocessRunner
+from utils.tracing import (
+    active_tracer,
+    install_tracer,
+    record_span,
+    trace_instant,
+    trace_span,
+    trace_tags,
+    uninstall_tracer,
+)
+
+
+@pytest.fixture
+def trace_file(tmp_path: Path):
+    path = tmp_path / "trace.json"
+    install_tracer(path)
+    yield path
+    uninstall_tracer()
+
+
+def _spans(path: Path) -> list[dict]:
+    return [e for e in json.loads(path.read_text()) if e["ph"] == "X"]
+
+
+def test_helpers_do_nothing_without_a_writer():
+    assert active_tracer() is None
+    with trace_tags(cycle=1), trace_span("noop"):
+        trace_instant("noop")
+    record_span("noop", "test", 0, 10, pid=123)
+
+
+def test_spans_carry_tags_and_thread_lanes(trace_file: Path):
+    with trace_tags(cycle=2, run_no=4):
+        with trace_span("outer", "test", box=0):
+            with trace_span("inner", "test"):
+                pass
+
+    def _worker():
+        with trace_span("worker", "test", cycle=1):
+            pass
+
+    thread = threading.Thread(target=_worker, name="otf_cycle_1")
+    thread.start()
+    thread.join()
+    uninstall_tracer()
+
+    events = json.loads(trace_file.read_text())
+    inner, outer, worker = _spans(trace_file)
+    assert outer["args"] == {"cycle": 2, "run_no": 4, "box": 0}
+    assert inner["args"] == {"cycle": 2, "run_no": 4}
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    # the worker thread gets its own, named lane without the main tags
+    assert worker["args"] == {"cycle": 1}
+    assert worker["tid"] != outer["tid"]
+    names = {
+        e["tid"]: e["args"]["name"]
+        for e in events
+        if e["name"] == "thread_name"
+    }
+    assert names[worker["tid"]] == "otf_cycle_1"
+
+
+def test_failed_span_records_the_error(trace_file: Path):
+    with pytest.raises(ValueError):
+        with trace_span("boom", "test"):
+            raise ValueError("bad segment")
+    uninstall_tracer()
+
+    (span,) = _spans(trace_file)
+    assert span["args"]["error"] == "ValueError: bad segment"
+
+
+def test_unclosed_trace_is_a_truncated_array(trace_file: Path):
+    with trace_span("cycle", "test"):
+        pass
+    active_tracer().flush()
+
+    text = trace_file.read_text()
+    assert text.startswith("[\n") and text.endswith(",\n")
+    events = json.loads(text.rstrip().rstrip(",") + "]")
+    assert [e["name"] for e in events] == [
+        "process_name",
+        "thread_name",
+        "cycle",
+    ]
+
+
+def test_runner_gives_each_process_a_lane(trace_file: Path, tmp_path: Path):
+    runner = SubprocessRunner()
+    handles = []
+    for box in (0, 1):
+        run_dir = tmp_path / f"0000000002_{'ab'[box]}"
+        cmd = Command(
+            argv=[sys.executable, "-c", "import time; time.sleep(0.1)"],
+            cwd=run_dir,
+            stdout_path=run_dir / "out.dat",
+        )
+        with trace_tags(cycle=1, box=box):
+            handles.append(runner.start(cmd))
+    for handle in handles:
+        assert runner.wait(handle) == 0
+    uninstall_tracer()
+
+    events = json.loads(trace_file.read_text())
+    box0, box1 = _spans(trace_file)
+    assert (box0["pid"], box1["pid"]) == tuple(h.pid for h in handles)
+    assert (box0["args"]["box"], box1["args"]["box"]) == (0, 1)
+    assert box0["cat"] == "subprocess" and box0["args"]["rc"] == 0
+    # the two boxes ran concurrently
+    assert box1["ts"] < box0["ts"] + box0["dur"]
+    lanes = {
+        e["pid"]: e["args"]["name"]
+        for e in events
+        if e["name"] == "process_name"
+    }
+    assert lanes[box1["pid"]] == f"{Path(sys.executable).name} 0000000002_b"
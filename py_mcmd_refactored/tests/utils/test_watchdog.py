@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from utils.subprocess_runner import Command, SubprocessRunner
+from utils.watchdog import (
+    WATCHDOG_EVENT_NAME,
+    EngineWatchdog,
+    ProgressTracker,
+    SegmentHangError,
+    process_tree_cpu_seconds,
+)
+
+# prints an energy line every 10 ms while keeping the CPU busy
+_BUSY = (
+    "import time\n"
+    "end = time.time() + {seconds}\n"
+    "step = 0\n"
+    "while time.time() < end:\n"
+    "    tick = time.time() + 0.01\n"
+    "    while time.time() < tick:\n"
+    "        pass\n"
+    "    step += 10\n"
+    "    print('ENERGY:', step, flush=True)\n"
+)
+# one energy line, then silence without using the CPU
+_STUCK = (
+    "import time\n"
+    "print('ENERGY: 10', flush=True)\n"
+    "print('Info: load balancing', flush=True)\n"
+    "time.sleep({seconds})\n"
+)
+
+
+def _command(tmp_path: Path, script: str, name: str) -> Command:
+    return Command(
+        argv=[sys.executable, "-c", script],
+        cwd=tmp_path / name,
+        stdout_path=tmp_path / name / "out.dat",
+    )
+
+
+def test_progress_tracker_parses_steps_across_chunks():
+    progress = ProgressTracker(tail_lines=2)
+    chunks = [
+        b"Info: startup\nENERGY:     100  -5.0\nENER_0:  ",
+        b"250  1.0\nTIM",
+    ]
+    for chunk in chunks:
+        progress.feed(chunk)
+    assert progress.mark() == (sum(map(len, chunks)), 250)
+    # the two newest complete lines plus the unterminated one
+    assert progress.last_lines() == [
+        "ENERGY:     100  -5.0",
+        "ENER_0:  250  1.0",
+        "TIM",
+    ]
+
+
+def test_progress_tracker_tails_a_growing_file(tmp_path: Path):
+    out = tmp_path / "out.dat"
+    out.write_bytes(b"ENERGY: 10\n")
+    progress = ProgressTracker()
+    progress.sync_file(out)
+    with out.open("ab") as fh:
+        fh.write(b"ENERGY: 20\n")
+    progress.sync_file(out)
+    assert progress.mark() == (22, 20)
+    assert progress.last_lines() == ["ENERGY: 10", "ENERGY: 20"]
+
+
+def test_process_tree_cpu_seconds_reads_proc():
+    if not Path("/proc/self/stat").exists():
+        pytest.skip("needs /proc")
+    assert process_tree_cpu_seconds(os.getpid()) > 0
+    assert process_tree_cpu_seconds(2**22 + 12345) is None
+
+
+def test_idle_timeout_kills_silent_segment_before_a_baseline(tmp_path: Path):
+    watchdog = EngineWatchdog(
+        mode="kill", check_interval_s=0.05, grace_s=0, idle_timeout_s=0.5
+    )
+    runner = SubprocessRunner(watchdog=watchdog)
+    cmd = _command(tmp_path, _STUCK.format(seconds=30), "00000001")
+
+    with pytest.raises(SegmentHangError) as exc:
+        runner.wait(runner.start(cmd))
+
+    event = exc.value.event
+    assert event.action == "kill"
+    assert event.last_step == 10
+    assert "Info: load balancing" in event.last_lines
+    assert "idle_timeout_s" in event.reason
+    report = json.loads((cmd.cwd / WATCHDOG_EVENT_NAME).read_text())
+    assert report["pid"] == event.pid
+    assert runner.hang_events == [event]
+
+
+def test_learned_baseline_flags_a_stalled_segment(tmp_path: Path):
+    if not Path("/proc/self/stat").exists():
+        pytest.skip("needs /proc")
+    watchdog = EngineWatchdog(
+        mode="flag", check_interval_s=0.05, grace_s=0, stall_factor=4
+    )
+    runner = SubprocessRunner(watchdog=watchdog)
+
+    healthy = _command(tmp_path, _BUSY.format(seconds=0.6), "00000001")
+    assert runner.run_and_wait(healthy) == 0
+    assert runner.hang_events == []
+    (baseline,) = watchdog.baselines.values()
+    assert baseline.cpu_rate > 0.3
+
+    stuck = _command(tmp_path, _STUCK.format(seconds=2.0), "00000003")
+    handle = runner.start(stuck)
+    # flag mode reports the stall and lets the segment finish
+    assert runner.wait(handle) == 0
+
+    event = handle.hang_event
+    assert event is not None and event.action == "flag"
+    assert "CPU" in event.reason
+    assert event.cpu_percent_while_silent < 10
+    assert event.baseline["segments"] == 1
+    # a flagged segment does not feed the baseline
+    assert baseline.segments == 1
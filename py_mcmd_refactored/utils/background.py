@@ -0,0 +1,185 @@
+"""Scheduling isolation of background (non-engine) work.
+
+On Linux, CPU affinity, the nice value and the I/O priority are attributes
+of a thread, and threads and processes inherit those of the thread that
+starts them. `BackgroundIsolation.apply` confines the calling thread, and
+everything it launches, to the configured cores, nice level and I/O class,
+while the orchestrator thread and the NAMD/GOMC processes keep their own
+scheduling.
+
+Scheduling alone does not keep Python work off the orchestrator: a worker
+thread shares the interpreter lock with the engine stdout pumps. With an
+isolation configured the OTF cycles (parsing, DCD combine, PSF and index
+writes, catdcd) therefore run in a separate worker process that applies it
+at start-up (see utils/otf_worker.py). The orchestrator's own file work
+between segments (retry-log archival, developer-mode mirroring) runs on a
+short-lived isolated thread.
+
+Settings come from ``background`` in the config. Without it, the legacy
+``catdcd_core`` / ``enable_cpu_affinity`` (+ ``otf_reserved_cores``) fields
+still pin the background work to the core(s) just past NAMD's range.
+Anything the platform refuses is logged once and skipped.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import logging
+import os
+import platform
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+IO_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_WHO_PROCESS = 1
+
+# ioprio_set(2) syscall numbers (not exposed by the os module)
+_IOPRIO_SET = {
+    "x86_64": 251,
+    "i386": 289,
+    "i686": 289,
+    "aarch64": 30,
+    "arm64": 30,
+    "armv7l": 314,
+    "ppc64le": 273,
+    "ppc64": 273,
+    "riscv64": 30,
+    "s390x": 282,
+}
+
+
+def set_io_priority(io_class: str, level: int = 7, tid: int = 0) -> None:
+    """ioprio_set(2) for thread `tid` (0 = calling thread)."""
+    number = _IOPRIO_SET.get(platform.machine())
+    if number is None:
+        raise OSError(f"ioprio_set unknown on {platform.machine()!r}")
+    value = (IO_CLASSES[io_class] << _IOPRIO_CLASS_SHIFT) | int(level)
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.syscall(number, _IOPRIO_WHO_PROCESS, int(tid), value) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+class BackgroundIsolation:
+    """Scheduling applied to background workers; see module docs."""
+
+    def __init__(
+        self,
+        *,
+        cpus: Optional[Iterable[int]] = None,
+        nice: Optional[int] = None,
+        io_class: Optional[str] = None,
+        io_level: int = 7,
+    ) -> None:
+        if io_class is not None and io_class not in IO_CLASSES:
+            raise ValueError(
+                f"io_class must be one of {sorted(IO_CLASSES)}, got {io_class!r}"
+            )
+        self.cpus = (
+            frozenset(int(c) for c in cpus) if cpus is not None else None
+        )
+        self.nice = None if nice is None else int(nice)
+        self.io_class = io_class
+        self.io_level = int(io_level)
+        self._warned: set[str] = set()
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["BackgroundIsolation"]:
+        spec = getattr(cfg, "background", None)
+
+        def _get(name, default=None):
+            if isinstance(spec, dict):
+                value = spec.get(name, default)
+            else:
+                value = getattr(spec, name, default)
+            return default if value is None else value
+
+        cpus = _get("cpus") if spec is not None else None
+        if cpus is None:
+            cpus = _legacy_cpus(cfg)
+        if spec is None:
+            if cpus is None:
+                return None
+            return cls(cpus=cpus)
+
+        io_class = str(_get("io_class", "best-effort"))
+        return cls(
+            cpus=cpus,
+            nice=int(_get("nice", 10)) or None,
+            io_class=None if io_class == "none" else io_class,
+            io_level=int(_get("io_level", 7)),
+        )
+
+    def describe(self) -> str:
+        parts = []
+        if self.cpus is not None:
+            parts.append("cpus=" + ",".join(map(str, sorted(self.cpus))))
+        if self.nice is not None:
+            parts.append(f"nice=+{self.nice}")
+        if self.io_class is not None:
+            parts.append(f"io={self.io_class}/{self.io_level}")
+        return " ".join(parts) or "none"
+
+    def apply(self) -> dict[str, Any]:
+        """Apply the isolation to the calling thread; returns what took."""
+        applied: dict[str, Any] = {}
+        tid = threading.get_native_id()
+
+        if self.cpus is not None and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, self.cpus)
+                applied["cpus"] = sorted(self.cpus)
+            except OSError as exc:
+                self._warn("cpus", exc)
+
+        if self.nice is not None and hasattr(os, "setpriority"):
+            try:
+                current = os.getpriority(os.PRIO_PROCESS, tid)
+                target = min(19, current + self.nice)
+                os.setpriority(os.PRIO_PROCESS, tid, target)
+                applied["nice"] = target
+            except OSError as exc:
+                self._warn("nice", exc)
+
+        if self.io_class is not None:
+            try:
+                set_io_priority(self.io_class, self.io_level)
+                applied["io"] = (self.io_class, self.io_level)
+            except OSError as exc:
+                self._warn("io", exc)
+        return applied
+
+    def wrap(self, target: Callable[..., Any]) -> Callable[..., Any]:
+        """`target` as a thread body that first isolates its thread."""
+
+        def _isolated(*args, **kwargs):
+            self.apply()
+            return target(*args, **kwargs)
+
+        return _isolated
+
+    def _warn(self, what: str, exc: OSError) -> None:
+        if what in self._warned:
+            return
+        self._warned.add(what)
+        logger.warning(
+            "[Background] Could not apply %s isolation: %s", what, exc
+        )
+
+
+def _legacy_cpus(cfg) -> Optional[list[int]]:
+    catdcd_core = getattr(cfg, "catdcd_core", None)
+    if catdcd_core is not None:
+        return [int(catdcd_core)]
+    if not bool(getattr(cfg, "enable_cpu_affinity", False)):
+        return None
+    # the core(s) just past NAMD's range
+    first = int(getattr(cfg, "no_core_box_0", 1) or 0) + int(
+        getattr(cfg, "no_core_box_1", 0) or 0
+    )
+    count = max(1, int(getattr(cfg, "otf_reserved_cores", None) or 1))
+    return list(range(first, first + count))
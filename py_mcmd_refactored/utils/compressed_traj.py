@@ -0,0 +1,294 @@
+"""Compressed, fixed-precision trajectory format for the combined outputs.
+
+A ``.pmct`` file is an 8-byte magic followed by self-contained blocks, one
+or more per appended segment::
+
+    [block header (BLOCK_DTYPE, 72 bytes)][zlib payload]
+
+The payload holds the unit cells (float64, when present) and the
+coordinates quantized to ``round(x / precision)``. Quantized coordinates
+are stored per frame as X, Y and Z planes; the first frame of a block is
+delta-encoded along the atoms and every later frame against the previous
+one, and the deltas are zigzag-mapped to uint32 and byte-shuffled before
+compression. Decoded
+coordinates are within ``precision / 2`` of the originals.
+
+Blocks carry their cycle, engine and box, so a reader can select cycles by
+walking the headers without decompressing anything else. A block cut short
+by a crash is ignored by the reader and truncated by the commit records.
+"""
+
+from __future__ import annotations
+
+import os
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+from utils.dcd import ENGINE_CODES, ENGINE_NAMES
+
+TRAJ_SUFFIX = ".pmct"
+TRAJ_MAGIC = b"PYMCTRJ1"
+
+BLOCK_DTYPE = np.dtype(
+    [
+        ("cycle", "<i8"),
+        ("engine", "<i4"),
+        ("box", "<i4"),
+        ("first_frame", "<i8"),
+        ("n_frames", "<i8"),
+        ("n_atoms", "<i8"),
+        ("precision", "<f8"),
+        ("has_cell", "<i8"),
+        ("payload_bytes", "<i8"),
+    ]
+)
+
+# frames per block: bounds the memory of one encode/decode step
+BLOCK_FRAMES = 256
+# keeps every delta, and so its zigzag code, within 32 bits
+_MAX_QUANTUM = 2**30 - 1
+
+
+@dataclass(frozen=True)
+class TrajectoryBlock:
+    cycle: int
+    engine: str
+    box: int
+    first_frame: int
+    n_frames: int
+    n_atoms: int
+    precision: float
+    has_cell: bool
+    offset: int  # of the payload
+    payload_bytes: int
+
+    @property
+    def frames(self) -> slice:
+        return slice(self.first_frame, self.first_frame + self.n_frames)
+
+
+def _shuffle(values: np.ndarray) -> bytes:
+    # zigzag keeps the high bytes of small negative deltas at zero
+    zigzag = ((values << 1) ^ (values >> 63)).astype("<u4")
+    return zigzag.view(np.uint8).reshape(-1, 4).T.tobytes()
+
+
+def _unshuffle(data: bytes, count: int) -> np.ndarray:
+    planes = np.frombuffer(data, dtype=np.uint8, count=4 * count)
+    zigzag = planes.reshape(4, count).T.copy().view("<u4").reshape(count)
+    zigzag = zigzag.astype(np.int64)
+    return (zigzag >> 1) ^ -(zigzag & 1)
+
+
+def encode_frames(
+    coords: np.ndarray,
+    cells: Optional[np.ndarray],
+    precision: float,
+    *,
+    level: int = 6,
+) -> bytes:
+    """Compress (n_frames, n_atoms, 3) coordinates to a block payload."""
+    planes = np.transpose(np.asarray(coords), (0, 2, 1))
+    quanta = np.rint(planes / float(precision)).astype(np.int64)
+    if quanta.size and np.abs(quanta).max() > _MAX_QUANTUM:
+        raise ValueError(
+            f"coordinates out of range for a precision of {precision}"
+        )
+
+    deltas = np.empty_like(quanta)
+    deltas[1:] = quanta[1:] - quanta[:-1]
+    deltas[0, :, 0] = quanta[0, :, 0]
+    deltas[0, :, 1:] = quanta[0, :, 1:] - quanta[0, :, :-1]
+
+    payload = b""
+    if cells is not None:
+        payload += np.asarray(cells, dtype="<f8").tobytes()
+    payload += _shuffle(deltas.reshape(-1))
+    return zlib.compress(payload, level)
+
+
+def decode_frames(
+    payload: bytes,
+    n_frames: int,
+    n_atoms: int,
+    precision: float,
+    has_cell: bool,
+) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    """Inverse of `encode_frames`: float32 coordinates and float64 cells."""
+    raw = zlib.decompress(payload)
+    cells = None
+    cell_bytes = 0
+    if has_cell:
+        cell_bytes = n_frames * 6 * 8
+        cells = np.frombuffer(raw[:cell_bytes], dtype="<f8").reshape(
+            n_frames, 6
+        )
+
+    count = n_frames * 3 * n_atoms
+    deltas = _unshuffle(raw[cell_bytes:], count)
+    quanta = deltas.reshape(n_frames, 3, n_atoms)
+    if n_frames:
+        np.cumsum(quanta[0], axis=1, out=quanta[0])
+        np.cumsum(quanta, axis=0, out=quanta)
+
+    coords = (quanta * float(precision)).astype(np.float32)
+    return np.transpose(coords, (0, 2, 1)), cells
+
+
+def compressed_path_for(dcd_path: Union[str, Path]) -> Path:
+    return Path(dcd_path).with_suffix(TRAJ_SUFFIX)
+
+
+class CompressedTrajectory:
+    """Append-only writer and block-wise reader of a ``.pmct`` file."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        # frames stored so far; found by walking the headers once, then
+        # tracked by `append` so long runs do not rescan the file
+        self._n_frames: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # writing
+    def append(
+        self,
+        coords: np.ndarray,
+        cells: Optional[np.ndarray] = None,
+        *,
+        precision: float,
+        cycle: int,
+        engine: str,
+        box: int,
+        level: int = 6,
+    ) -> int:
+        """Append (n_frames, n_atoms, 3) coordinates; returns frames added."""
+        coords = np.asarray(coords)
+        n_frames, n_atoms = coords.shape[:2]
+        if n_frames == 0:
+            return 0
+
+        if self._n_frames is None:
+            self._n_frames = len(self)
+        first_frame = self._n_frames
+
+        with self.path.open("ab") as fh:
+            if fh.tell() < len(TRAJ_MAGIC):
+                fh.truncate(0)
+                fh.write(TRAJ_MAGIC)
+            for start in range(0, n_frames, BLOCK_FRAMES):
+                chunk = slice(start, start + BLOCK_FRAMES)
+                payload = encode_frames(
+                    coords[chunk],
+                    None if cells is None else cells[chunk],
+                    precision,
+                    level=level,
+                )
+                header = np.array(
+                    [
+                        (
+                            int(cycle),
+                            ENGINE_CODES[str(engine).upper()],
+                            int(box),
+                            first_frame + start,
+                            len(coords[chunk]),
+                            n_atoms,
+                            float(precision),
+                            int(cells is not None),
+                            len(payload),
+                        )
+                    ],
+                    dtype=BLOCK_DTYPE,
+                )
+                fh.write(header.tobytes())
+                fh.write(payload)
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._n_frames = first_frame + n_frames
+        return n_frames
+
+    # ------------------------------------------------------------------
+    # reading
+    def blocks(self) -> Iterator[TrajectoryBlock]:
+        """Complete blocks in file order (a torn tail block is skipped)."""
+        if not self.path.exists():
+            return
+        size = self.path.stat().st_size
+        with self.path.open("rb") as fh:
+            magic = fh.read(len(TRAJ_MAGIC))
+            if not magic:
+                return
+            if magic != TRAJ_MAGIC:
+                raise ValueError(
+                    f"{self.path} is not a py-MCMD compressed trajectory"
+                )
+            offset = len(TRAJ_MAGIC)
+            while offset + BLOCK_DTYPE.itemsize <= size:
+                fh.seek(offset)
+                row = np.frombuffer(
+                    fh.read(BLOCK_DTYPE.itemsize), dtype=BLOCK_DTYPE
+                )[0]
+                payload_at = offset + BLOCK_DTYPE.itemsize
+                if payload_at + int(row["payload_bytes"]) > size:
+                    return
+                yield TrajectoryBlock(
+                    cycle=int(row["cycle"]),
+                    engine=ENGINE_NAMES.get(int(row["engine"]), "?"),
+                    box=int(row["box"]),
+                    first_frame=int(row["first_frame"]),
+                    n_frames=int(row["n_frames"]),
+                    n_atoms=int(row["n_atoms"]),
+                    precision=float(row["precision"]),
+                    has_cell=bool(row["has_cell"]),
+                    offset=payload_at,
+                    payload_bytes=int(row["payload_bytes"]),
+                )
+                offset = payload_at + int(row["payload_bytes"])
+
+    def __len__(self) -> int:
+        return sum(block.n_frames for block in self.blocks())
+
+    def read_block(
+        self, block: TrajectoryBlock
+    ) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        with self.path.open("rb") as fh:
+            fh.seek(block.offset)
+            payload = fh.read(block.payload_bytes)
+        return decode_frames(
+            payload,
+            block.n_frames,
+            block.n_atoms,
+            block.precision,
+            block.has_cell,
+        )
+
+    def read(
+        self,
+        first_cycle: Optional[int] = None,
+        last_cycle: Optional[int] = None,
+    ) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        """Decode the frames of cycles `first_cycle`..`last_cycle`.
+
+        Returns ``(positions, cells)`` with positions shaped
+        (n_frames, n_atoms, 3); cells is None without unit cells.
+        """
+        coords: list[np.ndarray] = []
+        cells: list[np.ndarray] = []
+        for block in self.blocks():
+            if first_cycle is not None and block.cycle < int(first_cycle):
+                continue
+            if last_cycle is not None and block.cycle > int(last_cycle):
+                continue
+            block_coords, block_cells = self.read_block(block)
+            coords.append(block_coords)
+            if block_cells is not None:
+                cells.append(block_cells)
+
+        if not coords:
+            return np.zeros((0, 0, 3), dtype=np.float32), None
+        return (
+            np.concatenate(coords),
+            np.concatenate(cells) if len(cells) == len(coords) else None,
+        )
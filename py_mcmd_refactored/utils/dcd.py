@@ -0,0 +1,429 @@
+"""Memory-mapped access to CHARMM/NAMD DCD trajectories and a frame index.
+
+A DCD file is a header (three Fortran records: control block, titles,
+atom count) followed by fixed-size frames. Each frame is an optional unit
+cell record (6 doubles) and one float32 record per axis::
+
+    [4B len][6 x f8 cell][4B len]   (only when the cell flag is set)
+    [4B len][N x f4 X][4B len]
+    [4B len][N x f4 Y][4B len]
+    [4B len][N x f4 Z][4B len]
+
+`DcdTrajectory` maps the frames with ``np.memmap`` through a structured
+dtype, so selecting any frame slice returns per-axis coordinate views
+without reading or copying the file. `DcdFrameIndex` is the sidecar the
+on-the-fly processor writes while appending segments to a combined
+trajectory: which frames belong to which cycle, engine and box.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+FRAME_INDEX_SUFFIX = ".frames"
+FRAME_INDEX_MAGIC = b"PYMCFRM1"
+
+FRAME_INDEX_DTYPE = np.dtype(
+    [
+        ("cycle", "<i8"),
+        ("engine", "<i4"),
+        ("box", "<i4"),
+        ("first_frame", "<i8"),
+        ("n_frames", "<i8"),
+        ("n_atoms", "<i8"),
+    ]
+)
+
+ENGINE_CODES = {"NAMD": 0, "GOMC": 1}
+ENGINE_NAMES = {code: name for name, code in ENGINE_CODES.items()}
+
+# byte offset of NSET inside the first header record
+_NSET_OFFSET = 8
+
+
+@dataclass(frozen=True)
+class DcdHeader:
+    endian: str  # "<" or ">"
+    n_atoms: int
+    n_frames_declared: int
+    has_unit_cell: bool
+    header_bytes: int
+    frame_bytes: int
+    timestep: float
+    save_interval: int
+    titles: tuple[str, ...]
+
+
+def read_dcd_header(path: Union[str, Path]) -> DcdHeader:
+    """Parse the header of a DCD file; raises ValueError if it is not one."""
+    with Path(path).open("rb") as fh:
+        head = fh.read(92)
+        if len(head) < 92:
+            raise ValueError(f"{path}: too short for a DCD header")
+
+        for endian in ("<", ">"):
+            if struct.unpack(f"{endian}i", head[:4])[0] == 84:
+                break
+        else:
+            raise ValueError(f"{path}: not a DCD file")
+        if head[4:8] != b"CORD":
+            raise ValueError(f"{path}: not a coordinate DCD file")
+
+        icntrl = struct.unpack(f"{endian}20i", head[8:88])
+        timestep = struct.unpack(f"{endian}f", head[8 + 9 * 4 : 8 + 10 * 4])[0]
+        if struct.unpack(f"{endian}i", head[88:92])[0] != 84:
+            raise ValueError(f"{path}: corrupt DCD control record")
+
+        n_fixed = icntrl[8]
+        if n_fixed:
+            raise ValueError(f"{path}: DCD files with fixed atoms unsupported")
+        if icntrl[19] and icntrl[11]:
+            raise ValueError(f"{path}: 4D DCD files are unsupported")
+        has_unit_cell = bool(icntrl[19]) and bool(icntrl[10])
+
+        (title_len,) = struct.unpack(f"{endian}i", fh.read(4))
+        title_block = fh.read(title_len)
+        fh.read(4)
+        (n_titles,) = struct.unpack(f"{endian}i", title_block[:4])
+        titles = tuple(
+            title_block[4 + 80 * i : 4 + 80 * (i + 1)]
+            .decode("ascii", "replace")
+            .rstrip("\x00 ")
+            for i in range(n_titles)
+        )
+
+        natom_rec = fh.read(12)
+        if len(natom_rec) < 12:
+            raise ValueError(f"{path}: truncated DCD header")
+        (n_atoms,) = struct.unpack(f"{endian}i", natom_rec[4:8])
+        header_bytes = fh.tell()
+
+    frame_bytes = 3 * (4 * n_atoms + 8)
+    if has_unit_cell:
+        frame_bytes += 6 * 8 + 8
+
+    return DcdHeader(
+        endian=endian,
+        n_atoms=int(n_atoms),
+        n_frames_declared=int(icntrl[0]),
+        has_unit_cell=has_unit_cell,
+        header_bytes=int(header_bytes),
+        frame_bytes=int(frame_bytes),
+        timestep=float(timestep),
+        save_interval=int(icntrl[2]),
+        titles=titles,
+    )
+
+
+def count_dcd_frames(path: Union[str, Path]) -> Optional[int]:
+    """Complete frames stored in a DCD file, or None if it is not one."""
+    try:
+        header = read_dcd_header(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    size = Path(path).stat().st_size
+    return max(0, size - header.header_bytes) // header.frame_bytes
+
+
+def frame_dtype(header: DcdHeader) -> np.dtype:
+    i4 = f"{header.endian}i4"
+    f4 = f"{header.endian}f4"
+    n = header.n_atoms
+    fields = []
+    if header.has_unit_cell:
+        fields += [
+            ("_cell_head", i4),
+            ("cell", f"{header.endian}f8", (6,)),
+            ("_cell_tail", i4),
+        ]
+    for axis in ("x", "y", "z"):
+        fields += [
+            (f"_{axis}_head", i4),
+            (axis, f4, (n,)),
+            (f"_{axis}_tail", i4),
+        ]
+    dtype = np.dtype(fields)
+    assert dtype.itemsize == header.frame_bytes
+    return dtype
+
+
+def truncate_dcd_frames(path: Union[str, Path], n_frames: int) -> bool:
+    """Cut a DCD back to its first `n_frames` frames and fix NSET.
+
+    Returns False (and leaves the file alone) when it is not a readable DCD
+    or already holds no more than `n_frames` frames.
+    """
+    path = Path(path)
+    try:
+        header = read_dcd_header(path)
+    except (OSError, ValueError, struct.error):
+        return False
+    n_frames = max(0, int(n_frames))
+    stored = count_dcd_frames(path) or 0
+    size = header.header_bytes + n_frames * header.frame_bytes
+    if stored < n_frames or (
+        stored == n_frames and path.stat().st_size == size
+    ):
+        return False
+
+    os.truncate(path, size)
+    with path.open("r+b") as fh:
+        fh.seek(_NSET_OFFSET)
+        fh.write(struct.pack(f"{header.endian}i", n_frames))
+    return True
+
+
+def write_dcd_subset(
+    src: Union[str, Path],
+    dst: Union[str, Path],
+    *,
+    atom_indices: Optional[Sequence[int]] = None,
+    stride: int = 1,
+    chunk_frames: int = 256,
+) -> int:
+    """Write frames ``stride-1, 2*stride-1, ...`` of `src` restricted to
+    the zero-based `atom_indices` (all atoms when None) to `dst`.
+
+    The header is copied from `src` with NSET, the save interval, the first
+    saved step and the atom count adjusted. Frames are streamed from the
+    memory map in chunks, so memory use does not grow with the segment.
+    Returns the number of frames written.
+    """
+    stride = max(1, int(stride))
+    traj = DcdTrajectory(src)
+    header = traj.header
+    kept = range(stride - 1, traj.n_frames, stride)
+    idx = (
+        np.arange(header.n_atoms)
+        if atom_indices is None
+        else np.asarray(atom_indices, dtype=np.int64)
+    )
+    # a selection resolved against another (e.g. pre-swap) atom count
+    if idx.size and (idx.min() < 0 or idx.max() >= header.n_atoms):
+        raise ValueError(
+            f"atom indices outside 0..{header.n_atoms - 1} of {src}"
+        )
+
+    with Path(src).open("rb") as fh:
+        head = bytearray(fh.read(header.header_bytes))
+    i4 = f"{header.endian}i"
+    _, istart, nsavc = struct.unpack(f"{header.endian}3i", head[8:20])
+    head[8:20] = struct.pack(
+        f"{header.endian}3i",
+        len(kept),
+        istart + (stride - 1) * nsavc,
+        nsavc * stride,
+    )
+    head[-8:-4] = struct.pack(i4, len(idx))
+
+    out_header = DcdHeader(
+        endian=header.endian,
+        n_atoms=len(idx),
+        n_frames_declared=len(kept),
+        has_unit_cell=header.has_unit_cell,
+        header_bytes=header.header_bytes,
+        frame_bytes=3 * (4 * len(idx) + 8)
+        + (6 * 8 + 8 if header.has_unit_cell else 0),
+        timestep=header.timestep,
+        save_interval=nsavc * stride,
+        titles=header.titles,
+    )
+    out_dtype = frame_dtype(out_header)
+
+    with Path(dst).open("wb") as out:
+        out.write(bytes(head))
+        for start in range(0, len(kept), int(chunk_frames)):
+            rows = kept[start : start + int(chunk_frames)]
+            source = traj.frames(slice(rows.start, rows.stop, rows.step))
+            chunk = np.empty(len(rows), dtype=out_dtype)
+            if header.has_unit_cell:
+                chunk["_cell_head"] = chunk["_cell_tail"] = 6 * 8
+                chunk["cell"] = source["cell"]
+            for axis in ("x", "y", "z"):
+                chunk[f"_{axis}_head"] = chunk[f"_{axis}_tail"] = 4 * len(idx)
+                chunk[axis] = source[axis][:, idx]
+            out.write(chunk.tobytes())
+    return len(kept)
+
+
+class DcdTrajectory:
+    """Read-only, memory-mapped view of a DCD trajectory.
+
+    `frames`, `xyz` and `unit_cells` return views into the mapped file, so
+    streaming a multi-GB trajectory only pages in the frames actually used.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.header = read_dcd_header(self.path)
+        self.n_frames = count_dcd_frames(self.path) or 0
+        self._frames = (
+            np.memmap(
+                self.path,
+                dtype=frame_dtype(self.header),
+                mode="r",
+                offset=self.header.header_bytes,
+                shape=(self.n_frames,),
+            )
+            if self.n_frames
+            else np.zeros(0, dtype=frame_dtype(self.header))
+        )
+
+    @property
+    def n_atoms(self) -> int:
+        return self.header.n_atoms
+
+    def __len__(self) -> int:
+        return self.n_frames
+
+    def frames(self, selection: Union[slice, int, None] = None) -> np.ndarray:
+        """Structured (no-copy) records for a frame slice."""
+        if selection is None:
+            return self._frames
+        if isinstance(selection, int):
+            selection = slice(selection, selection + 1)
+        return self._frames[selection]
+
+    def xyz(
+        self, selection: Union[slice, int, None] = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Zero-copy ``(x, y, z)`` arrays of shape (n_frames, n_atoms)."""
+        frames = self.frames(selection)
+        return frames["x"], frames["y"], frames["z"]
+
+    def positions(
+        self, selection: Union[slice, int, None] = None
+    ) -> np.ndarray:
+        """(n_frames, n_atoms, 3) float32 array (a copy; X/Y/Z are apart)."""
+        x, y, z = self.xyz(selection)
+        return np.stack((x, y, z), axis=-1)
+
+    def unit_cells(
+        self, selection: Union[slice, int, None] = None
+    ) -> Optional[np.ndarray]:
+        """(n_frames, 6) unit cell records, or None without a cell block."""
+        if not self.header.has_unit_cell:
+            return None
+        return self.frames(selection)["cell"]
+
+
+@dataclass(frozen=True)
+class FrameIndexEntry:
+    cycle: int
+    engine: str
+    box: int
+    first_frame: int
+    n_frames: int
+    n_atoms: int
+
+    @property
+    def frames(self) -> slice:
+        return slice(self.first_frame, self.first_frame + self.n_frames)
+
+
+def frame_index_path_for(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + FRAME_INDEX_SUFFIX)
+
+
+class DcdFrameIndex:
+    """Sidecar recording which combined-DCD frames each cycle appended."""
+
+    def __init__(self, dcd_path: Union[str, Path]) -> None:
+        self.dcd_path = Path(dcd_path)
+        self.path = frame_index_path_for(self.dcd_path)
+
+    def append(self, entry: FrameIndexEntry) -> None:
+        record = np.array(
+            [
+                (
+                    entry.cycle,
+                    ENGINE_CODES[entry.engine.upper()],
+                    entry.box,
+                    entry.first_frame,
+                    entry.n_frames,
+                    entry.n_atoms,
+                )
+            ],
+            dtype=FRAME_INDEX_DTYPE,
+        )
+        with self.path.open("ab") as fh:
+            if fh.tell() < len(FRAME_INDEX_MAGIC):
+                fh.truncate(0)
+                fh.write(FRAME_INDEX_MAGIC)
+            fh.write(record.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def entries(self) -> np.ndarray:
+        if not self.path.exists():
+            return np.zeros(0, dtype=FRAME_INDEX_DTYPE)
+        data = self.path.read_bytes()
+        if len(data) < len(FRAME_INDEX_MAGIC):
+            return np.zeros(0, dtype=FRAME_INDEX_DTYPE)
+        if data[: len(FRAME_INDEX_MAGIC)] != FRAME_INDEX_MAGIC:
+            raise ValueError(f"{self.path} is not a py-MCMD frame index")
+        body = data[len(FRAME_INDEX_MAGIC) :]
+        usable = len(body) - len(body) % FRAME_INDEX_DTYPE.itemsize
+        return np.frombuffer(body[:usable], dtype=FRAME_INDEX_DTYPE)
+
+    def entry_for_cycle(self, cycle: int) -> Optional[FrameIndexEntry]:
+        entries = self.entries()
+        hits = np.nonzero(entries["cycle"] == int(cycle))[0]
+        if not len(hits):
+            return None
+        row = entries[hits[-1]]
+        return FrameIndexEntry(
+            cycle=int(row["cycle"]),
+            engine=ENGINE_NAMES.get(int(row["engine"]), "?"),
+            box=int(row["box"]),
+            first_frame=int(row["first_frame"]),
+            n_frames=int(row["n_frames"]),
+            n_atoms=int(row["n_atoms"]),
+        )
+
+    def frames_for_cycles(self, first_cycle: int, last_cycle: int) -> slice:
+        """Frame slice covering cycles `first_cycle`..`last_cycle`."""
+        entries = self.entries()
+        mask = (entries["cycle"] >= int(first_cycle)) & (
+            entries["cycle"] <= int(last_cycle)
+        )
+        if not mask.any():
+            return slice(0, 0)
+        selected = entries[mask]
+        start = int(selected["first_frame"].min())
+        stop = int((selected["first_frame"] + selected["n_frames"]).max())
+        return slice(start, stop)
+
+    def record_append(
+        self,
+        *,
+        cycle: int,
+        engine: str,
+        box: int,
+        frames_before: int,
+    ) -> Optional[FrameIndexEntry]:
+        """Index the frames a successful append added to the trajectory."""
+        try:
+            header = read_dcd_header(self.dcd_path)
+        except (OSError, ValueError, struct.error):
+            return None
+        frames_after = count_dcd_frames(self.dcd_path) or 0
+        if frames_after <= frames_before:
+            return None
+        entry = FrameIndexEntry(
+            cycle=int(cycle),
+            engine=str(engine).upper(),
+            box=int(box),
+            first_frame=int(frames_before),
+            n_frames=int(frames_after - frames_before),
+            n_atoms=header.n_atoms,
+        )
+        self.append(entry)
+        return entry
@@ -6,7 +6,9 @@ import os
 import shutil
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
+
+from utils.input_stage import InputStage, StagedInputs, _discover_input_root
 
 # def _discover_managed_root(explicit_root: Optional[str | Path] = None) -> Path:
 #     if explicit_root is not None:
@@ -112,6 +114,10 @@ class ManagedArtifactStore:
       - release_step(engine, step_id)
       - cleanup_step(engine, step_id)
       - cleanup_all()
+
+    `stage_inputs` additionally copies static inputs (force fields, starting
+    structures, templates) into a node-wide content-addressed area that
+    `cleanup_all` leaves in place for other runs.
     """
 
     def __init__(
@@ -120,11 +126,14 @@ class ManagedArtifactStore:
         disk_roots: dict[str, str | Path],
         developer_mode: bool = False,
         managed_root: Optional[str | Path] = None,
+        input_root: Optional[str | Path] = None,
         logger: Optional[logging.Logger] = None,
     ) -> None:
         self.logger = logger or logging.getLogger(__name__)
         self.managed_root = _discover_managed_root(managed_root)
         self.managed_root.mkdir(parents=True, exist_ok=True)
+        self._input_root = input_root
+        self._input_stage: Optional[InputStage] = None
 
         self.disk_roots = {
             str(engine).upper(): Path(path)
@@ -244,6 +253,21 @@ class ManagedArtifactStore:
             ignore_errors=True,
         )
 
+    def stage_inputs(
+        self, paths: Iterable[str | Path], project_root: Path
+    ) -> StagedInputs:
+        if self._input_stage is None:
+            self._input_stage = InputStage(
+                _discover_input_root(self._input_root, self.managed_root)
+            )
+        staged = self._input_stage.stage_all(paths, project_root)
+        self.logger.info(
+            "[ARTIFACT_STORE] staged %d static inputs under %s",
+            len(staged.staged),
+            self._input_stage.root,
+        )
+        return staged
+
     def cleanup_all(self) -> None:
         for engine, step_id in list(self._steps.keys()):
             self.cleanup_step(engine, step_id)
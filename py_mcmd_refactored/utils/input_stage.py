@@ -0,0 +1,181 @@
+"""Content-addressed staging of static engine inputs into tmpfs.
+
+Force fields, starting PSF/PDBs and the NAMD/GOMC templates are read by
+every segment. On a slow shared project filesystem that means repeated
+remote reads, and with many simulations on one node as many copies of the
+same force field in the page cache. `InputStage` copies each input once
+into ``<root>/<sha256>/<basename>`` and hands out that path:
+
+* the root is per user and node-wide (``/dev/shm/py_mcmd_inputs-<uid>``
+  by default, created 0700), so a user's runs staging the same content
+  share one read-only copy;
+* a root that another user owns or can write to could hand out planted
+  inputs, so it is not used: staging falls back to the run's managed root;
+* a copy is written under a temporary name and renamed into place, so
+  concurrent runs staging the same file race harmlessly;
+* ``by_source/`` remembers the digest of a source file by path, size,
+  mtime and inode, so later runs only ``stat`` the project file.
+
+Staged files are never removed by a run (another may be using them); the
+root can be cleared whenever no simulation is running on the node.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import stat
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK = 1 << 20
+_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def _private_dir(path: Path) -> bool:
+    """Create `path` (0700); True if only this user can write to it."""
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _discover_input_root(
+    explicit_root: Optional[str | Path] = None,
+    managed_root: Optional[Path] = None,
+) -> Path:
+    root: Optional[Path] = None
+    if explicit_root is not None:
+        root = Path(explicit_root)
+    elif os.getenv("PY_MCMD_STAGED_INPUT_ROOT"):
+        root = Path(os.environ["PY_MCMD_STAGED_INPUT_ROOT"])
+    else:
+        shm_root = Path("/dev/shm")
+        if shm_root.exists() and os.access(shm_root, os.W_OK):
+            root = shm_root / f"py_mcmd_inputs-{os.getuid()}"
+
+    if root is not None:
+        if _private_dir(root):
+            return root
+        logger.warning(
+            "Staged input root %s is not private to this user; staging "
+            "into the managed root instead",
+            root,
+        )
+
+    if managed_root is not None:
+        return Path(managed_root) / "_inputs"
+    return Path.cwd() / ".managed_outputs" / "_inputs"
+
+
+def _tmp_name(name: str) -> str:
+    # unique per process and thread: concurrent stagers never share one
+    return f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class StagedInputs:
+    """Staged copies of a run's static inputs, keyed by resolved source."""
+
+    project_root: Path
+    staged: Mapping[str, Path] = field(default_factory=dict)
+
+    def path(self, p: str | Path) -> Path:
+        """Staged copy of `p` (relative to the project root), else `p`."""
+        source = (self.project_root / p).resolve()
+        return self.staged.get(str(source), source)
+
+
+class InputStage:
+    """Content-addressed input store; see the module docstring."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    def _source_key(self, source: Path) -> Path:
+        st = source.stat()
+        key = f"{source}\0{st.st_size}\0{st.st_mtime_ns}\0{st.st_ino}"
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return self.root / "by_source" / name
+
+    def stage(self, source: str | Path) -> Path:
+        """Path of the staged copy of `source`, copying it if needed."""
+        source = Path(source).resolve()
+        key_path = self._source_key(source)
+        try:
+            digest = key_path.read_text().strip()
+        except OSError:
+            digest = ""
+        if _DIGEST_RE.fullmatch(digest):
+            staged = self.root / digest / source.name
+            if staged.is_file():
+                return staged
+
+        digest = _file_digest(source)
+        staged = self.root / digest / source.name
+        if not staged.is_file():
+            staged.parent.mkdir(parents=True, exist_ok=True)
+            tmp = staged.with_name(_tmp_name(staged.name))
+            shutil.copyfile(source, tmp)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, staged)
+
+        key_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_key = key_path.with_name(_tmp_name(key_path.name))
+        tmp_key.write_text(digest)
+        os.replace(tmp_key, key_path)
+        return staged
+
+    def stage_all(
+        self, paths: Iterable[str | Path], project_root: Path
+    ) -> StagedInputs:
+        """Stage the existing files among `paths` (relative to the root)."""
+        project_root = Path(project_root)
+        staged: dict[str, Path] = {}
+        for p in paths:
+            source = (project_root / p).resolve()
+            if str(source) not in staged and source.is_file():
+                staged[str(source)] = self.stage(source)
+        return StagedInputs(project_root=project_root, staged=staged)
+
+
+def static_input_paths(cfg) -> list[str]:
+    """Force fields, starting structures and templates named by `cfg`."""
+    paths = [
+        *(getattr(cfg, "starting_ff_file_list_namd", None) or []),
+        *(getattr(cfg, "starting_ff_file_list_gomc", None) or []),
+    ]
+    for name in (
+        "starting_pdb_box_0_file",
+        "starting_psf_box_0_file",
+        "starting_pdb_box_1_file",
+        "starting_psf_box_1_file",
+        "path_namd_template",
+        "path_gomc_template",
+    ):
+        value = getattr(cfg, name, None)
+        if value and str(value) != "NA":
+            paths.append(str(value))
+    return paths
@@ -0,0 +1,366 @@
+"""Online statistics of the on-the-fly data columns.
+
+Each numeric column of the NAMD and GOMC rows gets a `ColumnStats`:
+Welford mean/variance, Flyvbjerg-Petersen block averaging (values are
+pair-averaged level by level, so the standard error of every block size
+2**k is available without storing the series) and a running
+autocorrelation estimate up to a fixed lag. Updates are O(1) (O(max_lag)
+for the autocorrelation) per value and the state is a few hundred numbers
+per column, so statistical inefficiencies and error bars can be reported
+after every cycle of an arbitrarily long run.
+
+`OnlineStatsBook` holds the columns of all engines/boxes and writes the
+per-cycle ``online_stats.json`` snapshot, which also carries the state
+needed to resume after a restart.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+STATS_SNAPSHOT_NAME = "online_stats.json"
+STATS_SNAPSHOT_VERSION = 1
+
+# fewest blocks a level needs before its error bar is trusted
+MIN_BLOCKS = 8
+MAX_BLOCK_LEVELS = 40
+DEFAULT_MAX_LAG = 64
+
+
+class Welford:
+    """Numerically stable running mean and variance."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = int(count)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance (None with fewer than two values)."""
+        if self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    def state(self) -> list[float]:
+        return [self.count, self.mean, self.m2]
+
+
+class BlockAverager:
+    """Multi-level block averaging (Flyvbjerg & Petersen 1989)."""
+
+    def __init__(self) -> None:
+        self.levels: list[Welford] = []
+        self.pending: list[Optional[float]] = []
+
+    def add(self, value: float) -> None:
+        level = 0
+        while level < MAX_BLOCK_LEVELS:
+            if level == len(self.levels):
+                self.levels.append(Welford())
+                self.pending.append(None)
+            self.levels[level].add(value)
+            previous = self.pending[level]
+            if previous is None:
+                self.pending[level] = value
+                return
+            self.pending[level] = None
+            value = 0.5 * (previous + value)
+            level += 1
+
+    def standard_errors(self) -> list[dict[str, float]]:
+        """Standard error of the mean estimated at every block size."""
+        out = []
+        for level, acc in enumerate(self.levels):
+            var = acc.variance
+            if var is None:
+                break
+            sem = math.sqrt(var / acc.count)
+            out.append(
+                {
+                    "block_size": 2**level,
+                    "n_blocks": acc.count,
+                    "sem": sem,
+                    "sem_error": sem / math.sqrt(2.0 * (acc.count - 1)),
+                }
+            )
+        return out
+
+    def sem(self) -> Optional[float]:
+        """Plateau estimate: the largest SEM over levels with enough blocks."""
+        trusted = [
+            level["sem"]
+            for level in self.standard_errors()
+            if level["n_blocks"] >= MIN_BLOCKS
+        ]
+        return max(trusted) if trusted else None
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "levels": [acc.state() for acc in self.levels],
+            "pending": list(self.pending),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "BlockAverager":
+        blocks = cls()
+        blocks.levels = [Welford(*values) for values in state["levels"]]
+        blocks.pending = list(state["pending"])
+        return blocks
+
+
+class RunningAutocorrelation:
+    """Autocorrelation function up to `max_lag`, updated value by value.
+
+    Values are shifted by the first one seen before the lagged products
+    are summed, which keeps large offsets (total energies) from cancelling
+    the fluctuations.
+    """
+
+    def __init__(self, max_lag: int = DEFAULT_MAX_LAG) -> None:
+        self.max_lag = max(1, int(max_lag))
+        self.shift: Optional[float] = None
+        self.count = 0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        # recent[0] is the newest value
+        self.recent = np.zeros(self.max_lag)
+        self.lag_sums = np.zeros(self.max_lag)
+
+    def add(self, value: float) -> None:
+        if self.shift is None:
+            self.shift = value
+        y = value - self.shift
+        filled = min(self.count, self.max_lag)
+        self.lag_sums[:filled] += y * self.recent[:filled]
+        self.recent[1:] = self.recent[:-1]
+        self.recent[0] = y
+        self.count += 1
+        self.sum += y
+        self.sum_sq += y * y
+
+    def acf(self) -> np.ndarray:
+        """rho(1..L) for the lags with at least one product so far."""
+        n = self.count
+        if n < 3:
+            return np.zeros(0)
+        mean = self.sum / n
+        var = self.sum_sq / n - mean * mean
+        lags = min(n - 1, self.max_lag)
+        if var <= 0.0:
+            return np.zeros(lags)
+        pairs = n - np.arange(1, lags + 1)
+        return (self.lag_sums[:lags] / pairs - mean * mean) / var
+
+    def integrated_time(self) -> Optional[float]:
+        """1 + 2 * sum(rho_k), summed up to the first non-positive rho."""
+        rho = self.acf()
+        if rho.size == 0:
+            return None
+        stop = np.flatnonzero(rho <= 0.0)
+        window = rho[: stop[0]] if stop.size else rho
+        return 1.0 + 2.0 * float(window.sum())
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "max_lag": self.max_lag,
+            "shift": self.shift,
+            "count": self.count,
+            "sum": self.sum,
+            "sum_sq": self.sum_sq,
+            "recent": self.recent.tolist(),
+            "lag_sums": self.lag_sums.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "RunningAutocorrelation":
+        acf = cls(state["max_lag"])
+        acf.shift = state["shift"]
+        acf.count = int(state["count"])
+        acf.sum = float(state["sum"])
+        acf.sum_sq = float(state["sum_sq"])
+        acf.recent = np.asarray(state["recent"], dtype=float)
+        acf.lag_sums = np.asarray(state["lag_sums"], dtype=float)
+        return acf
+
+
+class ColumnStats:
+    """All online accumulators of one data column."""
+
+    def __init__(self, max_lag: int = DEFAULT_MAX_LAG) -> None:
+        self.moments = Welford()
+        self.blocks = BlockAverager()
+        self.autocorrelation = RunningAutocorrelation(max_lag)
+
+    def add(self, value: float) -> None:
+        self.moments.add(value)
+        self.blocks.add(value)
+        self.autocorrelation.add(value)
+
+    def summary(self) -> dict[str, Any]:
+        n = self.moments.count
+        var = self.moments.variance
+        naive_sem = math.sqrt(var / n) if var is not None else None
+        block_sem = self.blocks.sem()
+        inefficiency = (
+            (block_sem / naive_sem) ** 2
+            if block_sem is not None and naive_sem
+            else None
+        )
+        return {
+            "n": n,
+            "mean": self.moments.mean if n else None,
+            "variance": var,
+            "std": math.sqrt(var) if var is not None else None,
+            "sem_naive": naive_sem,
+            "sem": block_sem,
+            "statistical_inefficiency": inefficiency,
+            "tau_int": self.autocorrelation.integrated_time(),
+            "blocks": self.blocks.standard_errors(),
+        }
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "moments": self.moments.state(),
+            "blocks": self.blocks.state(),
+            "autocorrelation": self.autocorrelation.state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "ColumnStats":
+        column = cls()
+        column.moments = Welford(*state["moments"])
+        column.blocks = BlockAverager.from_state(state["blocks"])
+        column.autocorrelation = RunningAutocorrelation.from_state(
+            state["autocorrelation"]
+        )
+        return column
+
+
+def _as_float(value: str) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+class OnlineStatsBook:
+    """Column statistics for every engine and box of a run."""
+
+    def __init__(self, *, max_lag: int = DEFAULT_MAX_LAG) -> None:
+        self.max_lag = int(max_lag)
+        # "NAMD" / "GOMC" -> box -> column -> stats
+        self.columns: dict[str, dict[int, dict[str, ColumnStats]]] = {}
+
+    def update(
+        self,
+        engine: str,
+        box: int,
+        titles: Sequence[str],
+        rows: Iterable[Sequence[str]],
+        *,
+        skip: Iterable[str] = (),
+    ) -> None:
+        """Add every numeric value of `rows` under its column title."""
+        skipped = set(skip)
+        box_columns = self.columns.setdefault(engine, {}).setdefault(
+            int(box), {}
+        )
+        names = [title.lstrip("#") for title in titles]
+        for row in rows:
+            for name, value in zip(names, row):
+                if name in skipped:
+                    continue
+                number = _as_float(value)
+                if number is None:
+                    continue
+                column = box_columns.get(name)
+                if column is None:
+                    column = box_columns[name] = ColumnStats(self.max_lag)
+                column.add(number)
+
+    def get(self, engine: str, box: int, column: str) -> Optional[ColumnStats]:
+        return self.columns.get(engine, {}).get(int(box), {}).get(column)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            engine: {
+                f"box_{box}": {
+                    name: column.summary() for name, column in columns.items()
+                }
+                for box, columns in boxes.items()
+            }
+            for engine, boxes in self.columns.items()
+        }
+
+    def state(self) -> dict[str, Any]:
+        return {
+            engine: {
+                str(box): {
+                    name: column.state() for name, column in columns.items()
+                }
+                for box, columns in boxes.items()
+            }
+            for engine, boxes in self.columns.items()
+        }
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.columns = {
+            engine: {
+                int(box): {
+                    name: ColumnStats.from_state(column)
+                    for name, column in columns.items()
+                }
+                for box, columns in boxes.items()
+            }
+            for engine, boxes in state.items()
+        }
+
+    def write_snapshot(
+        self,
+        path: str | Path,
+        *,
+        cycle: Optional[int],
+        step: int,
+    ) -> None:
+        """Atomically replace the per-cycle JSON snapshot at `path`."""
+        path = Path(path)
+        payload = {
+            "version": STATS_SNAPSHOT_VERSION,
+            "cycle": cycle,
+            "step": int(step),
+            "stats": self.summary(),
+            "state": self.state(),
+        }
+        tmp = path.with_name(f".{path.name}.tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=1)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+
+def read_snapshot(path: str | Path) -> Optional[dict[str, Any]]:
+    """Load a snapshot written by `write_snapshot` (None if unusable)."""
+    try:
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != STATS_SNAPSHOT_VERSION:
+        return None
+    return payload
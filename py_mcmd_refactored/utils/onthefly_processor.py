@@ -3,13 +3,43 @@
 from __future__ import annotations
 
 import logging
+import os
 import shutil
+import struct
 import subprocess
 from pathlib import Path
 from typing import Iterable, Optional, TextIO
 
+import numpy as np
+from utils.compressed_traj import (
+    BLOCK_FRAMES,
+    TRAJ_SUFFIX,
+    CompressedTrajectory,
+    compressed_path_for,
+)
+from utils.dcd import (
+    DcdFrameIndex,
+    DcdTrajectory,
+    count_dcd_frames,
+    read_dcd_header,
+    truncate_dcd_frames,
+    write_dcd_subset,
+)
 from utils.fifo_store import _discover_managed_root
+from utils.online_stats import (
+    STATS_SNAPSHOT_NAME,
+    OnlineStatsBook,
+    read_snapshot,
+)
+from utils.otf_commit import (
+    COMMIT_RECORD_NAME,
+    OtfCommitLog,
+    truncate_to_offsets,
+)
+from utils.output_index import CycleOffsetIndex
 from utils.path import format_cycle_id
+from utils.psf import read_psf, select_atoms, write_reduced_psf
+from utils.tracing import trace_span, trace_tags
 
 logger = logging.getLogger(__name__)
 
@@ -288,19 +318,6 @@ def _parse_gomc_log(
     )
 
 
-# Module-level cache for which CPU core catdcd should be pinned to.
-# Set once by the processor based on NAMD's core count. catdcd is pinned
-# to a core OUTSIDE NAMD's range so it does not steal CPU from NAMD's
-# compute-bound threads -- this keeps NAMD fast (like the old code) while
-# still combining DCDs every cycle (crash-safe, unlike deferring to the end).
-_CATDCD_CORE: Optional[int] = None
-
-
-def _set_catdcd_core(core_id: Optional[int]) -> None:
-    global _CATDCD_CORE
-    _CATDCD_CORE = core_id
-
-
 def _append_dcd(
     catdcd_bin: str | Path,
     src_dcd: str | Path,
@@ -308,9 +325,9 @@ def _append_dcd(
 ) -> bool:
     """Append one DCD segment to a combined trajectory atomically.
 
-    catdcd is pinned (via taskset) to a dedicated CPU core outside NAMD's
-    range when _CATDCD_CORE is set, so the combine step does not compete
-    with NAMD's compute-bound threads for CPU.
+    catdcd inherits the scheduling of the calling process; the orchestrator
+    isolates its OTF worker (see utils/background.py), so the combine step
+    does not compete with NAMD's compute-bound threads.
     """
     src = Path(src_dcd)
     dst = Path(dst_dcd)
@@ -338,22 +355,14 @@ def _append_dcd(
 
     command.append(str(src))
 
-    # Pin catdcd to its dedicated core (outside NAMD's range) if available.
-    # taskset is standard on Linux; if unavailable the command still runs
-    # normally, just without pinning.
-    if _CATDCD_CORE is not None:
-        import shutil as _shutil
-
-        if _shutil.which("taskset"):
-            command = ["taskset", "-c", str(_CATDCD_CORE)] + command
-
     try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
+        with trace_span("catdcd", "io", src=str(src)):
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
 
         if result.returncode != 0:
             logger.warning(
@@ -424,38 +433,6 @@ class OnTheFlyProcessor:
 
         self._managed_root = _discover_managed_root(managed_root)
 
-        # Pin catdcd to the CPU core specified in the JSON (catdcd_core),
-        # so the per-cycle DCD combine does not steal CPU from NAMD's
-        # compute threads. Set catdcd_core in the JSON to a core OUTSIDE
-        # NAMD's range (e.g. NAMD uses cores 0-7, set catdcd_core=8).
-        # This keeps NAMD fast (like the old code) while still combining
-        # every cycle so partial data survives a crash.
-        try:
-            catdcd_core = getattr(cfg, "catdcd_core", None)
-            enable_affinity = bool(getattr(cfg, "enable_cpu_affinity", False))
-            reserved = getattr(cfg, "otf_reserved_cores", None)
-
-            chosen_core = None
-            if catdcd_core is not None:
-                # Explicit core ID takes priority
-                chosen_core = int(catdcd_core)
-            elif enable_affinity:
-                # Derive the core from NAMD's range + reserved offset
-                namd_cores = int(getattr(cfg, "no_core_box_0", 1)) + int(
-                    getattr(cfg, "no_core_box_1", 0)
-                )
-                chosen_core = namd_cores  # first core past NAMD's range
-
-            if chosen_core is not None:
-                _set_catdcd_core(chosen_core)
-                logger.info("[OnTheFly] catdcd pinned to core %d", chosen_core)
-            else:
-                logger.info("[OnTheFly] catdcd runs without CPU pinning.")
-        except Exception as _exc:
-            logger.warning(
-                "[OnTheFly] Could not set catdcd CPU affinity: %s", _exc
-            )
-
         self.catdcd_bin = Path(
             getattr(
                 cfg,
@@ -486,6 +463,43 @@ class OnTheFlyProcessor:
             and self.sim_type != "GCMC"
         )
 
+        # Per-engine atom selection and frame stride for the combined
+        # DCDs; selections are resolved against the PSF on first use.
+        self._dcd_filters = {
+            "NAMD": (
+                getattr(cfg, "otf_namd_dcd_selection", None),
+                max(1, int(getattr(cfg, "otf_namd_dcd_frame_stride", 1))),
+            ),
+            "GOMC": (
+                getattr(cfg, "otf_gomc_dcd_selection", None),
+                max(1, int(getattr(cfg, "otf_gomc_dcd_frame_stride", 1))),
+            ),
+        }
+        self._dcd_atoms: dict[Path, Optional[np.ndarray]] = {}
+
+        # "dcd" (catdcd, default), "compressed" (.pmct) or "both"
+        self.trajectory_format = str(
+            getattr(cfg, "otf_trajectory_format", "dcd")
+        ).lower()
+        self.trajectory_precision = float(
+            getattr(cfg, "otf_trajectory_precision", 0.001)
+        )
+        self._compressed_trajs: dict[Path, CompressedTrajectory] = {}
+
+        # Online block averages / autocorrelation of the parsed columns,
+        # snapshotted to online_stats.json at every commit.
+        # Off unless requested (or needed by convergence_stop): the
+        # snapshot is rewritten and fsynced every cycle.
+        self._stats_max_lag = int(getattr(cfg, "otf_stats_max_lag", 64))
+        online_stats = getattr(cfg, "otf_online_stats", None)
+        if online_stats is None:
+            online_stats = getattr(cfg, "convergence_stop", None) is not None
+        self._stats = (
+            OnlineStatsBook(max_lag=self._stats_max_lag)
+            if bool(online_stats)
+            else None
+        )
+
         self._current_step = 0
 
         self._namd_e_titles = None
@@ -516,6 +530,13 @@ class OnTheFlyProcessor:
             "gomc1_stitle": False,
         }
 
+        # Roll back whatever an interrupted cycle left behind before the
+        # combined files are reopened for appending.
+        self._commit_log = OtfCommitLog(self.combined_dir / COMMIT_RECORD_NAME)
+        restored = self._commit_log.latest()
+        if restored is not None:
+            self._restore_commit(restored)
+
         self._namd_log_fh = self._open_append("NAMD_data_box_0.txt")
 
         self._gomc_log_fh = {
@@ -538,6 +559,11 @@ class OnTheFlyProcessor:
             "GOMC_Energies_Stat_kcal_per_mol_box_0.txt"
         )
 
+        if restored is None:
+            # Baseline: pre-existing content is kept, anything appended
+            # before the first committed cycle is not.
+            self._commit(None, None, None)
+
         logger.info(
             "[OnTheFly] Initialized core processor. " "Output dir: %s",
             self.combined_dir,
@@ -547,12 +573,210 @@ class OnTheFlyProcessor:
         self,
         basename: str,
     ) -> TextIO:
+        # Block-buffered: rows reach the file in batches and are made
+        # durable once per cycle by `_commit`.
         return (self.combined_dir / basename).open(
             "a",
             encoding="utf-8",
-            buffering=1,
         )
 
+    def _output_handles(self) -> dict[str, TextIO]:
+        handles = {
+            "NAMD_data_box_0.txt": self._namd_log_fh,
+            "GOMC_data_box_0.txt": self._gomc_log_fh[0],
+            "GOMC_data_box_1.txt": self._gomc_log_fh[1],
+            "combined_NAMD_GOMC_data_box_0.txt": self._combined_fh,
+            "NAMD_data_density_box_0.txt": self._namd_density_fh,
+            "GOMC_Energies_Stat_box_0.txt": self._gomc_stat_fh,
+            "GOMC_Energies_Stat_kcal_per_mol_box_0.txt": self._gomc_kcal_fh,
+        }
+        return {name: fh for name, fh in handles.items() if fh is not None}
+
+    def _dcd_sizes(self) -> dict[str, int]:
+        return {
+            path.name: path.stat().st_size
+            for path in sorted(self.combined_dir.glob("combined_box_*.dcd"))
+        }
+
+    def _commit(
+        self,
+        namd_run_no: Optional[int],
+        gomc_run_no: Optional[int],
+        cycle: Optional[int],
+    ) -> dict:
+        """Flush the combined files and record a consistent cut point."""
+        previous = self._commit_log.latest()
+        previous_offsets = previous.get("offsets", {}) if previous else {}
+
+        offsets: dict[str, int] = {}
+        for basename, handle in self._output_handles().items():
+            handle.flush()
+            os.fsync(handle.fileno())
+            offsets[basename] = os.fstat(handle.fileno()).st_size
+
+            index = CycleOffsetIndex(self.combined_dir / basename)
+            if cycle is not None:
+                index.index_region(
+                    cycle,
+                    int(previous_offsets.get(basename, 0)),
+                    offsets[basename],
+                )
+            # the sidecar is rolled back together with its output
+            offsets[index.path.name] = (
+                index.path.stat().st_size if index.path.exists() else 0
+            )
+
+        for path in sorted(
+            self.combined_dir.glob(f"combined_box_*{TRAJ_SUFFIX}")
+        ):
+            offsets[path.name] = path.stat().st_size
+
+        for dcd_name in self._dcd_sizes():
+            frame_index = DcdFrameIndex(self.combined_dir / dcd_name)
+            offsets[frame_index.path.name] = (
+                frame_index.path.stat().st_size
+                if frame_index.path.exists()
+                else 0
+            )
+
+        if self._stats is not None:
+            self._stats.write_snapshot(
+                self.combined_dir / STATS_SNAPSHOT_NAME,
+                cycle=cycle,
+                step=self._current_step,
+            )
+
+        record = {
+            "cycle": cycle,
+            "namd_run_no": namd_run_no,
+            "gomc_run_no": gomc_run_no,
+            "current_step": self._current_step,
+            "offsets": offsets,
+            "dcd_sizes": self._dcd_sizes(),
+            "header_written": dict(self._header_written),
+            "namd_e_titles": self._namd_e_titles,
+            "namd_density_titles": self._namd_density_titles,
+            "gomc_titles": {
+                str(box): dict(titles)
+                for box, titles in self._gomc_titles.items()
+            },
+        }
+        self._commit_log.append(record)
+        return record
+
+    def _restore_commit(self, record: dict) -> None:
+        truncated = truncate_to_offsets(
+            self.combined_dir, record.get("offsets", {})
+        )
+        # cached frame counts may now be past the end of the files
+        self._compressed_trajs.clear()
+        self._restore_stats(record.get("cycle"))
+
+        self._current_step = int(record.get("current_step", 0))
+        self._header_written.update(record.get("header_written", {}))
+        self._namd_e_titles = record.get("namd_e_titles")
+        self._namd_density_titles = record.get("namd_density_titles")
+        for box, titles in record.get("gomc_titles", {}).items():
+            self._gomc_titles[int(box)].update(titles)
+
+        for name, size in record.get("dcd_sizes", {}).items():
+            path = self.combined_dir / name
+            if not path.exists() or path.stat().st_size == int(size):
+                continue
+            try:
+                header = read_dcd_header(path)
+            except (OSError, ValueError, struct.error):
+                header = None
+            committed_frames = (
+                (int(size) - header.header_bytes) // header.frame_bytes
+                if header is not None and int(size) >= header.header_bytes
+                else None
+            )
+            if committed_frames is not None and truncate_dcd_frames(
+                path, committed_frames
+            ):
+                truncated.append(name)
+            else:
+                logger.warning(
+                    "[OnTheFly] %s changed after the last committed cycle; "
+                    "it may hold frames of an unfinished cycle",
+                    path,
+                )
+
+        logger.info(
+            "[OnTheFly] Resuming after committed cycle %s " "(truncated: %s)",
+            record.get("cycle"),
+            ", ".join(truncated) or "none",
+        )
+
+    def _restore_stats(self, cycle: Optional[int]) -> None:
+        if self._stats is None:
+            return
+        self._stats = OnlineStatsBook(max_lag=self._stats_max_lag)
+        snapshot = read_snapshot(self.combined_dir / STATS_SNAPSHOT_NAME)
+        if snapshot is not None and snapshot.get("cycle") == cycle:
+            self._stats.load_state(snapshot.get("state", {}))
+        elif cycle is not None:
+            logger.warning(
+                "[OnTheFly] No online statistics snapshot for cycle %s; "
+                "statistics restart from the next cycle",
+                cycle,
+            )
+
+    @property
+    def stats(self) -> Optional[OnlineStatsBook]:
+        """Online statistics of the parsed columns (None when disabled)."""
+        return self._stats
+
+    @property
+    def last_committed_cycle(self) -> Optional[int]:
+        latest = self._commit_log.latest()
+        if latest is None or latest.get("cycle") is None:
+            return None
+        return int(latest["cycle"])
+
+    def rewind_to_cycle(
+        self,
+        start_cycle: int,
+    ) -> Optional[int]:
+        """Drop combined rows of cycles >= `start_cycle` before a restart.
+
+        Returns the committed cycle the outputs now end at (None when they
+        end before the first cycle).
+        """
+        start_cycle = int(start_cycle)
+        latest = self._commit_log.latest()
+
+        if latest is not None and (
+            latest.get("cycle") is None or int(latest["cycle"]) < start_cycle
+        ):
+            if (
+                latest.get("cycle") is not None
+                and int(latest["cycle"]) < start_cycle - 1
+            ):
+                logger.warning(
+                    "[OnTheFly] Combined outputs end at cycle %s but the run "
+                    "restarts at cycle %d; cycles in between are missing",
+                    latest["cycle"],
+                    start_cycle,
+                )
+            return self.last_committed_cycle
+
+        record = self._commit_log.latest_before(start_cycle)
+        if record is None:
+            logger.warning(
+                "[OnTheFly] No commit record before cycle %d is kept; "
+                "combined outputs may repeat rows for re-run cycles",
+                start_cycle,
+            )
+            return self.last_committed_cycle
+
+        for handle in self._output_handles().values():
+            handle.flush()
+        self._restore_commit(record)
+        self._commit_log.discard_after(record)
+        return self.last_committed_cycle
+
     def _namd_dir(
         self,
         run_no: int,
@@ -651,37 +875,36 @@ class OnTheFlyProcessor:
         namd_run_no: int,
         gomc_run_no: int,
     ) -> None:
-        self._process_namd_step(namd_run_no)
-        self._process_gomc_step(gomc_run_no)
+        with trace_tags(cycle=gomc_run_no // 2), trace_span("OTF cycle", "otf"):
+            with trace_span("OTF NAMD rows", "otf", run_no=namd_run_no):
+                self._process_namd_step(namd_run_no)
+            with trace_span("OTF GOMC rows", "otf", run_no=gomc_run_no):
+                self._process_gomc_step(gomc_run_no)
 
-        if self.combine_namd_dcd and self.sim_type in {"NVT", "NPT"}:
-            self._append_namd_dcd(namd_run_no)
+            if self.combine_namd_dcd and self.sim_type in {"NVT", "NPT"}:
+                with trace_span("OTF NAMD DCD", "otf", run_no=namd_run_no):
+                    self._append_namd_dcd(namd_run_no)
 
-        if self.combine_gomc_dcd:
-            self._append_gomc_dcd(gomc_run_no)
+            if self.combine_gomc_dcd:
+                with trace_span("OTF GOMC DCD", "otf", run_no=gomc_run_no):
+                    self._append_gomc_dcd(gomc_run_no)
 
-        self._copy_merged_psf(gomc_run_no)
+            self._copy_merged_psf(gomc_run_no)
 
-        self._archive_cycle_logs(
-            namd_run_no,
-            gomc_run_no,
-        )
-
-    def close(self) -> None:
-        handles = [
-            self._namd_log_fh,
-            self._gomc_log_fh[0],
-            self._gomc_log_fh[1],
-            self._combined_fh,
-            self._namd_density_fh,
-            self._gomc_stat_fh,
-            self._gomc_kcal_fh,
-        ]
+            self._archive_cycle_logs(
+                namd_run_no,
+                gomc_run_no,
+            )
 
-        for handle in handles:
-            if handle is None:
-                continue
+            with trace_span("OTF commit", "otf"):
+                self._commit(
+                    namd_run_no,
+                    gomc_run_no,
+                    gomc_run_no // 2,
+                )
 
+    def close(self) -> None:
+        for handle in self._output_handles().values():
             try:
                 handle.flush()
                 handle.close()
@@ -775,6 +998,15 @@ class OnTheFlyProcessor:
 
         self._current_step = last_ts
 
+        if self._stats is not None and self._namd_e_titles:
+            self._stats.update(
+                "NAMD",
+                0,
+                list(self._namd_e_titles) + ["DENSITY"],
+                (list(row) + [str(density)] for row, density in raw_rows),
+                skip=("ETITLE:", "TS"),
+            )
+
         self._append_combined_rows(combined_rows)
 
         return combined_rows
@@ -846,12 +1078,21 @@ class OnTheFlyProcessor:
 
         self._current_step = last_step
 
+        if self._stats is not None and box0_titles["stat"]:
+            self._stats.update(
+                "GOMC",
+                0,
+                box0_titles["stat"],
+                rows_to_write,
+                skip=("STEP",),
+            )
+
         if self.sim_type in {
             "GEMC",
             "GCMC",
         }:
             (
-                _,
+                merged_box1,
                 _,
                 raw_box1,
                 _,
@@ -867,6 +1108,16 @@ class OnTheFlyProcessor:
                 skip_duplicate_pair=True,
             )
 
+            box1_titles = self._gomc_titles[1]["stat"]
+            if self._stats is not None and box1_titles:
+                self._stats.update(
+                    "GOMC",
+                    1,
+                    box1_titles,
+                    merged_box1[1:] if len(merged_box1) > 1 else merged_box1,
+                    skip=("STEP",),
+                )
+
         return rows_to_write
 
     def _parse_gomc_box(
@@ -982,12 +1233,240 @@ class OnTheFlyProcessor:
 
         dst = self.combined_dir / "combined_box_0_NAMD_dcd_files.dcd"
 
-        return _append_dcd(
-            self.catdcd_bin,
+        return self._append_indexed_dcd(
             src,
             dst,
+            cycle=run_no // 2,
+            engine="NAMD",
+            box=0,
+        )
+
+    def _append_indexed_dcd(
+        self,
+        src: Path,
+        dst: Path,
+        *,
+        cycle: int,
+        engine: str,
+        box: int,
+    ) -> bool:
+        """Append `src` to `dst` and record the new frames in its index.
+
+        With an atom selection or a frame stride configured for `engine`,
+        the segment is first reduced to a temporary DCD next to `dst`.
+        Depending on `trajectory_format` the segment goes to the compressed
+        trajectory beside `dst` instead of, or as well as, the DCD.
+        """
+        if self.trajectory_format in {"compressed", "both"}:
+            compressed = self._append_compressed(
+                src,
+                dst,
+                cycle=cycle,
+                engine=engine,
+                box=box,
+            )
+            if self.trajectory_format == "compressed":
+                return compressed
+
+        frames_before = (count_dcd_frames(dst) or 0) if dst.exists() else 0
+
+        selection, stride = self._dcd_filters[engine]
+        segment = src
+        if selection is not None or stride > 1:
+            segment = dst.with_name(f".{dst.name}.segment")
+            try:
+                kept = write_dcd_subset(
+                    src,
+                    segment,
+                    atom_indices=self._dcd_atom_indices(
+                        src,
+                        dst,
+                        engine=engine,
+                        box=box,
+                        selection=selection,
+                    ),
+                    stride=stride,
+                )
+            except (OSError, ValueError, struct.error, IndexError) as exc:
+                logger.warning(
+                    "[OnTheFly] Could not reduce DCD %s: %s",
+                    src,
+                    exc,
+                )
+                segment.unlink(missing_ok=True)
+                return False
+
+            if kept == 0:
+                logger.info(
+                    "[OnTheFly] %s has fewer frames than the stride %d; "
+                    "nothing appended",
+                    src,
+                    stride,
+                )
+                segment.unlink(missing_ok=True)
+                return False
+
+        try:
+            appended = _append_dcd(
+                self.catdcd_bin,
+                segment,
+                dst,
+            )
+        finally:
+            if segment != src:
+                segment.unlink(missing_ok=True)
+
+        if appended:
+            DcdFrameIndex(dst).record_append(
+                cycle=cycle,
+                engine=engine,
+                box=box,
+                frames_before=frames_before,
+            )
+
+        return appended
+
+    def _append_compressed(
+        self,
+        src: Path,
+        dst: Path,
+        *,
+        cycle: int,
+        engine: str,
+        box: int,
+    ) -> bool:
+        """Quantize the selected atoms/frames of `src` into ``dst.pmct``."""
+        selection, stride = self._dcd_filters[engine]
+        path = compressed_path_for(dst)
+        trajectory = self._compressed_trajs.setdefault(
+            path, CompressedTrajectory(path)
         )
 
+        added = 0
+        try:
+            atoms = self._dcd_atom_indices(
+                src,
+                dst,
+                engine=engine,
+                box=box,
+                selection=selection,
+            )
+            segment = DcdTrajectory(src)
+            kept = range(stride - 1, len(segment), stride)
+            for start in range(0, len(kept), BLOCK_FRAMES):
+                rows = kept[start : start + BLOCK_FRAMES]
+                frames = segment.frames(slice(rows.start, rows.stop, rows.step))
+                coords = np.stack(
+                    [
+                        (
+                            frames[axis]
+                            if atoms is None
+                            else frames[axis][:, atoms]
+                        )
+                        for axis in ("x", "y", "z")
+                    ],
+                    axis=-1,
+                )
+                added += trajectory.append(
+                    coords,
+                    segment.unit_cells(slice(rows.start, rows.stop, rows.step)),
+                    precision=self.trajectory_precision,
+                    cycle=cycle,
+                    engine=engine,
+                    box=box,
+                )
+        except (OSError, ValueError, struct.error, IndexError) as exc:
+            logger.warning(
+                "[OnTheFly] Could not compress DCD %s into %s: %s",
+                src,
+                path,
+                exc,
+            )
+            self._compressed_trajs.pop(path, None)
+            return False
+
+        return added > 0
+
+    def _dcd_atom_indices(
+        self,
+        src: Path,
+        dst: Path,
+        *,
+        engine: str,
+        box: int,
+        selection,
+    ) -> Optional[np.ndarray]:
+        """Atoms of `src` kept in `dst` (None: all), resolved once per run.
+
+        The selection is resolved against the first PSF whose atom count
+        matches the DCD, and a reduced PSF is written beside `dst`.
+        """
+        if dst in self._dcd_atoms:
+            return self._dcd_atoms[dst]
+
+        self._dcd_atoms[dst] = None
+        if selection is None:
+            return None
+
+        n_atoms = read_dcd_header(src).n_atoms
+        candidates = [
+            src.parent / f"Output_data_BOX_{box}_restart.psf",
+            src.parent / "Output_data_merged.psf",
+        ]
+        starting_psf = getattr(self.cfg, f"starting_psf_box_{box}_file", None)
+        if starting_psf:
+            candidates.append(Path(starting_psf))
+
+        for psf_path in candidates:
+            if not psf_path.exists():
+                continue
+            try:
+                topology = read_psf(psf_path)
+            except (OSError, ValueError) as exc:
+                logger.warning(
+                    "[OnTheFly] Skipping unreadable PSF %s: %s",
+                    psf_path,
+                    exc,
+                )
+                continue
+            if topology.n_atoms == n_atoms:
+                break
+        else:
+            logger.warning(
+                "[OnTheFly] No PSF with %d atoms found for the %s box-%d "
+                "DCD; its atom selection is ignored",
+                n_atoms,
+                engine,
+                box,
+            )
+            return None
+
+        indices = select_atoms(topology, selection)
+        if len(indices) == 0:
+            logger.warning(
+                "[OnTheFly] The %s DCD atom selection matches no atoms in "
+                "%s; it is ignored",
+                engine,
+                psf_path,
+            )
+            return None
+
+        reduced_psf = write_reduced_psf(
+            topology,
+            indices,
+            dst.with_suffix(".psf"),
+        )
+        logger.info(
+            "[OnTheFly] %s box-%d DCD keeps %d of %d atoms (PSF: %s)",
+            engine,
+            box,
+            len(indices),
+            n_atoms,
+            reduced_psf,
+        )
+        self._dcd_atoms[dst] = indices
+        return indices
+
     def _append_gomc_dcd(
         self,
         run_no: int,
@@ -1021,10 +1500,12 @@ class OnTheFlyProcessor:
                 f"combined_box_{box_no}_" "GOMC_dcd_files.dcd"
             )
 
-            results[box_no] = _append_dcd(
-                self.catdcd_bin,
+            results[box_no] = self._append_indexed_dcd(
                 src,
                 dst,
+                cycle=run_no // 2,
+                engine="GOMC",
+                box=box_no,
             )
 
         return results
@@ -0,0 +1,152 @@
+"""Per-cycle commit records for the on-the-fly combined outputs.
+
+After every processed cycle the processor flushes its combined text files
+and appends a record holding the cycle id, the committed byte size of each
+file and the title/header state needed to keep appending. The record file
+is replaced atomically, so after a crash it always describes a complete
+cycle; anything past the recorded offsets belongs to an unfinished cycle
+and is truncated on restart.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+COMMIT_RECORD_NAME = "otf_commit.json"
+COMMIT_RECORD_VERSION = 1
+# Number of recent commits kept so a restart from an earlier cycle can
+# still roll the combined files back.
+COMMIT_HISTORY = 16
+
+
+class OtfCommitLog:
+    """Atomic, bounded history of on-the-fly commit records."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        history: int = COMMIT_HISTORY,
+    ) -> None:
+        self.path = Path(path)
+        self.history = max(1, int(history))
+        self._commits: list[dict[str, Any]] = self._read()
+
+    @property
+    def commits(self) -> list[dict[str, Any]]:
+        return list(self._commits)
+
+    def latest(self) -> Optional[dict[str, Any]]:
+        return self._commits[-1] if self._commits else None
+
+    def latest_before(self, cycle: int) -> Optional[dict[str, Any]]:
+        """Return the newest commit for a cycle earlier than `cycle`."""
+        for record in reversed(self._commits):
+            committed = record.get("cycle")
+            if committed is None or int(committed) < int(cycle):
+                return record
+        return None
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        self._commits.append(dict(record))
+        del self._commits[: -self.history]
+        self._write()
+
+    def discard_after(self, record: Mapping[str, Any]) -> None:
+        """Drop every commit newer than `record` (which must be kept)."""
+        for index in range(len(self._commits) - 1, -1, -1):
+            if self._commits[index] == record:
+                del self._commits[index + 1 :]
+                self._write()
+                return
+        raise ValueError("commit record is not part of this log")
+
+    def _read(self) -> list[dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning(
+                "[OnTheFly] Ignoring unreadable commit record %s: %s",
+                self.path,
+                exc,
+            )
+            return []
+        if payload.get("version") != COMMIT_RECORD_VERSION:
+            logger.warning(
+                "[OnTheFly] Ignoring commit record %s with version %s",
+                self.path,
+                payload.get("version"),
+            )
+            return []
+        return list(payload.get("commits", []))
+
+    def _write(self) -> None:
+        payload = {
+            "version": COMMIT_RECORD_VERSION,
+            "commits": self._commits,
+        }
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=1)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path.parent)
+
+
+def truncate_to_offsets(
+    directory: str | Path,
+    offsets: Mapping[str, int],
+) -> list[str]:
+    """Truncate each file in `directory` back to its committed size.
+
+    Returns the basenames that were shortened. Files shorter than their
+    recorded size are left alone and reported in the log.
+    """
+    directory = Path(directory)
+    truncated: list[str] = []
+
+    for basename, size in offsets.items():
+        path = directory / basename
+        if not path.exists():
+            if int(size) > 0:
+                logger.warning(
+                    "[OnTheFly] Committed output %s is missing", path
+                )
+            continue
+
+        current = path.stat().st_size
+        if current > int(size):
+            os.truncate(path, int(size))
+            truncated.append(basename)
+        elif current < int(size):
+            logger.warning(
+                "[OnTheFly] %s is shorter than its committed size "
+                "(%d < %d bytes)",
+                path,
+                current,
+                int(size),
+            )
+
+    return truncated
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,194 @@
+"""On-the-fly processing in an isolated worker process.
+
+`BackgroundIsolation` can pin, renice and I/O-deprioritize a thread, but a
+worker *thread* still shares the interpreter lock with the orchestrator and
+its engine stdout pumps: while the OTF cycle parses logs in Python, a pump
+waits up to the switch interval for every chunk it moves, and a niced
+worker that is descheduled while holding the lock stalls them longer.
+
+`OtfWorkerProcess` therefore keeps the `OnTheFlyProcessor` in a single
+spawned worker process whose initializer applies the isolation, and gives
+the orchestrator a proxy with the processor's interface. Calls run one at a
+time in the worker; errors are re-raised in the caller. After each call the
+worker sends back its online statistics, so `stats` stays readable for the
+convergence check. Log records are forwarded to the orchestrator's loggers.
+While a trace is being written, the worker collects its spans (OTF cycle,
+catdcd) with the caller's trace tags and returns them with each result,
+including a failed one; they are replayed on an "OTF worker" lane.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Optional
+
+from utils.background import BackgroundIsolation
+from utils.online_stats import OnlineStatsBook
+from utils.onthefly_processor import OnTheFlyProcessor
+from utils.tracing import (
+    TraceCollector,
+    active_tracer,
+    current_trace_tags,
+    install_collector,
+    replay_spans,
+    trace_tags,
+    uninstall_tracer,
+)
+
+TRACE_LANE = "OTF worker"
+
+# the worker process's processor
+_processor: Any = None
+
+
+def _init_worker(
+    isolation: Optional[BackgroundIsolation], log_queue, log_level: int
+) -> None:
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(log_level)
+    if isolation is not None:
+        isolation.apply()  # the only thread of the worker: applies to all
+
+
+def _stats_state() -> Optional[tuple[int, dict[str, Any]]]:
+    stats = getattr(_processor, "stats", None)
+    if stats is None:
+        return None
+    return stats.max_lag, stats.state()
+
+
+def _traced(fn: Callable[..., Any], tags: Optional[dict[str, Any]], *args):
+    """Run `fn` in the worker; returns (result, stats, trace events)."""
+    if tags is None:
+        uninstall_tracer()
+        return fn(*args), _stats_state(), []
+    collector = active_tracer()
+    if not isinstance(collector, TraceCollector):
+        collector = install_collector()
+    try:
+        with trace_tags(**tags):
+            result = fn(*args)
+    except BaseException as exc:
+        exc.trace_events = collector.drain()
+        raise
+    return result, _stats_state(), collector.drain()
+
+
+def _start(factory: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+    global _processor
+    _processor = factory(*args, **kwargs)
+
+
+def _call(name: str, args: tuple, kwargs: dict) -> Any:
+    return getattr(_processor, name)(*args, **kwargs)
+
+
+class _ForwardToLoggers(logging.Handler):
+    """Hands worker records to the same-named logger of this process."""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        pass
+
+
+class OtfWorkerProcess:
+    """`OnTheFlyProcessor` proxy running it in a worker process."""
+
+    def __init__(
+        self,
+        cfg,
+        combined_data_dir,
+        *,
+        managed_root=None,
+        isolation: Optional[BackgroundIsolation] = None,
+        factory: Callable[..., Any] = OnTheFlyProcessor,
+    ) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        self._log_queue = ctx.Queue()
+        self._log_listener = QueueListener(self._log_queue, _ForwardToLoggers())
+        self._log_listener.start()
+        log_level = logging.getLogger(factory.__module__).getEffectiveLevel()
+        self._pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(isolation, self._log_queue, log_level),
+        )
+        self._stats: Optional[OnlineStatsBook] = None
+        try:
+            self._run(
+                _start,
+                factory,
+                (cfg, combined_data_dir),
+                {"managed_root": managed_root},
+            )
+        except BaseException:
+            self._shutdown()
+            raise
+
+    def _run(self, fn, *args) -> Any:
+        if self._pool is None:
+            raise RuntimeError("OTF worker process is closed")
+        tags = current_trace_tags() if active_tracer() is not None else None
+        try:
+            result, stats, events = self._pool.submit(
+                _traced, fn, tags, *args
+            ).result()
+        except BaseException as exc:
+            replay_spans(
+                getattr(exc, "trace_events", []), process_name=TRACE_LANE
+            )
+            raise
+        replay_spans(events, process_name=TRACE_LANE)
+        if stats is None:
+            self._stats = None
+        else:
+            max_lag, state = stats
+            self._stats = OnlineStatsBook(max_lag=max_lag)
+            self._stats.load_state(state)
+        return result
+
+    @property
+    def stats(self) -> Optional[OnlineStatsBook]:
+        """Online statistics as of the last call (None when disabled)."""
+        return self._stats
+
+    def rewind_to_cycle(self, start_cycle: int) -> Optional[int]:
+        return self._run(_call, "rewind_to_cycle", (start_cycle,), {})
+
+    def set_current_step(self, current_step: int) -> None:
+        self._run(_call, "set_current_step", (current_step,), {})
+
+    def process_cycle(self, namd_run_no: int, gomc_run_no: int) -> None:
+        self._run(
+            _call,
+            "process_cycle",
+            (),
+            {"namd_run_no": namd_run_no, "gomc_run_no": gomc_run_no},
+        )
+
+    def close(self) -> None:
+        if self._pool is None:
+            return
+        try:
+            self._run(_call, "close", (), {})
+        finally:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._log_listener is not None:
+            self._log_listener.stop()
+            self._log_listener = None
+            self._log_queue.close()
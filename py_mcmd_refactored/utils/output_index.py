@@ -0,0 +1,316 @@
+"""Cycle -> byte-offset sidecar index for the combined text outputs.
+
+Every indexed output ``<name>.txt`` gets a binary sidecar ``<name>.txt.idx``:
+an 8-byte magic followed by fixed-size little-endian records
+
+    cycle, first_step, byte_offset, n_bytes, n_rows   (5 x int64)
+
+one per cycle that wrote rows, in file order. Cycle and first-step columns
+are non-decreasing, so a cycle or step range resolves to a byte range with
+two binary searches over a memory-mapped view of the sidecar, and only that
+slice of the (possibly multi-GB) text file is read.
+
+The on-the-fly processor appends one record per committed cycle. Outputs
+produced by the legacy replay (``combine_data_NAMD_GOMC.py``) can be indexed
+after the fact with `CycleOffsetIndex.build`.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"PYMCIDX1"
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("cycle", "<i8"),
+        ("first_step", "<i8"),
+        ("offset", "<i8"),
+        ("n_bytes", "<i8"),
+        ("n_rows", "<i8"),
+    ]
+)
+
+
+@dataclass(frozen=True)
+class RowFormat:
+    """Where the step lives in a data row of one output file.
+
+    Lines that do not start with one of `prefixes` (when given) or whose
+    `step_field` token is not an integer are headers and are not counted.
+    """
+
+    step_field: int = 0
+    prefixes: tuple[str, ...] = ()
+
+    def step_of(self, line: str) -> Optional[int]:
+        if self.prefixes and not line.startswith(self.prefixes):
+            return None
+        tokens = line.split()
+        if self.step_field >= len(tokens):
+            return None
+        token = tokens[self.step_field]
+        try:
+            return int(token)
+        except ValueError:
+            pass
+        try:
+            return int(float(token))
+        except ValueError:
+            return None
+
+
+def row_format_for(path: str | Path) -> RowFormat:
+    """Return the row format of a combined output, by file name."""
+    name = Path(path).name
+    if name.startswith("NAMD_data_box_"):
+        return RowFormat(step_field=1, prefixes=("ENERGY:",))
+    if name.startswith("GOMC_data_box_"):
+        box = name[len("GOMC_data_box_") :].split(".", 1)[0]
+        return RowFormat(
+            step_field=1, prefixes=(f"ENER_{box}:", f"STAT_{box}:")
+        )
+    if name.startswith("combined_"):
+        return RowFormat(step_field=1)
+    return RowFormat(step_field=0)
+
+
+def index_path_for(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+@dataclass(frozen=True)
+class CycleIndexEntry:
+    cycle: int
+    first_step: int
+    offset: int
+    n_bytes: int
+    n_rows: int
+
+
+class CycleOffsetIndex:
+    """Sidecar index of one combined text output."""
+
+    def __init__(
+        self,
+        data_path: str | Path,
+        *,
+        row_format: Optional[RowFormat] = None,
+    ) -> None:
+        self.data_path = Path(data_path)
+        self.path = index_path_for(self.data_path)
+        self.row_format = row_format or row_format_for(self.data_path)
+
+    # ------------------------------------------------------------------
+    # writing
+    def append(self, entry: CycleIndexEntry) -> None:
+        record = np.array(
+            [
+                (
+                    entry.cycle,
+                    entry.first_step,
+                    entry.offset,
+                    entry.n_bytes,
+                    entry.n_rows,
+                )
+            ],
+            dtype=INDEX_DTYPE,
+        )
+        with self.path.open("ab") as fh:
+            if fh.tell() < len(INDEX_MAGIC):
+                # new (or truncated-to-empty) sidecar
+                fh.truncate(0)
+                fh.write(INDEX_MAGIC)
+            fh.write(record.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def index_region(
+        self,
+        cycle: int,
+        start: int,
+        end: int,
+    ) -> Optional[CycleIndexEntry]:
+        """Index bytes [`start`, `end`) of the data file as `cycle`.
+
+        Returns the appended entry, or None when the region holds no rows.
+        """
+        if end <= start:
+            return None
+        with self.data_path.open("rb") as fh:
+            fh.seek(start)
+            chunk = fh.read(end - start)
+
+        first_step = None
+        n_rows = 0
+        for raw in chunk.splitlines():
+            step = self.row_format.step_of(raw.decode("utf-8", "ignore"))
+            if step is None:
+                continue
+            if first_step is None:
+                first_step = step
+            n_rows += 1
+
+        if first_step is None:
+            return None
+
+        entry = CycleIndexEntry(
+            cycle=int(cycle),
+            first_step=first_step,
+            offset=int(start),
+            n_bytes=int(end - start),
+            n_rows=n_rows,
+        )
+        self.append(entry)
+        return entry
+
+    @classmethod
+    def build(
+        cls,
+        data_path: str | Path,
+        *,
+        steps_per_cycle: int,
+        step_offset: int = 0,
+        row_format: Optional[RowFormat] = None,
+    ) -> "CycleOffsetIndex":
+        """(Re)build the sidecar of an existing output in one pass.
+
+        Rows are bucketed by ``(step - step_offset) // steps_per_cycle``, so
+        a row at an exact cycle boundary is filed under the cycle starting
+        there. Used for outputs that were not written by the on-the-fly
+        processor, e.g. the legacy replay.
+        """
+        if int(steps_per_cycle) <= 0:
+            raise ValueError("steps_per_cycle must be > 0")
+
+        index = cls(data_path, row_format=row_format)
+        records: list[tuple[int, int, int, int, int]] = []
+        current: Optional[list[int]] = None
+        offset = 0
+
+        with index.data_path.open("rb") as fh:
+            for raw in fh:
+                line_start = offset
+                offset += len(raw)
+                step = index.row_format.step_of(raw.decode("utf-8", "ignore"))
+                if step is None:
+                    if current is not None:
+                        current[3] = offset - current[2]
+                    continue
+
+                cycle = max(
+                    0, (step - int(step_offset)) // int(steps_per_cycle)
+                )
+                if current is not None and cycle > current[0]:
+                    records.append(tuple(current))
+                    current = None
+                if current is None:
+                    current = [cycle, step, line_start, 0, 0]
+                current[3] = offset - current[2]
+                current[4] += 1
+
+        if current is not None:
+            records.append(tuple(current))
+
+        tmp = index.path.with_name(f".{index.path.name}.tmp")
+        with tmp.open("wb") as fh:
+            fh.write(INDEX_MAGIC)
+            fh.write(np.array(records, dtype=INDEX_DTYPE).tobytes())
+        os.replace(tmp, index.path)
+        return index
+
+    # ------------------------------------------------------------------
+    # reading
+    def entries(self) -> np.ndarray:
+        """Memory-mapped view of all records (empty array if none)."""
+        if not self.path.exists():
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        size = self.path.stat().st_size - len(INDEX_MAGIC)
+        count = max(0, size) // INDEX_DTYPE.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        with self.path.open("rb") as fh:
+            if fh.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"{self.path} is not a py-MCMD output index")
+        return np.memmap(
+            self.path,
+            dtype=INDEX_DTYPE,
+            mode="r",
+            offset=len(INDEX_MAGIC),
+            shape=(count,),
+        )
+
+    def entry_for_cycle(self, cycle: int) -> Optional[CycleIndexEntry]:
+        entries = self.entries()
+        i = int(np.searchsorted(entries["cycle"], int(cycle), side="left"))
+        if i < len(entries) and int(entries["cycle"][i]) == int(cycle):
+            return CycleIndexEntry(*(int(v) for v in entries[i].tolist()))
+        return None
+
+    def cycle_byte_range(
+        self, first_cycle: int, last_cycle: int
+    ) -> Optional[tuple[int, int]]:
+        """Byte range covering cycles `first_cycle`..`last_cycle` inclusive."""
+        entries = self.entries()
+        cycles = entries["cycle"]
+        lo = int(np.searchsorted(cycles, int(first_cycle), side="left"))
+        hi = int(np.searchsorted(cycles, int(last_cycle), side="right"))
+        if lo >= hi:
+            return None
+        return (
+            int(entries["offset"][lo]),
+            int(entries["offset"][hi - 1] + entries["n_bytes"][hi - 1]),
+        )
+
+    def read_cycles(self, first_cycle: int, last_cycle: int) -> list[str]:
+        """Data rows written for cycles `first_cycle`..`last_cycle`."""
+        span = self.cycle_byte_range(first_cycle, last_cycle)
+        if span is None:
+            return []
+        return list(self._rows_in(*span))
+
+    def read_steps(self, first_step: int, last_step: int) -> list[str]:
+        """Data rows whose step lies in [`first_step`, `last_step`]."""
+        entries = self.entries()
+        if len(entries) == 0 or int(last_step) < int(first_step):
+            return []
+        steps = entries["first_step"]
+        # start one cycle early: a boundary step can close the previous one
+        lo = max(0, int(np.searchsorted(steps, int(first_step), "left")) - 1)
+        hi = int(np.searchsorted(steps, int(last_step), side="right"))
+        if hi <= lo:
+            return []
+        start = int(entries["offset"][lo])
+        end = int(entries["offset"][hi - 1] + entries["n_bytes"][hi - 1])
+        return [
+            line
+            for line in self._rows_in(start, end)
+            if int(first_step)
+            <= self.row_format.step_of(line)
+            <= int(last_step)
+        ]
+
+    def header(self) -> Optional[str]:
+        """The first non-data line of the output (its column titles)."""
+        with self.data_path.open("r", encoding="utf-8", errors="ignore") as fh:
+            for line in fh:
+                if self.row_format.step_of(line) is None:
+                    return line.rstrip("\n")
+                return None
+        return None
+
+    def _rows_in(self, start: int, end: int) -> Iterator[str]:
+        with self.data_path.open("rb") as fh:
+            fh.seek(start)
+            chunk = fh.read(end - start)
+        for raw in chunk.splitlines():
+            line = raw.decode("utf-8", "ignore")
+            if self.row_format.step_of(line) is not None:
+                yield line
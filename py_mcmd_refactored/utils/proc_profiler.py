@@ -0,0 +1,265 @@
+"""Per-segment resource profiles of the engine processes.
+
+While a segment runs, a `ResourceSampler` thread reads ``/proc`` for the
+engine process and its descendants (charmrun/mpirun ranks) every
+``interval_s`` seconds: CPU time from ``stat``, RSS and context switches
+from ``status``, I/O bytes from ``io`` and the CPU time of every thread
+from ``task/*/stat``. Counters are cumulative, so the last value seen per
+process is kept and a process that exits early still counts; for a process
+that outlives the segment (persistent NAMD) the counters seen at `start` are
+subtracted. When the
+segment ends the sampler returns a `SegmentProfile`: CPU utilization
+against the cores the launcher allocated (the ``+pN`` of the command line
+when none is given), peak RSS, bytes
+read/written, context switches and how many threads were actually busy.
+
+The orchestrator appends one JSON line per segment, tagged with the cycle,
+to ``RESOURCE_PROFILE_started_at_cycle_No_<n>.jsonl`` in the log dir.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from utils.procfs import (
+    process_table,
+    process_tree,
+    read_io,
+    read_status,
+    thread_cpu_seconds,
+)
+
+# a thread using at least this share of one core counts as busy
+BUSY_THREAD_UTILIZATION = 0.5
+
+_CORES_RE = re.compile(r"^\+p(\d+)$")
+
+
+def allocated_cores(argv: Sequence[str]) -> Optional[int]:
+    """Core count of a charm++ ``+pN`` argument (None without one)."""
+    for arg in argv:
+        match = _CORES_RE.match(str(arg))
+        if match:
+            return int(match.group(1))
+    return None
+
+
+@dataclass(frozen=True)
+class SegmentProfile:
+    pid: int
+    command: str
+    cwd: str
+    allocated_cores: Optional[int]
+    wall_s: float
+    samples: int
+    cpu_s: float
+    cpu_utilization: float  # busy cores on average
+    core_efficiency: Optional[float]  # cpu_utilization / allocated_cores
+    peak_rss_bytes: int
+    read_bytes: int
+    write_bytes: int
+    rchar: int
+    wchar: int
+    voluntary_ctxt_switches: int
+    nonvoluntary_ctxt_switches: int
+    peak_threads: int
+    busy_threads: int
+    max_thread_utilization: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class ResourceSampler:
+    """Background sampler of one process tree; see the module docstring."""
+
+    def __init__(
+        self,
+        pid: int,
+        *,
+        interval_s: float = 1.0,
+        argv: Sequence[str] = (),
+        cwd: str | Path = "",
+        cores: Optional[int] = None,
+        since_start: bool = False,
+    ) -> None:
+        self.pid = int(pid)
+        self.interval_s = float(interval_s)
+        self.argv = [str(a) for a in argv]
+        self.cwd = str(cwd)
+        # mpirun/srun command lines carry no +pN
+        self.cores = int(cores) if cores else allocated_cores(self.argv)
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # sample() also runs from wait()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.samples = 0
+        # last cumulative counters seen per pid / per (pid, tid)
+        self._cpu: dict[int, float] = {}
+        self._io: dict[int, dict[str, int]] = {}
+        self._switches: dict[int, tuple[int, int]] = {}
+        self._threads: dict[tuple[int, int], float] = {}
+        self.peak_rss_bytes = 0
+        self.peak_threads = 0
+        # counters at start() that are not part of this segment
+        self.since_start = bool(since_start)
+        self._base: tuple[dict, dict, dict, dict] = ({}, {}, {}, {})
+
+    def start(self) -> "ResourceSampler":
+        self._started = time.monotonic()
+        if self.since_start:
+            with self._lock:
+                self._sample()
+                self._base = (
+                    dict(self._cpu),
+                    {pid: dict(c) for pid, c in self._io.items()},
+                    dict(self._switches),
+                    dict(self._threads),
+                )
+                self.samples = 0
+        self._thread = threading.Thread(
+            target=self._loop, name=f"resource-sampler-{self.pid}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> SegmentProfile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.profile(time.monotonic() - self._started)
+
+    def _loop(self) -> None:
+        while True:
+            self.sample()
+            if self._stop.wait(self.interval_s):
+                return
+
+    def sample(self) -> None:
+        with self._lock:
+            self._sample()
+
+    def _sample(self) -> None:
+        table = process_table()
+        if table is None:
+            return
+        children, cpu = table
+        if self.pid not in cpu:
+            return
+
+        rss = 0
+        threads = 0
+        for pid in process_tree(self.pid, children):
+            self._cpu[pid] = cpu.get(pid, self._cpu.get(pid, 0.0))
+            status = read_status(pid)
+            rss += status.get("VmRSS", 0)
+            threads += status.get("Threads", 0)
+            if "voluntary_ctxt_switches" in status:
+                self._switches[pid] = (
+                    status["voluntary_ctxt_switches"],
+                    status.get("nonvoluntary_ctxt_switches", 0),
+                )
+            counters = read_io(pid)
+            if counters:
+                self._io[pid] = counters
+            for tid, seconds in thread_cpu_seconds(pid).items():
+                self._threads[(pid, tid)] = seconds
+
+        self.samples += 1
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+        self.peak_threads = max(self.peak_threads, threads)
+
+    def profile(self, wall_s: float) -> SegmentProfile:
+        cores = self.cores
+        base_cpu, base_io, base_switches, base_threads = self._base
+        cpu_s = sum(s - base_cpu.get(pid, 0.0) for pid, s in self._cpu.items())
+        utilization = cpu_s / wall_s if wall_s > 0 else 0.0
+        thread_use = [
+            (
+                (seconds - base_threads.get(key, 0.0)) / wall_s
+                if wall_s > 0
+                else 0.0
+            )
+            for key, seconds in self._threads.items()
+        ]
+        switches = [
+            (
+                v - base_switches.get(pid, (0, 0))[0],
+                n - base_switches.get(pid, (0, 0))[1],
+            )
+            for pid, (v, n) in self._switches.items()
+        ]
+
+        def _io_total(name: str) -> int:
+            return sum(
+                c.get(name, 0) - base_io.get(pid, {}).get(name, 0)
+                for pid, c in self._io.items()
+            )
+
+        return SegmentProfile(
+            pid=self.pid,
+            command=Path(self.argv[0]).name if self.argv else "",
+            cwd=self.cwd,
+            allocated_cores=cores,
+            wall_s=round(wall_s, 6),
+            samples=self.samples,
+            cpu_s=round(cpu_s, 3),
+            cpu_utilization=round(utilization, 3),
+            core_efficiency=(round(utilization / cores, 3) if cores else None),
+            peak_rss_bytes=self.peak_rss_bytes,
+            read_bytes=_io_total("read_bytes"),
+            write_bytes=_io_total("write_bytes"),
+            rchar=_io_total("rchar"),
+            wchar=_io_total("wchar"),
+            voluntary_ctxt_switches=sum(v for v, _ in switches),
+            nonvoluntary_ctxt_switches=sum(n for _, n in switches),
+            peak_threads=self.peak_threads,
+            busy_threads=sum(
+                1 for use in thread_use if use >= BUSY_THREAD_UTILIZATION
+            ),
+            max_thread_utilization=round(max(thread_use, default=0.0), 3),
+        )
+
+
+class ResourceProfileLog:
+    """Append-only JSONL file of the per-segment profiles of a run."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def append(
+        self,
+        profile: SegmentProfile,
+        *,
+        cycle: int,
+        run_no: int,
+        engine: str,
+        box: Optional[int] = None,
+    ) -> dict[str, Any]:
+        record = {
+            "cycle": int(cycle),
+            "run_no": int(run_no),
+            "engine": engine,
+            "box": box,
+            **profile.as_dict(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+        return record
+
+    def records(self) -> list[dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        return [
+            json.loads(line)
+            for line in self.path.read_text(encoding="utf-8").splitlines()
+            if line.strip()
+        ]
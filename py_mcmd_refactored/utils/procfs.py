@@ -0,0 +1,128 @@
+"""Small readers of Linux ``/proc`` for engine process trees.
+
+Every reader returns None (or an empty dict) when ``/proc`` or the process
+is not available, so callers degrade to "no data" on other platforms and
+for processes that exit between two reads.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+PROC = Path("/proc")
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):  # pragma: no cover
+    CLOCK_TICKS = 100
+
+# /proc/<pid>/status fields kept by `read_status` (kB values become bytes)
+_STATUS_FIELDS = {
+    "VmRSS": 1024,
+    "VmHWM": 1024,
+    "Threads": 1,
+    "voluntary_ctxt_switches": 1,
+    "nonvoluntary_ctxt_switches": 1,
+}
+
+
+def _stat_fields(path: Path) -> Optional[list[bytes]]:
+    try:
+        stat = path.read_bytes()
+    except OSError:
+        return None
+    # the command name may contain spaces: fields start after ')'
+    return stat[stat.rfind(b")") + 2 :].split()
+
+
+def stat_cpu_seconds(path: Path) -> Optional[float]:
+    """User + system CPU seconds from a ``stat`` file (process or thread)."""
+    fields = _stat_fields(path)
+    try:
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    except (TypeError, IndexError, ValueError):
+        return None
+
+
+def process_table() -> Optional[tuple[dict[int, list[int]], dict[int, float]]]:
+    """(children by parent pid, CPU seconds by pid) of all processes."""
+    children: dict[int, list[int]] = {}
+    cpu: dict[int, float] = {}
+    try:
+        entries = list(PROC.iterdir())
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.name.isdigit():
+            continue
+        fields = _stat_fields(entry / "stat")
+        try:
+            ppid = int(fields[1])
+            ticks = int(fields[11]) + int(fields[12])
+        except (TypeError, IndexError, ValueError):
+            continue
+        pid = int(entry.name)
+        cpu[pid] = ticks / CLOCK_TICKS
+        children.setdefault(ppid, []).append(pid)
+    return children, cpu
+
+
+def process_tree(pid: int, children: dict[int, list[int]]) -> list[int]:
+    """`pid` followed by all its descendants."""
+    tree = []
+    todo = [int(pid)]
+    while todo:
+        current = todo.pop()
+        tree.append(current)
+        todo.extend(children.get(current, ()))
+    return tree
+
+
+def read_status(pid: int) -> dict[str, int]:
+    out: dict[str, int] = {}
+    try:
+        text = (PROC / str(pid) / "status").read_text(errors="replace")
+    except OSError:
+        return out
+    for line in text.splitlines():
+        name, _, value = line.partition(":")
+        scale = _STATUS_FIELDS.get(name)
+        if scale is None:
+            continue
+        try:
+            out[name] = int(value.split()[0]) * scale
+        except (IndexError, ValueError):
+            continue
+    return out
+
+
+def read_io(pid: int) -> dict[str, int]:
+    """``/proc/<pid>/io`` counters (empty without permission)."""
+    out: dict[str, int] = {}
+    try:
+        text = (PROC / str(pid) / "io").read_text()
+    except OSError:
+        return out
+    for line in text.splitlines():
+        name, _, value = line.partition(":")
+        try:
+            out[name] = int(value)
+        except ValueError:
+            continue
+    return out
+
+
+def thread_cpu_seconds(pid: int) -> dict[int, float]:
+    """CPU seconds of every thread of `pid`, by thread id."""
+    out: dict[int, float] = {}
+    try:
+        tasks = list((PROC / str(pid) / "task").iterdir())
+    except OSError:
+        return out
+    for task in tasks:
+        seconds = stat_cpu_seconds(task / "stat")
+        if seconds is not None and task.name.isdigit():
+            out[int(task.name)] = seconds
+    return out
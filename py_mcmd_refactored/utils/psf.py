@@ -0,0 +1,239 @@
+"""Minimal PSF reader/writer used to select and reduce trajectory atoms.
+
+Only what the on-the-fly trajectory filter needs is modelled: the atom
+records (segment, residue and atom names) for resolving a selection, and
+the bonded sections so a reduced PSF keeps the bonds, angles, dihedrals,
+impropers and cross-terms that lie entirely inside the selection.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+# section tag -> atoms per term and terms per output line
+_BONDED_SECTIONS = {
+    "!NBOND": (2, 4),
+    "!NTHETA": (3, 3),
+    "!NPHI": (4, 2),
+    "!NIMPHI": (4, 2),
+    "!NCRTERM": (8, 1),
+}
+
+_SECTION_TITLES = {
+    "!NBOND": "bonds",
+    "!NTHETA": "angles",
+    "!NPHI": "dihedrals",
+    "!NIMPHI": "impropers",
+    "!NCRTERM": "cross-terms",
+}
+
+
+@dataclass
+class PsfTopology:
+    """Atom records and bonded terms of a PSF file."""
+
+    path: Path
+    extended: bool
+    titles: list[str]
+    atom_lines: list[str]
+    segids: np.ndarray
+    resnames: np.ndarray
+    # tag -> (n_terms, atoms_per_term) int array of 1-based atom ids
+    bonded: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def n_atoms(self) -> int:
+        return len(self.atom_lines)
+
+
+def _section_count(line: str) -> Optional[tuple[int, str]]:
+    parts = line.split()
+    if len(parts) >= 2 and parts[1].startswith("!"):
+        try:
+            return int(parts[0]), parts[1].rstrip(":")
+        except ValueError:
+            return None
+    return None
+
+
+def read_psf(path: Union[str, Path]) -> PsfTopology:
+    """Parse a PSF file; raises ValueError when it has no !NATOM section."""
+    path = Path(path)
+    with path.open("r", encoding="utf-8", errors="replace") as fh:
+        lines = fh.read().splitlines()
+
+    if not lines or not lines[0].startswith("PSF"):
+        raise ValueError(f"{path}: not a PSF file")
+    extended = "EXT" in lines[0].split()
+
+    titles: list[str] = []
+    atom_lines: list[str] = []
+    bonded: dict[str, np.ndarray] = {}
+    found_atoms = False
+
+    i = 1
+    while i < len(lines):
+        header = _section_count(lines[i])
+        i += 1
+        if header is None:
+            continue
+        count, tag = header
+
+        if tag == "!NTITLE":
+            titles = lines[i : i + count]
+            i += count
+        elif tag == "!NATOM":
+            atom_lines = lines[i : i + count]
+            if len(atom_lines) != count:
+                raise ValueError(f"{path}: truncated !NATOM section")
+            i += count
+            found_atoms = True
+        elif tag in _BONDED_SECTIONS:
+            width, _ = _BONDED_SECTIONS[tag]
+            values: list[int] = []
+            while len(values) < count * width and i < len(lines):
+                values.extend(int(v) for v in lines[i].split())
+                i += 1
+            bonded[tag] = np.array(
+                values[: count * width], dtype=np.int64
+            ).reshape(count, width)
+
+    if not found_atoms:
+        raise ValueError(f"{path}: no !NATOM section")
+
+    fields = [line.split() for line in atom_lines]
+    return PsfTopology(
+        path=path,
+        extended=extended,
+        titles=titles,
+        atom_lines=atom_lines,
+        segids=np.array([f[1] if len(f) > 1 else "" for f in fields]),
+        resnames=np.array([f[3] if len(f) > 3 else "" for f in fields]),
+        bonded=bonded,
+    )
+
+
+def _get(spec: Any, name: str) -> Sequence:
+    if isinstance(spec, dict):
+        value = spec.get(name)
+    else:
+        value = getattr(spec, name, None)
+    return list(value or [])
+
+
+def select_atoms(topology: PsfTopology, spec: Any) -> np.ndarray:
+    """Resolve an atom selection to sorted zero-based atom indices.
+
+    `spec` is a mapping (or object) with any of ``index_ranges`` (inclusive
+    zero-based ``[first, last]`` pairs), ``segids`` and ``resnames``, which
+    are OR-ed together (all atoms when none is given), and
+    ``exclude_segids`` / ``exclude_resnames``, which are removed afterwards.
+    """
+    n = topology.n_atoms
+    ranges = _get(spec, "index_ranges")
+    segids = _get(spec, "segids")
+    resnames = _get(spec, "resnames")
+
+    if ranges or segids or resnames:
+        keep = np.zeros(n, dtype=bool)
+        for first, last in ranges:
+            keep[max(0, int(first)) : min(n, int(last) + 1)] = True
+        if segids:
+            keep |= np.isin(topology.segids, segids)
+        if resnames:
+            keep |= np.isin(topology.resnames, resnames)
+    else:
+        keep = np.ones(n, dtype=bool)
+
+    exclude_segids = _get(spec, "exclude_segids")
+    if exclude_segids:
+        keep &= ~np.isin(topology.segids, exclude_segids)
+    exclude_resnames = _get(spec, "exclude_resnames")
+    if exclude_resnames:
+        keep &= ~np.isin(topology.resnames, exclude_resnames)
+
+    return np.flatnonzero(keep)
+
+
+def _renumber_atom_line(line: str, new_id: int) -> str:
+    stripped = line.lstrip()
+    token = stripped.split(None, 1)[0]
+    width = len(line) - len(stripped) + len(token)
+    return f"{new_id:>{width}d}" + line[width:]
+
+
+def _format_terms(
+    terms: np.ndarray, per_line: int, id_width: int
+) -> Iterable[str]:
+    flat = terms.reshape(-1)
+    step = per_line * terms.shape[1] if terms.size else 1
+    for start in range(0, len(flat), step):
+        yield "".join(f"{v:>{id_width}d}" for v in flat[start : start + step])
+
+
+def write_reduced_psf(
+    topology: PsfTopology,
+    indices: Sequence[int],
+    dst: Union[str, Path],
+) -> Path:
+    """Write a PSF holding only the atoms at zero-based `indices`.
+
+    Atoms are renumbered in order; bonded terms survive only when all of
+    their atoms are kept. Donor/acceptor/exclusion/group sections are
+    written empty.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    new_ids = np.zeros(topology.n_atoms + 1, dtype=np.int64)
+    new_ids[indices + 1] = np.arange(1, len(indices) + 1)
+    id_width = 10 if topology.extended else 8
+
+    out = ["PSF EXT" if topology.extended else "PSF", ""]
+    titles = list(topology.titles) + [
+        f" REMARKS reduced by py-MCMD to {len(indices)} of "
+        f"{topology.n_atoms} atoms from {topology.path.name}"
+    ]
+    out.append(f"{len(titles):>{id_width}d} !NTITLE")
+    out.extend(titles)
+    out.append("")
+
+    out.append(f"{len(indices):>{id_width}d} !NATOM")
+    for new_id, old in enumerate(indices, start=1):
+        out.append(_renumber_atom_line(topology.atom_lines[old], new_id))
+    out.append("")
+
+    def bonded_section(tag: str) -> None:
+        width, per_line = _BONDED_SECTIONS[tag]
+        terms = topology.bonded.get(tag, np.zeros((0, width), dtype=np.int64))
+        mapped = new_ids[terms] if terms.size else terms
+        mapped = mapped[(mapped > 0).all(axis=1)] if mapped.size else mapped
+        out.append(f"{len(mapped):>{id_width}d} {tag}: {_SECTION_TITLES[tag]}")
+        out.extend(_format_terms(mapped, per_line, id_width))
+        out.append("")
+
+    for tag in ("!NBOND", "!NTHETA", "!NPHI", "!NIMPHI"):
+        bonded_section(tag)
+
+    out.append(f"{0:>{id_width}d} !NDON: donors")
+    out.append("")
+    out.append(f"{0:>{id_width}d} !NACC: acceptors")
+    out.append("")
+    # no exclusions, but the per-atom IBLO pointer list is still expected
+    out.append(f"{0:>{id_width}d} !NNB")
+    out.extend(
+        _format_terms(np.zeros((len(indices), 1), dtype=np.int64), 8, id_width)
+    )
+    out.append("")
+    out.append(f"{0:>{id_width}d}{0:>{id_width}d} !NGRP")
+    out.append("")
+
+    bonded_section("!NCRTERM")
+
+    dst = Path(dst)
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    tmp.write_text("\n".join(out) + "\n", encoding="utf-8")
+    tmp.replace(dst)
+    return dst
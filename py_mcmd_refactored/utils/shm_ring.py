@@ -0,0 +1,295 @@
+"""Bounded shared-memory ring buffer for handing engine stdout to parsers.
+
+A `ShmRingWriter` (the stdout pump of `SubprocessRunner`) appends records to
+a ring in `multiprocessing.shared_memory`; a `ShmRingReader` in the same or
+another process consumes them in order. Two semaphores carry the wake-ups
+(and the memory ordering) between the sides:
+
+* backpressure: when the ring is full the writer waits up to `max_wait_s`
+  for the reader to free space;
+* overflow: after that it appends the bytes to the spill file instead and
+  enqueues a small record pointing at them once there is room, so output is
+  never lost and the engine's stdout pipe is never left undrained.
+
+The 64-byte header holds running byte counts: the writer owns ``head`` and
+the reader ``tail``, so the two sides share no lock. `read` returns ``b""``
+once the writer has closed and everything, including a spill extent that
+never fit a record, has been consumed.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+DEFAULT_CAPACITY = 4 << 20
+
+# header: head, tail, closed, pending spill offset/length, spilled bytes,
+# capacity (u64 each)
+_HEADER_SIZE = 64
+_HEAD, _TAIL, _CLOSED, _PENDING_OFF, _PENDING_LEN, _SPILLED, _CAPACITY = (
+    8 * i for i in range(7)
+)
+
+# record: kind, payload length
+_RECORD = struct.Struct("<II")
+_DATA, _SPILL = 1, 2
+_EXTENT = struct.Struct("<QQ")
+
+
+@dataclass(frozen=True)
+class ShmRingSpec:
+    """What a reader needs to attach; pass it to a `multiprocessing` child."""
+
+    name: str
+    capacity: int
+    spill_path: Path
+    data_ready: Any
+    space_free: Any
+    owner_pid: int
+
+
+class _Ring:
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int):
+        self.shm = shm
+        self.buf = shm.buf
+        self.capacity = int(capacity)
+
+    def get(self, field: int) -> int:
+        return struct.unpack_from("<Q", self.buf, field)[0]
+
+    def set(self, field: int, value: int) -> None:
+        struct.pack_into("<Q", self.buf, field, int(value))
+
+    def put(self, pos: int, data: bytes) -> None:
+        off = pos % self.capacity
+        first = min(len(data), self.capacity - off)
+        start = _HEADER_SIZE + off
+        self.buf[start : start + first] = data[:first]
+        rest = len(data) - first
+        if rest:
+            self.buf[_HEADER_SIZE : _HEADER_SIZE + rest] = data[first:]
+
+    def take(self, pos: int, size: int) -> bytes:
+        off = pos % self.capacity
+        first = min(size, self.capacity - off)
+        start = _HEADER_SIZE + off
+        out = bytes(self.buf[start : start + first])
+        if size > first:
+            out += bytes(self.buf[_HEADER_SIZE : _HEADER_SIZE + size - first])
+        return out
+
+
+class ShmRingWriter:
+    """Producer side; see the module docstring."""
+
+    def __init__(
+        self,
+        spill_path: str | Path,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        max_wait_s: float = 0.1,
+        ctx=None,
+    ) -> None:
+        if capacity <= _RECORD.size + _EXTENT.size:
+            raise ValueError(f"capacity too small: {capacity}")
+        ctx = ctx or multiprocessing.get_context()
+        shm = shared_memory.SharedMemory(
+            create=True, size=_HEADER_SIZE + int(capacity)
+        )
+        shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        self._ring = _Ring(shm, capacity)
+        self._ring.set(_CAPACITY, capacity)
+        self.spill_path = Path(spill_path)
+        self.max_wait_s = float(max_wait_s)
+        self._data_ready = ctx.Semaphore(0)
+        self._space_free = ctx.Semaphore(0)
+        self._lock = threading.Lock()
+        self._spill_fh = None
+        self._spill_size = 0
+        self._pending: Optional[tuple[int, int]] = None
+        self._closed = False
+
+    @property
+    def spec(self) -> ShmRingSpec:
+        return ShmRingSpec(
+            name=self._ring.shm.name,
+            capacity=self._ring.capacity,
+            spill_path=self.spill_path,
+            data_ready=self._data_ready,
+            space_free=self._space_free,
+            owner_pid=os.getpid(),
+        )
+
+    @property
+    def spilled_bytes(self) -> int:
+        return self._ring.get(_SPILLED)
+
+    def reader(self) -> "ShmRingReader":
+        """A reader for a thread of this process."""
+        return ShmRingReader(self.spec)
+
+    def write(self, data: bytes) -> None:
+        """Append `data`; waits at most `max_wait_s`, then spills."""
+        if not data:
+            return
+        with self._lock:
+            if self._closed:
+                raise ValueError("write to a closed ShmRingWriter")
+            self._emit_pending(wait=False)
+            if self._pending is None and self._put(
+                _DATA, bytes(data), wait=True
+            ):
+                return
+            self._spill(bytes(data))
+
+    def close(self) -> None:
+        """Mark end of stream; readers drain and then get b""."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._emit_pending(wait=True)
+            if self._pending is not None:
+                # never fit a record; the reader takes it after the ring
+                self._ring.set(_PENDING_OFF, self._pending[0])
+                self._ring.set(_PENDING_LEN, self._pending[1])
+                self._pending = None
+            if self._spill_fh is not None:
+                self._spill_fh.close()
+                self._spill_fh = None
+            self._ring.set(_CLOSED, 1)
+            self._data_ready.release()
+
+    def unlink(self) -> None:
+        """Close and free the shared memory (after the readers are done)."""
+        self.close()
+        self._ring.buf = None
+        self._ring.shm.close()
+        try:
+            self._ring.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _put(self, kind: int, payload: bytes, *, wait: bool) -> bool:
+        ring = self._ring
+        need = _RECORD.size + len(payload)
+        if need > ring.capacity:
+            return False
+        deadline = time.monotonic() + (self.max_wait_s if wait else 0.0)
+        while True:
+            head = ring.get(_HEAD)
+            if ring.capacity - (head - ring.get(_TAIL)) >= need:
+                ring.put(head, _RECORD.pack(kind, len(payload)) + payload)
+                ring.set(_HEAD, head + need)
+                self._data_ready.release()
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._space_free.acquire(timeout=remaining)
+
+    def _spill(self, data: bytes) -> None:
+        if self._spill_fh is None:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill_fh = self.spill_path.open("wb")
+        self._spill_fh.write(data)
+        if self._pending is None:
+            self._pending = (self._spill_size, 0)
+        self._pending = (self._pending[0], self._pending[1] + len(data))
+        self._spill_size += len(data)
+        self._ring.set(_SPILLED, self._spill_size)
+        self._emit_pending(wait=False)
+
+    def _emit_pending(self, *, wait: bool) -> None:
+        if self._pending is None:
+            return
+        self._spill_fh.flush()
+        if self._put(_SPILL, _EXTENT.pack(*self._pending), wait=wait):
+            self._pending = None
+
+
+class ShmRingReader:
+    """Consumer side; attach with the writer's `spec`."""
+
+    def __init__(self, spec: ShmRingSpec) -> None:
+        if spec.owner_pid == os.getpid():
+            shm = shared_memory.SharedMemory(name=spec.name)
+        else:
+            shm = _attach_untracked(spec.name)
+        self._ring = _Ring(shm, spec.capacity)
+        self.spill_path = Path(spec.spill_path)
+        self._data_ready = spec.data_ready
+        self._space_free = spec.space_free
+        self._spill_fh = None
+        self._eof = False
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Next chunk in order; b"" at end of stream, None on timeout."""
+        ring = self._ring
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._eof:
+            closed = ring.get(_CLOSED)
+            tail = ring.get(_TAIL)
+            if ring.get(_HEAD) - tail >= _RECORD.size:
+                kind, size = _RECORD.unpack(ring.take(tail, _RECORD.size))
+                payload = ring.take(tail + _RECORD.size, size)
+                ring.set(_TAIL, tail + _RECORD.size + size)
+                self._space_free.release()
+                if kind == _SPILL:
+                    return self._read_spill(*_EXTENT.unpack(payload))
+                return payload
+            if closed:
+                self._eof = True
+                length = ring.get(_PENDING_LEN)
+                if length:
+                    return self._read_spill(ring.get(_PENDING_OFF), length)
+                break
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+            self._data_ready.acquire(timeout=remaining)
+        return b""
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read()
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        if self._spill_fh is not None:
+            self._spill_fh.close()
+            self._spill_fh = None
+        if self._ring.buf is not None:
+            self._ring.buf = None
+            self._ring.shm.close()
+
+    def _read_spill(self, offset: int, length: int) -> bytes:
+        if self._spill_fh is None:
+            self._spill_fh = self.spill_path.open("rb")
+        self._spill_fh.seek(offset)
+        return self._spill_fh.read(length)
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    # the creating process owns (and unlinks) the segment; without this the
+    # resource tracker of an attaching process would unlink it at exit
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
@@ -0,0 +1,180 @@
+"""Zero-copy duplication of an engine's stdout pipe (Linux splice/tee).
+
+`SubprocessRunner` writes engine stdout to a primary destination (runtime
+file or FIFO) and a disk mirror. The portable pump reads every chunk into
+Python and writes it out twice. On Linux the kernel can do this without
+the bytes ever reaching user space:
+
+* ``tee(2)`` duplicates the data waiting in the engine pipe into a second
+  pipe (or straight into the FIFO) without consuming it;
+* ``splice(2)`` then moves the engine pipe into one file and the duplicate
+  into the other.
+
+`zero_copy_available` tells whether the fast path can be used; the pumps
+fall back to plain ``read``/``write`` for the rest of the stream if the
+kernel refuses a destination (e.g. a filesystem without splice support).
+Since no bytes pass through Python, a watchdog tracks progress by tailing
+the mirror file instead of being fed chunks.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import errno
+import fcntl
+import os
+import select
+import sys
+from typing import Callable, Optional
+
+CHUNK = 1 << 20
+# engine and duplicate pipes are grown to this (best effort; the default
+# 64 KiB caps every splice at 16 pages)
+PIPE_SIZE = 1 << 20
+
+_SPLICE_F_NONBLOCK = 2
+# errors meaning "this fd pair cannot be spliced", not "the stream failed"
+_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.EXDEV}
+
+_tee_fn = None
+
+
+def _libc_tee() -> Optional[Callable[..., int]]:
+    global _tee_fn
+    if _tee_fn is None:
+        try:
+            fn = ctypes.CDLL(None, use_errno=True).tee
+        except (OSError, AttributeError):
+            fn = False
+        else:
+            fn.restype = ctypes.c_ssize_t
+            fn.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_size_t]
+            fn.argtypes += [ctypes.c_uint]
+        _tee_fn = fn
+    return _tee_fn or None
+
+
+def zero_copy_available() -> bool:
+    return (
+        sys.platform.startswith("linux")
+        and hasattr(os, "splice")
+        and _libc_tee() is not None
+    )
+
+
+def _tee(fd_in: int, fd_out: int, count: int, flags: int = 0) -> int:
+    n = _libc_tee()(fd_in, fd_out, count, flags)
+    if n < 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+    return n
+
+
+def _grow_pipe(fd: int) -> None:
+    try:
+        fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+    except (AttributeError, OSError):
+        pass
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+class _Mover:
+    """Moves exactly n bytes from a pipe to a file: splice, else copy."""
+
+    def __init__(self) -> None:
+        self.spliced = True
+
+    def move(self, src: int, dst: int, n: int) -> None:
+        while n > 0:
+            if self.spliced:
+                try:
+                    done = os.splice(src, dst, n)
+                except OSError as exc:
+                    if exc.errno not in _UNSUPPORTED:
+                        raise
+                    self.spliced = False
+                    continue
+            else:
+                chunk = os.read(src, n)
+                _write_all(dst, chunk)
+                done = len(chunk)
+            if done == 0:
+                raise EOFError("pipe closed with teed bytes outstanding")
+            n -= done
+
+
+def _copy_rest(src: int, dsts: list[int]) -> None:
+    while True:
+        chunk = os.read(src, CHUNK)
+        if not chunk:
+            return
+        for dst in dsts:
+            _write_all(dst, chunk)
+
+
+def pump_to_files(src: int, primary: int, mirror: Optional[int]) -> None:
+    """Drain pipe `src` into `primary` and (if given) `mirror` until EOF."""
+    _grow_pipe(src)
+    mover = _Mover()
+    if mirror is None:
+        while True:
+            try:
+                n = os.splice(src, primary, CHUNK)
+            except OSError as exc:
+                if exc.errno not in _UNSUPPORTED:
+                    raise
+                return _copy_rest(src, [primary])
+            if n == 0:
+                return
+
+    dup_r, dup_w = os.pipe()
+    try:
+        _grow_pipe(dup_w)
+        while True:
+            # blocks until the engine writes; 0 once it closed stdout
+            n = _tee(src, dup_w, CHUNK)
+            if n == 0:
+                return
+            mover.move(src, primary, n)
+            mover.move(dup_r, mirror, n)
+    finally:
+        os.close(dup_r)
+        os.close(dup_w)
+
+
+def pump_to_fifo(src: int, fifo: int, mirror: int, *, stall_s: float) -> bool:
+    """Drain `src` into the non-blocking FIFO `fifo` and the file `mirror`.
+
+    The mirror gets everything. If the FIFO stays full for `stall_s`, it is
+    dropped and the rest goes to the mirror only; returns False in that case.
+    """
+    _grow_pipe(src)
+    mover = _Mover()
+    while True:
+        select.select([src], [], [])
+        try:
+            n = _tee(src, fifo, CHUNK, _SPLICE_F_NONBLOCK)
+        except BlockingIOError:
+            _, writable, _ = select.select([], [fifo], [], stall_s)
+            if writable:
+                continue
+            break
+        if n == 0:
+            return True
+        mover.move(src, mirror, n)
+
+    while True:
+        try:
+            n = os.splice(src, mirror, CHUNK)
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED:
+                raise
+            _copy_rest(src, [mirror])
+            return False
+        if n == 0:
+            return False
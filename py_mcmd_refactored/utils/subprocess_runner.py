@@ -1,12 +1,132 @@
 from __future__ import annotations
 
+import logging
 import os
+import select
 import subprocess
 import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
+
+from utils.proc_profiler import ResourceSampler, SegmentProfile
+from utils.shm_ring import ShmRingWriter
+from utils.splice_pump import (
+    pump_to_fifo,
+    pump_to_files,
+    zero_copy_available,
+)
+from utils.tracing import (
+    active_tracer,
+    current_trace_tags,
+    record_span,
+    trace_clock_us,
+)
+from utils.watchdog import (
+    EngineWatchdog,
+    HangEvent,
+    ProgressTracker,
+    SegmentHangError,
+)
+
+logger = logging.getLogger(__name__)
+
+# how long the FIFO pump waits for a slow reader before it stops feeding it
+FIFO_STALL_S = 0.5
+# last thing a reader of a dropped FIFO sees before EOF
+FIFO_TRUNCATED = b"\n[py-mcmd] output truncated: FIFO reader stalled\n"
+# a line longer than this is written to the FIFO in pieces
+_FIFO_MAX_LINE = 1 << 20
+
+
+def _warn_stalled(fifo_path: Path, mirror_path: Optional[Path]) -> None:
+    logger.warning(
+        "FIFO reader of %s stalled; only %s gets the rest of the output",
+        fifo_path,
+        mirror_path,
+    )
+
+
+class _FifoFeed:
+    """Feeds whole lines to a non-blocking FIFO; marks where it gave up.
+
+    Lines go out in batches of at most ``PIPE_BUF`` bytes, which a pipe
+    takes whole or not at all, so a stalled reader is never left with a
+    torn line. Once the reader stalls the FIFO only gets `FIFO_TRUNCATED`,
+    as soon as it has room for it, before EOF.
+    """
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.stalled = False
+        self._marked = False
+        self._partial = b""
+
+    def feed(self, chunk: bytes) -> bool:
+        """Queue `chunk`; False when the reader stalls on this call."""
+        if self.stalled:
+            self._mark(0)
+            return True
+        data = self._partial + chunk
+        end = data.rfind(b"\n") + 1
+        if len(data) - end > _FIFO_MAX_LINE:
+            end = len(data)
+        self._partial = data[end:]
+        if self._write(data, end):
+            return True
+        self.give_up()
+        return False
+
+    def give_up(self) -> None:
+        self.stalled = True
+        self._mark(0)
+
+    def close(self) -> None:
+        """Flush an unterminated last line (or the marker) and close."""
+        try:
+            partial = self._partial
+            if not self.stalled and not self._write(partial, len(partial)):
+                self.stalled = True
+            if self.stalled:
+                self._mark(FIFO_STALL_S)
+        finally:
+            os.close(self.fd)
+
+    def _write(self, data: bytes, end: int) -> bool:
+        view = memoryview(data)
+        deadline = None
+        pos = 0
+        while pos < end:
+            stop = min(end, pos + select.PIPE_BUF)
+            if stop < end:
+                nl = data.rfind(b"\n", pos, stop)
+                if nl >= 0:
+                    stop = nl + 1
+            try:
+                pos += os.write(self.fd, view[pos:stop])
+                deadline = None
+            except BlockingIOError:
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + FIFO_STALL_S
+                if now >= deadline:
+                    return False
+                select.select([], [self.fd], [], deadline - now)
+        return True
+
+    def _mark(self, timeout: float) -> None:
+        if self._marked:
+            return
+        if timeout > 0:
+            select.select([], [self.fd], [], timeout)
+        try:
+            # shorter than PIPE_BUF: written whole or not at all
+            os.write(self.fd, FIFO_TRUNCATED)
+        except BlockingIOError:
+            return
+        self._marked = True
 
 
 @dataclass(frozen=True)
@@ -16,6 +136,10 @@ class Command:
     stdout_path: Optional[Path] = None
     stdout_disk_path: Optional[Path] = None
     stdout_fifo_path: Optional[Path] = None
+    # shared-memory channel for stdout parsers (see utils/shm_ring.py)
+    stdout_ring: Optional[ShmRingWriter] = None
+    # from the launcher; None: read the +pN of argv (see proc_profiler.py)
+    allocated_cores: Optional[int] = None
 
 
 @dataclass
@@ -24,14 +148,117 @@ class ProcessHandle:
     command: Command
     started_at: datetime
     popen: Optional[subprocess.Popen] = None
+    progress: Optional[ProgressTracker] = None  # fed by the pump thread
+    hang_event: Optional[HangEvent] = None
+    sampler: Optional[ResourceSampler] = None
+    profile: Optional[SegmentProfile] = None
+    trace_start_us: Optional[int] = None
+    trace_tags: Optional[dict[str, Any]] = None
+    # one segment of a process that outlives it (see `attach`)
+    wait_done: Optional[Callable[[Optional[float]], Optional[int]]] = None
 
 
 class SubprocessRunner:
-    def __init__(self, *, dry_run: bool = False):
+    def __init__(
+        self,
+        *,
+        dry_run: bool = False,
+        watchdog: Optional[EngineWatchdog] = None,
+        profile_interval_s: Optional[float] = None,
+        zero_copy: Optional[bool] = None,
+    ):
         self.dry_run = bool(dry_run)
+        # splice/tee stdout pumps (Linux); None: use them where available
+        self.zero_copy = zero_copy_available() and zero_copy is not False
+        self.watchdog = watchdog
+        self.profile_interval_s = profile_interval_s
+        self._profiles: list[SegmentProfile] = []
+
+    @property
+    def hang_events(self) -> list[HangEvent]:
+        return list(self.watchdog.events) if self.watchdog is not None else []
+
+    def pop_profiles(self) -> list[SegmentProfile]:
+        """Resource profiles of the segments waited for since the last call."""
+        profiles, self._profiles = self._profiles, []
+        return profiles
+
+    def _handle(
+        self,
+        popen: subprocess.Popen,
+        cmd: Command,
+        progress: Optional[ProgressTracker] = None,
+        *,
+        since_start: bool = False,
+    ) -> ProcessHandle:
+        sampler = None
+        if self.profile_interval_s:
+            sampler = ResourceSampler(
+                popen.pid,
+                interval_s=self.profile_interval_s,
+                argv=cmd.argv,
+                cwd=cmd.cwd,
+                cores=cmd.allocated_cores,
+                since_start=since_start,
+            ).start()
+        return ProcessHandle(
+            pid=popen.pid,
+            command=cmd,
+            started_at=datetime.now(),
+            popen=popen,
+            progress=progress,
+            sampler=sampler,
+            trace_start_us=trace_clock_us() if active_tracer() else None,
+            trace_tags=current_trace_tags(),
+        )
+
+    @staticmethod
+    def _sample_before_reaping(handle: ProcessHandle) -> None:
+        # wait for the exit without reaping, so the final CPU/IO counters
+        # of the process are still readable from /proc
+        try:
+            os.waitid(os.P_PID, handle.pid, os.WEXITED | os.WNOWAIT)
+        except (AttributeError, ChildProcessError, OSError):
+            return
+        handle.sampler.sample()
+
+    @staticmethod
+    def _trace_process(handle: ProcessHandle, rc: int) -> None:
+        # one lane per engine process, named after the command and run dir
+        if handle.trace_start_us is None:
+            return
+        command = Path(handle.command.argv[0]).name
+        cwd = Path(handle.command.cwd)
+        record_span(
+            command,
+            "subprocess",
+            handle.trace_start_us,
+            trace_clock_us(),
+            pid=handle.pid,
+            process_name=f"{command} {cwd.name}",
+            args={
+                **(handle.trace_tags or {}),
+                "cwd": str(cwd),
+                "rc": rc,
+                "hang": (
+                    handle.hang_event.reason
+                    if handle.hang_event is not None
+                    else None
+                ),
+            },
+        )
+
+    def _new_tracker(self) -> Optional[ProgressTracker]:
+        if self.watchdog is None:
+            return None
+        return self.watchdog.new_tracker()
 
     def _pump_stdout(
-        self, pipe, primary_path: Path, mirror_path: Optional[Path]
+        self,
+        pipe,
+        primary_path: Path,
+        mirror_path: Optional[Path],
+        progress: Optional[ProgressTracker] = None,
     ) -> None:
         primary_path.parent.mkdir(parents=True, exist_ok=True)
         primary_fh = primary_path.open("wb")
@@ -41,6 +268,14 @@ class SubprocessRunner:
                 mirror_path.parent.mkdir(parents=True, exist_ok=True)
                 mirror_fh = mirror_path.open("wb")
 
+            if self.zero_copy:
+                pump_to_files(
+                    pipe.fileno(),
+                    primary_fh.fileno(),
+                    mirror_fh.fileno() if mirror_fh is not None else None,
+                )
+                return
+
             while True:
                 chunk = pipe.read(65536)
                 if not chunk:
@@ -48,6 +283,8 @@ class SubprocessRunner:
                 primary_fh.write(chunk)
                 if mirror_fh is not None:
                     mirror_fh.write(chunk)
+                if progress is not None:
+                    progress.feed(chunk)
 
             primary_fh.flush()
             if mirror_fh is not None:
@@ -61,6 +298,38 @@ class SubprocessRunner:
             if mirror_fh is not None:
                 mirror_fh.close()
 
+    @staticmethod
+    def _pump_ring(
+        pipe,
+        ring: ShmRingWriter,
+        mirror_path: Optional[Path],
+        progress: Optional[ProgressTracker] = None,
+    ) -> None:
+        mirror_fh = None
+        try:
+            if mirror_path is not None:
+                mirror_path.parent.mkdir(parents=True, exist_ok=True)
+                mirror_fh = mirror_path.open("wb")
+
+            while True:
+                chunk = pipe.read(65536)
+                if not chunk:
+                    break
+                # bounded wait, then spill: never stops draining the engine
+                ring.write(chunk)
+                if mirror_fh is not None:
+                    mirror_fh.write(chunk)
+                if progress is not None:
+                    progress.feed(chunk)
+        finally:
+            try:
+                pipe.close()
+            except Exception:
+                pass
+            ring.close()
+            if mirror_fh is not None:
+                mirror_fh.close()
+
     def start(self, cmd: Command) -> ProcessHandle:
         cmd.cwd.mkdir(parents=True, exist_ok=True)
 
@@ -80,10 +349,37 @@ class SubprocessRunner:
                 cmd.stdout_disk_path.write_text(
                     "[dry_run] subprocess not executed\n", encoding="utf-8"
                 )
+            if cmd.stdout_ring is not None:
+                cmd.stdout_ring.close()
             return ProcessHandle(
                 pid=0, command=cmd, started_at=datetime.now(), popen=None
             )
 
+        if cmd.stdout_ring is not None:
+            p = subprocess.Popen(
+                cmd.argv,
+                cwd=str(cmd.cwd),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=False,
+                bufsize=0,
+            )
+            progress = self._new_tracker()
+            mirror = cmd.stdout_disk_path or cmd.stdout_path
+            pump_thread = threading.Thread(
+                target=self._pump_ring,
+                args=(
+                    p.stdout,
+                    cmd.stdout_ring,
+                    Path(mirror) if mirror is not None else None,
+                    progress,
+                ),
+                daemon=True,
+            )
+            pump_thread.start()
+            p._py_mcmd_pump_thread = pump_thread  # type: ignore[attr-defined]
+            return self._handle(p, cmd, progress)
+
         if cmd.stdout_path is None:
             p = subprocess.Popen(
                 cmd.argv,
@@ -91,9 +387,7 @@ class SubprocessRunner:
                 stderr=subprocess.STDOUT,
                 text=True,
             )
-            return ProcessHandle(
-                pid=p.pid, command=cmd, started_at=datetime.now(), popen=p
-            )
+            return self._handle(p, cmd)
 
         if cmd.stdout_disk_path is None or Path(cmd.stdout_disk_path) == Path(
             cmd.stdout_path
@@ -108,9 +402,7 @@ class SubprocessRunner:
                 text=True,
             )
             p._py_mcmd_out_fh = out_fh  # type: ignore[attr-defined]
-            return ProcessHandle(
-                pid=p.pid, command=cmd, started_at=datetime.now(), popen=p
-            )
+            return self._handle(p, cmd)
 
         if cmd.stdout_fifo_path is not None:
             if self.dry_run:
@@ -137,33 +429,56 @@ class SubprocessRunner:
                 bufsize=0,
             )
 
+            # zero-copy pumps never see the bytes: the watchdog tails the file
+            progress = None if self.zero_copy else self._new_tracker()
+
             def _pump_fifo(
                 pipe, fifo_path: Path, mirror_path: Optional[Path]
             ) -> None:
-                fifo_fh = None
+                fifo: Optional[_FifoFeed] = None
                 mirror_fh = None
                 try:
-                    fifo_fd = os.open(str(fifo_path), os.O_RDWR | os.O_NONBLOCK)
-                    fifo_fh = os.fdopen(fifo_fd, "wb", buffering=0)
+                    fifo = _FifoFeed(
+                        os.open(str(fifo_path), os.O_RDWR | os.O_NONBLOCK)
+                    )
 
                     if mirror_path is not None:
                         mirror_path.parent.mkdir(parents=True, exist_ok=True)
                         mirror_fh = mirror_path.open("wb")
 
+                    if self.zero_copy and mirror_fh is not None:
+                        if not pump_to_fifo(
+                            pipe.fileno(),
+                            fifo.fd,
+                            mirror_fh.fileno(),
+                            stall_s=FIFO_STALL_S,
+                        ):
+                            # tee cannot stop at a line: the marker's
+                            # leading newline ends a torn one
+                            _warn_stalled(fifo_path, mirror_path)
+                            fifo.give_up()
+                        return
+
                     while True:
                         chunk = pipe.read(65536)
                         if not chunk:
                             break
-                        fifo_fh.write(chunk)
+                        # a stalled reader must not kill the pump (and with
+                        # it the engine's stdout): stop feeding the FIFO and
+                        # keep draining into the mirror
+                        if not fifo.feed(chunk):
+                            _warn_stalled(fifo_path, mirror_path)
                         if mirror_fh is not None:
                             mirror_fh.write(chunk)
+                        if progress is not None:
+                            progress.feed(chunk)
                 finally:
                     try:
                         pipe.close()
                     except Exception:
                         pass
-                    if fifo_fh is not None:
-                        fifo_fh.close()
+                    if fifo is not None:
+                        fifo.close()
                     if mirror_fh is not None:
                         mirror_fh.close()
 
@@ -178,9 +493,7 @@ class SubprocessRunner:
             )
             pump_thread.start()
             p._py_mcmd_pump_thread = pump_thread  # type: ignore[attr-defined]
-            return ProcessHandle(
-                pid=p.pid, command=cmd, started_at=datetime.now(), popen=p
-            )
+            return self._handle(p, cmd, progress)
         p = subprocess.Popen(
             cmd.argv,
             cwd=str(cmd.cwd),
@@ -189,22 +502,76 @@ class SubprocessRunner:
             text=False,
             bufsize=0,
         )
+        progress = None if self.zero_copy else self._new_tracker()
         pump_thread = threading.Thread(
             target=self._pump_stdout,
-            args=(p.stdout, Path(cmd.stdout_path), Path(cmd.stdout_disk_path)),
+            args=(
+                p.stdout,
+                Path(cmd.stdout_path),
+                Path(cmd.stdout_disk_path),
+                progress,
+            ),
             daemon=True,
         )
         pump_thread.start()
         p._py_mcmd_pump_thread = pump_thread  # type: ignore[attr-defined]
-        return ProcessHandle(
-            pid=p.pid, command=cmd, started_at=datetime.now(), popen=p
-        )
+        return self._handle(p, cmd, progress)
+
+    def attach(
+        self,
+        popen: subprocess.Popen,
+        cmd: Command,
+        wait_done: Callable[[Optional[float]], Optional[int]],
+    ) -> ProcessHandle:
+        """Handle for one segment run by an already running process.
+
+        `wait_done(timeout)` returns the segment's rc once it is done, else
+        None. `wait` then supervises, profiles and traces the segment like
+        a launched process, but does not reap the process; the profile only
+        counts what the process did after this call.
+        """
+        handle = self._handle(popen, cmd, since_start=True)
+        handle.wait_done = wait_done
+        return handle
 
     def wait(self, handle: ProcessHandle) -> int:
         if handle.popen is None:
             return 0
 
-        rc = int(handle.popen.wait())
+        if self.watchdog is None and handle.wait_done is not None:
+            rc = int(handle.wait_done(None))
+        elif self.watchdog is None:
+            if handle.sampler is not None:
+                self._sample_before_reaping(handle)
+            rc = int(handle.popen.wait())
+        else:
+            # without a pump thread feeding it (or with a zero-copy one),
+            # progress is read back from the file
+            tail_file = None
+            if handle.progress is None:
+                tail_file = (
+                    handle.command.stdout_disk_path
+                    or handle.command.stdout_path
+                )
+            rc, handle.hang_event = self.watchdog.supervise(
+                handle.popen,
+                argv=list(handle.command.argv),
+                cwd=Path(handle.command.cwd),
+                progress=handle.progress or self.watchdog.new_tracker(),
+                stdout_file=tail_file,
+                before_reap=(
+                    handle.sampler.sample
+                    if handle.sampler is not None
+                    else None
+                ),
+                wait_done=handle.wait_done,
+            )
+
+        if handle.sampler is not None:
+            if handle.wait_done is not None:
+                handle.sampler.sample()  # the process is still running
+            handle.profile = handle.sampler.stop()
+            self._profiles.append(handle.profile)
 
         pump_thread = getattr(handle.popen, "_py_mcmd_pump_thread", None)
         if pump_thread is not None:
@@ -216,6 +583,11 @@ class SubprocessRunner:
                 out_fh.close()
             except Exception:
                 pass
+
+        self._trace_process(handle, rc)
+
+        if handle.hang_event is not None and handle.hang_event.action == "kill":
+            raise SegmentHangError(handle.hang_event)
         return rc
 
     def run_and_wait(self, cmd: Command) -> int:
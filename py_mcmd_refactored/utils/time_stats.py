@@ -0,0 +1,219 @@
+"""Streaming TIME_STATS recorder with constant-memory rolling aggregates."""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+TIME_STATS_COLUMNS = (
+    "NAMD_time_s",
+    "GOMC_time_s",
+    "Python_time_s",
+    "Total_time_s",
+)
+
+TIME_STATS_HEADER = (
+    "*************************************************\n"
+    "TIME_STATS_TITLE:\t"
+    "#Cycle_No\t\t"
+    "NAMD_time_s\t\t"
+    "GOMC_time_s\t\t"
+    "Python_time_s\t\t"
+    "Total_time_s\n"
+)
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate using the P-square algorithm.
+
+    Jain & Chlamtac (1985): five markers are adjusted with a piecewise
+    parabolic fit as observations arrive, so the estimate needs O(1) memory
+    and O(1) work per value. Exact for the first five observations.
+    """
+
+    __slots__ = ("p", "_heights", "_pos", "_desired0", "_step", "_count")
+
+    def __init__(self, p: float) -> None:
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"quantile must be in (0, 1), got {p}")
+        self.p = float(p)
+        self._heights: List[float] = []
+        self._pos = [1, 2, 3, 4, 5]
+        # desired marker positions after the first five observations
+        self._desired0 = (1.0, 1.0 + 2 * p, 1.0 + 4 * p, 3.0 + 2 * p, 5.0)
+        self._step = (0.0, p / 2, p, (1.0 + p) / 2, 1.0)
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def add(self, x: float) -> None:
+        x = float(x)
+        self._count += 1
+        q = self._heights
+
+        if self._count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while k < 3 and x >= q[k + 1]:
+                k += 1
+
+        n = self._pos
+        for i in range(k + 1, 5):
+            n[i] += 1
+        extra = self._count - 5
+
+        for i in (1, 2, 3):
+            d = self._desired0[i] + extra * self._step[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (
+                d <= -1 and n[i - 1] - n[i] < -1
+            ):
+                s = 1 if d > 0 else -1
+                cand = self._parabolic(i, s)
+                if not q[i - 1] < cand < q[i + 1]:
+                    cand = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = cand
+                n[i] += s
+
+    def _parabolic(self, i: int, s: int) -> float:
+        q = self._heights
+        n = self._pos
+        return q[i] + s / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        if not self._count:
+            return None
+        if self._count <= 5:
+            # nearest-rank on the exact sample
+            idx = max(0, math.ceil(self.p * self._count) - 1)
+            return self._heights[idx]
+        return self._heights[2]
+
+
+class RollingStats:
+    """Count, mean, max and streaming p50/p95 for one TIME_STATS column."""
+
+    __slots__ = ("count", "mean", "max", "_p50", "_p95")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.max: Optional[float] = None
+        self._p50 = P2Quantile(0.50)
+        self._p95 = P2Quantile(0.95)
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        self.mean += (x - self.mean) / self.count
+        if self.max is None or x > self.max:
+            self.max = x
+        self._p50.add(x)
+        self._p95.add(x)
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "p50": self._p50.value(),
+            "p95": self._p95.value(),
+            "max": self.max,
+        }
+
+
+class TimeStatsRecorder:
+    """
+    Stream TIME_STATS lines to `path` and keep rolling aggregates.
+
+    Only the header and the last `keep_recent` data lines stay in memory
+    (exposed as `lines` for the run summary); every line is written to the
+    file as it is produced, so a run of any length holds O(1) state.
+    """
+
+    def __init__(self, path: str | Path, *, keep_recent: int = 100) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh: Optional[TextIO] = self.path.open("w")
+        self._header: Optional[str] = None
+        self._recent: deque[str] = deque(maxlen=max(0, int(keep_recent)))
+        self.stats = {col: RollingStats() for col in TIME_STATS_COLUMNS}
+
+    def write_header(self) -> str:
+        self._header = TIME_STATS_HEADER
+        self._write(TIME_STATS_HEADER)
+        return TIME_STATS_HEADER
+
+    def record(
+        self,
+        cycle_no: int,
+        namd_s: float,
+        gomc_s: float,
+        python_s: float,
+        total_s: float,
+    ) -> str:
+        """Write one TIME_STATS_DATA line and fold it into the aggregates."""
+        data = (
+            f"TIME_STATS_DATA:\t"
+            f"{cycle_no}\t\t"
+            f"{namd_s}\t\t"
+            f"{gomc_s}\t\t"
+            f"{python_s}\t\t"
+            f"{total_s}\n"
+        )
+        self._write(data)
+        self._recent.append(data)
+        for col, value in zip(
+            TIME_STATS_COLUMNS, (namd_s, gomc_s, python_s, total_s)
+        ):
+            self.stats[col].add(value)
+        return data
+
+    @property
+    def lines(self) -> List[str]:
+        head = [self._header] if self._header is not None else []
+        return head + list(self._recent)
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {col: s.as_dict() for col, s in self.stats.items()}
+
+    def summary_line(self) -> str:
+        total = self.stats["Total_time_s"].as_dict()
+        return (
+            "TIME_STATS_SUMMARY:\t"
+            f"cycles={total['count']}\t"
+            f"mean={_fmt(total['mean'])}\t"
+            f"p50={_fmt(total['p50'])}\t"
+            f"p95={_fmt(total['p95'])}\t"
+            f"max={_fmt(total['max'])}"
+        )
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def _write(self, text: str) -> None:
+        if self._fh is not None:
+            self._fh.write(text)
+            # one line per cycle; readable by `py-mcmd timing` mid-run
+            self._fh.flush()
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.6f}"
@@ -0,0 +1,276 @@
+"""Timing analytics and remaining-time forecast of a (running) coupled run.
+
+Reads the per-cycle ``TIME_STATS_started_at_cycle_No_<n>.txt`` files the
+orchestrator streams to the log dir (falling back to the TIME_STATS_DATA
+lines of the ``NAMD_GOMC_started_at_cycle_No_<n>.log`` files of older
+runs). A restarted run writes a new file; for cycles present in several
+files the file started last wins, like the restart itself.
+
+`analyze` reports per-phase distributions, linear trends against the cycle
+number (and of GOMC time against the box-0 molecule count when the combined
+GOMC stat output is indexed), outlier cycles by modified z-score, the Python
+overhead fraction and a forecast of the remaining wall time and final disk
+footprint. Used by ``py-mcmd timing`` (`cli/timing.py`).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+from utils.output_index import CycleOffsetIndex
+from utils.time_stats import TIME_STATS_COLUMNS
+
+PHASES = ("namd_s", "gomc_s", "python_s", "total_s")
+
+# modified z-score above which a cycle counts as an outlier
+OUTLIER_Z = 3.5
+
+_STARTED_RE = re.compile(r"_started_at_cycle_No_(\d+)\.(?:txt|log)$")
+_DATA_PREFIX = "TIME_STATS_DATA:"
+
+
+@dataclass(frozen=True)
+class CycleTiming:
+    cycle: int
+    namd_s: float
+    gomc_s: float
+    python_s: float
+    total_s: float
+
+
+def _started_at(path: Path) -> int:
+    match = _STARTED_RE.search(path.name)
+    return int(match.group(1)) if match else -1
+
+
+def parse_time_stats_lines(lines: Iterable[str]) -> list[CycleTiming]:
+    timings = []
+    for line in lines:
+        line = line.strip()
+        if not line.startswith(_DATA_PREFIX):
+            continue
+        parts = line[len(_DATA_PREFIX) :].split()
+        if len(parts) < 1 + len(TIME_STATS_COLUMNS):
+            continue
+        try:
+            timings.append(
+                CycleTiming(int(parts[0]), *(float(v) for v in parts[1:5]))
+            )
+        except ValueError:
+            continue
+    return timings
+
+
+def read_time_stats(log_dir: str | Path) -> list[CycleTiming]:
+    """All cycle timings of a run, restarts merged, sorted by cycle."""
+    log_dir = Path(log_dir)
+    files = sorted(
+        log_dir.glob("TIME_STATS_started_at_cycle_No_*.txt"), key=_started_at
+    )
+    if not files:
+        files = sorted(
+            log_dir.glob("NAMD_GOMC_started_at_cycle_No_*.log"),
+            key=_started_at,
+        )
+    by_cycle: dict[int, CycleTiming] = {}
+    for path in files:
+        with path.open("r", encoding="utf-8", errors="ignore") as fh:
+            for timing in parse_time_stats_lines(fh):
+                by_cycle[timing.cycle] = timing
+    return [by_cycle[c] for c in sorted(by_cycle)]
+
+
+def distribution(values: Sequence[float]) -> dict[str, Optional[float]]:
+    if len(values) == 0:
+        return {"count": 0}
+    x = np.asarray(values, dtype=float)
+    p50, p90, p95 = np.percentile(x, [50, 90, 95])
+    return {
+        "count": int(x.size),
+        "mean": float(x.mean()),
+        "std": float(x.std(ddof=1)) if x.size > 1 else 0.0,
+        "min": float(x.min()),
+        "p50": float(p50),
+        "p90": float(p90),
+        "p95": float(p95),
+        "max": float(x.max()),
+    }
+
+
+def linear_trend(
+    x: Sequence[float], y: Sequence[float]
+) -> Optional[dict[str, float]]:
+    """Least-squares line of `y` against `x` (None below 3 points)."""
+    if len(x) < 3 or len(x) != len(y):
+        return None
+    xa = np.asarray(x, dtype=float)
+    ya = np.asarray(y, dtype=float)
+    if np.ptp(xa) == 0:
+        return None
+    if np.ptp(ya) == 0:
+        return {"slope": 0.0, "intercept": float(ya[0]), "r": 0.0}
+    slope, intercept = np.polyfit(xa, ya, 1)
+    r = float(np.corrcoef(xa, ya)[0, 1])
+    return {"slope": float(slope), "intercept": float(intercept), "r": r}
+
+
+def outlier_indices(
+    values: Sequence[float], threshold: float = OUTLIER_Z
+) -> list[int]:
+    """Indices of values whose modified z-score exceeds `threshold`."""
+    x = np.asarray(values, dtype=float)
+    if x.size < 3:
+        return []
+    median = np.median(x)
+    deviation = np.abs(x - median)
+    mad = np.median(deviation)
+    if mad > 0:
+        z = 0.6745 * deviation / mad
+    else:
+        # over half the values are identical; scale by the mean deviation
+        mean_ad = deviation.mean()
+        if mean_ad == 0:
+            return []
+        z = deviation / (1.253314 * mean_ad)
+    return [int(i) for i in np.flatnonzero(z > threshold)]
+
+
+def gomc_molecule_counts(
+    combined_dir: str | Path, column: str = "TOT_MOL"
+) -> dict[int, float]:
+    """Last box-0 `column` value of every indexed cycle of the GOMC stats."""
+    data = Path(combined_dir) / "GOMC_Energies_Stat_box_0.txt"
+    index = CycleOffsetIndex(data)
+    if not data.exists() or not index.path.exists():
+        return {}
+    header = index.header()
+    titles = header.split() if header else []
+    if column not in titles:
+        return {}
+    col = titles.index(column)
+
+    counts = {}
+    for cycle in index.entries()["cycle"]:
+        rows = index.read_cycles(int(cycle), int(cycle))
+        if not rows:
+            continue
+        fields = rows[-1].split()
+        try:
+            counts[int(cycle)] = float(fields[col])
+        except (IndexError, ValueError):
+            continue
+    return counts
+
+
+def forecast_remaining(
+    timings: Sequence[CycleTiming],
+    total_cycles: int,
+    *,
+    window: int = 50,
+) -> dict[str, Any]:
+    """Remaining cycles and wall time from the last `window` cycles.
+
+    ``remaining_s`` uses the window median; ``remaining_s_trend`` sums the
+    window's linear trend over the remaining cycles (e.g. GOMC slowing as
+    the box fills), never below zero per cycle.
+    """
+    done = timings[-1].cycle + 1 if timings else 0
+    remaining = max(0, int(total_cycles) - done)
+    # cycle 0 includes the NAMD minimization
+    recent = [t for t in timings if t.cycle > 0][-max(1, int(window)) :]
+    if not recent:
+        recent = list(timings)
+    out: dict[str, Any] = {
+        "cycles_done": done,
+        "total_cycles": int(total_cycles),
+        "remaining_cycles": remaining,
+        "window": len(recent),
+        "per_cycle_s": None,
+        "remaining_s": None,
+        "remaining_s_trend": None,
+    }
+    if not recent:
+        return out
+
+    per_cycle = float(np.median([t.total_s for t in recent]))
+    out["per_cycle_s"] = per_cycle
+    out["remaining_s"] = per_cycle * remaining
+    trend = linear_trend([t.cycle for t in recent], [t.total_s for t in recent])
+    if trend is not None and remaining:
+        future = np.arange(done, done + remaining, dtype=float)
+        predicted = trend["intercept"] + trend["slope"] * future
+        out["remaining_s_trend"] = float(np.clip(predicted, 0, None).sum())
+    else:
+        out["remaining_s_trend"] = out["remaining_s"]
+    return out
+
+
+def forecast_disk(
+    current_bytes: int, cycles_done: int, total_cycles: int
+) -> dict[str, Optional[int]]:
+    """Final footprint of the run dirs, assuming linear growth per cycle."""
+    if cycles_done <= 0:
+        return {"current_bytes": int(current_bytes), "final_bytes": None}
+    per_cycle = current_bytes / cycles_done
+    return {
+        "current_bytes": int(current_bytes),
+        "bytes_per_cycle": int(round(per_cycle)),
+        "final_bytes": int(round(per_cycle * total_cycles)),
+    }
+
+
+def analyze(
+    timings: Sequence[CycleTiming],
+    *,
+    total_cycles: Optional[int] = None,
+    molecule_counts: Optional[dict[int, float]] = None,
+    window: int = 50,
+    outlier_z: float = OUTLIER_Z,
+) -> dict[str, Any]:
+    """The timing report of `timings` (see the module docstring)."""
+    cycles = [t.cycle for t in timings]
+    series = {p: [getattr(t, p) for t in timings] for p in PHASES}
+    total_time = sum(series["total_s"])
+
+    outliers = {}
+    for phase in PHASES:
+        idx = outlier_indices(series[phase], outlier_z)
+        if idx:
+            outliers[phase] = [cycles[i] for i in idx]
+
+    report: dict[str, Any] = {
+        "cycles": len(timings),
+        "first_cycle": cycles[0] if cycles else None,
+        "last_cycle": cycles[-1] if cycles else None,
+        "missing_cycles": (
+            sorted(set(range(cycles[0], cycles[-1] + 1)) - set(cycles))
+            if cycles
+            else []
+        ),
+        "distributions": {p: distribution(series[p]) for p in PHASES},
+        "trends": {p: linear_trend(cycles, series[p]) for p in PHASES},
+        "outliers": outliers,
+        "python_overhead_fraction": (
+            sum(series["python_s"]) / total_time if total_time > 0 else None
+        ),
+        "gomc_vs_molecules": None,
+    }
+
+    if molecule_counts:
+        pairs = [
+            (molecule_counts[t.cycle], t.gomc_s)
+            for t in timings
+            if t.cycle in molecule_counts
+        ]
+        if pairs:
+            report["gomc_vs_molecules"] = linear_trend(*zip(*pairs))
+
+    if total_cycles is not None:
+        report["forecast"] = forecast_remaining(
+            timings, total_cycles, window=window
+        )
+    return report
@@ -0,0 +1,289 @@
+"""Chrome/Perfetto trace-event export of the cycle timeline.
+
+When ``trace_events_path`` is set the orchestrator installs a `TraceWriter`
+for the run, and the orchestrator, engines, `SubprocessRunner` and
+`OnTheFlyProcessor` emit spans through the module-level helpers below:
+
+* `trace_span` - a complete ("X") event on the calling thread;
+* `trace_tags` - tags (cycle, run_no, box, ...) added to every span opened
+  in the current context, e.g. the subprocess span of one NAMD box;
+* `record_span` - a span measured elsewhere, e.g. an engine process, which
+  gets its own process lane (pid) named after the command and run dir.
+
+A worker process (the isolated OTF worker) installs a `TraceCollector`
+instead and sends its events back; `replay_spans` records them on a lane of
+the worker's pid. The trace clock is system-wide, so no offset is needed.
+
+Without an installed writer the helpers do nothing. Events are streamed as
+a JSON array, one per line; the closing bracket is written on `close`, but
+trace viewers also load the file of a run that crashed before that.
+Open the file in https://ui.perfetto.dev or chrome://tracing.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+_ACTIVE: Optional["TraceWriter"] = None
+_TAGS: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar(
+    "py_mcmd_trace_tags", default={}
+)
+
+
+def trace_clock_us() -> int:
+    """Trace clock (monotonic microseconds)."""
+    return time.perf_counter_ns() // 1000
+
+
+class TraceWriter:
+    """Thread-safe writer of a trace-event JSON array."""
+
+    def __init__(self, path: str | Path, *, name: str = "py-mcmd") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.pid = os.getpid()
+        self.events = 0
+        self._lock = threading.Lock()
+        self._named: set[tuple[int, Optional[int]]] = set()
+        self._fh = self.path.open("w", encoding="utf-8")
+        self._fh.write("[\n")
+        self.name_process(self.pid, name)
+
+    def _write(self, event: dict[str, Any]) -> None:
+        # called with the lock held
+        if self._fh is None:
+            return
+        self._fh.write(json.dumps(event, default=str) + ",\n")
+        self.events += 1
+
+    def name_process(self, pid: int, name: str) -> None:
+        with self._lock:
+            if (pid, None) in self._named:
+                return
+            self._named.add((pid, None))
+            self._write(
+                {
+                    "ph": "M",
+                    "name": "process_name",
+                    "pid": pid,
+                    "tid": 0,
+                    "args": {"name": name},
+                }
+            )
+
+    def _name_current_thread(self) -> int:
+        tid = threading.get_ident()
+        if (self.pid, tid) not in self._named:
+            self._named.add((self.pid, tid))
+            self._write(
+                {
+                    "ph": "M",
+                    "name": "thread_name",
+                    "pid": self.pid,
+                    "tid": tid,
+                    "args": {"name": threading.current_thread().name},
+                }
+            )
+        return tid
+
+    def complete(
+        self,
+        name: str,
+        cat: str,
+        start_us: int,
+        end_us: int,
+        *,
+        pid: Optional[int] = None,
+        tid: Optional[int] = None,
+        args: Optional[dict[str, Any]] = None,
+    ) -> None:
+        with self._lock:
+            if pid is None:
+                pid = self.pid
+                tid = self._name_current_thread()
+            self._write(
+                {
+                    "ph": "X",
+                    "name": name,
+                    "cat": cat,
+                    "ts": int(start_us),
+                    "dur": max(0, int(end_us) - int(start_us)),
+                    "pid": pid,
+                    "tid": pid if tid is None else tid,
+                    "args": args or {},
+                }
+            )
+
+    def instant(
+        self, name: str, cat: str, *, args: Optional[dict[str, Any]] = None
+    ) -> None:
+        with self._lock:
+            self._write(
+                {
+                    "ph": "i",
+                    "s": "t",
+                    "name": name,
+                    "cat": cat,
+                    "ts": trace_clock_us(),
+                    "pid": self.pid,
+                    "tid": self._name_current_thread(),
+                    "args": args or {},
+                }
+            )
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is None:
+                return
+            # a final metadata event absorbs the trailing comma
+            self._fh.write(
+                json.dumps(
+                    {
+                        "ph": "M",
+                        "name": "trace_end",
+                        "pid": self.pid,
+                        "tid": 0,
+                        "args": {"events": self.events},
+                    }
+                )
+                + "\n]\n"
+            )
+            self._fh.close()
+            self._fh = None
+
+
+class TraceCollector(TraceWriter):
+    """Writer keeping the events in memory until `drain`."""
+
+    def __init__(self) -> None:
+        self.path = None
+        self.pid = os.getpid()
+        self.events = 0
+        self._lock = threading.Lock()
+        self._named = set()
+        self._fh = None
+        self._events: list[dict[str, Any]] = []
+
+    def _write(self, event: dict[str, Any]) -> None:
+        self._events.append(event)
+        self.events += 1
+
+    def drain(self) -> list[dict[str, Any]]:
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+
+def install_tracer(path: str | Path) -> TraceWriter:
+    """Open a writer at `path` and make it the active one."""
+    global _ACTIVE
+    if _ACTIVE is not None:
+        _ACTIVE.close()
+    _ACTIVE = TraceWriter(path)
+    return _ACTIVE
+
+
+def install_collector() -> TraceCollector:
+    """Make an in-memory `TraceCollector` the active writer."""
+    global _ACTIVE
+    if _ACTIVE is not None:
+        _ACTIVE.close()
+    _ACTIVE = TraceCollector()
+    return _ACTIVE
+
+
+def uninstall_tracer() -> None:
+    global _ACTIVE
+    writer, _ACTIVE = _ACTIVE, None
+    if writer is not None:
+        writer.close()
+
+
+def active_tracer() -> Optional[TraceWriter]:
+    return _ACTIVE
+
+
+def current_trace_tags() -> dict[str, Any]:
+    return dict(_TAGS.get())
+
+
+@contextlib.contextmanager
+def trace_tags(**tags: Any) -> Iterator[None]:
+    token = _TAGS.set({**_TAGS.get(), **tags})
+    try:
+        yield
+    finally:
+        _TAGS.reset(token)
+
+
+@contextlib.contextmanager
+def trace_span(name: str, cat: str = "py-mcmd", **args: Any) -> Iterator[None]:
+    """Time the block as a span on the calling thread."""
+    writer = _ACTIVE
+    if writer is None:
+        yield
+        return
+    tags = {**_TAGS.get(), **args}
+    start = trace_clock_us()
+    try:
+        yield
+    except BaseException as exc:
+        tags["error"] = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        writer.complete(name, cat, start, trace_clock_us(), args=tags)
+
+
+def record_span(
+    name: str,
+    cat: str,
+    start_us: int,
+    end_us: int,
+    *,
+    pid: Optional[int] = None,
+    process_name: Optional[str] = None,
+    args: Optional[dict[str, Any]] = None,
+) -> None:
+    """Record a span measured by the caller (own lane when `pid` is set)."""
+    writer = _ACTIVE
+    if writer is None:
+        return
+    if pid is not None and process_name:
+        writer.name_process(pid, process_name)
+    if pid is None:
+        args = {**_TAGS.get(), **(args or {})}
+    writer.complete(name, cat, start_us, end_us, pid=pid, args=args)
+
+
+def replay_spans(events: list[dict[str, Any]], *, process_name: str) -> None:
+    """Record the spans a `TraceCollector` gathered in another process."""
+    for event in events:
+        if event.get("ph") != "X":
+            continue
+        record_span(
+            event["name"],
+            event["cat"],
+            event["ts"],
+            event["ts"] + event["dur"],
+            pid=event["pid"],
+            process_name=process_name,
+            args=event["args"],
+        )
+
+
+def trace_instant(name: str, cat: str = "py-mcmd", **args: Any) -> None:
+    writer = _ACTIVE
+    if writer is not None:
+        writer.instant(name, cat, args={**_TAGS.get(), **args})
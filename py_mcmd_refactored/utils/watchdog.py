@@ -0,0 +1,451 @@
+"""Hang detection for engine subprocesses.
+
+`SubprocessRunner.wait` hands a running segment to `EngineWatchdog`, which
+polls the process every ``check_interval_s`` seconds. Progress is what
+reaches stdout: bytes written and the step numbers of NAMD/GOMC energy
+lines (`ProgressTracker`, fed by the pump threads or by tailing the stdout
+file). CPU time of the whole process tree comes from ``/proc``.
+
+Healthy segments teach a per-command baseline: their duration, the longest
+silence between two stdout updates and the CPU seconds used per wall-clock
+second. A segment that has been silent for ``stall_factor`` times the
+baseline silence is treated as hung when either its CPU use over the
+silence fell below ``cpu_stall_fraction`` of the baseline (a deadlock
+sleeping in MPI/condition waits) or it has already run ``stall_factor``
+times longer than a whole baseline segment (a busy loop such as stuck load
+balancing). Before any baseline exists only ``idle_timeout_s`` applies.
+
+A detected hang becomes a `HangEvent` carrying the last stdout lines and
+the CPU figures. It is logged and written to ``watchdog_event.json`` in the
+segment directory; in ``kill`` mode the process is terminated and
+`SubprocessRunner.wait` raises `SegmentHangError`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from utils.procfs import process_table, process_tree
+
+logger = logging.getLogger(__name__)
+
+WATCHDOG_EVENT_NAME = "watchdog_event.json"
+
+# step numbers of NAMD ENERGY/TIMING lines and GOMC ENER_/STAT_ lines
+_STEP_RE = re.compile(rb"^\s*(?:ENERGY|TIMING|ENER_\d+|STAT_\d+):\s+(\d+)")
+_BASELINE_WEIGHT = 0.5  # of the newest healthy segment in the baseline
+_TERMINATE_GRACE_S = 10.0
+
+
+class SegmentHangError(RuntimeError):
+    """Raised by `SubprocessRunner.wait` after the watchdog killed a hang."""
+
+    def __init__(self, event: "HangEvent") -> None:
+        super().__init__(event.summary())
+        self.event = event
+
+
+@dataclass(frozen=True)
+class HangEvent:
+    pid: int
+    argv: list[str]
+    cwd: str
+    action: str  # "flag" or "kill"
+    reason: str
+    elapsed_s: float
+    silent_s: float
+    stdout_bytes: int
+    last_step: Optional[int]
+    cpu_seconds: Optional[float]
+    cpu_percent_while_silent: Optional[float]
+    baseline: Optional[dict[str, float]]
+    last_lines: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{' '.join(self.argv)} in {self.cwd} (pid {self.pid}) "
+            f"{self.reason}"
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class ProgressTracker:
+    """Bytes, step numbers and last lines seen on a segment's stdout."""
+
+    def __init__(self, tail_lines: int = 50) -> None:
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.last_step: Optional[int] = None
+        self._lines: deque[bytes] = deque(maxlen=max(1, int(tail_lines)))
+        self._partial = b""
+        self._file_offset = 0
+
+    def feed(self, chunk: bytes) -> None:
+        with self._lock:
+            self.bytes += len(chunk)
+            lines = (self._partial + chunk).split(b"\n")
+            self._partial = lines.pop()
+            for line in lines:
+                self._lines.append(line)
+                match = _STEP_RE.match(line)
+                if match:
+                    self.last_step = int(match.group(1))
+
+    def sync_file(self, path: Path) -> None:
+        """Feed whatever was appended to `path` since the last call."""
+        try:
+            with Path(path).open("rb") as fh:
+                fh.seek(self._file_offset)
+                chunk = fh.read()
+        except OSError:
+            return
+        if chunk:
+            self._file_offset += len(chunk)
+            self.feed(chunk)
+
+    def mark(self) -> tuple[int, Optional[int]]:
+        with self._lock:
+            return self.bytes, self.last_step
+
+    def last_lines(self) -> list[str]:
+        with self._lock:
+            lines = list(self._lines)
+            if self._partial:
+                lines.append(self._partial)
+        return [line.decode("utf-8", errors="replace") for line in lines]
+
+
+def process_tree_cpu_seconds(pid: int) -> Optional[float]:
+    """User + system CPU seconds of `pid` and its live descendants.
+
+    None when ``/proc`` is unavailable or the process is gone.
+    """
+    table = process_table()
+    if table is None or int(pid) not in table[1]:
+        return None
+    children, cpu = table
+    return sum(cpu.get(p, 0.0) for p in process_tree(pid, children))
+
+
+@dataclass
+class ProgressBaseline:
+    duration_s: float
+    silence_s: float
+    cpu_rate: Optional[float]  # CPU seconds per wall-clock second
+    segments: int = 1
+
+    def update(
+        self, duration_s: float, silence_s: float, cpu_rate: Optional[float]
+    ) -> None:
+        w = _BASELINE_WEIGHT
+        self.duration_s = (1 - w) * self.duration_s + w * duration_s
+        self.silence_s = (1 - w) * self.silence_s + w * silence_s
+        if cpu_rate is not None:
+            self.cpu_rate = (
+                cpu_rate
+                if self.cpu_rate is None
+                else (1 - w) * self.cpu_rate + w * cpu_rate
+            )
+        self.segments += 1
+
+
+def _wait_exit(
+    popen: subprocess.Popen,
+    timeout: float,
+    before_reap: Optional[Callable[[], None]] = None,
+) -> Optional[int]:
+    """Exit code of `popen` within `timeout` seconds, else None."""
+    if before_reap is not None:
+        deadline = time.monotonic() + timeout
+        delay = 0.0005
+        while True:
+            try:
+                info = os.waitid(
+                    os.P_PID,
+                    popen.pid,
+                    os.WEXITED | os.WNOHANG | os.WNOWAIT,
+                )
+            except (AttributeError, ChildProcessError, OSError):
+                break  # already reaped or no waitid: plain wait below
+            if info is not None:
+                before_reap()
+                return int(popen.wait())
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            # same back-off as Popen.wait(timeout)
+            delay = min(delay * 2, remaining, 0.05)
+            time.sleep(delay)
+        timeout = max(0.0, deadline - time.monotonic())
+    try:
+        return int(popen.wait(timeout=timeout))
+    except subprocess.TimeoutExpired:
+        return None
+
+
+class EngineWatchdog:
+    def __init__(
+        self,
+        *,
+        mode: str = "flag",
+        check_interval_s: float = 5.0,
+        grace_s: float = 60.0,
+        stall_factor: float = 4.0,
+        cpu_stall_fraction: float = 0.1,
+        idle_timeout_s: Optional[float] = None,
+        tail_lines: int = 50,
+    ) -> None:
+        self.mode = mode
+        self.check_interval_s = float(check_interval_s)
+        self.grace_s = float(grace_s)
+        self.stall_factor = float(stall_factor)
+        self.cpu_stall_fraction = float(cpu_stall_fraction)
+        self.idle_timeout_s = (
+            float(idle_timeout_s) if idle_timeout_s is not None else None
+        )
+        self.tail_lines = int(tail_lines)
+        self.baselines: dict[str, ProgressBaseline] = {}
+        self.events: list[HangEvent] = []
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["EngineWatchdog"]:
+        spec = getattr(cfg, "engine_watchdog", None)
+        if spec is None:
+            return None
+
+        def _get(name, default=None):
+            if isinstance(spec, dict):
+                return spec.get(name, default)
+            return getattr(spec, name, default)
+
+        if str(_get("mode", "flag")) == "off":
+            return None
+        return cls(
+            mode=str(_get("mode", "flag")),
+            check_interval_s=float(_get("check_interval_s", 5.0)),
+            grace_s=float(_get("grace_s", 60.0)),
+            stall_factor=float(_get("stall_factor", 4.0)),
+            cpu_stall_fraction=float(_get("cpu_stall_fraction", 0.1)),
+            idle_timeout_s=_get("idle_timeout_s"),
+            tail_lines=int(_get("tail_lines", 50)),
+        )
+
+    @staticmethod
+    def baseline_key(argv: list[str], cwd: Path) -> str:
+        # run dirs are "<run id>[_a|_b]": one baseline per engine and box
+        return f"{Path(argv[0]).name}|{re.sub(r'^[0-9]+', '', cwd.name)}"
+
+    def new_tracker(self) -> ProgressTracker:
+        return ProgressTracker(self.tail_lines)
+
+    # ------------------------------------------------------------------
+    def supervise(
+        self,
+        popen: subprocess.Popen,
+        *,
+        argv: list[str],
+        cwd: Path,
+        progress: ProgressTracker,
+        stdout_file: Optional[Path] = None,
+        before_reap: Optional[Callable[[], None]] = None,
+        wait_done: Optional[Callable[[float], Optional[int]]] = None,
+    ) -> tuple[int, Optional[HangEvent]]:
+        """Wait for `popen`, checking for hangs; returns (rc, event).
+
+        `before_reap` runs once the process has exited but before it is
+        reaped, while its final counters are still readable from /proc.
+        For a process that runs several segments, `wait_done(timeout)`
+        replaces the wait for its exit: it returns the segment's rc once
+        the segment is done, else None. A hung segment still kills the
+        process.
+        """
+        key = self.baseline_key(argv, cwd)
+        baseline = self.baselines.get(key)
+
+        start = time.monotonic()
+        cpu_start = process_tree_cpu_seconds(popen.pid)
+        cpu_last = cpu_start
+        last_mark = progress.mark()
+        last_progress_at = start
+        cpu_at_progress = cpu_start
+        longest_silence = 0.0
+        event: Optional[HangEvent] = None
+
+        while True:
+            if wait_done is not None:
+                rc = wait_done(self.check_interval_s)
+            else:
+                rc = _wait_exit(popen, self.check_interval_s, before_reap)
+            if rc is not None:
+                break
+
+            now = time.monotonic()
+            if stdout_file is not None:
+                progress.sync_file(stdout_file)
+            cpu = process_tree_cpu_seconds(popen.pid)
+            if cpu is not None:
+                cpu_last = cpu
+
+            mark = progress.mark()
+            if mark != last_mark:
+                longest_silence = max(longest_silence, now - last_progress_at)
+                last_mark = mark
+                last_progress_at = now
+                cpu_at_progress = cpu
+                continue
+
+            if event is not None:
+                continue  # already flagged; keep waiting
+            event = self._check(
+                popen,
+                argv=argv,
+                cwd=cwd,
+                progress=progress,
+                baseline=baseline,
+                elapsed=now - start,
+                silent=now - last_progress_at,
+                cpu=cpu,
+                cpu_at_progress=cpu_at_progress,
+            )
+            if event is None:
+                continue
+
+            self._report(event, cwd)
+            if event.action == "kill":
+                rc = self._terminate(popen)
+                break
+
+        end = time.monotonic()
+        if event is None and rc == 0:
+            silence = max(longest_silence, end - last_progress_at)
+            duration = end - start
+            cpu_rate = (
+                (cpu_last - cpu_start) / duration
+                if cpu_start is not None and cpu_last is not None and duration
+                else None
+            )
+            if baseline is None:
+                self.baselines[key] = ProgressBaseline(
+                    duration, silence, cpu_rate
+                )
+            else:
+                baseline.update(duration, silence, cpu_rate)
+        return rc, event
+
+    def _check(
+        self,
+        popen: subprocess.Popen,
+        *,
+        argv: list[str],
+        cwd: Path,
+        progress: ProgressTracker,
+        baseline: Optional[ProgressBaseline],
+        elapsed: float,
+        silent: float,
+        cpu: Optional[float],
+        cpu_at_progress: Optional[float],
+    ) -> Optional[HangEvent]:
+        if elapsed < self.grace_s:
+            return None
+
+        cpu_rate = None
+        if cpu is not None and cpu_at_progress is not None and silent > 0:
+            cpu_rate = (cpu - cpu_at_progress) / silent
+
+        reason = None
+        if baseline is None:
+            if self.idle_timeout_s is not None and silent > self.idle_timeout_s:
+                reason = (
+                    f"wrote no output for {silent:.0f} s "
+                    f"(idle_timeout_s={self.idle_timeout_s:g})"
+                )
+        elif silent > self.stall_factor * max(
+            baseline.silence_s, self.check_interval_s
+        ):
+            cpu_floor = (
+                self.cpu_stall_fraction * baseline.cpu_rate
+                if baseline.cpu_rate is not None
+                else None
+            )
+            if cpu_rate is not None and cpu_floor is not None:
+                if cpu_rate < cpu_floor:
+                    reason = (
+                        f"silent for {silent:.0f} s at {cpu_rate:.0%} CPU "
+                        f"(baseline {baseline.cpu_rate:.0%}, longest "
+                        f"silence {baseline.silence_s:.0f} s)"
+                    )
+            if reason is None and (
+                elapsed > self.stall_factor * baseline.duration_s
+            ):
+                reason = (
+                    f"running for {elapsed:.0f} s, silent for {silent:.0f} s "
+                    f"(baseline segment {baseline.duration_s:.0f} s)"
+                )
+        if reason is None:
+            return None
+
+        return HangEvent(
+            pid=int(popen.pid),
+            argv=list(argv),
+            cwd=str(cwd),
+            action="kill" if self.mode == "kill" else "flag",
+            reason=reason,
+            elapsed_s=round(elapsed, 3),
+            silent_s=round(silent, 3),
+            stdout_bytes=progress.mark()[0],
+            last_step=progress.mark()[1],
+            cpu_seconds=cpu,
+            cpu_percent_while_silent=(
+                round(100.0 * cpu_rate, 1) if cpu_rate is not None else None
+            ),
+            baseline=asdict(baseline) if baseline is not None else None,
+            last_lines=progress.last_lines(),
+        )
+
+    def _report(self, event: HangEvent, cwd: Path) -> None:
+        self.events.append(event)
+        logger.warning(
+            "[Watchdog] Segment appears hung (%s): %s\n"
+            "[Watchdog] last stdout lines:\n%s",
+            event.action,
+            event.summary(),
+            "\n".join(event.last_lines[-10:]),
+        )
+        try:
+            (Path(cwd) / WATCHDOG_EVENT_NAME).write_text(
+                json.dumps(event.as_dict(), indent=1), encoding="utf-8"
+            )
+        except OSError as exc:
+            logger.warning("[Watchdog] Could not write the event file: %s", exc)
+
+    @staticmethod
+    def _terminate(popen: subprocess.Popen) -> int:
+        # launchers (charmrun, mpirun) leave their ranks behind otherwise
+        table = process_table()
+        descendants = (
+            process_tree(popen.pid, table[0])[1:] if table is not None else []
+        )
+        popen.terminate()
+        for pid in descendants:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        try:
+            return int(popen.wait(timeout=_TERMINATE_GRACE_S))
+        except subprocess.TimeoutExpired:
+            popen.kill()
+            return int(popen.wait())